@@ -46,6 +46,12 @@ ENABLE_BACKTESTING = os.getenv('ENABLE_BACKTESTING', 'True').lower() == 'true'
 BACKTEST_WEEKS = int(os.getenv('BACKTEST_WEEKS', '30'))  # 최근 N주
 BACKTEST_INITIAL_CAPITAL = float(os.getenv('BACKTEST_INITIAL_CAPITAL', '10000'))
 RISK_FREE_RATE = float(os.getenv('RISK_FREE_RATE', '0.05'))  # 무위험 수익률 5%
+ENABLE_UNIVERSE_SNAPSHOT = os.getenv('ENABLE_UNIVERSE_SNAPSHOT', 'True').lower() == 'true'  # 일일 유니버스 스냅샷 저장
+
+# 거래 비용 설정
+TRANSACTION_FEE = float(os.getenv('TRANSACTION_FEE', '0.002'))  # 수수료 0.2%
+SLIPPAGE = float(os.getenv('SLIPPAGE', '0.001'))  # 슬리피지 0.1% (유동성 데이터가 없을 때)
+COST_MODEL = os.getenv('COST_MODEL', 'fixed')  # 'fixed' 또는 'liquidity'
 
 # 재시도 설정
 MAX_RETRIES = int(os.getenv('MAX_RETRIES', '3'))
@@ -54,3 +60,13 @@ RETRY_DELAY = int(os.getenv('RETRY_DELAY', '5'))  # 초
 # 시장 필터 설정
 ENABLE_MARKET_FILTER = os.getenv('ENABLE_MARKET_FILTER', 'True').lower() == 'true'
 VIX_THRESHOLD = float(os.getenv('VIX_THRESHOLD', '20'))  # VIX 임계값
+
+# 시장 폭(breadth) 필터 - 대형주/초대형주 유니버스의 MA200 위 종목 비율이 하한보다 낮으면 현금 보유
+ENABLE_MARKET_BREADTH = os.getenv('ENABLE_MARKET_BREADTH', 'False').lower() == 'true'
+BREADTH_THRESHOLD = float(os.getenv('BREADTH_THRESHOLD', '40'))  # MA200 위 종목 비율 하한 (%)
+
+# 기술적 분석 스캔 깊이 (스크리너 상위 N개 - 이동평균/ATR/MA20 기울기/신고가 돌파, 0이면 전체 페이지)
+TECHNICAL_SCAN_DEPTH = int(os.getenv('TECHNICAL_SCAN_DEPTH', '50'))
+
+# 매수 조건식 (screening 조건식 - 일일 리포트의 조건 충족 판정과 백테스트 매수 신호에 공통 사용)
+ENTRY_RULE = os.getenv('ENTRY_RULE', 'close > ma60 > ma120')
@@ -12,21 +12,41 @@ from datetime import datetime
 sys.path.append(os.path.join(os.path.dirname(__file__), 'src'))
 
 from finviz_scraper import scrape_finviz_screener
-from data_manager import save_daily_data, load_previous_data, load_last_business_day_data
+from data_manager import (save_daily_data, load_previous_data, load_last_business_day_data,
+                          save_technical_snapshot, load_last_business_day_technical)
 from analyzer import compare_data, get_top_performers, calculate_portfolio_allocation, calculate_summary_stats
 from telegram_notifier import create_telegram_message, send_to_telegram
 from email_notifier import create_email_message, send_email
 from discord_notifier import create_discord_message, send_to_discord
-from technical_analyzer import analyze_top10_technical
+from technical_analyzer import analyze_top10_technical, scan_technical, apply_entry_rule
 from backtester import run_backtest
 from config import (TELEGRAM_BOT_TOKEN, TELEGRAM_CHAT_ID, ENABLE_TELEGRAM_NOTIFICATIONS, 
                     ENABLE_EMAIL_NOTIFICATIONS, ENABLE_DISCORD_NOTIFICATIONS, ENABLE_BACKTESTING,
-                    FINVIZ_URL_LARGE, FINVIZ_URL_MEGA, SCREENER_TYPES, ENABLE_MARKET_FILTER)
+                    FINVIZ_URL_LARGE, FINVIZ_URL_MEGA, SCREENER_TYPES, ENABLE_MARKET_FILTER,
+                    ENABLE_UNIVERSE_SNAPSHOT, TECHNICAL_SCAN_DEPTH, ENTRY_RULE, ENABLE_MARKET_BREADTH)
 from logger import get_logger
 
 # 로거 초기화
 logger = get_logger()
 
+def load_scan_candidates(df, screener_type, depth=TECHNICAL_SCAN_DEPTH):
+    """
+    기술적 스캔 대상 종목 (스크리너 순위 상위 depth개)
+    
+    첫 페이지보다 깊거나 depth가 0(전체)이면 나머지 페이지를 조회합니다.
+    조회에 실패하면 첫 페이지만 사용합니다.
+    """
+    if depth and len(df) >= depth:
+        return df.head(depth)
+    
+    from finviz_scraper import scrape_all_tickers_with_pagination
+    max_pages = -(-depth // 20) if depth else 20
+    full_df = scrape_all_tickers_with_pagination(screener_type, max_pages=max_pages)
+    if full_df is None or full_df.empty:
+        logger.warning("스크리너 전체 페이지 조회 실패: 첫 페이지 종목만 스캔합니다.")
+        full_df = df
+    return full_df.head(depth) if depth else full_df
+
 def process_screener(screener_type, today):
     """
     특정 스크리너 타입의 데이터를 처리
@@ -58,6 +78,14 @@ def process_screener(screener_type, today):
         filename = f"finviz_data_{screener_type}_{today}.csv"
         save_daily_data(df, today, filename_prefix=f"{screener_type}_")
         
+        # 유니버스 스냅샷 (백테스트의 시점별 구성 종목 조회용)
+        if ENABLE_UNIVERSE_SNAPSHOT:
+            try:
+                from universe import snapshot_universe
+                snapshot_universe(screener_type, today)
+            except Exception as e:
+                logger.error(f"유니버스 스냅샷 저장 실패: {e}", exc_info=True)
+        
         # 3) 이전 데이터 로드 및 비교
         logger.info("3. 이전 데이터 분석 중...")
         # 영업일 기준으로 전날 데이터 로드 (주말/월요일은 금요일 데이터)
@@ -99,13 +127,37 @@ def process_screener(screener_type, today):
         breakout_highs = []
         
         try:
-            technical_analysis = analyze_top10_technical(df)
-            logger.info("기술적 분석 완료")
+            # 스캔 대상: 스크리너 상위 TECHNICAL_SCAN_DEPTH개 (상위 5개 진입 직전 후보 포함)
+            scan_df = load_scan_candidates(df, screener_type)
+            depth = len(scan_df)
+            logger.info(f"기술적 스캔 대상: 상위 {depth}개 종목")
+            
+            # 가격 데이터의 원본은 로컬 일봉 저장소 (마지막 저장일 이후 일봉만 일괄 조회)
+            # - 이동평균 상태(MA 값)와 ATR / MA20 기울기 / 신고가 돌파 스캔 모두 같은 저장본에서 계산
+            # - 주봉/월봉 지표도 같은 저장소에서 리샘플
+            # 조건 충족 여부는 매수 조건식(ENTRY_RULE)으로 판정 (백테스트와 같은 식)
+            from bar_store import get_bar_store
+            from ma_state import get_ma_state_store
+            scan_tickers = scan_df['Ticker'].tolist()
+            bar_store = get_bar_store()
+            bar_store.update(scan_tickers)
+            ma_store = get_ma_state_store()
+            technical_analysis = analyze_top10_technical(scan_df, top_n=depth, store=ma_store, update=False)
+            scan = scan_technical(scan_tickers, histories=bar_store.histories(scan_tickers), rule=ENTRY_RULE)
+            apply_entry_rule(technical_analysis, scan)
+            save_technical_snapshot(technical_analysis, today, filename_prefix=f"{screener_type}_")
+            logger.info(f"기술적 분석 완료 (매수 조건: {ENTRY_RULE})")
             
-            # 전날 데이터가 있으면 전날 기술적 분석도 수행하여 MA60 이탈 감지
+            # 전날 데이터가 있으면 전날 보고한 기술적 분석 결과와 비교하여 MA60 이탈 감지
+            # (전날 저장본이 없으면 이동평균 상태의 전날 기준 값으로 대체)
             if yesterday_df is not None:
                 from technical_analyzer import detect_ma60_breaks
-                previous_technical_analysis = analyze_top10_technical(yesterday_df)
+                previous_technical_analysis = load_last_business_day_technical(filename_prefix=f"{screener_type}_")
+                if previous_technical_analysis is not None:
+                    logger.info(f"전날 기술적 분석 결과 사용: {len(previous_technical_analysis)}개 종목")
+                else:
+                    previous_technical_analysis = analyze_top10_technical(yesterday_df, top_n=depth, store=ma_store,
+                                                                          offset=1)
                 ma60_breaks = detect_ma60_breaks(technical_analysis, previous_technical_analysis)
                 
                 if ma60_breaks:
@@ -113,13 +165,15 @@ def process_screener(screener_type, today):
                 else:
                     logger.info("MA60 이탈 종목 없음")
             
+            ma_store.save()
+            
             # 신고가 돌파 감지 (3개월 최고가 경신)
             from technical_analyzer import detect_trailing_stops, detect_breakout_highs
-            breakout_highs = detect_breakout_highs(df)
+            breakout_highs = detect_breakout_highs(scan_df, top_n=depth, scan=scan)
             
             # 트레일링 스탑 감지 (MA20 2일 이상 하향 이탈)
             if yesterday_df is not None and previous_technical_analysis is not None:
-                trailing_stops = detect_trailing_stops(technical_analysis, previous_technical_analysis)
+                trailing_stops = detect_trailing_stops(technical_analysis, previous_technical_analysis, scan=scan)
             else:
                 logger.warning("전날 데이터 없음: 트레일링 스탑 분석 스킵")
             
@@ -133,7 +187,12 @@ def process_screener(screener_type, today):
         if ENABLE_MARKET_FILTER:
             try:
                 from market_filter import check_market_regime
-                market_regime = check_market_regime()
+                # 시장 폭: 유니버스 전 종목의 로컬 일봉으로 MA200 위 비율·신고가/신저가 계산
+                breadth = None
+                if ENABLE_MARKET_BREADTH:
+                    from breadth import current_breadth
+                    breadth = current_breadth()
+                market_regime = check_market_regime(breadth=breadth)
                 if market_regime:
                     if market_regime.get('hold_cash', False):
                         logger.warning(f"⚠️ 약세장 감지: {market_regime.get('reason', '')}")
@@ -164,11 +164,13 @@ def simulate_daily_rebalancing_custom(tickers, start_date, end_date, initial_cap
     import yfinance as yf
     from datetime import timedelta
     from config import RISK_FREE_RATE
-    from historical_backtest import (
-        calculate_mdd, 
-        calculate_sharpe_ratio, 
-        calculate_win_rate,
-        calculate_buy_and_hold_returns
+    from historical_backtest import calculate_buy_and_hold_returns
+    from performance_metrics import (
+        calculate_total_return,
+        calculate_annualized_return,
+        calculate_mdd,
+        calculate_sharpe_ratio,
+        calculate_win_rate
     )
     
     logger.info(f"=== 매일 리밸런싱 시뮬레이션 시작 ===")
@@ -262,14 +264,11 @@ def simulate_daily_rebalancing_custom(tickers, start_date, end_date, initial_cap
     
     # 성과 지표 계산
     final_value = portfolio_value
-    total_return = ((final_value - initial_capital) / initial_capital) * 100
+    total_return = calculate_total_return(initial_capital, final_value)
     
     # 기간 계산
     days = (common_dates[-1] - common_dates[0]).days
-    if days > 0:
-        annualized_return = ((final_value / initial_capital) ** (365 / days) - 1) * 100
-    else:
-        annualized_return = 0
+    annualized_return = calculate_annualized_return(initial_capital, final_value, days)
     
     # MDD 계산
     mdd = calculate_mdd([h['value'] for h in portfolio_history])
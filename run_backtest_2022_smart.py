@@ -8,18 +8,17 @@
 import sys
 from pathlib import Path
 from datetime import datetime, timedelta
-import pandas as pd
 import yfinance as yf
 
 # src 모듈 임포트를 위한 경로 추가
 sys.path.insert(0, str(Path(__file__).parent / 'src'))
 
-from historical_backtest import (
-    get_historical_top_performers,
-    calculate_mdd,
-    calculate_sharpe_ratio,
-    calculate_win_rate
-)
+from historical_backtest import get_historical_top_performers, backtest_year_period
+from backtest_engine import PortfolioEngine, run_event_loop
+from price_panel import PricePanel
+from indicators import IndicatorPanel, consecutive, INDICATOR_WARMUP_DAYS, TRAILING_STOP_DAYS
+from checkpoint import Checkpoint
+from progress import log_progress
 from telegram_notifier import send_to_telegram
 from logger import get_logger
 from config import RISK_FREE_RATE
@@ -28,50 +27,29 @@ import json
 logger = get_logger()
 
 
-def calculate_moving_averages(prices, periods=[20, 60, 120]):
-    """이동평균선 계산"""
-    ma_data = {}
-    for period in periods:
-        if len(prices) >= period:
-            ma_data[f'MA{period}'] = prices.rolling(window=period).mean()
-        else:
-            ma_data[f'MA{period}'] = pd.Series([None] * len(prices), index=prices.index)
-    return ma_data
-
-
-def check_trailing_stop(ticker, current_price, ma20, prev_below_ma20):
-    """
-    트레일링 스탑 체크: MA20을 2일 이상 하향 이탈 시 매도
-    
-    Returns:
-        (should_sell, days_below): 매도 여부, 이탈 일수
-    """
-    below_ma20 = current_price < ma20 if pd.notna(ma20) else False
-    
-    if below_ma20:
-        days_below = prev_below_ma20.get(ticker, 0) + 1
-        if days_below >= 2:
-            return True, days_below
-        return False, days_below
-    else:
-        return False, 0
-
-
-def check_ma60_stop_loss(current_price, prev_price, ma60, prev_ma60):
-    """
-    MA60 손절: 전날 MA60 위 → 오늘 MA60 아래로 떨어지면 손절
+def fetch_price_data(tickers, start_date, end_date):
+    """종목별 가격 이력 조회 (이동평균 계산용 INDICATOR_WARMUP_DAYS일 이력 포함)"""
+    price_data = {}
+    for ticker in tickers:
+        try:
+            stock = yf.Ticker(ticker)
+            # 이동평균선 계산을 위해 충분한 기간의 데이터 가져오기
+            hist_start = start_date - timedelta(days=INDICATOR_WARMUP_DAYS)
+            hist = stock.history(start=hist_start, end=end_date + timedelta(days=1))
+            
+            if not hist.empty:
+                price_data[ticker] = hist
+                logger.info(f"{ticker}: {len(hist)}일 데이터")
+            else:
+                logger.warning(f"{ticker}: 가격 데이터 없음")
+        except Exception as e:
+            logger.error(f"{ticker}: 가격 데이터 가져오기 실패 - {e}")
     
-    Returns:
-        should_sell: 손절 여부
-    """
-    if pd.notna(ma60) and pd.notna(prev_ma60):
-        was_above = prev_price >= prev_ma60
-        now_below = current_price < ma60
-        return was_above and now_below
-    return False
+    return price_data
 
 
-def simulate_smart_strategy(tickers, start_date, end_date, initial_capital=10000):
+def simulate_smart_strategy(tickers, start_date, end_date, initial_capital=10000,
+                            checkpoint_name=None, resume=False):
     """
     스마트 전략 시뮬레이션: 매매 신호를 반영한 백테스팅
     
@@ -80,28 +58,32 @@ def simulate_smart_strategy(tickers, start_date, end_date, initial_capital=10000
     2. MA60 손절: MA60 하향 돌파 시 즉시 매도 → 현금 보유
     3. 매도 후 현금은 남은 종목들에 재분배
     4. 매도된 종목은 다시 매수하지 않음 (원칙)
+    
+    checkpoint_name: 체크포인트 이름 (지정 시 주기적으로 엔진 상태와 조회한 가격 데이터 저장)
+    resume: True면 같은 종목/기간의 체크포인트에서 이어서 실행
     """
     logger.info(f"=== 스마트 전략 시뮬레이션 시작 ===")
     logger.info(f"종목: {', '.join(tickers)}")
     logger.info(f"기간: {start_date.strftime('%Y-%m-%d')} ~ {end_date.strftime('%Y-%m-%d')}")
     logger.info(f"초기 자본: ${initial_capital:,.2f}")
     
+    checkpoint = None
+    price_data = None
+    if checkpoint_name:
+        checkpoint = Checkpoint(checkpoint_name, key={
+            'tickers': list(tickers),
+            'start_date': start_date.strftime('%Y-%m-%d'),
+            'end_date': end_date.strftime('%Y-%m-%d'),
+            'initial_capital': initial_capital
+        })
+        if resume:
+            price_data = checkpoint.load_inputs()
+    
     # 모든 종목의 가격 데이터 가져오기
-    price_data = {}
-    for ticker in tickers:
-        try:
-            stock = yf.Ticker(ticker)
-            # 이동평균선 계산을 위해 충분한 기간의 데이터 가져오기
-            hist_start = start_date - timedelta(days=180)
-            hist = stock.history(start=hist_start, end=end_date + timedelta(days=1))
-            
-            if not hist.empty:
-                price_data[ticker] = hist
-                logger.info(f"{ticker}: {len(hist)}일 데이터")
-            else:
-                logger.warning(f"{ticker}: 가격 데이터 없음")
-        except Exception as e:
-            logger.error(f"{ticker}: 가격 데이터 가져오기 실패 - {e}")
+    if price_data is None:
+        price_data = fetch_price_data(tickers, start_date, end_date)
+        if checkpoint is not None and price_data:
+            checkpoint.save_inputs(price_data)
     
     if len(price_data) == 0:
         logger.error("가격 데이터를 가져올 수 없습니다.")
@@ -125,200 +107,124 @@ def simulate_smart_strategy(tickers, start_date, end_date, initial_capital=10000
         logger.error("충분한 공통 거래일이 없습니다.")
         return None
     
-    # 이동평균선 계산
-    ma_data = {}
-    for ticker, hist in price_data.items():
-        ma_data[ticker] = calculate_moving_averages(hist['Close'], [20, 60, 120])
-    
-    # 시뮬레이션 초기화
-    portfolio_value = initial_capital
-    cash = 0  # 매도한 현금
-    active_positions = {ticker: True for ticker in tickers}  # 보유 중인 종목
-    position_values = {ticker: initial_capital / len(tickers) for ticker in tickers}  # 각 종목 가치
-    
-    portfolio_history = [{'date': common_dates[0].strftime('%Y-%m-%d'), 'value': initial_capital}]
-    daily_returns = []
-    trade_log = []
-    prev_below_ma20 = {ticker: 0 for ticker in tickers}
-    prev_prices = {}
-    
-    # 초기 매수 기록
-    for ticker in tickers:
-        first_price = price_data[ticker].loc[common_dates[0]]['Close']
-        trade_log.append({
-            'date': common_dates[0].strftime('%Y-%m-%d'),
-            'ticker': ticker,
-            'action': 'BUY',
-            'price': first_price,
-            'reason': '초기 매수',
-            'position_value': position_values[ticker]
-        })
-        prev_prices[ticker] = first_price
+    # 전 기간 이동평균 / 매매 신호 마스크 (종목별 한 번만 계산) → 공통 거래일 행만 추출
+    panel = PricePanel.from_series({ticker: hist['Close'] for ticker, hist in price_data.items()},
+                                   fill=False)
+    indicators = IndicatorPanel(panel)
+    common_rows = panel.dates.get_indexer(common_dates)
+    closes = panel.values[common_rows]
+    # 트레일링 스탑: 보유 시작(첫 거래일)부터 센 MA20 연속 이탈
+    trailing_stop = consecutive(indicators.below_ma20[common_rows], TRAILING_STOP_DAYS)
+    # MA60 손절: 첫 거래일 종가에 매수하므로 첫날 돌파(매수 전 구간)는 제외
+    ma60_break = indicators.ma60_break[common_rows]
+    ma60_break[0] = False
+    
+    # 시뮬레이션 엔진 (거래 비용 없음, 첫날 기록은 기준점)
+    engine = PortfolioEngine(initial_capital, tickers=tickers, skip_first_return=True)
+    held_tickers = [ticker for ticker in tickers if ticker in price_data]
+    last_index = len(common_dates) - 1
+    
+    
+    def price_hook(engine, current_date, i):
+        return {ticker: closes[i, panel.index.get(ticker)] for ticker in held_tickers}
+    
+    def select_hook(engine, current_date, i):
+        # 첫날: 전 종목 동일 비중 매수 / 이후: 매도로 생긴 현금을 남은 종목에 재분배
+        if i == 0:
+            return held_tickers
+        if engine.cash > 0:
+            return engine.held_tickers()
+        return None
     
-    # 매일 시뮬레이션
-    for i in range(len(common_dates) - 1):
-        current_date = common_dates[i]
-        next_date = common_dates[i + 1]
-        
-        day_start_value = portfolio_value
-        sells_today = []
-        
-        # 각 종목 체크
-        for ticker in tickers:
-            if not active_positions[ticker]:
-                continue
-            
-            try:
-                hist = price_data[ticker]
-                current_price = hist.loc[current_date]['Close']
-                next_price = hist.loc[next_date]['Close']
-                
-                ma20 = ma_data[ticker]['MA20'].loc[current_date]
-                ma60 = ma_data[ticker]['MA60'].loc[current_date]
-                
-                should_sell = False
-                sell_reason = ""
-                
-                # 1. 트레일링 스탑 체크
-                trailing_stop, days_below = check_trailing_stop(
-                    ticker, current_price, ma20, prev_below_ma20
-                )
-                prev_below_ma20[ticker] = days_below
-                
-                if trailing_stop:
-                    should_sell = True
-                    sell_reason = f"트레일링 스탑 (MA20 {days_below}일 이탈)"
-                
-                # 2. MA60 손절 체크
-                if not should_sell and ticker in prev_prices:
-                    prev_price = prev_prices[ticker]
-                    prev_ma60 = ma_data[ticker]['MA60'].loc[current_date - timedelta(days=1)] if current_date - timedelta(days=1) in ma_data[ticker]['MA60'].index else None
-                    
-                    if check_ma60_stop_loss(current_price, prev_price, ma60, prev_ma60):
-                        should_sell = True
-                        sell_reason = "MA60 손절"
-                
-                # 매도 처리
-                if should_sell:
-                    sell_value = position_values[ticker]
-                    cash += sell_value
-                    active_positions[ticker] = False
-                    
-                    trade_log.append({
-                        'date': current_date.strftime('%Y-%m-%d'),
-                        'ticker': ticker,
-                        'action': 'SELL',
-                        'price': current_price,
-                        'reason': sell_reason,
-                        'position_value': sell_value
-                    })
-                    
-                    sells_today.append({
-                        'ticker': ticker,
-                        'reason': sell_reason,
-                        'price': current_price,
-                        'value': sell_value
-                    })
-                    
-                    logger.info(f"{current_date.strftime('%Y-%m-%d')}: {ticker} 매도 (${current_price:.2f}) - {sell_reason}")
-                    
-                    position_values[ticker] = 0
-                    prev_below_ma20[ticker] = 0
-                else:
-                    # 보유 중인 종목의 가치 업데이트
-                    stock_return = (next_price - current_price) / current_price
-                    position_values[ticker] = position_values[ticker] * (1 + stock_return)
-                    prev_prices[ticker] = next_price
-                
-            except KeyError as e:
-                logger.debug(f"{ticker}: {current_date} 데이터 누락 - {e}")
-                continue
-        
-        # 매도로 생긴 현금을 남은 종목에 재분배
-        if sells_today and cash > 0:
-            active_tickers = [t for t in tickers if active_positions[t]]
-            if active_tickers:
-                cash_per_stock = cash / len(active_tickers)
-                for ticker in active_tickers:
-                    position_values[ticker] += cash_per_stock
-                    
-                logger.info(f"  → 현금 ${cash:.2f}를 {len(active_tickers)}개 종목에 재분배")
-                cash = 0
+    def rebalance_hook(engine, current_date, targets, prices):
+        if not targets:
+            return
         
-        # 포트폴리오 가치 계산
-        portfolio_value = sum(position_values.values()) + cash
-        day_return = ((portfolio_value - day_start_value) / day_start_value) * 100
+        cash = engine.cash
+        cash_per_stock = cash / len(targets)
+        reason = '초기 매수' if current_date == common_dates[0] else '현금 재분배'
+        for ticker in targets:
+            engine.buy(current_date, ticker, cash_per_stock, prices[ticker], reason=reason)
         
-        daily_returns.append({
-            'date': next_date.strftime('%Y-%m-%d'),
-            'return': day_return,
-            'value': portfolio_value,
-            'active_positions': sum(1 for p in active_positions.values() if p),
-            'cash': cash
-        })
+        if reason == '현금 재분배':
+            logger.info(f"  → 현금 ${cash:.2f}를 {len(targets)}개 종목에 재분배")
+            logger.info(f"{current_date.strftime('%Y-%m-%d')}: 포트폴리오 ${engine.value():,.2f} (보유: {engine.position_count}개)")
+    
+    def signal_hook(engine, current_date, i, prices):
+        # 마지막 거래일은 신호 체크 없이 종료
+        if i == last_index:
+            return []
         
-        portfolio_history.append({
-            'date': next_date.strftime('%Y-%m-%d'),
-            'value': portfolio_value
-        })
+        sells = []
+        for ticker in engine.held_tickers():
+            col = panel.index.get(ticker)
+            sell_reason = None
+            
+            # 1. 트레일링 스탑 체크
+            if trailing_stop[i, col]:
+                sell_reason = f"트레일링 스탑 (MA20 {TRAILING_STOP_DAYS}일 이탈)"
+            # 2. MA60 손절 체크
+            elif ma60_break[i, col]:
+                sell_reason = "MA60 손절"
+            
+            # 매도 처리 (매도 대금은 다음 거래일에 남은 종목으로 재분배)
+            if sell_reason:
+                sells.append((ticker, sell_reason))
+                logger.info(f"{current_date.strftime('%Y-%m-%d')}: {ticker} 매도 (${closes[i, col]:.2f}) - {sell_reason}")
         
-        if sells_today:
-            logger.info(f"{next_date.strftime('%Y-%m-%d')}: 포트폴리오 ${portfolio_value:,.2f} (보유: {sum(1 for p in active_positions.values() if p)}개)")
+        return sells
+    
+    def on_day_end(engine, current_date, i):
+        engine.record(current_date, active_positions=engine.position_count)
+    
+    # 매일 시뮬레이션: 현금 재분배 → 매매 신호 체크 → 가치 기록 (재개 시 체크포인트 다음 날부터)
+    start = checkpoint.restore(engine, common_dates) if checkpoint is not None and resume else 0
+    run_event_loop(engine, common_dates, price_hook, select_hook=select_hook,
+                   signal_hook=signal_hook, rebalance_hook=rebalance_hook,
+                   on_day_end=on_day_end, signals_first=False,
+                   start=start, checkpoint=checkpoint,
+                   progress=log_progress(every_fraction=0.1, every_seconds=60),
+                   progress_label='스마트 전략')
+    if checkpoint is not None:
+        checkpoint.clear()
     
     # 최종 매도 (시뮬레이션 종료)
     final_sales = []
-    for ticker in tickers:
-        if active_positions[ticker] and position_values[ticker] > 0:
-            final_price = price_data[ticker].loc[common_dates[-1]]['Close']
-            initial_price = price_data[ticker].loc[common_dates[0]]['Close']
-            return_pct = ((final_price - initial_price) / initial_price) * 100
-            
-            final_sales.append({
-                'ticker': ticker,
-                'buy_price': initial_price,
-                'sell_price': final_price,
-                'return_pct': return_pct,
-                'held_days': len(common_dates)
-            })
+    for ticker in engine.held_tickers():
+        col = panel.index.get(ticker)
+        final_price = closes[-1, col]
+        initial_price = closes[0, col]
+        return_pct = ((final_price - initial_price) / initial_price) * 100
+        
+        final_sales.append({
+            'ticker': ticker,
+            'buy_price': initial_price,
+            'sell_price': final_price,
+            'return_pct': return_pct,
+            'held_days': len(common_dates)
+        })
     
     # 성과 지표 계산
-    final_value = portfolio_value
-    total_return = ((final_value - initial_capital) / initial_capital) * 100
-    
     days = (common_dates[-1] - common_dates[0]).days
-    if days > 0:
-        annualized_return = ((final_value / initial_capital) ** (365 / days) - 1) * 100
-    else:
-        annualized_return = 0
-    
-    mdd = calculate_mdd([h['value'] for h in portfolio_history])
-    returns = [r['return'] for r in daily_returns]
-    sharpe_ratio = calculate_sharpe_ratio(returns, RISK_FREE_RATE)
-    win_rate = calculate_win_rate(daily_returns)
-    
-    if daily_returns:
-        best_day = max(daily_returns, key=lambda x: x['return'])
-        worst_day = min(daily_returns, key=lambda x: x['return'])
-    else:
-        best_day = {'date': '-', 'return': 0}
-        worst_day = {'date': '-', 'return': 0}
+    metrics = engine.performance(days, RISK_FREE_RATE)
+    trade_log = engine.trade_log
     
     result = {
         'tickers': tickers,
         'start_date': common_dates[0].strftime('%Y-%m-%d'),
         'end_date': common_dates[-1].strftime('%Y-%m-%d'),
         'initial_capital': initial_capital,
-        'final_value': final_value,
-        'total_return': total_return,
-        'annualized_return': annualized_return,
-        'mdd': mdd,
-        'sharpe_ratio': sharpe_ratio,
-        'win_rate': win_rate,
+        'final_value': metrics['final_value'],
+        'total_return': metrics['total_return'],
+        'annualized_return': metrics['annualized_return'],
+        'mdd': metrics['mdd'],
+        'sharpe_ratio': metrics['sharpe_ratio'],
+        'win_rate': metrics['win_rate'],
         'trading_days': len(common_dates) - 1,
-        'best_day': best_day,
-        'worst_day': worst_day,
-        'portfolio_history': portfolio_history,
-        'daily_returns': daily_returns,
+        'best_day': metrics['best_day'],
+        'worst_day': metrics['worst_day'],
+        'portfolio_history': engine.portfolio_history,
+        'daily_returns': engine.daily_returns,
         'trade_log': trade_log,
         'final_sales': final_sales,
         'total_trades': len(trade_log)
@@ -327,16 +233,20 @@ def simulate_smart_strategy(tickers, start_date, end_date, initial_capital=10000
     return result
 
 
-def main(year=2022):
-    """메인 실행 함수"""
-    
-    # 날짜 설정
-    start_date = datetime(year, 1, 3)
-    # 2025년이고 아직 12월 30일이 지나지 않았으면 현재 날짜 사용
-    if year == 2025 and datetime.now() < datetime(2025, 12, 30):
-        end_date = datetime.now() - timedelta(days=1)  # 어제까지
-    else:
-        end_date = datetime(year, 12, 30)
+def main(year=2022, panels=None, notify=True, resume=False):
+    """
+    메인 실행 함수
+    
+    Args:
+        year: 백테스팅 연도
+        panels: 미리 조회한 유니버스 가격 패널 {'large', 'mega'} (run_backtest_multi_year에서 공유)
+        notify: False면 Telegram 전송 생략
+        resume: True면 마지막 체크포인트에서 이어서 실행
+    """
+    panels = panels or {}
+    
+    # 날짜 설정 (아직 12월 30일이 지나지 않은 연도는 어제까지)
+    start_date, end_date = backtest_year_period(year)
     initial_capital = 10000
     
     logger.info("=" * 60)
@@ -354,7 +264,8 @@ def main(year=2022):
     large_result = get_historical_top_performers(
         screener_type="large",
         lookback_date=start_date,
-        performance_period_days=90
+        performance_period_days=90,
+        panel=panels.get('large')
     )
     
     if large_result is None:
@@ -369,7 +280,8 @@ def main(year=2022):
     mega_result = get_historical_top_performers(
         screener_type="mega",
         lookback_date=start_date,
-        performance_period_days=90
+        performance_period_days=90,
+        panel=panels.get('mega')
     )
     
     if mega_result is None:
@@ -388,7 +300,9 @@ def main(year=2022):
         tickers=combined_tickers,
         start_date=start_date,
         end_date=end_date,
-        initial_capital=initial_capital
+        initial_capital=initial_capital,
+        checkpoint_name=f'smart_{year}',
+        resume=resume
     )
     
     if simulation_result is None:
@@ -431,13 +345,14 @@ def main(year=2022):
             logger.info(f"{stock['ticker']:6s}: ${stock['buy_price']:8.2f} → ${stock['sell_price']:8.2f} ({stock['return_pct']:+7.2f}%)")
     
     # Telegram 전송
-    logger.info(f"\nTelegram으로 결과 전송 중...")
-    message = create_smart_backtest_message(large_tickers, mega_tickers, simulation_result, year)
-    success = send_to_telegram(message)
-    if success:
-        logger.info("✅ Telegram 전송 성공!")
-    else:
-        logger.warning("⚠️ Telegram 전송 실패")
+    if notify:
+        logger.info(f"\nTelegram으로 결과 전송 중...")
+        message = create_smart_backtest_message(large_tickers, mega_tickers, simulation_result, year)
+        success = send_to_telegram(message)
+        if success:
+            logger.info("✅ Telegram 전송 성공!")
+        else:
+            logger.warning("⚠️ Telegram 전송 실패")
     
     # JSON 저장
     result = {
@@ -523,11 +438,13 @@ if __name__ == "__main__":
     parser = argparse.ArgumentParser(description='스마트 백테스팅 (매매 신호 반영)')
     parser.add_argument('--year', type=int, default=2022, 
                        help='백테스팅 연도 (기본: 2022)')
+    parser.add_argument('--resume', action='store_true',
+                       help='마지막 체크포인트에서 이어서 실행')
     
     args = parser.parse_args()
     
     try:
-        result = main(year=args.year)
+        result = main(year=args.year, resume=args.resume)
         
         if result:
             sys.exit(0)
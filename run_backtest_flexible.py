@@ -11,66 +11,32 @@
 import sys
 from pathlib import Path
 from datetime import datetime, timedelta
-import pandas as pd
-import yfinance as yf
 
 sys.path.insert(0, str(Path(__file__).parent / 'src'))
 
-from finviz_scraper import scrape_all_tickers_with_pagination
-from historical_backtest import get_historical_top_performers
+from historical_backtest import get_historical_top_performers, fetch_universe_panel, backtest_year_period
+from backtest_engine import PortfolioEngine, run_event_loop
+from price_panel import PricePanel
+from indicators import IndicatorPanel, INDICATOR_WARMUP_DAYS
+from screening import compile_rule
+from stop_kernel import run_stop_kernel, kernel_records, NUMBA_AVAILABLE
+from checkpoint import Checkpoint
+from progress import log_progress
 from logger import get_logger
-from config import RISK_FREE_RATE
+from config import RISK_FREE_RATE, ENTRY_RULE
 from telegram_notifier import send_to_telegram
 import json
 
 logger = get_logger()
 
 
-def calculate_moving_averages(prices, periods=[20, 60, 120]):
-    """이동평균선 계산"""
-    ma_data = {}
-    for period in periods:
-        if len(prices) >= period:
-            ma_data[f'MA{period}'] = prices.rolling(window=period).mean()
-        else:
-            ma_data[f'MA{period}'] = pd.Series([None] * len(prices), index=prices.index)
-    return ma_data
-
-
-def check_trailing_stop(current_price, ma20, days_below_ma20):
-    """트레일링 스탑: MA20을 2일 이상 하향 이탈"""
-    if pd.notna(ma20):
-        below_ma20 = current_price < ma20
-        if below_ma20:
-            new_days = days_below_ma20 + 1
-            return new_days >= 2, new_days
-        else:
-            return False, 0
-    return False, 0
-
-
-def check_ma60_stop(current_price, prev_price, ma60, prev_ma60):
-    """MA60 손절: 전날 위 → 오늘 아래"""
-    if pd.notna(ma60) and pd.notna(prev_ma60):
-        was_above = prev_price >= prev_ma60
-        now_below = current_price < ma60
-        return was_above and now_below
-    return False
-
-
-def check_technical_condition(current_price, ma60, ma120):
-    """기술적 조건: 현재가 > MA60 > MA120"""
-    if pd.notna(ma60) and pd.notna(ma120):
-        return current_price > ma60 and ma60 > ma120
-    return False
-
-
-def get_top_performers_at_date(screener_type, date, top_n=5):
-    """특정 날짜의 상위 종목 조회"""
+def get_top_performers_at_date(screener_type, date, top_n=5, panel=None):
+    """특정 날짜의 상위 종목 조회 (유니버스 스냅샷 as-of + 미리 조회한 가격 패널)"""
     result = get_historical_top_performers(
         screener_type=screener_type,
         lookback_date=date,
-        performance_period_days=90
+        performance_period_days=90,
+        panel=panel
     )
     
     if result is None or 'tickers' not in result:
@@ -80,7 +46,8 @@ def get_top_performers_at_date(screener_type, date, top_n=5):
 
 
 def simulate_flexible_strategy(start_date, end_date, initial_capital=10000, 
-                               rebalance_frequency='weekly'):
+                               rebalance_frequency='weekly', panels=None, use_kernel=False,
+                               checkpoint_name=None, resume=False, entry_rule=ENTRY_RULE):
     """
     유연한 전략 시뮬레이션
     
@@ -88,16 +55,58 @@ def simulate_flexible_strategy(start_date, end_date, initial_capital=10000,
     - 매도 신호: 즉시 매도
     - 매수 신호: 기술적 조건 + 상위 종목
     - 종목 수: 0~10개 유연
+    
+    panels: {'large': PricePanel, 'mega': PricePanel} - 미리 조회한 유니버스 패널 (없으면 기간만큼 조회)
+    use_kernel: True면 일별 상태 머신을 stop_kernel로 실행 (이벤트 루프와 같은 결과)
+    checkpoint_name: 체크포인트 이름 (지정 시 주기적으로 엔진 상태와 조회한 패널 저장, 커널 실행은 제외)
+    resume: True면 같은 파라미터의 체크포인트에서 이어서 실행
+    entry_rule: 매수 조건식 (screening 조건식, 전 기간 마스크로 한 번에 계산)
     """
     logger.info(f"=== 유연한 전략 시뮬레이션 시작 ===")
     logger.info(f"기간: {start_date.strftime('%Y-%m-%d')} ~ {end_date.strftime('%Y-%m-%d')}")
     logger.info(f"초기 자본: ${initial_capital:,.2f}")
     logger.info(f"리밸런싱: {rebalance_frequency}")
+    logger.info(f"매수 조건: {entry_rule}")
+    
+    # 가격 조회 전에 조건식 구문 검사
+    compile_rule(entry_rule)
+    
+    # 보유 종목별 매수일 행 (트레일링 스탑은 매수 이후 이탈 구간만 인정) / 마지막 리밸런싱일
+    state = {'entry_rows': {}, 'last_rebalance': None}
+    checkpoint = None
+    if checkpoint_name and not use_kernel:
+        checkpoint = Checkpoint(checkpoint_name, key={
+            'start_date': start_date.strftime('%Y-%m-%d'),
+            'end_date': end_date.strftime('%Y-%m-%d'),
+            'initial_capital': initial_capital,
+            'rebalance_frequency': rebalance_frequency,
+            'entry_rule': entry_rule
+        }, state=state)
+        if resume and panels is None:
+            panels = checkpoint.load_inputs()
+    
+    # 기간 중 유니버스 전 종목 가격을 한 번만 조회 (리밸런싱마다 재조회하지 않음)
+    # MA120 계산을 위해 시작일 이전 INDICATOR_WARMUP_DAYS일 이력 포함, 고가/저가도 보관 (atr 등 조건식용)
+    if panels is None:
+        panels = {
+            screener_type: fetch_universe_panel(screener_type, start_date, end_date,
+                                                warmup_days=INDICATOR_WARMUP_DAYS, ohlc=True)
+            for screener_type in ('large', 'mega')
+        }
+        if checkpoint is not None:
+            checkpoint.save_inputs(panels)
+    
+    # 전 기간 이동평균 / 매매 신호 마스크 (종목별 한 번만 계산)
+    price_panel = PricePanel.concat([panels['large'], panels['mega']])
+    if price_panel is None:
+        logger.error("가격 데이터를 가져올 수 없습니다.")
+        return None
+    indicators = IndicatorPanel(price_panel, entry_rule=entry_rule)
     
     # 초기 상위 종목 선정 (대형주 5 + 초대형주 5)
     logger.info("\n[초기 포트폴리오 구성]")
-    large_tickers = get_top_performers_at_date("large", start_date, top_n=5)
-    mega_tickers = get_top_performers_at_date("mega", start_date, top_n=5)
+    large_tickers = get_top_performers_at_date("large", start_date, top_n=5, panel=panels['large'])
+    mega_tickers = get_top_performers_at_date("mega", start_date, top_n=5, panel=panels['mega'])
     
     if not large_tickers or not mega_tickers:
         logger.error("초기 종목 선정 실패")
@@ -107,13 +116,8 @@ def simulate_flexible_strategy(start_date, end_date, initial_capital=10000,
     logger.info(f"대형주 5개: {', '.join(large_tickers)}")
     logger.info(f"초대형주 5개: {', '.join(mega_tickers)}")
     
-    # 시뮬레이션 변수
-    portfolio_value = initial_capital
-    cash = initial_capital  # 처음엔 전액 현금
-    positions = {}  # {ticker: {'shares': N, 'avg_price': P}}
-    trade_log = []
-    portfolio_history = []
-    daily_returns = []
+    # 시뮬레이션 엔진 (처음엔 전액 현금)
+    engine = PortfolioEngine(initial_capital)
     
     # 거래 날짜 생성
     current = start_date
@@ -126,14 +130,28 @@ def simulate_flexible_strategy(start_date, end_date, initial_capital=10000,
     
     logger.info(f"총 {len(trading_dates)}개 거래일")
     
-    # 매일 시뮬레이션
-    prev_below_ma20 = {}
-    prev_prices = {}
-    last_rebalance_date = None
-    
-    for i, current_date in enumerate(trading_dates):
-        day_start_value = portfolio_value
-        
+    # 거래 날짜별 패널 행 (당일 데이터가 없는 휴장일은 -1)
+    rows = {date: indicators.row(date) for date in trading_dates}
+    
+    def day_data(ticker, current_date):
+        """당일 (행, 열) - 당일 실거래 데이터가 없으면 None"""
+        col = indicators.column(ticker)
+        row = rows[current_date]
+        if col is None or row < 0 or not indicators.valid[row, col]:
+            return None
+        return row, col
+    
+    def price_hook(engine, current_date, i):
+        # 보유 종목 당일 종가 (휴장일 등 가격이 없으면 직전 가격으로 평가)
+        prices = {}
+        for ticker in engine.held_tickers():
+            loc = day_data(ticker, current_date)
+            if loc is not None:
+                prices[ticker] = indicators.close[loc]
+        return prices
+    
+    def select_targets(current_date):
+        """리밸런싱일이면 새 상위 10개 (아니면 None) - 보유 상태와 무관"""
         # 리밸런싱 날짜 체크 (매월 첫 주 월요일)
         should_rebalance = False
         if rebalance_frequency == 'monthly' and current_date.day <= 7 and current_date.weekday() == 0:
@@ -141,213 +159,119 @@ def simulate_flexible_strategy(start_date, end_date, initial_capital=10000,
         elif rebalance_frequency == 'weekly' and current_date.weekday() == 0:
             should_rebalance = True
         
+        if not should_rebalance:
+            return None
+        
         # 리밸런싱: 상위 종목 재조회
-        if should_rebalance and (last_rebalance_date is None or 
-                                (current_date - last_rebalance_date).days >= 20):
+        last_rebalance_date = state['last_rebalance']
+        if last_rebalance_date is None or (current_date - last_rebalance_date).days >= 20:
             rebal_type = "매월" if rebalance_frequency == 'monthly' else "주간"
             logger.info(f"\n{current_date.strftime('%Y-%m-%d')}: {rebal_type} 리밸런싱")
-            large_top = get_top_performers_at_date("large", current_date, top_n=5)
-            mega_top = get_top_performers_at_date("mega", current_date, top_n=5)
+            large_top = get_top_performers_at_date("large", current_date, top_n=5, panel=panels['large'])
+            mega_top = get_top_performers_at_date("mega", current_date, top_n=5, panel=panels['mega'])
             
             if large_top and mega_top:
                 target_tickers = large_top + mega_top
                 logger.info(f"  새 상위 10개: {', '.join(target_tickers)}")
-                last_rebalance_date = current_date
-            else:
-                target_tickers = list(positions.keys())
-        else:
-            target_tickers = list(positions.keys())
+                state['last_rebalance'] = current_date
+                return target_tickers
         
-        # 1. 기존 보유 종목 체크 (매도 신호)
+        return None
+    
+    def select_hook(engine, current_date, i):
+        return select_targets(current_date)
+    
+    def signal_hook(engine, current_date, i, prices):
+        # 기존 보유 종목 체크 (매도 신호) - 미리 계산한 마스크 조회
         to_sell = []
-        for ticker in list(positions.keys()):
-            try:
-                stock = yf.Ticker(ticker)
-                hist = stock.history(start=current_date - timedelta(days=180), 
-                                    end=current_date + timedelta(days=1))
-                
-                if hist.empty:
-                    continue
-                
-                hist.index = hist.index.tz_localize(None)
-                
-                if current_date not in hist.index:
-                    continue
-                
-                current_price = hist.loc[current_date]['Close']
-                ma_data = calculate_moving_averages(hist['Close'], [20, 60, 120])
-                ma20 = ma_data['MA20'].loc[current_date]
-                ma60 = ma_data['MA60'].loc[current_date]
-                
-                # 트레일링 스탑 체크
-                days_below = prev_below_ma20.get(ticker, 0)
-                stop_triggered, new_days = check_trailing_stop(current_price, ma20, days_below)
-                prev_below_ma20[ticker] = new_days
-                
-                if stop_triggered:
-                    to_sell.append((ticker, current_price, "트레일링 스탑"))
-                    continue
-                
-                # MA60 손절 체크
-                if ticker in prev_prices:
-                    prev_date_idx = hist.index.get_loc(current_date) - 1
-                    if prev_date_idx >= 0:
-                        prev_ma60 = ma_data['MA60'].iloc[prev_date_idx]
-                        prev_price = prev_prices[ticker]
-                        
-                        if check_ma60_stop(current_price, prev_price, ma60, prev_ma60):
-                            to_sell.append((ticker, current_price, "MA60 손절"))
-                            continue
-                
-                prev_prices[ticker] = current_price
-                
-            except Exception as e:
-                logger.debug(f"{ticker} 체크 실패: {e}")
+        for ticker in engine.held_tickers():
+            loc = day_data(ticker, current_date)
+            if loc is None:
                 continue
+            
+            reason = None
+            # 트레일링 스탑: MA20 연속 이탈 구간이 매수일 이후에 시작된 경우만
+            if indicators.trailing_stop[loc] and indicators.trailing_start[loc] > state['entry_rows'].get(ticker, -1):
+                reason = "트레일링 스탑"
+            # MA60 손절: 전날 MA60 위 → 오늘 MA60 아래
+            elif indicators.ma60_break[loc]:
+                reason = "MA60 손절"
+            
+            if reason:
+                to_sell.append((ticker, reason))
+                logger.info(f"{current_date.strftime('%Y-%m-%d')}: {ticker} 매도 ${indicators.close[loc]:.2f} - {reason}")
         
-        # 매도 실행
-        for ticker, price, reason in to_sell:
-            if ticker in positions:
-                shares = positions[ticker]['shares']
-                sell_value = shares * price
-                cash += sell_value
-                
-                trade_log.append({
-                    'date': current_date.strftime('%Y-%m-%d'),
-                    'ticker': ticker,
-                    'action': 'SELL',
-                    'price': price,
-                    'shares': shares,
-                    'value': sell_value,
-                    'reason': reason
-                })
-                
-                logger.info(f"{current_date.strftime('%Y-%m-%d')}: {ticker} 매도 ${price:.2f} - {reason}")
-                
-                del positions[ticker]
-                prev_below_ma20[ticker] = 0
+        return to_sell
+    
+    def rebalance_hook(engine, current_date, target_tickers, prices):
+        # 매수 기회 체크 (리밸런싱 시점 + 현금 여유)
+        if engine.cash <= 0 or engine.position_count >= 10:
+            return
+        
+        # 현재 보유하지 않은 상위 종목 중 기술적 조건 만족하는 것 매수
+        candidates = [t for t in target_tickers if not engine.is_held(t)]
         
-        # 2. 매수 기회 체크 (리밸런싱 시점 + 현금 여유)
-        if should_rebalance and cash > 0 and len(positions) < 10:
-            # 현재 보유하지 않은 상위 종목 중 기술적 조건 만족하는 것 매수
-            candidates = [t for t in target_tickers if t not in positions]
+        for ticker in candidates[:3]:  # 한 번에 최대 3개씩 매수
+            if engine.cash < 100:  # 최소 매수 금액
+                break
+            
+            loc = day_data(ticker, current_date)
+            if loc is None:
+                continue
             
-            for ticker in candidates[:3]:  # 한 번에 최대 3개씩 매수
-                if cash < 100:  # 최소 매수 금액
-                    break
+            # 기술적 조건 체크 (매수 조건식, 기본: 현재가 > MA60 > MA120)
+            if indicators.entry[loc]:
+                # 매수 실행 (현금의 일부 투자, 최대 10개 분산)
+                current_price = indicators.close[loc]
+                target_positions = min(10, len(target_tickers))
+                buy_amount = engine.cash / (target_positions - engine.position_count)
+                buy_amount = min(buy_amount, engine.cash)
                 
-                try:
-                    stock = yf.Ticker(ticker)
-                    hist = stock.history(start=current_date - timedelta(days=180),
-                                        end=current_date + timedelta(days=1))
-                    
-                    if hist.empty:
-                        continue
-                    
-                    hist.index = hist.index.tz_localize(None)
-                    
-                    if current_date not in hist.index:
-                        continue
-                    
-                    current_price = hist.loc[current_date]['Close']
-                    ma_data = calculate_moving_averages(hist['Close'], [20, 60, 120])
-                    
-                    ma60 = ma_data['MA60'].loc[current_date]
-                    ma120 = ma_data['MA120'].loc[current_date]
-                    
-                    # 기술적 조건 체크
-                    if check_technical_condition(current_price, ma60, ma120):
-                        # 매수 실행 (현금의 일부 투자, 최대 10개 분산)
-                        target_positions = min(10, len(target_tickers))
-                        buy_amount = cash / (target_positions - len(positions))
-                        buy_amount = min(buy_amount, cash)
-                        
-                        shares = buy_amount / current_price
-                        positions[ticker] = {
-                            'shares': shares,
-                            'avg_price': current_price
-                        }
-                        
-                        cash -= buy_amount
-                        prev_below_ma20[ticker] = 0
-                        prev_prices[ticker] = current_price
-                        
-                        trade_log.append({
-                            'date': current_date.strftime('%Y-%m-%d'),
-                            'ticker': ticker,
-                            'action': 'BUY',
-                            'price': current_price,
-                            'shares': shares,
-                            'value': buy_amount,
-                            'reason': '기술적 조건 만족'
-                        })
-                        
-                        logger.info(f"{current_date.strftime('%Y-%m-%d')}: {ticker} 매수 ${current_price:.2f} (${buy_amount:.0f})")
-                        
-                except Exception as e:
-                    logger.debug(f"{ticker} 매수 실패: {e}")
-                    continue
-        
-        # 3. 포트폴리오 가치 업데이트
-        position_value = 0
-        for ticker, pos in positions.items():
-            try:
-                stock = yf.Ticker(ticker)
-                hist = stock.history(start=current_date, end=current_date + timedelta(days=1))
+                engine.buy(current_date, ticker, buy_amount, current_price, reason='기술적 조건 만족')
+                state['entry_rows'][ticker] = loc[0]
                 
-                if not hist.empty:
-                    hist.index = hist.index.tz_localize(None)
-                    if current_date in hist.index:
-                        current_price = hist.loc[current_date]['Close']
-                        position_value += pos['shares'] * current_price
-            except:
-                # 가격 못 가져오면 전날 가격 사용
-                position_value += pos['shares'] * pos['avg_price']
-        
-        portfolio_value = cash + position_value
-        day_return = ((portfolio_value - day_start_value) / day_start_value) * 100 if day_start_value > 0 else 0
-        
-        portfolio_history.append({
-            'date': current_date.strftime('%Y-%m-%d'),
-            'value': portfolio_value,
-            'cash': cash,
-            'positions': len(positions)
-        })
-        
-        daily_returns.append({
-            'date': current_date.strftime('%Y-%m-%d'),
-            'return': day_return,
-            'value': portfolio_value
-        })
+                logger.info(f"{current_date.strftime('%Y-%m-%d')}: {ticker} 매수 ${current_price:.2f} (${buy_amount:.0f})")
+    
+    def on_day_end(engine, current_date, i):
+        portfolio_value = engine.value()
+        engine.record(current_date)
         
         # 진행 상황 로깅 (매월 1일)
         if current_date.day == 1:
-            logger.info(f"{current_date.strftime('%Y-%m')}: 포트폴리오 ${portfolio_value:,.0f} (보유: {len(positions)}개, 현금: ${cash:,.0f})")
+            logger.info(f"{current_date.strftime('%Y-%m')}: 포트폴리오 ${portfolio_value:,.0f} (보유: {engine.position_count}개, 현금: ${engine.cash:,.0f})")
+    
+    if use_kernel:
+        # 목표 종목은 보유 상태와 무관하므로 미리 선정하고, 일별 상태 머신은 커널로 실행
+        logger.info(f"상태 머신 커널 실행 ({'Numba' if NUMBA_AVAILABLE else '순수 Python'})")
+        targets = []
+        for date in trading_dates:
+            selected = select_targets(date)
+            targets.append(None if selected is None else
+                           [-1 if indicators.column(t) is None else indicators.column(t) for t in selected])
+        
+        kernel_result = run_stop_kernel(indicators, [rows[date] for date in trading_dates], targets,
+                                        initial_capital=initial_capital)
+        engine.portfolio_history, engine.daily_returns, engine.trade_log = kernel_records(
+            kernel_result, trading_dates, price_panel.tickers, initial_capital)
+        engine.cash = float(kernel_result['cash'][-1])
+        for trade in engine.trade_log:
+            logger.info(f"{trade['date']}: {trade['ticker']} {'매수' if trade['action'] == 'BUY' else '매도'} "
+                        f"${trade['price']:.2f} - {trade['reason']}")
+    else:
+        # 매일 시뮬레이션: 매도 신호 → 매수 → 가치 기록 (재개 시 체크포인트 다음 날부터)
+        start = checkpoint.restore(engine, trading_dates) if checkpoint is not None and resume else 0
+        run_event_loop(engine, trading_dates, price_hook, select_hook=select_hook,
+                       signal_hook=signal_hook, rebalance_hook=rebalance_hook,
+                       on_day_end=on_day_end, start=start, checkpoint=checkpoint,
+                       progress=log_progress(every_fraction=0.1, every_seconds=60),
+                       progress_label='유연한 전략')
+        if checkpoint is not None:
+            checkpoint.clear()
     
     # 성과 지표 계산
-    final_value = portfolio_value
-    total_return = ((final_value - initial_capital) / initial_capital) * 100
-    
     days = (trading_dates[-1] - trading_dates[0]).days
-    if days > 0:
-        annualized_return = ((final_value / initial_capital) ** (365 / days) - 1) * 100
-    else:
-        annualized_return = 0
-    
-    # MDD, 샤프비율, 승률 계산
-    from historical_backtest import calculate_mdd, calculate_sharpe_ratio, calculate_win_rate
-    
-    mdd = calculate_mdd([h['value'] for h in portfolio_history])
-    returns = [r['return'] for r in daily_returns]
-    sharpe_ratio = calculate_sharpe_ratio(returns, RISK_FREE_RATE)
-    win_rate = calculate_win_rate(daily_returns)
-    
-    if daily_returns:
-        best_day = max(daily_returns, key=lambda x: x['return'])
-        worst_day = min(daily_returns, key=lambda x: x['return'])
-    else:
-        best_day = {'date': '-', 'return': 0}
-        worst_day = {'date': '-', 'return': 0}
+    metrics = engine.performance(days, RISK_FREE_RATE)
+    trade_log = engine.trade_log
     
     # 거래 통계
     buy_trades = [t for t in trade_log if t['action'] == 'BUY']
@@ -357,19 +281,19 @@ def simulate_flexible_strategy(start_date, end_date, initial_capital=10000,
         'start_date': trading_dates[0].strftime('%Y-%m-%d'),
         'end_date': trading_dates[-1].strftime('%Y-%m-%d'),
         'initial_capital': initial_capital,
-        'final_value': final_value,
-        'final_cash': cash,
-        'final_positions': len(positions),
-        'total_return': total_return,
-        'annualized_return': annualized_return,
-        'mdd': mdd,
-        'sharpe_ratio': sharpe_ratio,
-        'win_rate': win_rate,
+        'final_value': metrics['final_value'],
+        'final_cash': engine.cash,
+        'final_positions': engine.portfolio_history[-1]['positions'] if use_kernel else engine.position_count,
+        'total_return': metrics['total_return'],
+        'annualized_return': metrics['annualized_return'],
+        'mdd': metrics['mdd'],
+        'sharpe_ratio': metrics['sharpe_ratio'],
+        'win_rate': metrics['win_rate'],
         'trading_days': len(trading_dates),
-        'best_day': best_day,
-        'worst_day': worst_day,
-        'portfolio_history': portfolio_history,
-        'daily_returns': daily_returns,
+        'best_day': metrics['best_day'],
+        'worst_day': metrics['worst_day'],
+        'portfolio_history': engine.portfolio_history,
+        'daily_returns': engine.daily_returns,
         'trade_log': trade_log,
         'total_trades': len(trade_log),
         'buy_count': len(buy_trades),
@@ -379,14 +303,20 @@ def simulate_flexible_strategy(start_date, end_date, initial_capital=10000,
     return result
 
 
-def main(year=2022):
-    """메인 실행 함수"""
+def main(year=2022, panels=None, notify=True, use_kernel=False, resume=False, entry_rule=ENTRY_RULE):
+    """
+    메인 실행 함수
+    
+    Args:
+        year: 백테스팅 연도
+        panels: 미리 조회한 유니버스 가격 패널 (run_backtest_multi_year에서 공유)
+        notify: False면 Telegram 전송 생략
+        use_kernel: True면 일별 매매 상태 머신을 stop_kernel로 실행
+        resume: True면 마지막 체크포인트에서 이어서 실행
+        entry_rule: 매수 조건식 (기본: config.ENTRY_RULE)
+    """
     
-    start_date = datetime(year, 1, 3)
-    if year == 2025 and datetime.now() < datetime(2025, 12, 30):
-        end_date = datetime.now() - timedelta(days=1)
-    else:
-        end_date = datetime(year, 12, 30)
+    start_date, end_date = backtest_year_period(year)
     
     logger.info("=" * 60)
     logger.info(f"{year}년 유연한 백테스팅 (매매 신호 + 종목 교체)")
@@ -395,16 +325,28 @@ def main(year=2022):
     logger.info("\n전략 규칙:")
     logger.info("1. 매월 첫 월요일: 상위 10개 재조회 및 리밸런싱")
     logger.info("2. 매도 신호: 트레일링 스탑 또는 MA60 손절")
-    logger.info("3. 매수 신호: 기술적 조건 + 상위 종목")
+    logger.info(f"3. 매수 신호: 기술적 조건({entry_rule}) + 상위 종목")
     logger.info("4. 종목 수: 0~10개 유연 (상황에 따라)")
     logger.info("5. 매도 시 현금 보유 OK")
     
+    # 조건식 구문 검사
+    try:
+        compile_rule(entry_rule)
+    except ValueError as e:
+        logger.error(f"매수 조건식 오류: {e}")
+        return None
+    
     # 시뮬레이션 실행
     result = simulate_flexible_strategy(
         start_date=start_date,
         end_date=end_date,
         initial_capital=10000,
-        rebalance_frequency='monthly'
+        rebalance_frequency='monthly',
+        panels=panels,
+        use_kernel=use_kernel,
+        checkpoint_name=f'flexible_{year}',
+        resume=resume,
+        entry_rule=entry_rule
     )
     
     if result is None:
@@ -445,13 +387,14 @@ def main(year=2022):
         logger.info(f"{snapshot['date'][:7]}: ${snapshot['value']:,.0f} (보유: {snapshot['positions']}개, 현금: ${snapshot['cash']:,.0f})")
     
     # Telegram 전송
-    logger.info(f"\nTelegram으로 결과 전송 중...")
-    message = create_flexible_backtest_message(result, year)
-    success = send_to_telegram(message)
-    if success:
-        logger.info("✅ Telegram 전송 성공!")
-    else:
-        logger.warning("⚠️ Telegram 전송 실패")
+    if notify:
+        logger.info(f"\nTelegram으로 결과 전송 중...")
+        message = create_flexible_backtest_message(result, year)
+        success = send_to_telegram(message)
+        if success:
+            logger.info("✅ Telegram 전송 성공!")
+        else:
+            logger.warning("⚠️ Telegram 전송 실패")
     
     # JSON 저장
     save_path = Path('daily_data') / f'backtest_{year}_flexible.json'
@@ -519,11 +462,18 @@ if __name__ == "__main__":
     parser = argparse.ArgumentParser(description='유연한 백테스팅 (매매 신호 + 종목 교체)')
     parser.add_argument('--year', type=int, default=2022,
                        help='백테스팅 연도 (기본: 2022)')
+    parser.add_argument('--kernel', action='store_true',
+                       help='매매 상태 머신을 커널(Numba 사용 가능 시 JIT)로 실행')
+    parser.add_argument('--resume', action='store_true',
+                       help='마지막 체크포인트에서 이어서 실행')
+    parser.add_argument('--entry-rule', default=ENTRY_RULE,
+                       help=f'매수 조건식 (기본: "{ENTRY_RULE}", 예: "close > sma(60) > sma(120) and atr_pct(14) < 5")')
     
     args = parser.parse_args()
     
     try:
-        result = main(year=args.year)
+        result = main(year=args.year, use_kernel=args.kernel, resume=args.resume,
+                      entry_rule=args.entry_rule)
         
         if result:
             sys.exit(0)
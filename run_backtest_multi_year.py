@@ -0,0 +1,279 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+여러 연도 × 전략 백테스팅 일괄 실행
+유니버스 가격 패널을 한 번만 조회하고, (연도, 전략) 조합을 워커 프로세스에서 병렬 실행
+
+- 전략: flexible (run_backtest_flexible), smart (run_backtest_2022_smart)
+- 패널은 워커 시작 시 한 번만 전달 (작업마다 다시 직렬화하지 않음)
+- 연도별 결과 JSON(backtest_{year}_{strategy}.json)은 기존과 동일하게 저장
+- 전체 비교 결과: daily_data/backtest_multi_year_comparison.json
+"""
+
+import sys
+import os
+from pathlib import Path
+from datetime import datetime
+from concurrent.futures import ProcessPoolExecutor, as_completed
+import json
+
+# src 모듈 임포트를 위한 경로 추가
+sys.path.insert(0, str(Path(__file__).parent / 'src'))
+
+from historical_backtest import fetch_universe_panel, backtest_year_period
+from indicators import INDICATOR_WARMUP_DAYS
+from progress import ProgressTracker, log_progress
+from telegram_notifier import send_to_telegram
+from logger import get_logger
+
+logger = get_logger()
+
+STRATEGIES = ('flexible', 'smart')
+
+STRATEGY_NAMES = {
+    'flexible': '유연한 전략',
+    'smart': '스마트 전략'
+}
+
+SUMMARY_METRICS = ('total_return', 'annualized_return', 'mdd', 'sharpe_ratio', 'win_rate')
+
+# 워커 프로세스 공용 가격 패널 (initializer에서 한 번 설정)
+_PANELS = None
+
+
+def _init_worker(panels):
+    """워커 초기화: 공용 가격 패널 저장"""
+    global _PANELS
+    _PANELS = panels
+
+
+def _strategy_main(strategy):
+    """전략 이름 → main 함수"""
+    if strategy == 'flexible':
+        from run_backtest_flexible import main
+    elif strategy == 'smart':
+        from run_backtest_2022_smart import main
+    else:
+        raise ValueError(f"알 수 없는 전략: {strategy}")
+    return main
+
+
+def summarize_result(strategy, result):
+    """전략별 결과 구조에서 비교용 지표만 추출"""
+    sim = result.get('simulation', result) if strategy == 'smart' else result
+    summary = {metric: sim.get(metric) for metric in SUMMARY_METRICS}
+    summary.update({
+        'start_date': sim.get('start_date'),
+        'end_date': sim.get('end_date'),
+        'final_value': sim.get('final_value'),
+        'total_trades': sim.get('total_trades')
+    })
+    return summary
+
+
+def run_job(strategy, year):
+    """
+    (전략, 연도) 백테스팅 1건 실행 (워커 프로세스)
+    
+    Returns:
+        (strategy, year, summary, error): 실패 시 summary는 None
+    """
+    try:
+        result = _strategy_main(strategy)(year=year, panels=_PANELS, notify=False)
+    except Exception as e:
+        return strategy, year, None, str(e)
+    if result is None:
+        return strategy, year, None, '시뮬레이션 실패'
+    return strategy, year, summarize_result(strategy, result), None
+
+
+def fetch_shared_panels(years):
+    """전체 연도 구간의 유니버스 가격 패널을 스크리너별로 한 번씩 조회 (이동평균 이력, 고가/저가 포함)"""
+    periods = [backtest_year_period(year) for year in years]
+    start_date = min(start for start, _ in periods)
+    end_date = max(end for _, end in periods)
+    logger.info(f"공용 가격 패널 조회: {start_date.strftime('%Y-%m-%d')} ~ {end_date.strftime('%Y-%m-%d')}")
+    return {
+        screener_type: fetch_universe_panel(screener_type, start_date, end_date,
+                                            warmup_days=INDICATOR_WARMUP_DAYS, ohlc=True)
+        for screener_type in ('large', 'mega')
+    }
+
+
+def build_comparison(summaries, years, strategies):
+    """
+    연도 × 전략 비교표와 전략별 평균 지표
+    
+    Returns:
+        dict: by_year {year: {strategy: summary}}, average {strategy: {metric: 평균}}
+    """
+    by_year = {str(year): {} for year in years}
+    for (strategy, year), summary in summaries.items():
+        by_year[str(year)][strategy] = summary
+    
+    average = {}
+    for strategy in strategies:
+        rows = [s for (name, _), s in summaries.items() if name == strategy]
+        if not rows:
+            continue
+        average[strategy] = {
+            metric: sum(row[metric] for row in rows) / len(rows)
+            for metric in SUMMARY_METRICS
+            if all(row.get(metric) is not None for row in rows)
+        }
+        average[strategy]['years'] = len(rows)
+    
+    return {'by_year': by_year, 'average': average}
+
+
+def create_multi_year_message(comparison, years, strategies):
+    """Telegram 메시지 생성"""
+    message = f"📊 *연도별 백테스팅 비교 ({years[0]}~{years[-1]})*\n\n"
+    message += "━━━━━━━━━━━━━━━━━━━━\n\n"
+    
+    for year in years:
+        message += f"📅 *{year}년*\n"
+        for strategy in strategies:
+            summary = comparison['by_year'][str(year)].get(strategy)
+            if summary is None:
+                message += f"• {STRATEGY_NAMES[strategy]}: 실패\n"
+                continue
+            message += (f"• {STRATEGY_NAMES[strategy]}: {summary['total_return']:+.2f}% "
+                        f"(MDD {summary['mdd']:.2f}%, 샤프 {summary['sharpe_ratio']:.2f})\n")
+        message += "\n"
+    
+    message += "━━━━━━━━━━━━━━━━━━━━\n\n"
+    message += "📈 *전략별 평균*\n"
+    for strategy, avg in comparison['average'].items():
+        message += (f"• {STRATEGY_NAMES[strategy]}: {avg.get('total_return', 0):+.2f}% "
+                    f"({avg['years']}개 연도)\n")
+    
+    message += f"\n⏰ {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}"
+    return message
+
+
+def main(years, strategies=STRATEGIES, workers=None, notify=True, progress=None):
+    """
+    메인 실행 함수
+    
+    Args:
+        progress: 작업 단위 진행률 콜백 (progress.ProgressTracker 이벤트, 로그는 항상 기록)
+    """
+    years = sorted(set(years))
+    jobs = [(strategy, year) for year in years for strategy in strategies]
+    workers = workers or min(len(jobs), os.cpu_count() or 1)
+    
+    logger.info("=" * 60)
+    logger.info("연도별 백테스팅 일괄 실행")
+    logger.info("=" * 60)
+    logger.info(f"연도: {', '.join(str(y) for y in years)}")
+    logger.info(f"전략: {', '.join(STRATEGY_NAMES[s] for s in strategies)}")
+    logger.info(f"작업 수: {len(jobs)}개 / 워커: {workers}개")
+    
+    # 1. 공용 가격 패널 (한 번만 조회)
+    panels = fetch_shared_panels(years)
+    if not any(panels.values()):
+        logger.error("유니버스 가격 패널을 가져올 수 없습니다.")
+        return None
+    
+    # 2. (전략, 연도) 병렬 실행
+    summaries = {}
+    failures = {}
+    tracker = ProgressTracker(len(jobs), '연도별 백테스팅', [progress, log_progress(every_steps=1)])
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                             initargs=(panels,)) as executor:
+        futures = [executor.submit(run_job, strategy, year) for strategy, year in jobs]
+        for future in as_completed(futures):
+            strategy, year, summary, error = future.result()
+            tracker.advance(message=f"{year} {strategy}")
+            if summary is None:
+                failures[f"{year}_{strategy}"] = error
+                logger.error(f"{year}년 {STRATEGY_NAMES[strategy]}: {error}")
+                continue
+            summaries[(strategy, year)] = summary
+            logger.info(f"{year}년 {STRATEGY_NAMES[strategy]} 완료: {summary['total_return']:+.2f}%")
+    
+    if not summaries:
+        logger.error("성공한 백테스팅이 없습니다.")
+        return None
+    
+    # 3. 비교 결과
+    comparison = build_comparison(summaries, years, strategies)
+    
+    logger.info("\n" + "=" * 60)
+    logger.info("연도별 백테스팅 비교")
+    logger.info("=" * 60)
+    for year in years:
+        for strategy in strategies:
+            summary = comparison['by_year'][str(year)].get(strategy)
+            if summary is None:
+                logger.info(f"{year} {strategy:8s}: 실패")
+                continue
+            logger.info(f"{year} {strategy:8s}: {summary['total_return']:+8.2f}% "
+                        f"(MDD {summary['mdd']:7.2f}%, 샤프 {summary['sharpe_ratio']:5.2f})")
+    
+    logger.info(f"\n[전략별 평균]")
+    for strategy, avg in comparison['average'].items():
+        logger.info(f"{STRATEGY_NAMES[strategy]}: 총 수익률 {avg.get('total_return', 0):+.2f}% "
+                    f"/ MDD {avg.get('mdd', 0):.2f}% ({avg['years']}개 연도)")
+    
+    # Telegram 전송
+    if notify:
+        logger.info(f"\nTelegram으로 결과 전송 중...")
+        success = send_to_telegram(create_multi_year_message(comparison, years, strategies))
+        if success:
+            logger.info("✅ Telegram 전송 성공!")
+        else:
+            logger.warning("⚠️ Telegram 전송 실패")
+    
+    # JSON 저장
+    output = {
+        'years': years,
+        'strategies': list(strategies),
+        'comparison': comparison,
+        'failures': failures,
+        'run_date': datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+    }
+    
+    save_path = Path('daily_data') / 'backtest_multi_year_comparison.json'
+    with open(save_path, 'w', encoding='utf-8') as f:
+        json.dump(output, f, indent=2, ensure_ascii=False)
+    logger.info(f"\n결과 저장: {save_path}")
+    
+    return output
+
+
+if __name__ == "__main__":
+    import argparse
+    
+    parser = argparse.ArgumentParser(description='연도별 백테스팅 일괄 실행 (병렬)')
+    parser.add_argument('--years', type=int, nargs='+', default=[2022, 2023, 2024],
+                       help='백테스팅 연도 (기본: 2022 2023 2024)')
+    parser.add_argument('--strategies', nargs='+', choices=STRATEGIES, default=list(STRATEGIES),
+                       help='실행할 전략 (기본: 전체)')
+    parser.add_argument('--workers', type=int, default=None,
+                       help='워커 프로세스 수 (기본: min(작업 수, CPU 수))')
+    parser.add_argument('--no-telegram', action='store_true',
+                       help='Telegram 전송 생략')
+    
+    args = parser.parse_args()
+    
+    try:
+        result = main(
+            years=args.years,
+            strategies=args.strategies,
+            workers=args.workers,
+            notify=not args.no_telegram
+        )
+        
+        if result:
+            sys.exit(0)
+        else:
+            sys.exit(1)
+    
+    except KeyboardInterrupt:
+        logger.info("\n사용자에 의해 중단되었습니다.")
+        sys.exit(130)
+    except Exception as e:
+        logger.error(f"예상치 못한 오류 발생: {e}", exc_info=True)
+        sys.exit(1)
@@ -11,25 +11,30 @@
 """
 
 import sys
-import pandas as pd
-import yfinance as yf
+import numpy as np
 from datetime import datetime, timedelta
 from pathlib import Path
 import json
-import numpy as np
 
 sys.path.insert(0, str(Path(__file__).parent / 'src'))
 
 from logger import get_logger
-from config import DATA_DIR, RISK_FREE_RATE
+from performance_metrics import calculate_volatility, StreamingMetrics
+from backtest_engine import (
+    PortfolioEngine, FixedCostModel, run_event_loop, stream_event_loop, rebalance_equal_weight,
+    rebalance_turnover
+)
+from record_stream import RecordWriter, SeriesDownsampler, consume_records, read_records, truncate_records
+from price_panel import fetch_price_panel
+from momentum_ranking import MomentumRanker, ChunkedMomentumRanker
+from panel_store import PanelStore, PANEL_STORE_DIR, build_panel_store
+from universe import get_universe_store
+from checkpoint import Checkpoint, load_saved_key
+from progress import log_progress
+from config import DATA_DIR, RISK_FREE_RATE, TRANSACTION_FEE, SLIPPAGE
 
 logger = get_logger()
 
-# 거래 비용 설정
-TRANSACTION_FEE = 0.002  # 0.2% 수수료
-SLIPPAGE = 0.001  # 0.1% 슬리피지
-TOTAL_TRANSACTION_COST = TRANSACTION_FEE + SLIPPAGE  # 0.3%
-
 # S&P 500 구성 종목 (간소화 버전 - 주요 종목들)
 # 실제로는 각 시점의 Large/Mega Cap을 정확히 구하기 어려우므로
 # 주요 종목들을 기반으로 시뮬레이션
@@ -53,8 +58,25 @@ SP500_TICKERS = [
     'TSMC', 'BRK-B', 'V', 'MA', 'DIS', 'PYPL'
 ]
 
+# 스트리밍 모드 결과의 차트용 시계열 최대 점 개수
+STREAM_MAX_POINTS = 2000
+
+
+def create_momentum_ranker(panel, lookback_months=3):
+    """
+    장기 백테스트용 모멘텀 순위 엔진
+    
+    평가 구간: [선정일 - (lookback_months × 30 + 30)일, 선정일] 첫 종가 → 마지막 종가,
+    구간 내 실거래일 30일 이상인 종목만 순위에 포함
+    디스크 패널(PanelStore)이면 선정일 구간만 블록 단위로 읽는 ChunkedMomentumRanker 사용
+    """
+    ranker_class = ChunkedMomentumRanker if isinstance(panel, PanelStore) else MomentumRanker
+    return ranker_class(panel, window_days=lookback_months * 30 + 30, min_periods=30,
+                        include_date=True)
 
-def get_top_performers_at_date(tickers_pool, selection_date, lookback_months=3, top_n=10):
+
+def get_top_performers_at_date(tickers_pool, selection_date, lookback_months=3, top_n=10,
+                               ranker=None):
     """
     특정 시점에서 과거 N개월 수익률 기준 상위 종목 선정
     Look-Ahead Bias 없음 - selection_date 이전 데이터만 사용
@@ -64,6 +86,7 @@ def get_top_performers_at_date(tickers_pool, selection_date, lookback_months=3,
         selection_date: 종목 선정 날짜
         lookback_months: 수익률 평가 기간 (개월)
         top_n: 선정할 종목 수
+        ranker: 미리 만든 MomentumRanker (없으면 평가 구간 가격을 조회하여 생성)
     
     Returns:
         상위 N개 티커 리스트
@@ -76,60 +99,30 @@ def get_top_performers_at_date(tickers_pool, selection_date, lookback_months=3,
     logger.info(f"평가 기간: {evaluation_start.strftime('%Y-%m-%d')} ~ {evaluation_end.strftime('%Y-%m-%d')}")
     logger.info(f"{'='*60}")
     
-    performance_data = []
-    
-    for i, ticker in enumerate(tickers_pool):
-        try:
-            if (i + 1) % 20 == 0:
-                logger.info(f"진행률: {i+1}/{len(tickers_pool)} ({(i+1)/len(tickers_pool)*100:.1f}%)")
-            
-            stock = yf.Ticker(ticker)
-            hist = stock.history(start=evaluation_start, end=evaluation_end + timedelta(days=1))
-            
-            if hist.empty or len(hist) < 30:
-                logger.debug(f"{ticker}: 데이터 부족")
-                continue
-            
-            start_price = hist['Close'].iloc[0]
-            end_price = hist['Close'].iloc[-1]
-            
-            if start_price == 0:
-                continue
-            
-            performance = ((end_price - start_price) / start_price) * 100
-            
-            performance_data.append({
-                'ticker': ticker,
-                'performance': performance,
-                'start_price': start_price,
-                'end_price': end_price
-            })
-            
-            logger.debug(f"{ticker}: {performance:+.2f}%")
-            
-        except Exception as e:
-            logger.debug(f"{ticker}: 실패 - {e}")
-            continue
+    if ranker is None:
+        panel = fetch_price_panel(tickers_pool, evaluation_start, evaluation_end, progress_every=20)
+        if panel is None:
+            logger.error("수익률 데이터 없음")
+            return []
+        ranker = create_momentum_ranker(panel, lookback_months)
     
-    if len(performance_data) == 0:
+    top_stocks = ranker.rank(selection_date, top_n)
+    if len(top_stocks) == 0:
         logger.error("수익률 데이터 없음")
         return []
     
-    # 수익률 기준 상위 N개
-    performance_df = pd.DataFrame(performance_data)
-    performance_df = performance_df.sort_values('performance', ascending=False)
-    top_stocks = performance_df.head(top_n)
-    
     logger.info(f"\n상위 {top_n}개 종목:")
-    for idx, row in top_stocks.iterrows():
+    for row in top_stocks:
         logger.info(f"  {row['ticker']}: {row['performance']:+.2f}%")
     
-    return top_stocks['ticker'].tolist()
+    return [row['ticker'] for row in top_stocks]
 
 
 def simulate_longterm_portfolio(start_date, end_date, tickers_pool, 
                                  initial_capital=10000, rebalance_frequency='monthly',
-                                 lookback_months=3, top_n=10):
+                                 lookback_months=3, top_n=10, cost_model=None,
+                                 turnover_only=False, panel=None, checkpoint_name=None, resume=False,
+                                 progress=None, record_path=None):
     """
     장기 포트폴리오 시뮬레이션
     
@@ -141,270 +134,262 @@ def simulate_longterm_portfolio(start_date, end_date, tickers_pool,
         rebalance_frequency: 리밸런싱 빈도 ('monthly' 또는 'quarterly')
         lookback_months: 종목 선정 시 평가 기간
         top_n: 선정할 종목 수
+        cost_model: 거래 비용 모델 (기본: 수수료 + 고정 슬리피지)
+        turnover_only: True면 전량 청산 없이 목표 비중과의 차이만 매매
+        panel: 미리 조회한 티커 풀 가격 패널 (없으면 기간만큼 한 번 조회)
+               - 종목 선정, 매수/청산 체결가, 평가액을 모두 이 패널에서 인덱싱
+               - 디스크 패널(PanelStore)도 가능: 날짜별 가격과 선정 구간만 블록 단위로 읽음
+                 (메모리 패널과 같은 결과)
+        checkpoint_name: 체크포인트 이름 (지정 시 주기적으로 엔진 상태와 조회한 패널 저장)
+        resume: True면 같은 파라미터(종료일·티커 풀 포함)의 체크포인트에서 이어서 실행
+                (저장된 패널 사용, 종료일·티커 풀은 호출 측이 load_saved_key로 맞춤)
+        progress: 진행률 콜백 (progress.ProgressTracker 이벤트, 기본: 10%/1분마다 로그)
+        record_path: 지정하면 스트리밍 모드 - 기록을 JSON Lines 파일로 바로 쓰고(RecordWriter)
+                     엔진 기록 리스트는 쌓지 않음. 성과 지표는 파일을 한 줄씩 다시 읽어
+                     누적 계산(StreamingMetrics)하고, portfolio_history / monthly_returns는
+                     차트용 축약 시계열(최대 STREAM_MAX_POINTS개 점)로 대신합니다.
     
     Returns:
         시뮬레이션 결과
     """
+    if cost_model is None:
+        cost_model = FixedCostModel(fee=TRANSACTION_FEE, slippage=SLIPPAGE)
+    
     logger.info("\n" + "="*80)
     logger.info("장기 백테스팅 시작")
     logger.info("="*80)
     logger.info(f"기간: {start_date.strftime('%Y-%m-%d')} ~ {end_date.strftime('%Y-%m-%d')}")
     logger.info(f"초기 자본: ${initial_capital:,.0f}")
     logger.info(f"리밸런싱: {rebalance_frequency}")
-    logger.info(f"거래 비용: {TOTAL_TRANSACTION_COST*100:.1f}% (수수료 {TRANSACTION_FEE*100:.1f}% + 슬리피지 {SLIPPAGE*100:.1f}%)")
+    logger.info(f"거래 비용: {cost_model.summary()}")
+    if turnover_only:
+        logger.info("리밸런싱 방식: 목표 비중과의 차이만 매매")
     logger.info(f"종목 선정: 상위 {top_n}개")
     
-    # 변수 초기화
-    portfolio_value = initial_capital
-    cash = initial_capital
-    positions = {}  # {ticker: shares}
-    current_tickers = []
-    
-    portfolio_history = []
-    monthly_returns = []
-    trade_log = []
-    rebalance_dates = []
-    
-    total_transaction_costs = 0
-    
-    # 월별로 순회
+    state = {'rebalance_dates': [], 'last_rebalance': None}
+    checkpoint = None
+    if checkpoint_name:
+        checkpoint = Checkpoint(checkpoint_name, key={
+            'start_date': start_date.strftime('%Y-%m-%d'),
+            'end_date': end_date.strftime('%Y-%m-%d'),
+            'tickers': list(tickers_pool),
+            'initial_capital': initial_capital,
+            'rebalance_frequency': rebalance_frequency,
+            'lookback_months': lookback_months,
+            'top_n': top_n,
+            'cost_model': (type(cost_model).__name__, cost_model.total_cost),
+            'turnover_only': turnover_only,
+            **({'streaming': True} if record_path is not None else {})
+        }, state=state)
+        if resume and panel is None:
+            inputs = checkpoint.load_inputs()
+            if inputs is not None:
+                panel = inputs['panel']
+    
+    # 티커 풀 전체 가격을 한 번만 조회 (선정·체결·평가 모두 패널 인덱싱, 루프 내 네트워크 조회 없음)
+    if panel is None:
+        logger.info(f"\n티커 풀 가격 조회 중... ({len(tickers_pool)}개 종목)")
+        panel = fetch_price_panel(
+            tickers_pool,
+            start_date - timedelta(days=lookback_months * 30 + 30),
+            end_date,
+            progress_every=20
+        )
+        if checkpoint is not None and panel is not None:
+            checkpoint.save_inputs({'panel': panel})
+    ranker = create_momentum_ranker(panel, lookback_months) if panel is not None else None
+    
+    # 시뮬레이션 엔진 (거래 비용 모델, 첫 월말 기록은 기준점)
+    # 티커 ID = 패널 열 순서 → 가격 배열을 그대로 평가 가격으로 사용
+    engine = PortfolioEngine(
+        initial_capital,
+        cost_model=cost_model,
+        tickers=panel.tickers if panel is not None else (),
+        skip_first_return=True
+    )
+    
+    # 평가 날짜 생성 (주간: 7일 간격 / 월간·분기: 매월 1일)
+    dates = []
     current_date = start_date
-    last_rebalance_date = None
-    month_count = 0
-    
     while current_date <= end_date:
-        # 리밸런싱 체크
-        should_rebalance = False
-        
+        dates.append(current_date)
+        if rebalance_frequency == 'weekly':
+            current_date = current_date + timedelta(days=7)
+        elif current_date.month == 12:
+            current_date = datetime(current_date.year + 1, 1, 1)
+        else:
+            current_date = datetime(current_date.year, current_date.month + 1, 1)
+    
+    def is_month_end(i):
+        if rebalance_frequency != 'weekly':
+            return True
+        # 월이 바뀌는지 체크
+        next_date = dates[i] + timedelta(days=7)
+        return next_date.month != dates[i].month or next_date > end_date
+    
+    def rebalance_due(current_date):
+        last_rebalance_date = state['last_rebalance']
         if last_rebalance_date is None:
             # 첫 날
-            should_rebalance = True
-        elif rebalance_frequency == 'weekly':
+            return True
+        if rebalance_frequency == 'weekly':
             # 매주 (7일마다)
-            if (current_date - last_rebalance_date).days >= 7:
-                should_rebalance = True
-        elif rebalance_frequency == 'monthly':
+            return (current_date - last_rebalance_date).days >= 7
+        if rebalance_frequency == 'monthly':
             # 매월 1일 또는 첫 영업일
-            if current_date.month != last_rebalance_date.month:
-                should_rebalance = True
-        elif rebalance_frequency == 'quarterly':
+            return current_date.month != last_rebalance_date.month
+        if rebalance_frequency == 'quarterly':
             # 분기별 (3개월마다)
             months_diff = (current_date.year - last_rebalance_date.year) * 12 + \
                           (current_date.month - last_rebalance_date.month)
-            if months_diff >= 3:
-                should_rebalance = True
+            return months_diff >= 3
+        return False
+    
+    day_prices = {'prices': None}
+    
+    def price_hook(engine, current_date, i):
+        # 최근 5일 중 마지막 종가 (없으면 NaN → 직전 가격으로 평가)
+        if panel is None:
+            return {}
+        prices = panel.prices_as_of(current_date, max_age_days=5)
+        day_prices['prices'] = prices
         
-        if should_rebalance:
-            month_count += 1
-            logger.info(f"\n{'='*80}")
-            logger.info(f"[{month_count}] 리밸런싱 #{len(rebalance_dates)+1}: {current_date.strftime('%Y-%m-%d')}")
-            logger.info(f"{'='*80}")
-            
+        stale = engine.held_ids()
+        stale = stale[np.isnan(prices[stale])]
+        for ticker_id in stale:
+            logger.warning(f"{panel.tickers[ticker_id]}: 가격 데이터 없음 (직전 가격으로 평가)")
+        return prices
+    
+    def buy_prices(targets):
+        """목표 종목의 당일 체결 기준가 (가격이 없는 종목은 None → 매수 생략)"""
+        prices = day_prices['prices']
+        result = {}
+        for ticker in targets:
+            ticker_id = panel.index.get(ticker) if prices is not None else None
+            price = None if ticker_id is None else prices[ticker_id]
+            result[ticker] = None if price is None or np.isnan(price) else float(price)
+        return result
+    
+    def select_hook(engine, current_date, i):
+        if not rebalance_due(current_date):
+            return None
+        
+        logger.info(f"\n{'='*80}")
+        logger.info(f"[{len(state['rebalance_dates'])+1}] 리밸런싱 #{len(state['rebalance_dates'])+1}: {current_date.strftime('%Y-%m-%d')}")
+        logger.info(f"{'='*80}")
+        
+        # 새로운 종목 선정
+        logger.info("\n새로운 종목 선정 중...")
+        new_tickers = get_top_performers_at_date(
+            tickers_pool=tickers_pool,
+            selection_date=current_date,
+            lookback_months=lookback_months,
+            top_n=top_n,
+            ranker=ranker
+        ) if ranker is not None else []
+        
+        if len(new_tickers) == 0:
+            # 기존 포지션만 청산하고 다음 날짜에 재시도
+            logger.error("종목 선정 실패")
+            return []
+        
+        state['rebalance_dates'].append(current_date.strftime('%Y-%m-%d'))
+        state['last_rebalance'] = current_date
+        return new_tickers
+    
+    def rebalance_hook(engine, current_date, targets, prices):
+        if turnover_only:
+            # 목표 비중과의 차이만 매매 (유지 종목은 비중 조정분만 거래)
+            logger.info(f"\n포지션 조정 중... (현금: ${engine.cash:,.2f})")
+            rebalance_turnover(engine, current_date, targets, buy_prices(targets))
+        else:
             # 기존 포지션 청산
-            if positions:
+            if engine.position_count:
                 logger.info("기존 포지션 청산 중...")
-                for ticker, shares in positions.items():
-                    try:
-                        stock = yf.Ticker(ticker)
-                        hist = stock.history(start=current_date - timedelta(days=5), 
-                                            end=current_date + timedelta(days=1))
-                        
-                        if hist.empty:
-                            logger.warning(f"{ticker}: 매도 가격 데이터 없음")
-                            continue
-                        
-                        sell_price = hist['Close'].iloc[-1]
-                        actual_sell_price = sell_price * (1 - SLIPPAGE)
-                        sell_value = shares * actual_sell_price
-                        sell_value_after_fee = sell_value * (1 - TRANSACTION_FEE)
-                        
-                        cash += sell_value_after_fee
-                        transaction_cost = shares * sell_price - sell_value_after_fee
-                        total_transaction_costs += transaction_cost
-                        
-                        trade_log.append({
-                            'date': current_date.strftime('%Y-%m-%d'),
-                            'action': 'SELL',
-                            'ticker': ticker,
-                            'shares': shares,
-                            'price': sell_price,
-                            'cost': transaction_cost
-                        })
-                        
-                        logger.info(f"  매도: {ticker} {shares:.4f}주 @ ${sell_price:.2f}")
-                        
-                    except Exception as e:
-                        logger.error(f"{ticker} 매도 실패: {e}")
-                        continue
-            
-            positions = {}
+            engine.liquidate(current_date)
             
-            # 새로운 종목 선정
-            logger.info("\n새로운 종목 선정 중...")
-            new_tickers = get_top_performers_at_date(
-                tickers_pool=tickers_pool,
-                selection_date=current_date,
-                lookback_months=lookback_months,
-                top_n=top_n
-            )
-            
-            if len(new_tickers) == 0:
-                logger.error("종목 선정 실패")
-                current_date += timedelta(days=30)
-                continue
-            
-            current_tickers = new_tickers
-            rebalance_dates.append(current_date.strftime('%Y-%m-%d'))
+            if not targets:
+                return
             
             # 새로운 포지션 매수
-            logger.info(f"\n새로운 포지션 매수 중... (현금: ${cash:,.2f})")
-            num_stocks = len(current_tickers)
-            allocation_per_stock = cash / num_stocks
-            
-            for ticker in current_tickers:
-                try:
-                    stock = yf.Ticker(ticker)
-                    hist = stock.history(start=current_date - timedelta(days=5),
-                                        end=current_date + timedelta(days=1))
-                    
-                    if hist.empty:
-                        logger.warning(f"{ticker}: 매수 가격 데이터 없음")
-                        continue
-                    
-                    buy_price = hist['Close'].iloc[-1]
-                    actual_buy_price = buy_price * (1 + SLIPPAGE)
-                    shares = allocation_per_stock / (actual_buy_price * (1 + TRANSACTION_FEE))
-                    buy_cost = shares * actual_buy_price * (1 + TRANSACTION_FEE)
-                    
-                    if buy_cost <= cash and buy_cost > 10:
-                        positions[ticker] = shares
-                        cash -= buy_cost
-                        transaction_cost = buy_cost - (shares * buy_price)
-                        total_transaction_costs += transaction_cost
-                        
-                        trade_log.append({
-                            'date': current_date.strftime('%Y-%m-%d'),
-                            'action': 'BUY',
-                            'ticker': ticker,
-                            'shares': shares,
-                            'price': buy_price,
-                            'cost': transaction_cost
-                        })
-                        
-                        logger.info(f"  매수: {ticker} {shares:.4f}주 @ ${buy_price:.2f}")
-                    
-                except Exception as e:
-                    logger.error(f"{ticker} 매수 실패: {e}")
-                    continue
-            
-            last_rebalance_date = current_date
-            
-            # 포트폴리오 가치 계산
-            position_value = 0
-            for ticker, shares in positions.items():
-                try:
-                    stock = yf.Ticker(ticker)
-                    hist = stock.history(start=current_date - timedelta(days=5),
-                                        end=current_date + timedelta(days=1))
-                    if not hist.empty:
-                        current_price = hist['Close'].iloc[-1]
-                        position_value += shares * current_price
-                except:
-                    continue
-            
-            portfolio_value = cash + position_value
-            
-            logger.info(f"\n리밸런싱 후 포트폴리오:")
-            logger.info(f"  현금: ${cash:,.2f}")
-            logger.info(f"  포지션 가치: ${position_value:,.2f}")
-            logger.info(f"  총 가치: ${portfolio_value:,.2f}")
-            logger.info(f"  누적 거래 비용: ${total_transaction_costs:,.2f}")
-        
-        # 포트폴리오 가치 기록 (월말)
-        is_month_end = False
-        next_date = None
-        
-        if rebalance_frequency == 'weekly':
-            next_date = current_date + timedelta(days=7)
-            # 월이 바뀌는지 체크
-            if next_date.month != current_date.month or next_date > end_date:
-                is_month_end = True
-        else:  # monthly or quarterly
-            # 다음 달로 이동
-            if current_date.month == 12:
-                next_date = datetime(current_date.year + 1, 1, 1)
-            else:
-                next_date = datetime(current_date.year, current_date.month + 1, 1)
-            is_month_end = True
+            logger.info(f"\n새로운 포지션 매수 중... (현금: ${engine.cash:,.2f})")
+            rebalance_equal_weight(engine, current_date, targets, buy_prices(targets))
         
+        logger.info(f"\n리밸런싱 후 포트폴리오:")
+        logger.info(f"  현금: ${engine.cash:,.2f}")
+        logger.info(f"  포지션 가치: ${engine.position_value():,.2f}")
+        logger.info(f"  총 가치: ${engine.value():,.2f}")
+        logger.info(f"  누적 거래 비용: ${engine.total_transaction_costs:,.2f}")
+    
+    def on_day_end(engine, current_date, i):
         # 월말이면 가치 기록 및 수익률 계산
-        if is_month_end:
-            try:
-                position_value = 0
-                for ticker, shares in positions.items():
-                    stock = yf.Ticker(ticker)
-                    hist = stock.history(start=current_date - timedelta(days=5),
-                                        end=current_date + timedelta(days=1))
-                    if not hist.empty:
-                        current_price = hist['Close'].iloc[-1]
-                        position_value += shares * current_price
-                
-                portfolio_value = cash + position_value
-                
-                portfolio_history.append({
-                    'date': current_date.strftime('%Y-%m-%d'),
-                    'value': portfolio_value,
-                    'cash': cash,
-                    'positions': len(positions),
-                    'tickers': list(positions.keys())
-                })
-                
-                # 월별 수익률 계산
-                if len(portfolio_history) > 1:
-                    prev_value = portfolio_history[-2]['value']
-                    monthly_return = ((portfolio_value - prev_value) / prev_value) * 100
-                    monthly_returns.append({
-                        'date': current_date.strftime('%Y-%m-%d'),
-                        'return': monthly_return,
-                        'value': portfolio_value
-                    })
-                    logger.info(f"{current_date.strftime('%Y-%m')}: ${portfolio_value:,.0f} ({monthly_return:+.2f}%)")
-            
-            except Exception as e:
-                logger.error(f"{current_date} 가치 계산 실패: {e}")
-        
-        # 다음 기간으로 이동
-        current_date = next_date
-        if current_date > end_date:
-            break
+        if not is_month_end(i):
+            return
+        monthly_return = engine.record(current_date, tickers=engine.held_tickers())
+        if monthly_return is not None:
+            logger.info(f"{current_date.strftime('%Y-%m')}: ${engine.value():,.0f} ({monthly_return:+.2f}%)")
+    
+    # 체크포인트 재개: 엔진/전략 상태 복원 후 커서 다음 날짜부터 처리
+    start = checkpoint.restore(engine, dates) if checkpoint is not None and resume else 0
+    loop_args = dict(
+        select_hook=select_hook,
+        rebalance_hook=rebalance_hook,
+        on_day_end=on_day_end,
+        start=start,
+        checkpoint=checkpoint,
+        progress=progress or log_progress(every_fraction=0.1, every_seconds=60),
+        progress_label='장기 백테스트'
+    )
+    if record_path is None:
+        run_event_loop(engine, dates, price_hook, **loop_args)
+    else:
+        # 재개 시 레코드 파일은 재개 날짜 이전까지만 남기고 이어서 기록
+        if 0 < start < len(dates):
+            truncate_records(record_path, dates[start].strftime('%Y-%m-%d'))
+        with RecordWriter(record_path, append=start > 0) as writer:
+            consume_records(stream_event_loop(engine, dates, price_hook, **loop_args), [writer])
+    if checkpoint is not None:
+        checkpoint.clear()
+    rebalance_dates = state['rebalance_dates']
     
     # 최종 성과 계산
-    final_value = portfolio_value
-    total_return = ((final_value - initial_capital) / initial_capital) * 100
+    total_transaction_costs = engine.total_transaction_costs
+    days = (end_date - start_date).days
+    years = days / 365.25
+    if record_path is None:
+        portfolio_history = engine.portfolio_history
+        monthly_returns = engine.daily_returns
+        total_trades = len(engine.trade_log)
+        metrics = engine.performance(days, RISK_FREE_RATE, periods_per_year=12)
+        
+        if monthly_returns:
+            returns = [r['return'] for r in monthly_returns]
+            avg_monthly_return = sum(returns) / len(returns)
+            volatility = calculate_volatility(returns, ddof=0)
+        else:
+            avg_monthly_return = 0
+            volatility = 0
+    else:
+        # 레코드 파일을 한 줄씩 다시 읽어 누적 지표와 차트용 시계열 계산 (메모리 일정)
+        stream_metrics = StreamingMetrics(initial_capital)
+        series = SeriesDownsampler(STREAM_MAX_POINTS)
+        total_trades = len(engine.trade_log)  # 마지막 기록 이후 거래 (파일에 없음)
+        for record in read_records(record_path):
+            stream_metrics.update_record(record)
+            series.update_record(record)
+            total_trades += len(record.get('trades', ()))
+        metrics = stream_metrics.result(days, RISK_FREE_RATE, periods_per_year=12)
+        portfolio_history = monthly_returns = series.series()
+        avg_monthly_return = stream_metrics.mean_return
+        volatility = stream_metrics.volatility(ddof=0)
+    final_value = metrics['final_value']
+    total_return = metrics['total_return']
     
-    years = (end_date - start_date).days / 365.25
     if years > 0:
         cagr = ((final_value / initial_capital) ** (1 / years) - 1) * 100
     else:
         cagr = 0
     
-    # 지표 계산
-    mdd = calculate_mdd([h['value'] for h in portfolio_history])
-    returns = [r['return'] for r in monthly_returns]
-    sharpe_ratio = calculate_sharpe_ratio(returns, RISK_FREE_RATE, frequency='monthly')
-    win_rate = calculate_win_rate(monthly_returns)
-    
-    if monthly_returns:
-        best_month = max(monthly_returns, key=lambda x: x['return'])
-        worst_month = min(monthly_returns, key=lambda x: x['return'])
-        avg_monthly_return = sum(r['return'] for r in monthly_returns) / len(monthly_returns)
-        volatility = np.std([r['return'] for r in monthly_returns])
-    else:
-        best_month = {'date': '-', 'return': 0}
-        worst_month = {'date': '-', 'return': 0}
-        avg_monthly_return = 0
-        volatility = 0
-    
     result = {
         'start_date': start_date.strftime('%Y-%m-%d'),
         'end_date': end_date.strftime('%Y-%m-%d'),
@@ -413,15 +398,15 @@ def simulate_longterm_portfolio(start_date, end_date, tickers_pool,
         'total_return': total_return,
         'cagr': cagr,
         'years': round(years, 2),
-        'mdd': mdd,
-        'sharpe_ratio': sharpe_ratio,
-        'win_rate': win_rate,
+        'mdd': metrics['mdd'],
+        'sharpe_ratio': metrics['sharpe_ratio'],
+        'win_rate': metrics['win_rate'],
         'avg_monthly_return': avg_monthly_return,
         'volatility': volatility,
-        'best_month': best_month,
-        'worst_month': worst_month,
+        'best_month': metrics['best_day'],
+        'worst_month': metrics['worst_day'],
         'total_rebalances': len(rebalance_dates),
-        'total_trades': len(trade_log),
+        'total_trades': total_trades,
         'total_transaction_costs': total_transaction_costs,
         'transaction_cost_pct': (total_transaction_costs / initial_capital) * 100,
         'portfolio_history': portfolio_history,
@@ -431,70 +416,85 @@ def simulate_longterm_portfolio(start_date, end_date, tickers_pool,
             'rebalance_frequency': rebalance_frequency,
             'lookback_months': lookback_months,
             'top_n': top_n,
-            'transaction_fee': TRANSACTION_FEE,
-            'slippage': SLIPPAGE
+            'transaction_fee': cost_model.fee,
+            'slippage': cost_model.slippage,
+            'cost_model': type(cost_model).__name__,
+            'cost_params': cost_model.describe(),
+            'turnover_only': turnover_only
         }
     }
+    if record_path is not None:
+        result['record_file'] = str(record_path)
     
     return result
 
 
-def calculate_mdd(portfolio_values):
-    """최대낙폭 계산"""
-    if len(portfolio_values) < 2:
-        return 0.0
-    
-    peak = portfolio_values[0]
-    max_drawdown = 0
-    
-    for value in portfolio_values:
-        if value > peak:
-            peak = value
-        drawdown = ((value - peak) / peak) * 100
-        if drawdown < max_drawdown:
-            max_drawdown = drawdown
-    
-    return max_drawdown
+def load_ticker_pool(universe, start_date, end_date):
+    """티커 풀: 'sp500'은 내장 주요 종목, 'large'/'mega'는 기간 중 유니버스 스냅샷 합집합"""
+    if universe == 'sp500':
+        return list(SP500_TICKERS)
+    return get_universe_store(universe).tickers_between(start_date, end_date)
 
 
-def calculate_sharpe_ratio(returns, risk_free_rate=0.05, frequency='monthly'):
-    """샤프비율 계산"""
-    if not returns or len(returns) < 2:
-        return 0.0
-    
-    avg_return = sum(returns) / len(returns)
-    variance = sum((r - avg_return) ** 2 for r in returns) / (len(returns) - 1)
-    std_dev = variance ** 0.5
-    
-    if std_dev == 0:
-        return 0.0
-    
-    if frequency == 'monthly':
-        periods_per_year = 12
-        period_rf = (1 + risk_free_rate) ** (1/12) - 1
-    else:  # daily
-        periods_per_year = 252
-        period_rf = (1 + risk_free_rate) ** (1/252) - 1
-    
-    period_rf_pct = period_rf * 100
-    sharpe = ((avg_return - period_rf_pct) / std_dev) * (periods_per_year ** 0.5)
+def open_panel_store(universe, tickers_pool, start_date, end_date, lookback_months=3,
+                     block_size=500):
+    """
+    티커 풀 디스크 패널 (DATA_DIR/panels/longterm_{universe})
     
-    return sharpe
-
-
-def calculate_win_rate(returns):
-    """승률 계산"""
-    if not returns:
-        return 0.0
-    wins = sum(1 for r in returns if r['return'] > 0)
-    return (wins / len(returns)) * 100 if returns else 0.0
+    저장된 패널의 조회 기간(meta.json)이 (시작일 - 룩백) ~ 종료일을 포함하고 요청 종목 풀이 정확히 같을 때만
+    그대로 쓰고, 아니면 블록 단위로 다시 조회합니다.
+    재개할 때는 체크포인트에 저장된 종료일과 티커 풀(load_saved_key)을 넘겨야 같은 패널이 재사용됩니다.
+    """
+    directory = PANEL_STORE_DIR / f'longterm_{universe}'
+    fetch_start = start_date - timedelta(days=lookback_months * 30 + 30)
+    if PanelStore.exists(directory):
+        store = PanelStore(directory)
+        meta = store.meta
+        covered = (
+            'start_date' in meta and 'end_date' in meta
+            and meta['start_date'] <= fetch_start.strftime('%Y-%m-%d')
+            and meta['end_date'] >= end_date.strftime('%Y-%m-%d')
+        )
+        if covered and set(meta.get('pool', ())) == set(tickers_pool):
+            logger.info(f"디스크 패널 사용: {directory} ({store.shape[0]}일 × {store.shape[1]}종목)")
+            return store
+        logger.info(f"디스크 패널이 기간/종목 풀과 맞지 않아 다시 생성합니다: {directory}")
+    
+    return build_panel_store(
+        tickers_pool,
+        fetch_start,
+        end_date,
+        directory,
+        block_size=block_size
+    )
 
 
-def main():
-    """메인 실행 함수"""
+def main(resume=False, universe='sp500', use_store=False, block_size=500, stream=False):
+    """
+    메인 실행 함수
+    
+    Args:
+        resume: True면 마지막 체크포인트에서 이어서 실행 (종료일·티커 풀·디스크 패널도 체크포인트 기준)
+        universe: 티커 풀 ('sp500': 내장 주요 종목, 'large'/'mega': 유니버스 스냅샷)
+        use_store: True면 가격 패널을 디스크에 블록 단위로 저장하고 필요한 구간만 읽음
+                   (메모리에 올릴 수 없는 대형 유니버스용)
+        block_size: 디스크 패널 종목 블록 크기
+        stream: True면 스트리밍 모드 - 기록을 JSON Lines 파일로 바로 쓰고 메모리에는 쌓지 않음
+                (DATA_DIR/longterm_backtest_2010_weekly*.records.jsonl, 대시보드 load_record_stream으로 읽기)
+    """
     # 백테스팅 기간 설정
     start_date = datetime(2010, 1, 1)
     end_date = datetime.now()
+    suffix = '' if universe == 'sp500' else f'_{universe}'
+    checkpoint_name = f'longterm_2010_weekly{suffix}'
+    
+    # 재개: 중단된 실행의 종료일과 티커 풀을 그대로 사용 (새로 계산하면 실행 키가 달라져 처음부터 다시 실행)
+    tickers_pool = None
+    saved_key = load_saved_key(checkpoint_name) if resume else None
+    if saved_key is not None and 'end_date' in saved_key:
+        end_date = datetime.strptime(saved_key['end_date'], '%Y-%m-%d')
+        tickers_pool = list(saved_key['tickers'])
+        logger.info(f"체크포인트 실행 파라미터 사용: 종료일 {saved_key['end_date']}, 티커 풀 {len(tickers_pool)}개")
     
     logger.info("="*80)
     logger.info("2010년부터 현재까지 장기 백테스팅")
@@ -502,14 +502,31 @@ def main():
     logger.info(f"기간: {start_date.strftime('%Y-%m-%d')} ~ {end_date.strftime('%Y-%m-%d')}")
     logger.info(f"약 {(end_date - start_date).days / 365.25:.1f}년")
     logger.info("\n⚠️  이 작업은 오랜 시간이 걸릴 수 있습니다 (30분 ~ 1시간)")
-    logger.info("⚠️  중단하려면 Ctrl+C를 누르세요\n")
+    logger.info("⚠️  중단하려면 Ctrl+C를 누르세요 (--resume으로 중단 지점부터 재개)\n")
     
     # 티커 풀 준비
-    tickers_pool = SP500_TICKERS
-    logger.info(f"티커 풀: {len(tickers_pool)}개 종목")
+    if tickers_pool is None:
+        tickers_pool = load_ticker_pool(universe, start_date, end_date)
+    logger.info(f"티커 풀: {len(tickers_pool)}개 종목 ({universe})")
+    if not tickers_pool:
+        logger.error("티커 풀이 비어 있습니다.")
+        return None
     
     # 백테스팅 실행
     try:
+        panel = None
+        if use_store:
+            # 재개 시에는 체크포인트의 종료일·티커 풀로 열어야 저장된 패널을 그대로 씀
+            # (오늘 날짜로 열면 meta.json 조회 기간이 모자라 네트워크로 다시 생성)
+            if saved_key is not None:
+                logger.info(f"디스크 패널을 체크포인트 기준으로 엽니다: ~{end_date.strftime('%Y-%m-%d')}, "
+                            f"{len(tickers_pool)}개 종목")
+            panel = open_panel_store(universe, tickers_pool, start_date, end_date,
+                                     block_size=block_size)
+            if panel is None:
+                logger.error("디스크 패널을 만들 수 없습니다.")
+                return None
+        
         result = simulate_longterm_portfolio(
             start_date=start_date,
             end_date=end_date,
@@ -517,7 +534,12 @@ def main():
             initial_capital=10000,
             rebalance_frequency='weekly',
             lookback_months=3,
-            top_n=10
+            top_n=10,
+            panel=panel,
+            checkpoint_name=checkpoint_name,
+            resume=resume,
+            record_path=(Path(DATA_DIR) / f'longterm_backtest_2010_weekly{suffix}.records.jsonl'
+                         if stream else None)
         )
         
         if result:
@@ -562,7 +584,7 @@ def main():
                     logger.info(f"{year}년: ${first_record['value']:,.0f} ({value_vs_initial:+.1f}%)")
             
             # JSON 저장
-            output_path = Path(DATA_DIR) / 'longterm_backtest_2010_2024_weekly.json'
+            output_path = Path(DATA_DIR) / f'longterm_backtest_2010_2024_weekly{suffix}.json'
             output_path.parent.mkdir(parents=True, exist_ok=True)
             
             with open(output_path, 'w', encoding='utf-8') as f:
@@ -658,7 +680,24 @@ def main():
 
 
 if __name__ == "__main__":
-    result = main()
+    import argparse
+    
+    parser = argparse.ArgumentParser(description='2010년부터 현재까지 장기 백테스팅')
+    parser.add_argument('--resume', action='store_true',
+                       help='마지막 체크포인트에서 이어서 실행')
+    parser.add_argument('--universe', choices=['sp500', 'large', 'mega'], default='sp500',
+                       help='티커 풀 (기본: sp500 내장 주요 종목, large/mega: 유니버스 스냅샷)')
+    parser.add_argument('--store', action='store_true',
+                       help='가격 패널을 디스크에 블록 단위로 저장하고 필요한 구간만 읽기 (대형 유니버스용)')
+    parser.add_argument('--block-size', type=int, default=500,
+                       help='디스크 패널 종목 블록 크기 (기본: 500)')
+    parser.add_argument('--stream', action='store_true',
+                       help='기록을 JSON Lines 파일로 바로 쓰고 메모리에 쌓지 않기 (긴 기간·대형 유니버스용)')
+    
+    args = parser.parse_args()
+    
+    result = main(resume=args.resume, universe=args.universe, use_store=args.store,
+                  block_size=args.block_size, stream=args.stream)
     
     if result:
         sys.exit(0)
@@ -0,0 +1,142 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+시장 필터 임계값 스윕
+SPY/VIX 이력을 한 번만 조회하고 (장기 MA, 단기 MA, VIX 임계값) 조합 전체의 hold_cash 마스크와
+필터 성과(SPY 보유 / 약세장 현금)를 한 번에 계산
+
+- 결과: daily_data/regime_sweep.json (조합별 지표, 정렬 기준 상위 조합)
+"""
+
+import sys
+from pathlib import Path
+from datetime import datetime
+import json
+
+# src 모듈 임포트를 위한 경로 추가
+sys.path.insert(0, str(Path(__file__).parent / 'src'))
+
+from market_filter import (fetch_regime_history, regime_sweep, evaluate_regime_sweep,
+                           REGIME_LONG_WINDOW, REGIME_SHORT_WINDOW)
+from logger import get_logger
+from config import VIX_THRESHOLD, RISK_FREE_RATE
+
+logger = get_logger()
+
+SORT_METRICS = ('sharpe_ratio', 'total_return', 'annualized_return', 'mdd')
+
+
+def config_label(config):
+    """조합 → 표시 문자열"""
+    if not isinstance(config, tuple):
+        return '필터 없음 (SPY 보유)'
+    long_window, short_window, vix_threshold = config
+    return f"MA{long_window} / MA{short_window} + VIX>{vix_threshold:g}"
+
+
+def main(start_date, end_date, long_windows, short_windows, vix_thresholds, sort_by='sharpe_ratio', top=10):
+    """메인 실행 함수"""
+    n_configs = len(long_windows) * len(short_windows) * len(vix_thresholds)
+    
+    logger.info("=" * 60)
+    logger.info("시장 필터 임계값 스윕")
+    logger.info("=" * 60)
+    logger.info(f"기간: {start_date.strftime('%Y-%m-%d')} ~ {end_date.strftime('%Y-%m-%d')}")
+    logger.info(f"장기 MA: {long_windows} / 단기 MA: {short_windows} / VIX: {vix_thresholds}")
+    logger.info(f"조합 수: {n_configs}개")
+    
+    # 1. 지수 이력 (한 번만 조회)
+    history = fetch_regime_history(start_date, end_date, max_window=max(long_windows + short_windows))
+    if history is None:
+        logger.error("지수 이력을 가져올 수 없습니다.")
+        return None
+    
+    # 2. 조합별 hold_cash 마스크 + 성과
+    hold_cash = regime_sweep(history, long_windows, short_windows, vix_thresholds)
+    metrics = evaluate_regime_sweep(history, hold_cash, start_date=start_date, risk_free_rate=RISK_FREE_RATE)
+    
+    baseline = metrics.loc['buy_and_hold']
+    ranked = metrics.drop(index='buy_and_hold').sort_values(sort_by, ascending=False)
+    
+    logger.info(f"\n[상위 {top}개 조합 - {sort_by} 기준]")
+    for config, row in ranked.head(top).iterrows():
+        logger.info(f"{config_label(config):32s} 수익률 {row['total_return']:+8.2f}% / MDD {row['mdd']:7.2f}% / "
+                    f"샤프 {row['sharpe_ratio']:5.2f} / 현금 {row['cash_days_pct']:5.1f}% / 전환 {int(row['switches'])}회")
+    logger.info(f"{config_label('buy_and_hold'):32s} 수익률 {baseline['total_return']:+8.2f}% / "
+                f"MDD {baseline['mdd']:7.2f}% / 샤프 {baseline['sharpe_ratio']:5.2f}")
+    
+    current = (REGIME_LONG_WINDOW, REGIME_SHORT_WINDOW, float(VIX_THRESHOLD))
+    if current in metrics.index:
+        row = metrics.loc[[current]].iloc[0]
+        rank = list(ranked.index).index(current) + 1
+        logger.info(f"\n현재 설정 {config_label(current)}: {rank}/{n_configs}위 "
+                    f"(수익률 {row['total_return']:+.2f}%, 샤프 {row['sharpe_ratio']:.2f})")
+    
+    # JSON 저장
+    output = {
+        'start_date': start_date.strftime('%Y-%m-%d'),
+        'end_date': end_date.strftime('%Y-%m-%d'),
+        'long_windows': long_windows,
+        'short_windows': short_windows,
+        'vix_thresholds': vix_thresholds,
+        'sort_by': sort_by,
+        'buy_and_hold': {k: float(v) for k, v in baseline.items()},
+        'configs': [
+            {'long_window': int(config[0]), 'short_window': int(config[1]), 'vix_threshold': float(config[2]),
+             **{k: float(v) for k, v in row.items()}}
+            for config, row in ranked.iterrows()
+        ],
+        'run_date': datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+    }
+    
+    save_path = Path('daily_data') / 'regime_sweep.json'
+    with open(save_path, 'w', encoding='utf-8') as f:
+        json.dump(output, f, indent=2, ensure_ascii=False)
+    logger.info(f"\n결과 저장: {save_path}")
+    
+    return output
+
+
+if __name__ == "__main__":
+    import argparse
+    
+    parser = argparse.ArgumentParser(description='시장 필터 임계값 스윕 (MA 기간 × VIX 임계값)')
+    parser.add_argument('--start', default='2010-01-01',
+                       help='평가 시작일 (기본: 2010-01-01)')
+    parser.add_argument('--end', default=None,
+                       help='평가 종료일 (기본: 오늘)')
+    parser.add_argument('--long', type=int, nargs='+', default=[150, 200, 250],
+                       help='장기 MA 기간 목록 (기본: 150 200 250)')
+    parser.add_argument('--short', type=int, nargs='+', default=[60, 90, 120],
+                       help='단기 MA 기간 목록 (기본: 60 90 120)')
+    parser.add_argument('--vix', type=float, nargs='+', default=[15, 18, 20, 22, 25, 30],
+                       help='VIX 임계값 목록 (기본: 15 18 20 22 25 30)')
+    parser.add_argument('--sort', choices=SORT_METRICS, default='sharpe_ratio',
+                       help='정렬 기준 (기본: sharpe_ratio)')
+    parser.add_argument('--top', type=int, default=10,
+                       help='출력할 상위 조합 수 (기본: 10)')
+    
+    args = parser.parse_args()
+    
+    try:
+        result = main(
+            start_date=datetime.strptime(args.start, '%Y-%m-%d'),
+            end_date=datetime.strptime(args.end, '%Y-%m-%d') if args.end else datetime.now(),
+            long_windows=args.long,
+            short_windows=args.short,
+            vix_thresholds=args.vix,
+            sort_by=args.sort,
+            top=args.top
+        )
+        
+        if result:
+            sys.exit(0)
+        else:
+            sys.exit(1)
+    
+    except KeyboardInterrupt:
+        logger.info("\n사용자에 의해 중단되었습니다.")
+        sys.exit(130)
+    except Exception as e:
+        logger.error(f"예상치 못한 오류 발생: {e}", exc_info=True)
+        sys.exit(1)
@@ -0,0 +1,163 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+백테스팅 결과 강건성 분석 (Bootstrap / Monte Carlo)
+저장된 백테스팅 결과 JSON의 일별 수익률을 재표본화하여 신뢰구간 산출
+"""
+
+import sys
+from pathlib import Path
+from datetime import datetime
+import json
+
+# src 모듈 임포트를 위한 경로 추가
+sys.path.insert(0, str(Path(__file__).parent / 'src'))
+
+from robustness import (
+    run_robustness_analysis,
+    extract_period_returns,
+    estimate_turnover,
+    ROBUSTNESS_METHODS
+)
+from logger import get_logger
+from config import RISK_FREE_RATE
+
+logger = get_logger()
+
+METHOD_NAMES = {
+    'bootstrap': '블록 부트스트랩',
+    'shuffle': '리밸런싱 순서 셔플',
+    'cost': '거래 비용 교란'
+}
+
+METRIC_NAMES = {
+    'total_return': '총 수익률',
+    'mdd': '최대낙폭 (MDD)',
+    'sharpe_ratio': '샤프비율'
+}
+
+
+def main(input_path, n_paths=10000, block_size=20, methods=ROBUSTNESS_METHODS,
+         cost_max=0.3, turnover=None, confidence=0.90, seed=None, output_path=None):
+    """메인 실행 함수"""
+    input_path = Path(input_path)
+    if not input_path.exists():
+        logger.error(f"결과 파일을 찾을 수 없습니다: {input_path}")
+        return None
+    
+    with open(input_path, 'r', encoding='utf-8') as f:
+        result = json.load(f)
+    
+    returns, periods_per_year = extract_period_returns(result)
+    if len(returns) < 2:
+        logger.error("결과 파일에 기간 수익률(daily_returns/monthly_returns)이 없습니다.")
+        return None
+    
+    if turnover is None:
+        turnover = estimate_turnover(result)
+    
+    logger.info("=" * 60)
+    logger.info("백테스팅 강건성 분석 시작")
+    logger.info("=" * 60)
+    logger.info(f"입력: {input_path}")
+    logger.info(f"기간 수: {len(returns)} (연간 {periods_per_year}기간)")
+    logger.info(f"경로 수: {n_paths:,} / 블록 크기: {block_size} / 신뢰수준: {confidence:.0%}")
+    logger.info(f"거래 비용 교란: 0 ~ {cost_max:.2f}% (기간당 회전율 {turnover:.4f})")
+    
+    analysis = run_robustness_analysis(
+        returns,
+        n_paths=n_paths,
+        methods=methods,
+        block_size=block_size,
+        cost_range=(0.0, cost_max),
+        turnover=turnover,
+        confidence=confidence,
+        risk_free_rate=RISK_FREE_RATE,
+        periods_per_year=periods_per_year,
+        seed=seed
+    )
+    
+    if analysis is None:
+        logger.error("강건성 분석 실패")
+        return None
+    
+    # 결과 출력
+    original = analysis['original']
+    logger.info(f"\n[원본 결과]")
+    logger.info(f"총 수익률: {original['total_return']:+.2f}% / "
+                f"MDD: {original['mdd']:.2f}% / 샤프비율: {original['sharpe_ratio']:.2f}")
+    
+    for method in methods:
+        logger.info(f"\n[{METHOD_NAMES[method]}]")
+        for metric, name in METRIC_NAMES.items():
+            stats = analysis[method][metric]
+            logger.info(f"{name:12s}: 중앙값 {stats['median']:+8.2f} "
+                        f"({stats['lower']:+8.2f} ~ {stats['upper']:+8.2f})")
+        logger.info(f"손실 확률: {analysis[method]['total_return']['prob_loss']:.1f}%")
+    
+    # JSON 저장
+    output = {
+        'source': str(input_path),
+        'analysis': analysis,
+        'run_date': datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+    }
+    
+    if output_path is None:
+        output_path = input_path.with_name(f"{input_path.stem}_robustness.json")
+    with open(output_path, 'w', encoding='utf-8') as f:
+        json.dump(output, f, indent=2, ensure_ascii=False)
+    logger.info(f"\n결과 저장: {output_path}")
+    
+    return output
+
+
+if __name__ == "__main__":
+    import argparse
+    
+    parser = argparse.ArgumentParser(description='백테스팅 결과 강건성 분석 (Bootstrap / Monte Carlo)')
+    parser.add_argument('--input', type=str, default='daily_data/backtest_2022_smart.json',
+                       help='백테스팅 결과 JSON 경로 (기본: daily_data/backtest_2022_smart.json)')
+    parser.add_argument('--paths', type=int, default=10000,
+                       help='방법별 시뮬레이션 경로 수 (기본: 10000)')
+    parser.add_argument('--block-size', type=int, default=20,
+                       help='블록 부트스트랩 블록 길이 (기본: 20)')
+    parser.add_argument('--methods', nargs='+', choices=ROBUSTNESS_METHODS,
+                       default=list(ROBUSTNESS_METHODS),
+                       help='분석 방법 (기본: 전체)')
+    parser.add_argument('--cost-max', type=float, default=0.3,
+                       help='거래 비용 교란 상한 %% (기본: 0.3)')
+    parser.add_argument('--turnover', type=float, default=None,
+                       help='기간당 평균 회전율 (기본: 거래 내역으로 추정)')
+    parser.add_argument('--confidence', type=float, default=0.90,
+                       help='신뢰수준 (기본: 0.90)')
+    parser.add_argument('--seed', type=int, default=None,
+                       help='난수 시드 (재현용)')
+    parser.add_argument('--output', type=str, default=None,
+                       help='결과 저장 경로 (기본: <입력파일>_robustness.json)')
+    
+    args = parser.parse_args()
+    
+    try:
+        result = main(
+            input_path=args.input,
+            n_paths=args.paths,
+            block_size=args.block_size,
+            methods=args.methods,
+            cost_max=args.cost_max,
+            turnover=args.turnover,
+            confidence=args.confidence,
+            seed=args.seed,
+            output_path=args.output
+        )
+        
+        if result:
+            sys.exit(0)
+        else:
+            sys.exit(1)
+    
+    except KeyboardInterrupt:
+        logger.info("\n사용자에 의해 중단되었습니다.")
+        sys.exit(130)
+    except Exception as e:
+        logger.error(f"예상치 못한 오류 발생: {e}", exc_info=True)
+        sys.exit(1)
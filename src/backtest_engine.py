@@ -0,0 +1,656 @@
+"""
+백테스팅 엔진 코어 (Event-Driven Simulation Core)
+모든 전략 스크립트가 공유하는 현금/포지션/거래내역 관리
+
+- 티커는 정수 ID로 인턴(intern)하여 보유 수량/가격을 NumPy 배열로 관리
+- 포트폴리오 가치는 보유 수량 · 가격 내적 한 번으로 계산
+- 전략은 훅(hook)으로 연결: 가격(price), 종목 선정(select), 매매 신호(signal),
+  리밸런싱(rebalance), 거래 비용(cost_model)
+- 리밸런싱은 전량 청산 후 재매수(rebalance_equal_weight) 또는
+  목표 비중과의 차이만 매매(rebalance_turnover) 중 선택
+"""
+import numpy as np
+from performance_metrics import (
+    TRADING_DAYS_PER_YEAR,
+    calculate_total_return,
+    calculate_annualized_return,
+    calculate_mdd,
+    calculate_sharpe_ratio,
+    calculate_win_rate
+)
+from progress import ProgressTracker
+from logger import get_logger
+
+logger = get_logger()
+
+
+class TickerIndex:
+    """티커 문자열 ↔ 정수 ID 매핑 (한 번 부여된 ID는 바뀌지 않음)"""
+    
+    def __init__(self, tickers=()):
+        self._ids = {}
+        self.tickers = []
+        for ticker in tickers:
+            self.intern(ticker)
+    
+    def intern(self, ticker):
+        """티커 ID 반환 (처음 보는 티커면 새 ID 부여)"""
+        ticker_id = self._ids.get(ticker)
+        if ticker_id is None:
+            ticker_id = len(self.tickers)
+            self._ids[ticker] = ticker_id
+            self.tickers.append(ticker)
+        return ticker_id
+    
+    def get(self, ticker):
+        """티커 ID 조회 (없으면 None)"""
+        return self._ids.get(ticker)
+    
+    def ids(self, tickers):
+        """티커 리스트 → ID 배열 (없는 티커는 새로 부여)"""
+        return np.array([self.intern(t) for t in tickers], dtype=np.int64)
+    
+    def __contains__(self, ticker):
+        return ticker in self._ids
+    
+    def __len__(self):
+        return len(self.tickers)
+
+
+class FixedCostModel:
+    """
+    고정 비율 거래 비용 모델 (수수료 + 슬리피지)
+    
+    매수: 슬리피지만큼 비싸게 체결 후 수수료 추가
+    매도: 슬리피지만큼 싸게 체결 후 수수료 차감
+    스칼라와 배열 입력 모두 지원합니다.
+    """
+    
+    def __init__(self, fee=0.0, slippage=0.0):
+        self.fee = fee
+        self.slippage = slippage
+    
+    @property
+    def total_cost(self):
+        return self.fee + self.slippage
+    
+    def describe(self):
+        """결과 저장용 모델 파라미터"""
+        return {'type': 'fixed', 'fee': self.fee, 'slippage': self.slippage}
+    
+    def summary(self):
+        """로그용 한 줄 설명"""
+        return f"고정 비율 {self.total_cost*100:.2f}% (수수료 {self.fee*100:.2f}% + 슬리피지 {self.slippage*100:.2f}%)"
+    
+    def buy_fill(self, amount, price, tickers=None):
+        """
+        매수 체결
+        
+        Returns:
+            (shares, spent, cost): 매수 수량, 지출 금액, 거래 비용
+        """
+        fill_price = price * (1 + self.slippage) * (1 + self.fee)
+        shares = amount / fill_price
+        spent = shares * fill_price
+        return shares, spent, spent - shares * price
+    
+    def sell_fill(self, shares, price, tickers=None):
+        """
+        매도 체결
+        
+        Returns:
+            (proceeds, cost): 매도 대금, 거래 비용
+        """
+        proceeds = shares * price * (1 - self.slippage) * (1 - self.fee)
+        return proceeds, shares * price - proceeds
+
+
+NO_COST = FixedCostModel()
+
+
+class PortfolioEngine:
+    """
+    포트폴리오 상태 관리
+    
+    Args:
+        initial_capital: 초기 자본
+        cost_model: 거래 비용 모델 (buy_fill / sell_fill 제공, 기본: 비용 없음)
+        tickers: 미리 인턴할 티커 리스트
+        skip_first_return: True면 첫 기록은 기준점으로만 쓰고 수익률을 남기지 않음
+    """
+    
+    def __init__(self, initial_capital=10000, cost_model=None, tickers=(),
+                 skip_first_return=False):
+        self.initial_capital = initial_capital
+        self.cash = initial_capital
+        self.cost_model = cost_model or NO_COST
+        self.index = TickerIndex()
+        self.shares = np.zeros(0, dtype=float)
+        self.prices = np.zeros(0, dtype=float)
+        
+        self.trade_log = []
+        self.portfolio_history = []
+        self.daily_returns = []
+        self.total_transaction_costs = 0.0
+        
+        self.record_count = 0
+        self._last_value = initial_capital
+        self._skip_first_return = skip_first_return
+        
+        for ticker in tickers:
+            self.ticker_id(ticker)
+    
+    # ---- 티커 / 가격 ----
+    
+    def ticker_id(self, ticker):
+        """티커 ID (배열 용량이 부족하면 두 배로 확장)"""
+        ticker_id = self.index.intern(ticker)
+        if ticker_id >= len(self.shares):
+            old_capacity = len(self.shares)
+            capacity = max(16, old_capacity * 2, ticker_id + 1)
+            self.shares = np.resize(self.shares, capacity)
+            self.prices = np.resize(self.prices, capacity)
+            self.shares[old_capacity:] = 0.0
+            self.prices[old_capacity:] = 0.0
+        return ticker_id
+    
+    def mark(self, prices):
+        """
+        가격 갱신 (평가 기준가)
+        
+        Args:
+            prices: {ticker: price} 딕셔너리 또는 티커 ID 순서의 가격 배열
+                    - NaN/None 가격은 무시 (직전 가격 유지)
+        """
+        if isinstance(prices, np.ndarray):
+            n = len(prices)
+            if n > len(self.shares):
+                self.ticker_id(self.index.tickers[n - 1])
+            self.prices[:n] = np.where(np.isnan(prices), self.prices[:n], prices)
+            return
+        for ticker, price in prices.items():
+            if price is not None and price == price:
+                # ID 부여로 배열이 확장될 수 있으므로 ID를 먼저 구함
+                ticker_id = self.ticker_id(ticker)
+                self.prices[ticker_id] = price
+    
+    def price(self, ticker):
+        """마지막으로 갱신된 가격 (없으면 None)"""
+        ticker_id = self.index.get(ticker)
+        if ticker_id is None or self.prices[ticker_id] <= 0:
+            return None
+        return float(self.prices[ticker_id])
+    
+    # ---- 포지션 조회 ----
+    
+    def held_ids(self):
+        """보유 중인 티커 ID 배열 (인턴 순서)"""
+        return np.flatnonzero(self.shares[:len(self.index)] > 0)
+    
+    def held_tickers(self):
+        """보유 중인 티커 리스트 (인턴 순서)"""
+        return [self.index.tickers[i] for i in self.held_ids()]
+    
+    def is_held(self, ticker):
+        ticker_id = self.index.get(ticker)
+        return ticker_id is not None and self.shares[ticker_id] > 0
+    
+    def position_shares(self, ticker):
+        ticker_id = self.index.get(ticker)
+        return 0.0 if ticker_id is None else float(self.shares[ticker_id])
+    
+    @property
+    def position_count(self):
+        return int(np.count_nonzero(self.shares > 0))
+    
+    def position_value(self):
+        """보유 포지션 평가액 (수량 · 가격 내적)"""
+        return float(np.dot(self.shares, self.prices))
+    
+    def value(self):
+        """포트폴리오 총 가치 (현금 + 포지션)"""
+        return self.cash + self.position_value()
+    
+    # ---- 매매 ----
+    
+    def buy(self, date, ticker, amount, price=None, **fields):
+        """
+        금액 기준 매수
+        
+        Args:
+            date: 거래일 (datetime)
+            ticker: 티커
+            amount: 투입 금액 (현금을 넘으면 현금만큼만)
+            price: 체결 기준가 (없으면 마지막 갱신 가격)
+            **fields: trade_log에 추가할 항목 (reason 등)
+        
+        Returns:
+            매수 수량 (매수하지 못하면 0)
+        """
+        ticker_id = self.ticker_id(ticker)
+        if price is None:
+            price = self.prices[ticker_id]
+        amount = min(amount, self.cash)
+        if price <= 0 or amount <= 0:
+            return 0.0
+        
+        shares, spent, cost = self.cost_model.buy_fill(amount, price, ticker)
+        self.shares[ticker_id] += shares
+        self.prices[ticker_id] = price
+        # 현금 전액 투입 시 부동소수점 오차로 생기는 미세한 음수 현금 제거
+        self.cash = max(self.cash - spent, 0.0)
+        self.total_transaction_costs += cost
+        
+        self._log_trade(date, 'BUY', ticker, shares, price, spent, cost, fields)
+        logger.debug(f"  매수: {ticker} {shares:.4f}주 @ ${price:.2f} (비용: ${cost:.2f})")
+        return shares
+    
+    def sell(self, date, ticker, price=None, **fields):
+        """
+        전량 매도
+        
+        Returns:
+            매도 대금 (보유하지 않으면 0)
+        """
+        ticker_id = self.index.get(ticker)
+        if ticker_id is None or self.shares[ticker_id] <= 0:
+            return 0.0
+        if price is None:
+            price = self.prices[ticker_id]
+        
+        shares = float(self.shares[ticker_id])
+        proceeds, cost = self.cost_model.sell_fill(shares, price, ticker)
+        self.shares[ticker_id] = 0.0
+        self.prices[ticker_id] = price
+        self.cash += proceeds
+        self.total_transaction_costs += cost
+        
+        self._log_trade(date, 'SELL', ticker, shares, price, proceeds, cost, fields)
+        logger.debug(f"  매도: {ticker} {shares:.4f}주 @ ${price:.2f} (비용: ${cost:.2f})")
+        return proceeds
+    
+    def liquidate(self, date, **fields):
+        """보유 포지션 전량 청산 (마지막 갱신 가격 기준)"""
+        for ticker in self.held_tickers():
+            self.sell(date, ticker, **fields)
+    
+    def rebalance_to(self, date, target_values, min_trade=10, **fields):
+        """
+        목표 평가액과의 차이(delta)만 한 번에 매매 (회전율 기반 리밸런싱)
+        
+        매도 → 매수 순서로 체결하며, 각 단계의 거래 비용은 cost_model에
+        주문 배열 전체를 넘겨 한 번에 계산합니다.
+        
+        Args:
+            date: 거래일 (datetime)
+            target_values: {ticker: 목표 평가액} - 목록에 없는 보유 종목은 전량 매도
+            min_trade: 이보다 작은 조정 거래는 생략 (전량 매도는 항상 실행)
+            **fields: trade_log에 추가할 항목
+        
+        Returns:
+            (sell_count, buy_count): 매도/매수 건수
+        """
+        target_ids = np.array([self.ticker_id(t) for t in target_values], dtype=np.int64)
+        n = len(self.index)
+        prices = self.prices[:n]
+        held = self.shares[:n]
+        
+        target_shares = np.zeros(n)
+        if len(target_ids):
+            values = np.fromiter(target_values.values(), dtype=float, count=len(target_ids))
+            with np.errstate(divide='ignore', invalid='ignore'):
+                target_shares[target_ids] = np.where(prices[target_ids] > 0,
+                                                     values / prices[target_ids], 0.0)
+        delta = target_shares - held
+        notional = delta * prices
+        
+        # 1. 매도: 목표에서 빠진 종목은 전량, 나머지는 초과분만
+        exits = (held > 0) & (target_shares == 0)
+        sell_ids = np.flatnonzero(exits | ((held > 0) & (notional <= -min_trade)))
+        if len(sell_ids):
+            sell_shares = np.where(exits[sell_ids], held[sell_ids], -delta[sell_ids])
+            proceeds, costs = self.cost_model.sell_fill(
+                sell_shares, prices[sell_ids], [self.index.tickers[i] for i in sell_ids])
+            self.shares[sell_ids] -= sell_shares
+            self.shares[sell_ids[exits[sell_ids]]] = 0.0
+            self.cash += float(np.sum(proceeds))
+            self.total_transaction_costs += float(np.sum(costs))
+            self._log_batch(date, 'SELL', sell_ids, sell_shares, proceeds, costs, fields)
+        
+        # 2. 매수: 부족분만, 현금이 모자라면 비율대로 축소
+        buy_ids = np.flatnonzero(notional >= min_trade)
+        if len(buy_ids) and self.cash > 0:
+            amounts = notional[buy_ids]
+            amounts = amounts * min(1.0, self.cash / amounts.sum())
+            shares, spent, costs = self.cost_model.buy_fill(
+                amounts, prices[buy_ids], [self.index.tickers[i] for i in buy_ids])
+            self.shares[buy_ids] += shares
+            self.cash = max(self.cash - float(np.sum(spent)), 0.0)
+            self.total_transaction_costs += float(np.sum(costs))
+            self._log_batch(date, 'BUY', buy_ids, shares, spent, costs, fields)
+        else:
+            buy_ids = buy_ids[:0]
+        
+        logger.debug(f"  리밸런싱: 매도 {len(sell_ids)}건 / 매수 {len(buy_ids)}건 "
+                     f"(현금: ${self.cash:,.2f})")
+        return len(sell_ids), len(buy_ids)
+    
+    def _log_batch(self, date, action, ids, shares, values, costs, fields):
+        for ticker_id, n_shares, value, cost in zip(ids, shares, values, costs):
+            self._log_trade(date, action, self.index.tickers[ticker_id], float(n_shares),
+                            self.prices[ticker_id], value, cost, fields)
+    
+    def _log_trade(self, date, action, ticker, shares, price, value, cost, fields):
+        trade = {
+            'date': date.strftime('%Y-%m-%d'),
+            'action': action,
+            'ticker': ticker,
+            'shares': shares,
+            'price': float(price),
+            'value': float(value),
+            'cost': float(cost)
+        }
+        trade.update(fields)
+        self.trade_log.append(trade)
+    
+    # ---- 기록 / 성과 ----
+    
+    def record(self, date, **fields):
+        """
+        포트폴리오 가치 기록 (직전 기록 대비 수익률 포함)
+        
+        Returns:
+            기간 수익률 (%) - 기준점 기록이면 None
+        """
+        value = self.value()
+        date_str = date.strftime('%Y-%m-%d')
+        
+        self.portfolio_history.append({
+            'date': date_str,
+            'value': value,
+            'cash': self.cash,
+            'positions': self.position_count,
+            **fields
+        })
+        
+        period_return = None
+        self.record_count += 1
+        if not (self._skip_first_return and self.record_count == 1):
+            prev_value = self._last_value
+            period_return = ((value - prev_value) / prev_value) * 100 if prev_value > 0 else 0
+            self.daily_returns.append({
+                'date': date_str,
+                'return': period_return,
+                'value': value,
+                **fields
+            })
+        
+        self._last_value = value
+        return period_return
+    
+    def snapshot(self):
+        """
+        체크포인트용 시점 스냅샷 (현금, 보유 수량/가격 배열 복사 + 티커·기록 리스트 길이)
+        
+        티커 순서와 기록 리스트는 추가만 되므로 매일 전체를 복사하지 않고 길이만 남기고,
+        저장할 때 state_dict(snapshot)에서 그 길이까지 잘라 씁니다.
+        """
+        return {
+            'cash': self.cash,
+            'tickers': len(self.index),
+            'shares': self.shares.copy(),
+            'prices': self.prices.copy(),
+            'trade_log': len(self.trade_log),
+            'portfolio_history': len(self.portfolio_history),
+            'daily_returns': len(self.daily_returns),
+            'total_transaction_costs': self.total_transaction_costs,
+            'record_count': self.record_count,
+            'last_value': self._last_value
+        }
+    
+    def state_dict(self, snapshot=None):
+        """
+        체크포인트용 상태 (현금, 티커 순서, 보유 수량/가격 배열(용량 포함), 기록)
+        
+        snapshot: snapshot()으로 남긴 시점의 상태 (없으면 현재 상태)
+        비용 모델과 초기 자본 등 생성자 인자는 포함하지 않습니다.
+        """
+        if snapshot is None:
+            snapshot = self.snapshot()
+        return {
+            **snapshot,
+            'tickers': self.index.tickers[:snapshot['tickers']],
+            'trade_log': self.trade_log[:snapshot['trade_log']],
+            'portfolio_history': self.portfolio_history[:snapshot['portfolio_history']],
+            'daily_returns': self.daily_returns[:snapshot['daily_returns']]
+        }
+    
+    def load_state_dict(self, state):
+        """state_dict()로 저장한 상태 복원"""
+        self.index = TickerIndex(state['tickers'])
+        self.shares = np.array(state['shares'], dtype=float)
+        self.prices = np.array(state['prices'], dtype=float)
+        self.cash = state['cash']
+        self.trade_log = list(state['trade_log'])
+        self.portfolio_history = list(state['portfolio_history'])
+        self.daily_returns = list(state['daily_returns'])
+        self.total_transaction_costs = state['total_transaction_costs']
+        self.record_count = state.get('record_count', len(self.portfolio_history))
+        self._last_value = state['last_value']
+    
+    def performance(self, days, risk_free_rate=0.05, periods_per_year=TRADING_DAYS_PER_YEAR):
+        """
+        기록된 가치/수익률로 공통 성과 지표 계산
+        
+        Args:
+            days: 달력 기준 기간 일수 (연환산용)
+        
+        Returns:
+            dict: final_value, total_return, annualized_return, mdd, sharpe_ratio,
+                  win_rate, best_day, worst_day
+        """
+        final_value = self.portfolio_history[-1]['value'] if self.portfolio_history else self.value()
+        returns = [r['return'] for r in self.daily_returns]
+        
+        if self.daily_returns:
+            best_day = max(self.daily_returns, key=lambda x: x['return'])
+            worst_day = min(self.daily_returns, key=lambda x: x['return'])
+        else:
+            best_day = {'date': '-', 'return': 0}
+            worst_day = {'date': '-', 'return': 0}
+        
+        return {
+            'final_value': final_value,
+            'total_return': calculate_total_return(self.initial_capital, final_value),
+            'annualized_return': calculate_annualized_return(self.initial_capital, final_value, days),
+            'mdd': calculate_mdd([h['value'] for h in self.portfolio_history]),
+            'sharpe_ratio': calculate_sharpe_ratio(returns, risk_free_rate, periods_per_year),
+            'win_rate': calculate_win_rate(returns),
+            'best_day': best_day,
+            'worst_day': worst_day
+        }
+
+
+def rebalance_equal_weight(engine, date, targets, prices, min_amount=10, **fields):
+    """
+    전량 청산 후 동일 비중 재매수 (기본 리밸런싱 훅)
+    
+    Args:
+        engine: PortfolioEngine
+        date: 리밸런싱 날짜
+        targets: 목표 종목 리스트 (현금을 목표 종목 수로 균등 배분)
+        prices: {ticker: price} 매수 기준가 - None이면 엔진의 현재 평가 가격 사용,
+                가격이 없는 종목은 건너뜀
+        min_amount: 종목당 최소 매수 금액
+    """
+    engine.liquidate(date, **fields)
+    if not targets:
+        return
+    
+    allocation = engine.cash / len(targets)
+    if allocation <= min_amount:
+        return
+    
+    for ticker in targets:
+        price = engine.price(ticker) if prices is None else prices.get(ticker)
+        if price is None:
+            logger.warning(f"{ticker}: 매수 가격 데이터 없음")
+            continue
+        engine.buy(date, ticker, allocation, price, **fields)
+
+
+def rebalance_turnover(engine, date, targets, prices, min_trade=10, **fields):
+    """
+    동일 비중 목표와의 차이만 매매하는 리밸런싱 훅 (전량 청산 없음)
+    
+    rebalance_equal_weight와 같은 목표 비중(총 가치 / 목표 종목 수)을 만들되,
+    이미 보유한 종목은 비중 차이만큼만 사고팔아 회전율과 거래 비용을 줄입니다.
+    
+    Args:
+        engine: PortfolioEngine
+        date: 리밸런싱 날짜
+        targets: 목표 종목 리스트
+        prices: {ticker: price} 체결 기준가 - None이면 엔진의 현재 평가 가격 사용,
+                가격이 없는 종목은 건너뜀 (해당 비중은 현금으로 유지)
+        min_trade: 이보다 작은 조정 거래는 생략
+    """
+    priced = {}
+    for ticker in targets or []:
+        price = engine.price(ticker) if prices is None else prices.get(ticker)
+        if price is None:
+            logger.warning(f"{ticker}: 매수 가격 데이터 없음")
+            continue
+        priced[ticker] = price
+    
+    # 체결 기준가로 평가한 총 가치를 목표 종목 수로 균등 배분
+    engine.mark(priced)
+    allocation = engine.value() / len(targets) if targets else 0.0
+    engine.rebalance_to(date, {ticker: allocation for ticker in priced},
+                        min_trade=min_trade, **fields)
+
+
+def run_event_loop(engine, dates, price_hook, select_hook=None, signal_hook=None,
+                   rebalance_hook=rebalance_equal_weight, on_day_end=None,
+                   signals_first=True, start=0, checkpoint=None, progress=None,
+                   progress_label='백테스트'):
+    """
+    이벤트 루프 실행
+    
+    하루 처리 순서:
+        1. price_hook(engine, date, i) → {ticker: price} 또는 티커 ID 순서의 가격 배열로
+           평가 가격 갱신 (배열이면 이후 훅에는 prices=None 전달 → 엔진 가격 사용)
+        2. select_hook(engine, date, i) → 목표 종목 리스트 (리밸런싱하지 않는 날은 None)
+        3. signal_hook(engine, date, i, prices) → [(ticker, reason), ...] 매도 실행
+        4. rebalance_hook(engine, date, targets, prices) - 목표 종목이 있을 때
+        5. on_day_end(engine, date, i) - 기본: engine.record(date)
+    signals_first=False면 3과 4의 순서를 바꿉니다 (재분배 후 신호 체크).
+    
+    start: 처리를 시작할 날짜 인덱스 (체크포인트 재개 시 Checkpoint.restore 반환값)
+    checkpoint: Checkpoint - 매 날짜 처리 후 step() 호출, 예외/중단(Ctrl+C) 시
+                마지막으로 처리를 마친 날짜의 상태를 저장한 뒤 예외를 다시 발생시킵니다.
+    progress: 진행률 콜백 (하나 또는 리스트, progress.ProgressTracker 이벤트 - 날짜 단위)
+    
+    Returns:
+        engine
+    """
+    for _ in iter_event_loop(engine, dates, price_hook, select_hook, signal_hook, rebalance_hook,
+                             on_day_end, signals_first, start, checkpoint, progress, progress_label):
+        pass
+    return engine
+
+
+def iter_event_loop(engine, dates, price_hook, select_hook=None, signal_hook=None,
+                    rebalance_hook=rebalance_equal_weight, on_day_end=None,
+                    signals_first=True, start=0, checkpoint=None, progress=None,
+                    progress_label='백테스트'):
+    """
+    이벤트 루프 제너레이터 - 하루 처리를 마칠 때마다 날짜 인덱스 i를 yield
+    
+    인자와 하루 처리 순서는 run_event_loop와 같습니다.
+    체크포인트 step은 yield 다음에 호출 → 소비자가 기록을 내보내고 비운 뒤의 상태가 저장됩니다.
+    """
+    def run_signals(date, i, prices):
+        if signal_hook is None:
+            return
+        for ticker, reason in signal_hook(engine, date, i, prices) or []:
+            price = None if prices is None else prices.get(ticker)
+            engine.sell(date, ticker, price, reason=reason)
+    
+    def run_rebalance(date, targets, prices):
+        if targets is not None and rebalance_hook is not None:
+            rebalance_hook(engine, date, targets, prices)
+    
+    def run_day(date, i):
+        prices = price_hook(engine, date, i)
+        if isinstance(prices, np.ndarray):
+            engine.mark(prices)
+            prices = None
+        else:
+            prices = prices or {}
+            engine.mark(prices)
+
+        targets = select_hook(engine, date, i) if select_hook else None
+        
+        if signals_first:
+            run_signals(date, i, prices)
+            run_rebalance(date, targets, prices)
+        else:
+            run_rebalance(date, targets, prices)
+            run_signals(date, i, prices)
+        
+        if on_day_end is None:
+            engine.record(date)
+        else:
+            on_day_end(engine, date, i)
+    
+    tracker = ProgressTracker(len(dates), progress_label, progress, start=start)
+    try:
+        for i in tracker.iterate(range(start, len(dates)),
+                                 message=lambda i: dates[i].strftime('%Y-%m-%d')):
+            run_day(dates[i], i)
+            yield i
+            if checkpoint is not None:
+                checkpoint.step(engine, dates[i], i)
+    except (Exception, KeyboardInterrupt):
+        # 처리 도중이던 날짜는 버리고 마지막으로 완료한 날짜의 상태를 저장
+        # (소비자가 제너레이터를 닫는 GeneratorExit은 중단이 아니므로 저장하지 않음)
+        if checkpoint is not None:
+            checkpoint.save_last()
+        raise
+
+
+def stream_event_loop(engine, dates, price_hook, select_hook=None, signal_hook=None,
+                      rebalance_hook=rebalance_equal_weight, on_day_end=None,
+                      signals_first=True, start=0, checkpoint=None, progress=None,
+                      progress_label='백테스트'):
+    """
+    스트리밍 이벤트 루프 - 기록 리스트를 메모리에 쌓지 않고 기록 단위로 yield
+    
+    하루 처리(run_event_loop와 동일) 후 engine.record()가 호출된 날마다 레코드를 내보내고,
+    엔진의 portfolio_history / daily_returns / trade_log는 매번 비웁니다.
+    기간이 길어도 메모리 사용량은 종목 수 × 하루 거래 수 수준으로 일정합니다.
+    
+    체크포인트는 그날 레코드를 내보낸 뒤 저장되므로, 재개할 때는 출력(레코드 파일)을
+    재개 날짜(dates[start]) 이전까지만 남기고 이어 쓰면 됩니다 (record_stream.truncate_records).
+    
+    Yields:
+        dict: date, value, cash, positions, return (기준점 기록이면 None),
+              trades (직전 레코드 이후 거래 리스트), 그 밖에 record(**fields)로 남긴 필드
+    """
+    for _ in iter_event_loop(engine, dates, price_hook, select_hook, signal_hook, rebalance_hook,
+                             on_day_end, signals_first, start, checkpoint, progress, progress_label):
+        # 기록이 없는 날의 거래는 엔진에 남겨 둠 (체크포인트 상태에 포함)
+        if not engine.portfolio_history:
+            continue
+        trades = list(engine.trade_log)
+        engine.trade_log.clear()
+        
+        returns = {r['date']: r['return'] for r in engine.daily_returns}
+        for history in engine.portfolio_history:
+            record = dict(history)
+            record['return'] = returns.get(history['date'])
+            record['trades'] = trades
+            trades = []
+            yield record
+        engine.portfolio_history.clear()
+        engine.daily_returns.clear()
@@ -6,7 +6,14 @@ import yfinance as yf
 from datetime import datetime, timedelta
 from pathlib import Path
 from logger import get_logger
-from config import DATA_DIR, BACKTEST_WEEKS, BACKTEST_INITIAL_CAPITAL, RISK_FREE_RATE, ENABLE_MARKET_FILTER, VIX_THRESHOLD
+from progress import ProgressTracker
+from performance_metrics import (
+    calculate_total_return, calculate_annualized_return, calculate_mdd,
+    calculate_sharpe_ratio, calculate_sortino_ratio, calculate_calmar_ratio,
+    calculate_win_rate, calculate_drawdown_duration
+)
+from config import (DATA_DIR, BACKTEST_WEEKS, BACKTEST_INITIAL_CAPITAL, RISK_FREE_RATE, ENABLE_MARKET_FILTER, VIX_THRESHOLD,
+                    ENABLE_MARKET_BREADTH, BREADTH_THRESHOLD)
 
 logger = get_logger()
 
@@ -92,7 +99,7 @@ def get_price_data(tickers, start_date, end_date):
     
     return price_data
 
-def simulate_portfolio_flexible(historical_data, params=None):
+def simulate_portfolio_flexible(historical_data, params=None, progress=None):
     """
     파라미터화된 포트폴리오 백테스팅 시뮬레이션
     
@@ -105,8 +112,11 @@ def simulate_portfolio_flexible(historical_data, params=None):
             - rebalance_frequency: 'daily' 또는 'weekly'
             - weight_method: 'equal', 'market_cap', 'momentum'
             - enable_market_filter: True/False
+            - enable_market_breadth: 시장 폭 조건 추가 여부 (시장 필터 활성화 시)
+            - breadth_threshold: MA200 위 종목 비율 하한 (%)
             - start_date: 시작 날짜 (옵션, YYYY-MM-DD)
             - end_date: 종료 날짜 (옵션, YYYY-MM-DD)
+        progress: 진행률 콜백 (progress.ProgressTracker 이벤트 - 리밸런싱 날짜 단위)
     
     Returns:
         백테스팅 결과 딕셔너리 (portfolio_history, daily_returns 포함)
@@ -119,6 +129,8 @@ def simulate_portfolio_flexible(historical_data, params=None):
         'rebalance_frequency': 'daily',
         'weight_method': 'equal',
         'enable_market_filter': ENABLE_MARKET_FILTER,
+        'enable_market_breadth': ENABLE_MARKET_BREADTH,
+        'breadth_threshold': BREADTH_THRESHOLD,
         'start_date': None,
         'end_date': None
     }
@@ -165,16 +177,26 @@ def simulate_portfolio_flexible(historical_data, params=None):
     logger.info(f"종목 수: {params['num_stocks']}, 비중 방식: {params['weight_method']}")
     
     # 시장 필터 활성화 여부
+    breadth = None
     if params['enable_market_filter']:
         logger.info("시장 필터 활성화 - 약세장 시 현금 보유")
+        if params['enable_market_breadth']:
+            # 기간 전체 시장 폭을 한 번에 계산 → 날짜별로는 행 조회만
+            from breadth import build_breadth
+            breadth = build_breadth(start_date, end_date)
+            if breadth is None:
+                logger.warning("시장 폭 계산 실패 - 지수 조건만 사용")
+            else:
+                logger.info(f"시장 폭 조건: MA200 위 종목 비율 < {params['breadth_threshold']:g}% → 현금 보유")
     
     # 포트폴리오 시뮬레이션
     portfolio_value = params['initial_capital']
     portfolio_history = []
     daily_returns = []
     cash_holding_days = 0
+    tracker = ProgressTracker(len(rebalance_dates) - 1, '백테스팅', progress)
     
-    for i in range(len(rebalance_dates) - 1):
+    for i in tracker.iterate(range(len(rebalance_dates) - 1), message=lambda i: rebalance_dates[i]):
         rebalance_date = rebalance_dates[i]
         next_rebalance_date = rebalance_dates[i + 1]
         
@@ -182,7 +204,8 @@ def simulate_portfolio_flexible(historical_data, params=None):
         hold_cash = False
         if params['enable_market_filter']:
             from market_filter import get_historical_market_regime
-            market_regime = get_historical_market_regime(rebalance_date, VIX_THRESHOLD)
+            market_regime = get_historical_market_regime(rebalance_date, VIX_THRESHOLD, breadth=breadth,
+                                                         breadth_threshold=params['breadth_threshold'])
             if market_regime and market_regime.get('hold_cash', False):
                 hold_cash = True
                 cash_holding_days += 1
@@ -401,7 +424,7 @@ def calculate_performance_metrics(initial_capital, final_value, portfolio_histor
     """성과 지표 계산"""
     
     # 총 수익률
-    total_return = ((final_value - initial_capital) / initial_capital) * 100
+    total_return = calculate_total_return(initial_capital, final_value)
     
     # 기간 계산 (일수)
     start = datetime.strptime(start_date, '%Y-%m-%d')
@@ -409,17 +432,16 @@ def calculate_performance_metrics(initial_capital, final_value, portfolio_histor
     days = (end - start).days
     
     # 연환산 수익률
-    if days > 0:
-        annualized_return = ((final_value / initial_capital) ** (365 / days) - 1) * 100
-    else:
-        annualized_return = 0
+    annualized_return = calculate_annualized_return(initial_capital, final_value, days)
     
     # 최대낙폭 (MDD) 계산
     mdd = calculate_mdd(portfolio_history)
     
-    # 샤프비율 계산
+    # 샤프/소르티노/칼마비율 계산
     returns = [r['return'] for r in daily_returns]
     sharpe_ratio = calculate_sharpe_ratio(returns, RISK_FREE_RATE)
+    sortino_ratio = calculate_sortino_ratio(returns, RISK_FREE_RATE)
+    calmar_ratio = calculate_calmar_ratio(annualized_return, mdd)
     
     # 승률 계산
     win_rate = calculate_win_rate(daily_returns)
@@ -441,6 +463,9 @@ def calculate_performance_metrics(initial_capital, final_value, portfolio_histor
         'annualized_return': annualized_return,
         'mdd': mdd,
         'sharpe_ratio': sharpe_ratio,
+        'sortino_ratio': sortino_ratio,
+        'calmar_ratio': calmar_ratio,
+        'max_drawdown_duration': calculate_drawdown_duration(portfolio_history),
         'win_rate': win_rate,
         'num_rebalances': num_rebalances,
         'best_day': best_day,
@@ -451,58 +476,6 @@ def calculate_performance_metrics(initial_capital, final_value, portfolio_histor
     
     return result
 
-def calculate_mdd(portfolio_values):
-    """최대낙폭 (Maximum Drawdown) 계산"""
-    if len(portfolio_values) < 2:
-        return 0.0
-    
-    peak = portfolio_values[0]
-    max_drawdown = 0
-    
-    for value in portfolio_values:
-        if value > peak:
-            peak = value
-        
-        drawdown = ((value - peak) / peak) * 100
-        if drawdown < max_drawdown:
-            max_drawdown = drawdown
-    
-    return max_drawdown
-
-def calculate_sharpe_ratio(returns, risk_free_rate=0.05):
-    """샤프비율 계산"""
-    if not returns or len(returns) < 2:
-        return 0.0
-    
-    # 일일 수익률 평균
-    avg_return = sum(returns) / len(returns)
-    
-    # 일일 수익률 표준편차
-    variance = sum((r - avg_return) ** 2 for r in returns) / (len(returns) - 1)
-    std_dev = variance ** 0.5
-    
-    if std_dev == 0:
-        return 0.0
-    
-    # 일일 무위험 수익률
-    daily_rf = (1 + risk_free_rate) ** (1/252) - 1
-    daily_rf_pct = daily_rf * 100
-    
-    # 샤프비율 (연환산)
-    sharpe = ((avg_return - daily_rf_pct) / std_dev) * (252 ** 0.5)
-    
-    return sharpe
-
-def calculate_win_rate(daily_returns):
-    """승률 계산 (수익 거래 / 전체 거래)"""
-    if not daily_returns:
-        return 0.0
-    
-    wins = sum(1 for r in daily_returns if r['return'] > 0)
-    total = len(daily_returns)
-    
-    return (wins / total) * 100 if total > 0 else 0.0
-
 def run_backtest(weeks=None, initial_capital=None, screener_type="large"):
     """
     백테스팅 실행 (메인 함수)
@@ -0,0 +1,249 @@
+"""
+일봉 저장소 / 다중 시간 단위 (Daily Bar Store)
+종목별 일봉 OHLCV를 로컬에 쌓아 두고, 주봉·월봉은 네트워크 조회 없이 일봉을 리샘플링해 만듦
+
+- 저장: DATA_DIR/bars/{ticker}.csv (Date, Open, High, Low, Close, Volume - 날짜는 거래소 현지 날짜)
+- 갱신: 마지막 저장일 이후 일봉만 조회 (경과일 → 조회 기간: REFRESH_PERIODS)
+  처음 보는 종목·오래 비운 종목·수정주가가 바뀐 종목은 SEED_PERIOD를 받아 새로 구성
+- 시간 단위: 'D' (일봉), 'W' (금요일 마감 주봉), 'M' (월봉)
+  주봉/월봉의 날짜는 구간의 마지막 실거래일 (진행 중인 주·월은 오늘까지의 부분 봉)
+- 리샘플 결과는 (종목, 시간 단위)별로 캐시하고, 새 일봉이 들어오거나 이력이 바뀌면 무효화
+- graph(): 시간 단위 봉으로 만든 IndicatorGraph → 주봉 MA, 조건식(screening) 등을 그대로 사용
+- 일일 리포트 가격 데이터의 원본: 이동평균 상태(ma_state)도 이 저장본에서 파생
+"""
+import os
+from datetime import datetime
+from pathlib import Path
+import numpy as np
+import pandas as pd
+from indicators import IndicatorGraph
+from logger import get_logger
+from config import DATA_DIR
+
+logger = get_logger()
+
+BAR_STORE_DIR = Path(DATA_DIR) / 'bars'
+
+# 처음 구성할 때 받는 기간 (주봉 MA120 = 120주, 월봉 MA20/MA60까지 계산할 수 있는 길이)
+SEED_PERIOD = '5y'
+
+# 마지막 저장 후 경과 일수 → 조회 기간 (이보다 오래되면 전체 재구성)
+REFRESH_PERIODS = ((5, '5d'), (25, '1mo'), (85, '3mo'))
+
+# 저장된 종가와 새 종가의 허용 차이 (넘으면 수정주가 변경으로 보고 재구성)
+ADJUSTMENT_TOLERANCE = 0.005
+
+BAR_COLUMNS = ('Open', 'High', 'Low', 'Close', 'Volume')
+
+# 시간 단위 → pandas 리샘플 규칙 (None = 일봉 그대로)
+TIMEFRAMES = {
+    'D': None,
+    'W': 'W-FRI',
+    'M': 'ME'
+}
+
+_AGGREGATIONS = {'Open': 'first', 'High': 'max', 'Low': 'min', 'Close': 'last', 'Volume': 'sum'}
+
+
+def normalize_bars(hist):
+    """yfinance 일봉 → 저장 형식 (현지 날짜 인덱스, BAR_COLUMNS, 종가 없는 행 제외)"""
+    bars = hist[[column for column in BAR_COLUMNS if column in hist.columns]].copy()
+    index = pd.DatetimeIndex(bars.index)
+    if index.tz is not None:
+        index = index.tz_localize(None)
+    bars.index = index.normalize().rename('Date')
+    bars = bars[~bars.index.duplicated(keep='last')].sort_index()
+    return bars.dropna(subset=['Close'])
+
+
+def resample_bars(daily, timeframe):
+    """
+    일봉 → 시간 단위 봉 (시가=첫 값, 고가=최고, 저가=최저, 종가=마지막, 거래량=합계)
+    
+    Returns:
+        DataFrame: index=구간의 마지막 실거래일
+    """
+    if timeframe not in TIMEFRAMES:
+        raise ValueError(f"지원하지 않는 시간 단위: {timeframe} (사용 가능: {', '.join(TIMEFRAMES)})")
+    rule = TIMEFRAMES[timeframe]
+    if rule is None or daily.empty:
+        return daily
+    resampler = daily.resample(rule)
+    bars = resampler.agg({column: _AGGREGATIONS[column] for column in daily.columns})
+    bars.index = daily.index.to_series().resample(rule).last()
+    return bars.dropna(subset=['Close']).rename_axis('Date')
+
+
+def _refresh_period(last_date, today):
+    """마지막 저장일 → 조회 기간 (None이면 전체 재구성)"""
+    gap = (pd.Timestamp(today) - pd.Timestamp(last_date)).days
+    for max_gap, period in REFRESH_PERIODS:
+        if gap <= max_gap:
+            return period
+    return None
+
+
+class DailyBarStore:
+    """
+    종목별 일봉 저장소
+    
+    Args:
+        directory: 저장 디렉토리 (기본: DATA_DIR/bars)
+    """
+    
+    def __init__(self, directory=BAR_STORE_DIR):
+        self.directory = Path(directory)
+        self._daily = {}
+        self._revisions = {}
+        self._resampled = {}
+    
+    def path(self, ticker):
+        return self.directory / f'{ticker}.csv'
+    
+    def daily(self, ticker):
+        """저장된 일봉 (없으면 None)"""
+        if ticker not in self._daily:
+            path = self.path(ticker)
+            bars = None
+            if path.exists():
+                try:
+                    bars = pd.read_csv(path, index_col='Date', parse_dates=['Date'])
+                except Exception as e:
+                    logger.warning(f"{ticker}: 일봉 저장본 읽기 실패 ({path}): {e} - 새로 받습니다.")
+            self._daily[ticker] = bars
+        return self._daily[ticker]
+    
+    def last_date(self, ticker):
+        bars = self.daily(ticker)
+        return None if bars is None or bars.empty else bars.index[-1]
+    
+    def invalidate(self, tickers):
+        """메모리 사본 버리기 (다른 프로세스가 갱신한 저장본을 다음 조회 때 다시 읽음)"""
+        for ticker in tickers:
+            self._daily.pop(ticker, None)
+            self._revisions[ticker] = self._revisions.get(ticker, 0) + 1
+    
+    def _store(self, ticker, bars):
+        """일봉 교체 (파일 원자적 저장 + 리샘플 캐시 무효화)"""
+        self.directory.mkdir(parents=True, exist_ok=True)
+        path = self.path(ticker)
+        # 프로세스별 임시 파일 → 여러 프로세스가 같은 종목을 동시에 써도 서로의 임시 파일을 덮지 않음
+        tmp_path = path.with_name(f'{path.name}.{os.getpid()}.tmp')
+        bars.to_csv(tmp_path, date_format='%Y-%m-%d')
+        os.replace(tmp_path, path)
+        self._daily[ticker] = bars
+        self._revisions[ticker] = self._revisions.get(ticker, 0) + 1
+    
+    def apply_history(self, ticker, hist, reseed=False):
+        """
+        조회한 일봉을 저장본에 반영 (겹치는 날짜는 새 값으로 교체)
+        
+        Returns:
+            새로 추가된 일봉 수 (수정주가 변경으로 재구성이 필요하면 None)
+        """
+        new = normalize_bars(hist)
+        stored = self.daily(ticker)
+        if reseed or stored is None or stored.empty:
+            self._store(ticker, new)
+            return len(new)
+        
+        # 겹치는 날짜의 종가가 달라졌으면(분할/배당 수정주가) 이어 붙일 수 없음
+        # (마지막 저장일은 장중 부분 봉일 수 있으므로 그 전 거래일로 비교)
+        overlap = stored.index.intersection(new.index)
+        if len(overlap):
+            last = overlap[-2] if len(overlap) > 1 else overlap[-1]
+            if abs(new.at[last, 'Close'] / stored.at[last, 'Close'] - 1) > ADJUSTMENT_TOLERANCE:
+                return None
+        
+        added = new.index.difference(stored.index)
+        changed = not np.allclose(stored.loc[overlap].to_numpy(dtype=float),
+                                  new.loc[overlap, stored.columns].to_numpy(dtype=float), equal_nan=True)
+        if not len(added) and not changed:
+            return 0
+        merged = pd.concat([stored.drop(overlap), new]).sort_index()
+        self._store(ticker, merged[list(stored.columns)])
+        return len(added)
+    
+    def update(self, tickers, today=None):
+        """
+        종목들의 일봉을 최신까지 갱신 (조회 기간이 같은 종목끼리 한 번에 조회)
+        
+        Returns:
+            새 일봉이 들어온 종목 수
+        """
+        from technical_analyzer import fetch_histories
+        
+        today = today or datetime.now()
+        groups = {}
+        for ticker in dict.fromkeys(tickers):
+            last_date = self.last_date(ticker)
+            period = _refresh_period(last_date, today) if last_date is not None else None
+            groups.setdefault(period or SEED_PERIOD, []).append(ticker)
+        
+        updated = 0
+        reseed = []
+        for period, group in groups.items():
+            histories = fetch_histories(group, period=period)
+            for ticker in group:
+                if ticker not in histories:
+                    continue
+                added = self.apply_history(ticker, histories[ticker], reseed=(period == SEED_PERIOD))
+                if added is None:
+                    reseed.append(ticker)
+                elif added:
+                    updated += 1
+        
+        if reseed:
+            logger.info(f"수정주가 변경으로 일봉 재구성: {', '.join(reseed)}")
+            histories = fetch_histories(reseed, period=SEED_PERIOD)
+            for ticker in reseed:
+                if ticker in histories:
+                    self.apply_history(ticker, histories[ticker], reseed=True)
+                    updated += 1
+        
+        logger.debug(f"일봉 저장소 갱신: {updated}/{len(tickers)}개 종목")
+        return updated
+    
+    def bars(self, ticker, timeframe='D'):
+        """
+        시간 단위 봉 (일봉 저장본 리샘플, 일봉이 바뀌기 전까지 캐시)
+        
+        Returns:
+            DataFrame 또는 None (저장본이 없으면)
+        """
+        daily = self.daily(ticker)
+        if daily is None:
+            return None
+        if timeframe == 'D':
+            return daily
+        key = (ticker, timeframe)
+        revision = self._revisions.get(ticker, 0)
+        cached = self._resampled.get(key)
+        if cached is None or cached[0] != revision:
+            cached = (revision, resample_bars(daily, timeframe))
+            self._resampled[key] = cached
+        return cached[1]
+    
+    def histories(self, tickers, timeframe='D'):
+        """{ticker: 시간 단위 봉} (저장본이 없는 종목은 제외) - fetch_histories 결과 대신 사용"""
+        histories = {}
+        for ticker in dict.fromkeys(tickers):
+            bars = self.bars(ticker, timeframe)
+            if bars is not None and not bars.empty:
+                histories[ticker] = bars
+        return histories
+    
+    def graph(self, tickers, timeframe='D'):
+        """시간 단위 봉의 IndicatorGraph (예: 'W'면 ma20 = 20주 이동평균)"""
+        return IndicatorGraph.from_histories(self.histories(tickers, timeframe), list(tickers))
+
+
+_STORE = None
+
+
+def get_bar_store():
+    """공용 일봉 저장소 (프로세스 내에서 리샘플 캐시 공유)"""
+    global _STORE
+    if _STORE is None:
+        _STORE = DailyBarStore()
+    return _STORE
@@ -0,0 +1,217 @@
+"""
+시장 폭 지표 (Market Breadth)
+대형주/초대형주 유니버스 전 종목의 가격 패널에서 거래일별 시장 폭을 횡단면으로 한 번에 계산
+
+- pct_above_ma200: MA200을 계산할 수 있는 구성 종목 중 종가 > MA200 비율 (%)
+- new_highs / new_lows: 52주(HIGH_LOW_DAYS 실거래일) 최고/최저 종가를 기록한 구성 종목 수
+- net_new_highs: 신고가 - 신저가 (종목 수), net_new_highs_pct: 52주 이력이 있는 구성 종목 대비 (%)
+- median_return_3m: 구성 종목 3개월(RETURN_3M_DAYS 실거래일) 수익률 중앙값 (%)
+
+- 구성 종목은 유니버스 스냅샷(universe)의 시점별(as-of) 구성 → 생존편향 없이 과거 날짜 계산
+  (스냅샷이 없으면 패널의 전 종목)
+- 지표는 IndicatorGraph 선언 지표(MA, high_52w, return_3m ...)를 그대로 사용하므로
+  전 기간을 한 번 계산해 두면 날짜별 조회는 행 인덱싱뿐
+- 일일 리포트: 로컬 일봉 저장소(bar_store) / 백테스트: 가격 패널(PricePanel)
+"""
+from datetime import datetime
+import numpy as np
+import pandas as pd
+from indicators import IndicatorGraph, INDICATOR_WARMUP_DAYS
+from logger import get_logger
+
+logger = get_logger()
+
+BREADTH_MA_WINDOW = 200
+
+# 시장 폭을 계산하는 스크리너 유니버스
+BREADTH_SCREENERS = ('large', 'mega')
+
+# MA200 / 52주 신고가 계산에 필요한 가격 이력 (달력 일수)
+BREADTH_WARMUP_DAYS = 400
+
+BREADTH_COLUMNS = ('members', 'pct_above_ma200', 'new_highs', 'new_lows', 'net_new_highs',
+                   'net_new_highs_pct', 'median_return_3m')
+
+
+def membership_mask(dates, tickers, screener_types=BREADTH_SCREENERS):
+    """
+    거래일별 유니버스 구성 종목 마스크 (스크리너 유니버스 합집합, 날짜 이전(포함) 마지막 스냅샷 기준)
+    
+    첫 스냅샷 이전 날짜는 가장 오래된 스냅샷을 사용합니다 (UniverseStore.as_of와 같은 규칙).
+    
+    Returns:
+        (거래일 × 종목) bool 배열 (스냅샷이 하나도 없으면 None)
+    """
+    from universe import get_universe_store
+    
+    positions = {ticker: col for col, ticker in enumerate(tickers)}
+    days = pd.DatetimeIndex(dates).strftime('%Y-%m-%d')
+    mask = np.zeros((len(days), len(positions)), dtype=bool)
+    found = False
+    for screener_type in screener_types:
+        store = get_universe_store(screener_type)
+        snapshot_dates = store.dates
+        if not snapshot_dates:
+            continue
+        found = True
+        # 각 거래일이 속한 스냅샷 번호
+        snapshot_rows = np.maximum(np.searchsorted(snapshot_dates, days, side='right') - 1, 0)
+        for k, snapshot_date in enumerate(snapshot_dates):
+            rows = np.flatnonzero(snapshot_rows == k)
+            cols = [positions[t] for t in store.as_of(snapshot_date)[1] if t in positions]
+            if len(rows) and cols:
+                mask[np.ix_(rows, cols)] = True
+    return mask if found else None
+
+
+def compute_breadth(graph, members=None):
+    """
+    거래일별 시장 폭 지표 (전 기간 한 번에 계산)
+    
+    Args:
+        graph: IndicatorGraph 또는 PricePanel (종가만 있어도 됨)
+        members: (거래일 × 종목) 구성 종목 마스크 (None이면 전 종목)
+    
+    Returns:
+        DataFrame: index=거래일, 컬럼=BREADTH_COLUMNS (구성 종목 중 당일 실거래가 있는 종목 기준)
+    """
+    if not isinstance(graph, IndicatorGraph):
+        graph = IndicatorGraph.from_panel(graph)
+    members = graph.valid if members is None else graph.valid & members
+    
+    ma = graph.moving_average(BREADTH_MA_WINDOW)
+    has_ma = members & ~np.isnan(ma)
+    with np.errstate(invalid='ignore'):
+        above = has_ma & (graph.get('close') > ma)
+    has_high_low = members & ~np.isnan(graph.get('high_52w'))
+    new_highs = (graph.get('new_high') & has_high_low).sum(axis=1)
+    new_lows = (graph.get('new_low') & has_high_low).sum(axis=1)
+    
+    ma_count = has_ma.sum(axis=1)
+    high_low_count = has_high_low.sum(axis=1)
+    returns = pd.DataFrame(np.where(members, graph.get('return_3m'), np.nan))
+    with np.errstate(invalid='ignore', divide='ignore'):
+        breadth = pd.DataFrame({
+            'members': members.sum(axis=1),
+            'pct_above_ma200': np.where(ma_count > 0, above.sum(axis=1) / ma_count * 100, np.nan),
+            'new_highs': new_highs,
+            'new_lows': new_lows,
+            'net_new_highs': new_highs - new_lows,
+            'net_new_highs_pct': np.where(high_low_count > 0, (new_highs - new_lows) / high_low_count * 100, np.nan),
+            'median_return_3m': returns.median(axis=1, skipna=True).to_numpy()
+        }, index=graph.dates)
+    return breadth
+
+
+def breadth_as_of(breadth, date=None):
+    """
+    date 이전(포함) 마지막 거래일의 시장 폭 (백테스트 / 일일 리포트 공용)
+    
+    Returns:
+        dict: {'date': 'YYYY-MM-DD', BREADTH_COLUMNS...} (해당 날짜 이전 데이터가 없으면 None)
+    """
+    if breadth is None or breadth.empty:
+        return None
+    if date is None:
+        i = len(breadth) - 1
+    else:
+        date = pd.Timestamp(date)
+        if breadth.index.tz is not None and date.tzinfo is None:
+            date = date.tz_localize(breadth.index.tz)
+        i = int(breadth.index.searchsorted(date, side='right')) - 1
+        if i < 0:
+            return None
+    row = breadth.iloc[i]
+    result = {'date': breadth.index[i].strftime('%Y-%m-%d')}
+    for column in BREADTH_COLUMNS:
+        value = row[column]
+        if column in ('members', 'new_highs', 'new_lows', 'net_new_highs'):
+            result[column] = int(value)
+        else:
+            result[column] = None if pd.isna(value) else round(float(value), 2)
+    return result
+
+
+def universe_tickers(date=None, screener_types=BREADTH_SCREENERS):
+    """date 시점 스크리너 유니버스 구성 종목 (합집합)"""
+    from universe import get_universe_store
+    
+    date = date or datetime.now()
+    tickers = []
+    for screener_type in screener_types:
+        tickers.extend(get_universe_store(screener_type).as_of(date)[1])
+    return list(dict.fromkeys(tickers))
+
+
+_CURRENT = {}
+
+
+def current_breadth(store=None, screener_types=BREADTH_SCREENERS, update=True):
+    """
+    오늘 시장 폭 (일일 리포트용 - 오늘 유니버스 구성 종목의 로컬 일봉 저장소 기준)
+    
+    Args:
+        store: DailyBarStore (기본: 공용 저장소)
+        update: True면 일봉 저장소를 먼저 갱신 (마지막 저장일 이후 일봉만 조회)
+    
+    Returns:
+        dict (breadth_as_of 형식) 또는 None (유니버스/일봉이 없으면)
+    """
+    from bar_store import get_bar_store
+    
+    # 같은 날 여러 스크리너 보고서에서 호출해도 한 번만 계산
+    key = (datetime.now().strftime('%Y-%m-%d'), tuple(screener_types))
+    if key in _CURRENT:
+        return _CURRENT[key]
+    tickers = universe_tickers(screener_types=screener_types)
+    if not tickers:
+        logger.warning("유니버스 스냅샷이 없어 시장 폭을 계산할 수 없습니다.")
+        return None
+    store = store or get_bar_store()
+    if update:
+        store.update(tickers)
+    graph = store.graph(tickers)
+    if not graph.tickers:
+        logger.warning("일봉 저장소에 유니버스 종목 데이터가 없습니다.")
+        return None
+    
+    result = breadth_as_of(compute_breadth(graph))
+    _CURRENT[key] = result
+    logger.info(f"시장 폭 ({len(graph.tickers)}개 종목): MA200 위 {result['pct_above_ma200']}% / "
+                f"신고가-신저가 {result['net_new_highs']:+d} / 3개월 수익률 중앙값 {result['median_return_3m']}%")
+    return result
+
+
+def build_breadth(start_date, end_date, screener_types=BREADTH_SCREENERS, panel=None):
+    """
+    백테스트 기간의 거래일별 시장 폭 (유니버스 스냅샷 구성 종목의 가격 패널로 한 번에 계산)
+    
+    Args:
+        start_date, end_date: 백테스트 기간 (MA200·52주 계산을 위해 BREADTH_WARMUP_DAYS 앞서 조회)
+        panel: 이미 조회한 PricePanel (없으면 기간 중 구성 종목을 조회)
+    
+    Returns:
+        compute_breadth 결과 DataFrame (start_date 이후) 또는 None
+    """
+    start_date, end_date = pd.Timestamp(start_date), pd.Timestamp(end_date)
+    if panel is None:
+        from universe import get_universe_store
+        from price_panel import fetch_price_panel
+        
+        tickers = list(dict.fromkeys(
+            t for screener_type in screener_types
+            for t in get_universe_store(screener_type).tickers_between(start_date, end_date)
+        ))
+        if not tickers:
+            logger.warning("유니버스 스냅샷이 없어 시장 폭을 계산할 수 없습니다.")
+            return None
+        panel = fetch_price_panel(tickers, start_date - pd.Timedelta(days=max(BREADTH_WARMUP_DAYS,
+                                                                              INDICATOR_WARMUP_DAYS)),
+                                  end_date)
+        if panel is None:
+            return None
+    
+    breadth = compute_breadth(panel, membership_mask(panel.dates, panel.tickers, screener_types))
+    dates = breadth.index.tz_localize(None) if breadth.index.tz is not None else breadth.index
+    logger.info(f"시장 폭 계산: {len(breadth)}일 × {len(panel.tickers)}종목")
+    return breadth[dates >= start_date.normalize()]
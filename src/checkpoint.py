@@ -0,0 +1,184 @@
+"""
+백테스트 체크포인트 (Checkpoint / Resume)
+오래 걸리는 백테스트를 중간 저장하고, 중단된 지점부터 이어서 실행
+
+- 저장: DATA_DIR/checkpoints/{name}.pkl
+  (임시 파일에 쓴 뒤 교체 → 저장 도중 중단돼도 직전 체크포인트 유지)
+- 내용: 실행 키(파라미터), 커서 날짜(마지막으로 처리를 마친 날),
+  엔진 상태(현금·보유 수량·가격 배열·기록), 전략 상태, 난수 상태
+- 입력 데이터(가격 패널 등)는 {name}.inputs.pkl에 한 번만 저장 → 재개 시 네트워크 조회 생략
+- 실행 키가 다르면(파라미터 변경) 체크포인트를 무시하고 처음부터 실행
+- 실행 시점에 정해지는 파라미터(종료일, 종목 풀 등)는 load_saved_key()로 먼저 읽어 같은 키로 재개
+"""
+import copy
+import os
+import pickle
+import random
+import time
+from pathlib import Path
+import numpy as np
+from logger import get_logger
+from config import DATA_DIR
+
+logger = get_logger()
+
+CHECKPOINT_DIR = Path(DATA_DIR) / 'checkpoints'
+
+# 기본 저장 간격 (처리한 날짜 수)
+CHECKPOINT_EVERY = 20
+
+
+def _dump(obj, path):
+    """원자적 저장 (임시 파일 → 교체)"""
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = path.with_name(path.name + '.tmp')
+    with open(tmp_path, 'wb') as f:
+        pickle.dump(obj, f, protocol=pickle.HIGHEST_PROTOCOL)
+    os.replace(tmp_path, path)
+
+
+def _load(path):
+    """저장 파일 읽기 (없거나 손상되면 None)"""
+    if not path.exists():
+        return None
+    try:
+        with open(path, 'rb') as f:
+            return pickle.load(f)
+    except Exception as e:
+        logger.warning(f"체크포인트 읽기 실패 ({path}): {e}")
+        return None
+
+
+def load_saved_key(name, directory=CHECKPOINT_DIR):
+    """
+    저장된 체크포인트(없으면 입력 데이터)의 실행 키 - 키 일치 여부는 확인하지 않음
+    
+    재개할 때 실행 시점에 정해지는 파라미터(종료일, 종목 풀 등)를 저장된 값으로 맞추는 데 사용합니다.
+    
+    Returns:
+        실행 키 dict (저장된 파일이 없으면 None)
+    """
+    for path in (Path(directory) / f'{name}.pkl', Path(directory) / f'{name}.inputs.pkl'):
+        saved = _load(path)
+        if saved is not None:
+            return saved.get('key')
+    return None
+
+
+class Checkpoint:
+    """
+    이벤트 루프 체크포인트
+    
+    Args:
+        name: 체크포인트 이름 (파일명)
+        key: 실행 파라미터 (같은 키의 체크포인트만 재개)
+        state: 전략 상태 dict (훅이 공유하는 가변 상태 - 저장/복원 대상)
+        every: 저장 간격 (처리한 날짜 수)
+        directory: 저장 디렉토리 (기본: DATA_DIR/checkpoints)
+    """
+    
+    def __init__(self, name, key, state=None, every=CHECKPOINT_EVERY, directory=CHECKPOINT_DIR):
+        self.name = name
+        self.key = key
+        self.state = state if state is not None else {}
+        self.every = max(1, int(every))
+        self.path = Path(directory) / f'{name}.pkl'
+        self.inputs_path = Path(directory) / f'{name}.inputs.pkl'
+        self._pending = 0
+        self._last = None
+    
+    # ---- 엔진 상태 ----
+    
+    def _write(self, cursor_date, engine, snapshot, strategy_state):
+        _dump({
+            'key': self.key,
+            'cursor': cursor_date.strftime('%Y-%m-%d'),
+            'engine': engine.state_dict(snapshot),
+            'state': strategy_state,
+            'rng': {'numpy': np.random.get_state(), 'python': random.getstate()},
+            'saved_at': time.strftime('%Y-%m-%d %H:%M:%S')
+        }, self.path)
+        self._pending = 0
+        logger.debug(f"체크포인트 저장: {self.name} ({cursor_date.strftime('%Y-%m-%d')}까지 처리)")
+    
+    def step(self, engine, date, i):
+        """
+        이벤트 루프에서 매 날짜 처리를 마친 뒤 호출
+        
+        완료 시점 상태를 메모리에 보관하고(중단 시 저장용), every 간격마다 파일로 저장합니다.
+        엔진은 배열과 기록 리스트 길이만 스냅샷하고 리스트는 저장할 때 잘라 씀 (매일 전체 복사하지 않음).
+        """
+        self._last = (date, engine, engine.snapshot(),
+                      {name: copy.copy(value) for name, value in self.state.items()})
+        self._pending += 1
+        if self._pending >= self.every:
+            self._write(*self._last)
+    
+    def save_last(self):
+        """마지막으로 처리를 마친 날짜의 상태 저장 (예외/중단 시)"""
+        if self._last is None or self._pending == 0:
+            return
+        logger.info(f"체크포인트 저장: {self._last[0].strftime('%Y-%m-%d')}까지 처리 ({self.path})")
+        self._write(*self._last)
+    
+    def load(self):
+        """
+        같은 실행 키의 체크포인트 읽기
+        
+        Returns:
+            체크포인트 dict (없거나 키가 다르면 None)
+        """
+        saved = _load(self.path)
+        if saved is None:
+            return None
+        if saved.get('key') != self.key:
+            logger.warning(f"체크포인트 실행 파라미터가 달라 무시합니다: {self.path}")
+            return None
+        return saved
+    
+    def restore(self, engine, dates):
+        """
+        체크포인트를 엔진/전략 상태에 적용
+        
+        Args:
+            engine: PortfolioEngine
+            dates: 이벤트 루프 날짜 리스트
+        
+        Returns:
+            이어서 처리할 첫 날짜 인덱스 (체크포인트가 없으면 0)
+        """
+        saved = self.load()
+        if saved is None:
+            logger.info(f"재개할 체크포인트가 없어 처음부터 실행합니다: {self.name}")
+            return 0
+        
+        engine.load_state_dict(saved['engine'])
+        self.state.update(saved['state'])
+        np.random.set_state(saved['rng']['numpy'])
+        random.setstate(saved['rng']['python'])
+        
+        cursor = saved['cursor']
+        start = next((i for i, date in enumerate(dates) if date.strftime('%Y-%m-%d') > cursor), len(dates))
+        logger.info(f"체크포인트에서 재개: {cursor} 이후 ({len(dates) - start}/{len(dates)}개 날짜 남음, "
+                    f"저장 {saved['saved_at']})")
+        return start
+    
+    # ---- 입력 데이터 ----
+    
+    def save_inputs(self, inputs):
+        """입력 데이터 저장 (가격 패널 등 - 재개 시 다시 조회하지 않도록)"""
+        _dump({'key': self.key, 'inputs': inputs}, self.inputs_path)
+    
+    def load_inputs(self):
+        """같은 실행 키의 입력 데이터 (없으면 None)"""
+        saved = _load(self.inputs_path)
+        if saved is None or saved.get('key') != self.key:
+            return None
+        logger.info(f"저장된 입력 데이터 사용: {self.inputs_path}")
+        return saved['inputs']
+    
+    def clear(self):
+        """완료된 실행의 체크포인트/입력 파일 삭제"""
+        for path in (self.path, self.inputs_path):
+            if path.exists():
+                path.unlink()
@@ -0,0 +1,252 @@
+"""
+거래 비용 모델 (Liquidity-Aware Transaction Cost Model)
+Finviz 스냅샷의 거래량/변동성 필드로 종목별 거래 비용을 배열 단위로 계산
+
+- 수수료(fee): 거래 대금 대비 고정 비율
+- 스프레드(spread): 일중 변동성(Volatility M/W)에 비례하는 호가 스프레드 절반
+- 시장 충격(impact): 제곱근 모형 k · σ · sqrt(주문 수량 / 일 거래량)
+  - 일 거래량 = Avg Volume × Rel Volume (0.5 ~ 2.0배로 제한)
+- 스냅샷에 없는 종목은 고정 비율(수수료 + 슬리피지)로 대체
+
+리밸런싱 한 번의 모든 주문을 배열로 받아 한 번에 비용을 계산하며,
+PortfolioEngine의 cost_model(buy_fill / sell_fill)로 그대로 사용할 수 있습니다.
+"""
+import numpy as np
+from backtest_engine import TickerIndex, FixedCostModel
+from config import TRANSACTION_FEE, SLIPPAGE
+from logger import get_logger
+
+logger = get_logger()
+
+# Rel Volume 보정 범위 (하루 거래량 급변이 비용을 과도하게 흔들지 않도록 제한)
+REL_VOLUME_RANGE = (0.5, 2.0)
+
+_VOLUME_UNITS = {'K': 1e3, 'M': 1e6, 'B': 1e9}
+
+
+def parse_volume(value):
+    """거래량 문자열을 숫자로 변환 ("7.01M" → 7010000, "12,997,210" → 12997210, 실패 시 NaN)"""
+    try:
+        text = str(value).strip().replace(',', '')
+        unit = _VOLUME_UNITS.get(text[-1:].upper())
+        if unit:
+            return float(text[:-1]) * unit
+        return float(text)
+    except (ValueError, TypeError):
+        return np.nan
+
+
+def parse_percent(value):
+    """퍼센트 문자열을 숫자로 변환 ("11.88%" → 11.88, 실패 시 NaN)"""
+    try:
+        return float(str(value).strip().replace('%', ''))
+    except (ValueError, TypeError):
+        return np.nan
+
+
+def parse_number(value):
+    """일반 숫자 문자열 변환 ("1.92" → 1.92, 실패 시 NaN)"""
+    try:
+        return float(str(value).strip().replace(',', ''))
+    except (ValueError, TypeError):
+        return np.nan
+
+
+def load_liquidity_profile(snapshot_df):
+    """
+    Finviz 스냅샷에서 종목별 유동성 지표 추출
+    
+    Args:
+        snapshot_df: Ticker, Avg Volume, Rel Volume, Volatility W/M 컬럼을 가진 DataFrame
+    
+    Returns:
+        dict: tickers, avg_volume(주), rel_volume(배), volatility(일중 변동성, 비율) 배열
+    """
+    df = snapshot_df.drop_duplicates(subset='Ticker')
+    
+    def column(name, parser):
+        if name not in df.columns:
+            return np.full(len(df), np.nan)
+        return df[name].map(parser).to_numpy(dtype=float)
+    
+    # 월간 변동성을 우선 사용하고, 없으면 주간 변동성으로 보완
+    volatility = column('Volatility M', parse_percent)
+    volatility = np.where(np.isnan(volatility), column('Volatility W', parse_percent), volatility)
+    
+    return {
+        'tickers': df['Ticker'].astype(str).tolist(),
+        'avg_volume': column('Avg Volume', parse_volume),
+        'rel_volume': column('Rel Volume', parse_number),
+        'volatility': volatility / 100
+    }
+
+
+class LiquidityCostModel:
+    """
+    유동성 기반 거래 비용 모델
+    
+    비용률(거래 대금 대비) = 수수료 + 스프레드 절반 + 시장 충격
+    
+    Args:
+        profile: load_liquidity_profile() 결과 (없으면 모든 종목에 대체 비용 적용)
+        fee: 수수료율
+        slippage: 유동성 데이터가 없는 종목의 대체 슬리피지율
+        spread_factor: 일중 변동성 대비 스프레드 절반 비율
+        min_spread: 최소 스프레드 절반
+        impact_coef: 시장 충격 계수 k
+        max_rate: 편도 비용률 상한
+    """
+    
+    def __init__(self, profile=None, fee=TRANSACTION_FEE, slippage=SLIPPAGE,
+                 spread_factor=0.05, min_spread=0.0002, impact_coef=0.5, max_rate=0.05):
+        self.fee = fee
+        self.slippage = slippage
+        self.spread_factor = spread_factor
+        self.min_spread = min_spread
+        self.impact_coef = impact_coef
+        self.max_rate = max_rate
+        
+        self.index = TickerIndex()
+        self.daily_volume = np.zeros(0, dtype=float)
+        self.volatility = np.zeros(0, dtype=float)
+        if profile is not None:
+            self.update(profile)
+    
+    @classmethod
+    def from_snapshot(cls, snapshot_df, **kwargs):
+        """Finviz 스냅샷 DataFrame으로 모델 생성"""
+        return cls(load_liquidity_profile(snapshot_df), **kwargs)
+    
+    @property
+    def total_cost(self):
+        """유동성 데이터가 없는 종목의 편도 비용률 (로그 표시용)"""
+        return self.fee + self.slippage
+    
+    def describe(self):
+        """결과 저장용 모델 파라미터"""
+        return {
+            'type': 'liquidity',
+            'fee': self.fee,
+            'slippage': self.slippage,
+            'spread_factor': self.spread_factor,
+            'min_spread': self.min_spread,
+            'impact_coef': self.impact_coef,
+            'max_rate': self.max_rate,
+            'profiled_tickers': len(self.index)
+        }
+    
+    def summary(self):
+        """로그용 한 줄 설명"""
+        return (f"유동성 기반 (수수료 {self.fee*100:.2f}% + 스프레드 절반 변동성×{self.spread_factor:g} "
+                f"(최소 {self.min_spread*100:.2f}%) + 시장 충격 k={self.impact_coef:g}, 상한 {self.max_rate*100:.1f}%, "
+                f"유동성 데이터 {len(self.index)}종목 / 그 외 슬리피지 {self.slippage*100:.2f}%)")
+    
+    def update(self, profile):
+        """유동성 지표 갱신 (새 종목은 추가, 기존 종목은 덮어씀)"""
+        ids = self.index.ids(profile['tickers'])
+        size = len(self.index)
+        if size > len(self.daily_volume):
+            self.daily_volume = np.concatenate(
+                [self.daily_volume, np.full(size - len(self.daily_volume), np.nan)])
+            self.volatility = np.concatenate(
+                [self.volatility, np.full(size - len(self.volatility), np.nan)])
+        
+        rel_volume = np.clip(np.nan_to_num(profile['rel_volume'], nan=1.0), *REL_VOLUME_RANGE)
+        self.daily_volume[ids] = profile['avg_volume'] * rel_volume
+        self.volatility[ids] = profile['volatility']
+    
+    def _lookup(self, tickers, n):
+        """티커별 (일 거래량, 일중 변동성) 배열 - 데이터가 없으면 NaN"""
+        volume = np.full(n, np.nan)
+        volatility = np.full(n, np.nan)
+        if tickers is None:
+            return volume, volatility
+        ids = np.array([self.index.get(t) if self.index.get(t) is not None else -1
+                        for t in np.atleast_1d(tickers)], dtype=np.int64)
+        ids = np.broadcast_to(ids, (n,))
+        known = ids >= 0
+        volume[known] = self.daily_volume[ids[known]]
+        volatility[known] = self.volatility[ids[known]]
+        return volume, volatility
+    
+    def estimate(self, tickers, notional, prices):
+        """
+        주문 배치의 비용률 구성요소 계산
+        
+        Args:
+            tickers: 티커 또는 티커 리스트
+            notional: 주문 금액 (스칼라 또는 배열)
+            prices: 기준가 (스칼라 또는 배열)
+        
+        Returns:
+            dict: fee, spread, impact, rate (거래 대금 대비 비율 배열)
+        """
+        notional, prices = np.broadcast_arrays(np.abs(np.atleast_1d(notional)).astype(float),
+                                               np.atleast_1d(prices).astype(float))
+        n = len(notional)
+        volume, volatility = self._lookup(tickers, n)
+        
+        with np.errstate(divide='ignore', invalid='ignore'):
+            participation = notional / (prices * volume)
+            spread = np.maximum(self.spread_factor * volatility, self.min_spread)
+            impact = self.impact_coef * volatility * np.sqrt(participation)
+        
+        # 유동성 데이터가 없거나 잘못된 종목은 고정 슬리피지로 대체
+        known = np.isfinite(spread) & np.isfinite(impact) & (volume > 0)
+        spread = np.where(known, spread, self.slippage)
+        impact = np.where(known, impact, 0.0)
+        fee = np.full(n, self.fee)
+        rate = np.minimum(fee + spread + impact, self.max_rate)
+        
+        return {
+            'fee': fee,
+            'spread': spread,
+            'impact': impact,
+            'rate': rate
+        }
+    
+    def buy_fill(self, amount, price, tickers=None):
+        """
+        매수 체결 (스칼라 또는 배열)
+        
+        Returns:
+            (shares, spent, cost): 매수 수량, 지출 금액, 거래 비용
+        """
+        rate = self.estimate(tickers, amount, price)['rate']
+        if np.ndim(amount) == 0 and np.ndim(price) == 0:
+            rate = float(rate[0])
+        shares = amount / (price * (1 + rate))
+        spent = amount
+        return shares, spent, spent - shares * price
+    
+    def sell_fill(self, shares, price, tickers=None):
+        """
+        매도 체결 (스칼라 또는 배열)
+        
+        Returns:
+            (proceeds, cost): 매도 대금, 거래 비용
+        """
+        rate = self.estimate(tickers, shares * price, price)['rate']
+        if np.ndim(shares) == 0 and np.ndim(price) == 0:
+            rate = float(rate[0])
+        gross = shares * price
+        proceeds = gross * (1 - rate)
+        return proceeds, gross - proceeds
+
+
+def create_cost_model(kind='fixed', snapshot_df=None, fee=TRANSACTION_FEE, slippage=SLIPPAGE):
+    """
+    거래 비용 모델 생성
+    
+    Args:
+        kind: 'fixed' (수수료 + 고정 슬리피지) 또는 'liquidity' (스냅샷 기반)
+        snapshot_df: 'liquidity'일 때 사용할 Finviz 스냅샷 (없으면 고정 비율로 대체)
+    """
+    if kind == 'fixed':
+        return FixedCostModel(fee=fee, slippage=slippage)
+    if kind == 'liquidity':
+        if snapshot_df is None or len(snapshot_df) == 0:
+            logger.warning("유동성 스냅샷이 없어 모든 종목에 고정 슬리피지를 적용합니다.")
+            return LiquidityCostModel(fee=fee, slippage=slippage)
+        return LiquidityCostModel.from_snapshot(snapshot_df, fee=fee, slippage=slippage)
+    raise ValueError(f"알 수 없는 거래 비용 모델: {kind}")
@@ -15,7 +15,10 @@ import yfinance as yf
 # 유틸리티 임포트
 project_root = Path(__file__).parent.parent.parent.parent
 sys.path.insert(0, str(project_root / 'src' / 'dashboard' / 'utils'))
+sys.path.insert(0, str(project_root / 'src'))
 from formatting import parse_performance, parse_price
+from performance_metrics import calculate_drawdown_series, rolling_sharpe_ratio
+from indicators import IndicatorGraph
 
 
 def plot_candlestick_with_ma(ticker, period="3mo"):
@@ -37,10 +40,11 @@ def plot_candlestick_with_ma(ticker, period="3mo"):
         if hist.empty:
             return None
         
-        # 이동평균 계산
-        hist['MA20'] = hist['Close'].rolling(window=20).mean()
-        hist['MA60'] = hist['Close'].rolling(window=60).mean()
-        hist['MA120'] = hist['Close'].rolling(window=120).mean()
+        # 이동평균 계산 (일일 리포트·백테스트와 같은 지표 그래프 선언 사용)
+        averages = IndicatorGraph.from_frame(hist, ticker).series(['ma20', 'ma60', 'ma120'])
+        hist['MA20'] = averages['ma20']
+        hist['MA60'] = averages['ma60']
+        hist['MA120'] = averages['ma120']
         
         # 캔들스틱 차트 생성
         fig = go.Figure()
@@ -365,14 +369,7 @@ def plot_mdd_curve(backtest_result):
             values = [r['value'] for r in daily_returns]
             
             # MDD 곡선 계산
-            drawdowns = []
-            peak = values[0]
-            
-            for value in values:
-                if value > peak:
-                    peak = value
-                drawdown = ((value - peak) / peak) * 100
-                drawdowns.append(drawdown)
+            drawdowns = calculate_drawdown_series(values)
             
             fig = go.Figure()
             
@@ -395,14 +392,7 @@ def plot_mdd_curve(backtest_result):
             dates = pd.date_range(start=start_date, end=end_date, periods=len(portfolio_history))
             
             # MDD 곡선 계산
-            drawdowns = []
-            peak = portfolio_history[0]
-            
-            for value in portfolio_history:
-                if value > peak:
-                    peak = value
-                drawdown = ((value - peak) / peak) * 100
-                drawdowns.append(drawdown)
+            drawdowns = calculate_drawdown_series(portfolio_history)
             
             fig = go.Figure()
             
@@ -769,25 +759,9 @@ def plot_rolling_sharpe(backtest_result, window=60):
         if len(daily_returns) < window:
             return None
         
-        dates = []
-        rolling_sharpes = []
-        
-        for i in range(window, len(daily_returns)):
-            window_data = daily_returns[i-window:i]
-            returns = [r['return'] for r in window_data]
-            
-            # 샤프비율 계산
-            avg_return = sum(returns) / len(returns)
-            variance = sum((r - avg_return) ** 2 for r in returns) / (len(returns) - 1)
-            std_dev = variance ** 0.5
-            
-            if std_dev > 0:
-                sharpe = (avg_return / std_dev) * (252 ** 0.5)
-            else:
-                sharpe = 0
-            
-            dates.append(daily_returns[i]['date'])
-            rolling_sharpes.append(sharpe)
+        # i번째 날짜의 값은 직전 window일 수익률 기준 (당일 미포함)
+        rolling_sharpes = rolling_sharpe_ratio(daily_returns[:-1], window)
+        dates = [r['date'] for r in daily_returns[window:]]
         
         fig = go.Figure()
         
@@ -842,18 +816,10 @@ def plot_drawdown_histogram(backtest_result):
             return None
         
         # 드로다운 계산
-        drawdowns = []
-        peak = portfolio_history[0]
+        drawdowns = calculate_drawdown_series(portfolio_history)
+        drawdowns = drawdowns[drawdowns < 0]
         
-        for value in portfolio_history:
-            if value > peak:
-                peak = value
-            
-            drawdown = ((value - peak) / peak) * 100
-            if drawdown < 0:
-                drawdowns.append(drawdown)
-        
-        if not drawdowns:
+        if len(drawdowns) == 0:
             return None
         
         fig = go.Figure()
@@ -881,6 +847,70 @@ def plot_drawdown_histogram(backtest_result):
         return None
 
 
+def plot_robustness_distribution(analysis, metric='total_return'):
+    """
+    강건성 분석 (Monte Carlo) 지표 분포 히스토그램
+    
+    Args:
+        analysis: run_robustness_analysis(include_samples=True) 결과
+        metric: 'total_return', 'mdd', 'sharpe_ratio'
+    
+    Returns:
+        plotly Figure
+    """
+    if not analysis:
+        return None
+    
+    try:
+        metric_names = {
+            'total_return': ('총 수익률 분포', '총 수익률 (%)'),
+            'mdd': ('최대낙폭 분포', 'MDD (%)'),
+            'sharpe_ratio': ('샤프비율 분포', '샤프비율')
+        }
+        method_styles = {
+            'bootstrap': ('블록 부트스트랩', '#1f77b4'),
+            'shuffle': ('순서 셔플', '#ff7f0e'),
+            'cost': ('비용 교란', '#2ca02c')
+        }
+        title, xaxis_title = metric_names[metric]
+        
+        fig = go.Figure()
+        
+        for method, (name, color) in method_styles.items():
+            if method not in analysis or 'samples' not in analysis[method]:
+                continue
+            fig.add_trace(go.Histogram(
+                x=analysis[method]['samples'][metric],
+                nbinsx=50,
+                marker_color=color,
+                opacity=0.6,
+                name=name
+            ))
+        
+        # 원본 결과 표시
+        fig.add_vline(
+            x=analysis['original'][metric],
+            line_dash="dash",
+            line_color="red",
+            annotation_text="실제 결과"
+        )
+        
+        fig.update_layout(
+            title=title,
+            xaxis_title=xaxis_title,
+            yaxis_title="경로 수",
+            barmode='overlay',
+            height=400,
+            template='plotly_white'
+        )
+        
+        return fig
+    
+    except Exception as e:
+        print(f"강건성 분석 차트 생성 실패: {e}")
+        return None
+
+
 def plot_win_loss_distribution(backtest_result):
     """
     승/패 거래 분포
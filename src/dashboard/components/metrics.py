@@ -9,7 +9,9 @@ import plotly.graph_objects as go
 # 유틸리티 임포트
 project_root = Path(__file__).parent.parent.parent.parent
 sys.path.insert(0, str(project_root / 'src' / 'dashboard' / 'utils'))
+sys.path.insert(0, str(project_root / 'src'))
 from formatting import format_percentage, format_currency, parse_performance, parse_price
+from technical_analyzer import as_technical_dict
 
 
 def display_market_status(market_regime):
@@ -105,7 +107,13 @@ def display_market_status(market_regime):
     
     # 업데이트 시간
     timestamp = market_regime.get('timestamp', 'N/A')
-    st.caption(f"📅 마지막 업데이트: {timestamp}")
+    session = market_regime.get('session')
+    if session:
+        st.caption(f"📅 마지막 업데이트: {timestamp} · 기준 세션: {session} 마감")
+    else:
+        st.caption(f"📅 마지막 업데이트: {timestamp}")
+    if market_regime.get('expired'):
+        st.caption("⚠️ 유효 기한이 지난 시장 상태입니다 (지수 데이터 갱신 실패)")
 
 
 def display_summary_cards(df):
@@ -178,8 +186,9 @@ def display_technical_status(technical_analysis):
     기술적 지표 상태 표시
     
     Args:
-        technical_analysis: 기술적 분석 결과 딕셔너리
+        technical_analysis: 기술적 분석 결과 딕셔너리 (analyze_technical_batch DataFrame도 가능)
     """
+    technical_analysis = as_technical_dict(technical_analysis)
     if not technical_analysis:
         st.warning("기술적 분석 데이터가 없습니다.")
         return
@@ -264,8 +273,9 @@ def display_signals(df, technical_analysis):
     
     Args:
         df: 현재 DataFrame
-        technical_analysis: 기술적 분석 결과
+        technical_analysis: 기술적 분석 결과 (analyze_technical_batch DataFrame도 가능)
     """
+    technical_analysis = as_technical_dict(technical_analysis)
     if df is None or df.empty:
         st.warning("데이터가 없습니다.")
         return
@@ -16,8 +16,9 @@ from dashboard.components.charts import (
     plot_portfolio_value, plot_daily_returns, plot_mdd_curve,
     plot_cumulative_returns_vs_spy, plot_monthly_returns_heatmap,
     plot_yearly_returns_bar, plot_rolling_sharpe, plot_drawdown_histogram,
-    plot_win_loss_distribution, plot_trade_frequency
+    plot_win_loss_distribution, plot_trade_frequency, plot_robustness_distribution
 )
+from robustness import run_robustness_analysis, estimate_turnover
 from telegram_notifier import send_backtest_report, send_backtest_chart
 
 # 페이지 설정
@@ -229,6 +230,68 @@ try:
             freq_fig = plot_trade_frequency(backtest_result)
             if freq_fig:
                 st.plotly_chart(freq_fig, use_container_width=True)
+        
+        st.divider()
+        
+        # 강건성 분석 (Monte Carlo)
+        st.subheader("🎲 강건성 분석 (Monte Carlo)")
+        st.caption("일별 수익률을 블록 부트스트랩 / 순서 셔플 / 거래 비용 교란으로 재표본화하여 신뢰구간을 계산합니다.")
+        
+        col1, col2, col3 = st.columns(3)
+        
+        with col1:
+            n_paths = st.select_slider(
+                "시뮬레이션 경로 수",
+                options=[1000, 5000, 10000, 20000],
+                value=10000
+            )
+        
+        with col2:
+            block_size = st.slider("블록 크기 (거래일)", min_value=1, max_value=60, value=20)
+        
+        with col3:
+            cost_max = st.slider("거래 비용 상한 (%)", min_value=0.0, max_value=1.0, value=0.3, step=0.05)
+        
+        if st.button("🎲 강건성 분석 실행", use_container_width=True):
+            with st.spinner(f"{n_paths:,}개 경로 시뮬레이션 중..."):
+                st.session_state[f'robustness_{screener_type}'] = run_robustness_analysis(
+                    backtest_result.get('daily_returns', []),
+                    n_paths=n_paths,
+                    block_size=block_size,
+                    cost_range=(0.0, cost_max),
+                    turnover=estimate_turnover(backtest_result),
+                    include_samples=True
+                )
+        
+        analysis = st.session_state.get(f'robustness_{screener_type}')
+        if analysis:
+            method_names = {'bootstrap': '블록 부트스트랩', 'shuffle': '순서 셔플', 'cost': '비용 교란'}
+            ci_label = f"{analysis['params']['confidence']:.0%} 구간"
+            
+            cols = st.columns(3)
+            for col, (method, name) in zip(cols, method_names.items()):
+                with col:
+                    ret = analysis[method]['total_return']
+                    mdd = analysis[method]['mdd']
+                    sharpe = analysis[method]['sharpe_ratio']
+                    st.markdown(f"**{name}**")
+                    st.metric(f"총 수익률 ({ci_label})", f"{ret['median']:+.2f}%",
+                              f"{ret['lower']:+.2f}% ~ {ret['upper']:+.2f}%", delta_color="off")
+                    st.metric(f"MDD ({ci_label})", f"{mdd['median']:.2f}%",
+                              f"{mdd['lower']:.2f}% ~ {mdd['upper']:.2f}%", delta_color="off")
+                    st.metric(f"샤프비율 ({ci_label})", f"{sharpe['median']:.2f}",
+                              f"{sharpe['lower']:.2f} ~ {sharpe['upper']:.2f}", delta_color="off")
+                    st.caption(f"손실 확률: {ret['prob_loss']:.1f}%")
+            
+            metric = st.radio(
+                "분포 지표",
+                options=['total_return', 'mdd', 'sharpe_ratio'],
+                format_func=lambda x: {'total_return': '총 수익률', 'mdd': 'MDD', 'sharpe_ratio': '샤프비율'}[x],
+                horizontal=True
+            )
+            robustness_fig = plot_robustness_distribution(analysis, metric)
+            if robustness_fig:
+                st.plotly_chart(robustness_fig, use_container_width=True)
     
     st.divider()
     
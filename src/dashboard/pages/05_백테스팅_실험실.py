@@ -20,6 +20,7 @@ from dashboard.components.charts import (
 )
 from dashboard.components.metrics import display_backtest_metrics
 from backtester import load_historical_portfolio_data, simulate_portfolio_flexible
+from progress import format_progress
 from telegram_notifier import send_backtest_report, send_backtest_chart
 
 # 페이지 설정
@@ -235,10 +236,14 @@ try:
                         st.error("역사적 데이터를 로드할 수 없습니다.")
                         st.stop()
                     
-                    # 백테스팅 실행
-                    progress_bar = st.progress(0)
-                    result = simulate_portfolio_flexible(historical_data, params)
-                    progress_bar.progress(100)
+                    # 백테스팅 실행 (리밸런싱 날짜 단위 진행률 / 남은 시간 표시)
+                    progress_bar = st.progress(0, text="백테스팅 준비 중...")
+                    
+                    def update_progress(event):
+                        progress_bar.progress(min(event['fraction'], 1.0), text=format_progress(event))
+                    
+                    result = simulate_portfolio_flexible(historical_data, params, progress=update_progress)
+                    progress_bar.progress(1.0, text="백테스팅 완료")
                     
                     if not result:
                         st.error("백테스팅 실행 실패")
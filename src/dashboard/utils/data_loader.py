@@ -12,8 +12,9 @@ import streamlit as st
 # 프로젝트 루트 경로 추가
 project_root = Path(__file__).parent.parent.parent.parent
 sys.path.insert(0, str(project_root))
+sys.path.insert(0, str(project_root / 'src'))
 
-from config import DATA_DIR
+from config import DATA_DIR, VIX_THRESHOLD
 
 
 @st.cache_data(ttl=300)  # 5분 캐시
@@ -160,6 +161,48 @@ def load_backtest_results(screener_type="large"):
         return None
 
 
+@st.cache_data(ttl=300)
+def load_record_stream(path, max_points=2000):
+    """
+    스트리밍 백테스트 레코드 파일(JSON Lines) 로드
+    
+    파일을 한 줄씩 읽으며 차트용 시계열은 최대 max_points개 점으로 줄이고,
+    성과 지표는 누적 계산합니다 (긴 기간 결과도 메모리 일정).
+    
+    Returns:
+        dict (daily_returns + 성과 지표, 차트 함수에 그대로 전달 가능) 또는 None
+    """
+    from record_stream import read_records, SeriesDownsampler, consume_records
+    from performance_metrics import StreamingMetrics
+    
+    path = Path(path)
+    if not path.exists():
+        return None
+    
+    try:
+        records = read_records(path)
+        first = next(records, None)
+        if first is None:
+            return None
+        
+        # 첫 기록(기준점)의 가치를 초기 자본으로 사용
+        metrics = StreamingMetrics(first['value'])
+        series = SeriesDownsampler(max_points)
+        consume_records([first], [metrics, series])
+        count = consume_records(records, [metrics, series]) + 1
+        
+        days = (datetime.strptime(metrics.last_date, '%Y-%m-%d')
+                - datetime.strptime(metrics.first_date, '%Y-%m-%d')).days
+        result = metrics.result(days)
+        result['daily_returns'] = series.series()
+        result['records'] = count
+        return result
+    
+    except Exception as e:
+        st.error(f"스트리밍 결과 로드 실패: {e}")
+        return None
+
+
 @st.cache_data(ttl=300)
 def load_technical_analysis(screener_type="large"):
     """
@@ -211,19 +254,22 @@ def get_latest_date(screener_type="large"):
 @st.cache_data(ttl=300)
 def load_market_regime():
     """
-    시장 필터 상태 로드
+    시장 필터 상태 로드 (main / 스케줄러와 공유하는 캐시)
+    
+    유효 기한(다음 세션 마감)이 지났거나 캐시가 없으면 마지막 마감 세션 기준으로 갱신합니다.
+    다른 프로세스가 갱신 중이면 잠금이 풀린 뒤 그 결과를 사용합니다.
     
     Returns:
-        dict 또는 None
+        dict 또는 None ('expired': 갱신 실패로 만료된 값을 보여주는 경우 True)
     """
-    cache_file = Path(DATA_DIR) / 'market_regime_cache.json'
-    
-    if not cache_file.exists():
-        return None
+    from market_filter import read_regime_cache, check_market_regime
     
     try:
-        with open(cache_file, 'r', encoding='utf-8') as f:
-            market_regime = json.load(f)
+        market_regime = read_regime_cache()
+        if market_regime is None or market_regime.get('expired'):
+            refreshed = check_market_regime(VIX_THRESHOLD)
+            if refreshed:
+                market_regime = dict(refreshed, expired=False)
         return market_regime
     except Exception as e:
         st.error(f"시장 상태 로드 실패: {e}")
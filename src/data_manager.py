@@ -1,9 +1,16 @@
 # 데이터 저장 및 로드 모듈
 import os
+import json
 import pandas as pd
 from datetime import datetime, timedelta
 from config import DATA_DIR
 
+def json_default(value):
+    """NumPy 스칼라 등 JSON 기본 타입이 아닌 값 변환 (json.dump의 default 인자)"""
+    if hasattr(value, 'item'):
+        return value.item()
+    return str(value)
+
 def save_daily_data(df, date_str, filename_prefix=""):
     """일일 데이터를 CSV 파일로 저장
     
@@ -75,3 +82,54 @@ def get_available_dates():
     files = [f for f in os.listdir(DATA_DIR) if f.startswith('finviz_data_') and f.endswith('.csv')]
     dates = [f.replace('finviz_data_', '').replace('.csv', '') for f in files]
     return sorted(dates)
+
+def save_technical_snapshot(technical_analysis, date_str, filename_prefix=""):
+    """일일 기술적 분석 결과를 JSON 파일로 저장 (스크리너 CSV와 같은 날짜/prefix)
+    
+    다음 영업일에 전날 값으로 다시 읽어 MA60 이탈/트레일링 스탑 비교에 사용합니다.
+    
+    Args:
+        technical_analysis: {ticker: calculate_ma_status 형식 dict}
+        date_str: 날짜 문자열
+        filename_prefix: 파일명 prefix (예: "large_", "mega_")
+    """
+    if not os.path.exists(DATA_DIR):
+        os.makedirs(DATA_DIR)
+    
+    filename = f"{DATA_DIR}/technical_{filename_prefix}{date_str}.json"
+    with open(filename, 'w', encoding='utf-8') as f:
+        json.dump(technical_analysis, f, ensure_ascii=False, indent=2, default=json_default)
+    print(f"기술적 분석 결과를 {filename}에 저장했습니다.")
+    return filename
+
+def load_previous_technical(days_ago, filename_prefix=""):
+    """지정된 일수 전의 기술적 분석 결과를 로드 (없으면 None)
+    
+    Args:
+        days_ago: 몇 일 전
+        filename_prefix: 파일명 prefix (예: "large_", "mega_")
+    """
+    target_date = (datetime.now() - timedelta(days=days_ago)).strftime("%Y-%m-%d")
+    filename = f"{DATA_DIR}/technical_{filename_prefix}{target_date}.json"
+    
+    if not os.path.exists(filename):
+        print(f"{days_ago}일 전 기술적 분석 결과를 찾을 수 없습니다: {filename}")
+        return None
+    try:
+        with open(filename, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError) as e:
+        print(f"기술적 분석 결과 로드 실패: {filename} ({e})")
+        return None
+
+def load_last_business_day_technical(filename_prefix=""):
+    """마지막 영업일의 기술적 분석 결과를 로드
+    
+    Args:
+        filename_prefix: 파일명 prefix (예: "large_", "mega_")
+    
+    Returns:
+        dict 또는 None
+    """
+    offset = get_last_business_day_offset()
+    return load_previous_technical(offset, filename_prefix)
@@ -5,20 +5,31 @@ from datetime import datetime, timedelta
 from pathlib import Path
 import json
 from logger import get_logger
-from finviz_scraper import scrape_all_tickers_with_pagination
+from universe import get_universe_as_of, get_universe_store
+from price_panel import fetch_price_panel
+from momentum_ranking import MomentumRanker
+from performance_metrics import (
+    calculate_total_return, calculate_annualized_return, calculate_mdd,
+    calculate_sharpe_ratio, calculate_win_rate
+)
 from config import DATA_DIR, RISK_FREE_RATE
 
 logger = get_logger()
 
-def get_historical_top_performers(screener_type="large", lookback_date=None, performance_period_days=90):
+def get_historical_top_performers(screener_type="large", lookback_date=None, performance_period_days=90,
+                                  panel=None, progress=None):
     """
     특정 시점(lookback_date)에서 과거 performance_period_days 동안의 수익률 기준으로 
     상위 10개 종목을 선정
     
+    종목 후보는 lookback_date 시점의 유니버스 스냅샷(universe.py)에서 읽습니다.
+    
     Args:
         screener_type: 'large' 또는 'mega'
         lookback_date: 기준 날짜 (datetime 객체, None이면 3개월 전)
         performance_period_days: 수익률 계산 기간 (기본: 90일 = 3개월)
+        panel: 미리 조회한 가격 패널 (없으면 후보 종목 가격을 새로 조회)
+        progress: 가격 조회 진행률 콜백 (progress.ProgressTracker 이벤트)
     
     Returns:
         상위 10개 종목의 티커 리스트
@@ -28,89 +39,35 @@ def get_historical_top_performers(screener_type="large", lookback_date=None, per
     
     logger.info(f"=== {lookback_date.strftime('%Y-%m-%d')} 기준 상위 10개 종목 선정 시작 ===")
     
-    # 1. 전체 티커 리스트 가져오기
-    logger.info(f"{screener_type} 스크리너에서 전체 티커 리스트 수집 중...")
-    all_tickers_df = scrape_all_tickers_with_pagination(screener_type)
+    # 1. 기준일 시점의 유니버스 (저장된 스냅샷 as-of 조회)
+    tickers = get_universe_as_of(screener_type, lookback_date)
     
-    if all_tickers_df is None or len(all_tickers_df) == 0:
+    if len(tickers) == 0:
         logger.error("티커 리스트를 가져올 수 없습니다.")
         return None
     
-    # Ticker 컬럼 찾기
-    ticker_column = None
-    for col in all_tickers_df.columns:
-        if 'Ticker' in col or 'ticker' in col.lower():
-            ticker_column = col
-            break
-    
-    if ticker_column is None:
-        logger.error("Ticker 컬럼을 찾을 수 없습니다.")
-        return None
-    
-    tickers = all_tickers_df[ticker_column].tolist()
-    logger.info(f"총 {len(tickers)}개 티커 수집 완료")
+    logger.info(f"{screener_type} 유니버스: {len(tickers)}개 티커")
     
-    # 2. 각 종목의 수익률 계산
+    # 2. 각 종목의 수익률 계산 (가격 패널 + 모멘텀 순위 엔진)
     start_date = lookback_date - timedelta(days=performance_period_days + 30)  # 여유있게
     end_date = lookback_date
     
     logger.info(f"수익률 계산 기간: {start_date.strftime('%Y-%m-%d')} ~ {end_date.strftime('%Y-%m-%d')}")
     
-    performance_data = []
+    if panel is None:
+        panel = fetch_price_panel(tickers, start_date, end_date, progress=progress)
+    if panel is None:
+        logger.error("수익률 데이터를 계산할 수 없습니다.")
+        return None
     
-    for i, ticker in enumerate(tickers):
-        try:
-            if (i + 1) % 50 == 0:
-                logger.info(f"진행률: {i+1}/{len(tickers)} ({(i+1)/len(tickers)*100:.1f}%)")
-            
-            stock = yf.Ticker(ticker)
-            hist = stock.history(start=start_date, end=end_date)
-            
-            if hist.empty or len(hist) < 2:
-                logger.debug(f"{ticker}: 충분한 가격 데이터 없음")
-                continue
-            
-            # lookback_date에 가장 가까운 날짜의 가격 찾기
-            hist_dates = hist.index
-            end_idx = -1
-            for idx, date in enumerate(hist_dates):
-                if date.date() <= end_date.date():
-                    end_idx = idx
-            
-            if end_idx == -1 or end_idx < performance_period_days // 2:
-                logger.debug(f"{ticker}: 기준일 데이터 부족")
-                continue
-            
-            # performance_period_days 전 가격 찾기
-            start_idx = max(0, end_idx - int(performance_period_days * 0.7))  # 영업일 고려
-            
-            if start_idx >= end_idx:
-                logger.debug(f"{ticker}: 시작/종료 인덱스 문제")
-                continue
-            
-            start_price = hist['Close'].iloc[start_idx]
-            end_price = hist['Close'].iloc[end_idx]
-            
-            if start_price == 0:
-                continue
-            
-            # 수익률 계산
-            performance = ((end_price - start_price) / start_price) * 100
-            
-            performance_data.append({
-                'ticker': ticker,
-                'performance': performance,
-                'start_price': start_price,
-                'end_price': end_price,
-                'start_date': hist_dates[start_idx].strftime('%Y-%m-%d'),
-                'end_date': hist_dates[end_idx].strftime('%Y-%m-%d')
-            })
-            
-            logger.debug(f"{ticker}: {performance:.2f}% ({start_price:.2f} -> {end_price:.2f})")
-            
-        except Exception as e:
-            logger.debug(f"{ticker}: 데이터 가져오기 실패 - {e}")
-            continue
+    # 기준일 이전 마지막 거래일 ~ 약 performance_period_days 전 (영업일 고려 0.7배)
+    ranker = MomentumRanker(
+        panel,
+        lookback=int(performance_period_days * 0.7),
+        min_periods=performance_period_days // 2 + 1,
+        include_date=False
+    )
+    performance_data = ranker.rank(lookback_date, top_n=10, tickers=tickers)
     
     if len(performance_data) == 0:
         logger.error("수익률 데이터를 계산할 수 없습니다.")
@@ -132,6 +89,50 @@ def get_historical_top_performers(screener_type="large", lookback_date=None, per
         'screener_type': screener_type
     }
 
+def fetch_universe_panel(screener_type, start_date, end_date, performance_period_days=90,
+                         warmup_days=None, progress=None, ohlc=False):
+    """
+    기간 중 유효했던 유니버스 전 종목의 가격 패널을 한 번에 조회
+    
+    get_historical_top_performers(panel=...)에 넘기면 리밸런싱마다 가격을 다시 받지 않습니다.
+    warmup_days: 시작일 이전 가격 이력 (기본: performance_period_days + 30일, 이동평균용이면 더 길게)
+    progress: 가격 조회 진행률 콜백 (progress.ProgressTracker 이벤트)
+    ohlc: True면 고가/저가도 조회 (High/Low 기반 매수 조건식 백테스트용)
+    """
+    if warmup_days is None:
+        warmup_days = performance_period_days + 30
+    tickers = get_universe_store(screener_type).tickers_between(start_date, end_date)
+    if not tickers:
+        get_universe_as_of(screener_type, start_date)  # 스냅샷이 없으면 수집
+        tickers = get_universe_store(screener_type).tickers_between(start_date, end_date)
+    if not tickers:
+        return None
+    
+    logger.info(f"{screener_type} 유니버스 가격 조회: {len(tickers)}개 종목")
+    return fetch_price_panel(tickers, start_date - timedelta(days=warmup_days), end_date,
+                             progress=progress, ohlc=ohlc)
+
+def backtest_year_period(year, now=None):
+    """
+    연도별 백테스팅 기간 (유연한 전략 / 스마트 전략 / 연도 일괄 실행 공용)
+    
+    1월 3일 ~ 12월 30일, 아직 12월 30일이 지나지 않은 연도는 어제까지
+    
+    Args:
+        year: 백테스팅 연도
+        now: 기준 시각 (기본: 현재)
+    
+    Returns:
+        (start_date, end_date)
+    """
+    now = datetime.now() if now is None else now
+    start_date = datetime(year, 1, 3)
+    if now < datetime(year, 12, 30):
+        end_date = now - timedelta(days=1)  # 어제까지
+    else:
+        end_date = datetime(year, 12, 30)
+    return start_date, end_date
+
 def calculate_buy_and_hold_returns(tickers, start_date, end_date):
     """
     각 종목별 Buy & Hold 수익률 계산
@@ -290,14 +291,11 @@ def simulate_daily_rebalancing(tickers, start_date, end_date, initial_capital=10
     
     # 성과 지표 계산
     final_value = portfolio_value
-    total_return = ((final_value - initial_capital) / initial_capital) * 100
+    total_return = calculate_total_return(initial_capital, final_value)
     
     # 기간 계산
     days = (common_dates[-1] - common_dates[0]).days
-    if days > 0:
-        annualized_return = ((final_value / initial_capital) ** (365 / days) - 1) * 100
-    else:
-        annualized_return = 0
+    annualized_return = calculate_annualized_return(initial_capital, final_value, days)
     
     # MDD 계산
     mdd = calculate_mdd([h['value'] for h in portfolio_history])
@@ -338,58 +336,6 @@ def simulate_daily_rebalancing(tickers, start_date, end_date, initial_capital=10
     
     return result
 
-def calculate_mdd(portfolio_values):
-    """최대낙폭 (Maximum Drawdown) 계산"""
-    if len(portfolio_values) < 2:
-        return 0.0
-    
-    peak = portfolio_values[0]
-    max_drawdown = 0
-    
-    for value in portfolio_values:
-        if value > peak:
-            peak = value
-        
-        drawdown = ((value - peak) / peak) * 100
-        if drawdown < max_drawdown:
-            max_drawdown = drawdown
-    
-    return max_drawdown
-
-def calculate_sharpe_ratio(returns, risk_free_rate=0.05):
-    """샤프비율 계산"""
-    if not returns or len(returns) < 2:
-        return 0.0
-    
-    # 일일 수익률 평균
-    avg_return = sum(returns) / len(returns)
-    
-    # 일일 수익률 표준편차
-    variance = sum((r - avg_return) ** 2 for r in returns) / (len(returns) - 1)
-    std_dev = variance ** 0.5
-    
-    if std_dev == 0:
-        return 0.0
-    
-    # 일일 무위험 수익률
-    daily_rf = (1 + risk_free_rate) ** (1/252) - 1
-    daily_rf_pct = daily_rf * 100
-    
-    # 샤프비율 (연환산)
-    sharpe = ((avg_return - daily_rf_pct) / std_dev) * (252 ** 0.5)
-    
-    return sharpe
-
-def calculate_win_rate(daily_returns):
-    """승률 계산 (수익 거래 / 전체 거래)"""
-    if not daily_returns:
-        return 0.0
-    
-    wins = sum(1 for r in daily_returns if r['return'] > 0)
-    total = len(daily_returns)
-    
-    return (wins / total) * 100 if total > 0 else 0.0
-
 def run_historical_backtest(screener_type="large", initial_capital=10000, 
                            lookback_days=90, cache_file=None, top_n=10):
     """
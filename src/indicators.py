@@ -0,0 +1,538 @@
+"""
+이동평균 지표 / 매매 신호 마스크 (Indicator Panel)
+가격 패널 전체 기간의 MA20/MA60/MA120과 손절·매수 조건을 종목별로 한 번만 계산
+
+- 이동평균은 종목별 실거래일(valid)만으로 계산 (직전 종가로 채운 칸은 제외)
+- '전날'은 종목별 직전 실거래일
+- 신호는 (거래일 × 종목) bool 배열 → 백테스트 루프에서는 인덱싱만 수행
+
+지표 그래프 (IndicatorGraph):
+- 지표는 @indicator(이름, *입력 지표)로 한 번만 선언 → 일일 리포트(scan_technical),
+  백테스트(IndicatorPanel), 대시보드 차트가 같은 정의를 사용
+- OHLCV 배열(종목 하나의 일봉 DataFrame, {ticker: DataFrame}, PricePanel)에서
+  요청한 지표와 그 입력(직전 종가, True Range, 이동평균 등)을 한 번씩만 계산해 캐시
+
+신호 규칙:
+- 트레일링 스탑: 2 거래일 연속 종가 < MA20
+- MA60 손절: 전날 종가 >= 전날 MA60 → 오늘 종가 < MA60
+- 매수 조건: 종가 > MA60 > MA120
+"""
+import numpy as np
+import pandas as pd
+
+# MA120 계산에 필요한 가격 이력 (달력 일수)
+INDICATOR_WARMUP_DAYS = 180
+
+# 트레일링 스탑: MA20 하향 이탈 연속 거래일 수
+TRAILING_STOP_DAYS = 2
+
+# 이동평균 / ATR 기간 (거래일), 신고가 비교 구간 (개월)
+MA_PERIODS = (20, 60, 120)
+ATR_PERIOD = 14
+BREAKOUT_MONTHS = 3
+
+# 52주 신고가/신저가 비교 구간, 3개월 수익률 기간 (거래일)
+HIGH_LOW_DAYS = 252
+RETURN_3M_DAYS = 63
+
+
+def rolling_mean(values, valid, window):
+    """
+    종목별 실거래일 기준 이동평균
+    
+    Args:
+        values: (거래일 × 종목) 종가 배열
+        valid: 실거래일 마스크
+        window: 이동평균 기간 (거래일 수)
+    
+    Returns:
+        (거래일 × 종목) 배열 - 실거래일이 아니거나 데이터가 부족한 칸은 NaN
+    """
+    ma = np.full(values.shape, np.nan)
+    for col in range(values.shape[1]):
+        rows = np.flatnonzero(valid[:, col])
+        if len(rows) < window:
+            continue
+        cum = np.concatenate([[0.0], np.cumsum(values[rows, col])])
+        ma[rows[window - 1:], col] = (cum[window:] - cum[:-window]) / window
+    return ma
+
+
+def rolling_max(values, valid, window):
+    """
+    종목별 실거래일 기준 구간 최댓값 (오늘 포함 window 실거래일)
+    
+    Returns:
+        (거래일 × 종목) 배열 - 실거래일이 아니거나 데이터가 부족한 칸은 NaN
+    """
+    result = np.full(values.shape, np.nan)
+    for col in range(values.shape[1]):
+        rows = np.flatnonzero(valid[:, col])
+        if len(rows) < window:
+            continue
+        result[rows, col] = pd.Series(values[rows, col]).rolling(window).max().to_numpy()
+    return result
+
+
+def previous_valid_rows(valid):
+    """(거래일 × 종목) 각 칸의 종목별 직전 실거래일 행 (없으면 -1)"""
+    n_rows = len(valid)
+    rows = np.where(valid, np.arange(n_rows)[:, None], -1)
+    last = np.maximum.accumulate(rows, axis=0) if n_rows else rows
+    prev = np.full(valid.shape, -1, dtype=np.int64)
+    prev[1:] = last[:-1]
+    return prev
+
+
+def consecutive(mask, n):
+    """행 방향으로 n행 연속 True인 칸 (앞쪽 n-1행은 False)"""
+    result = mask.copy()
+    for k in range(1, n):
+        result[k:] &= mask[:-k]
+        result[:k] = False
+    return result
+
+
+def window_max(values, starts, ends):
+    """
+    구간 최댓값 (NaN 제외, 구간이 비었거나 값이 모두 NaN이면 NaN)
+    
+    2의 거듭제곱 길이 구간 최댓값 표(sparse table)로 구간마다 두 번 조회합니다.
+    
+    Args:
+        values: 1차원 배열
+        starts / ends: 구간 시작·끝 위치 배열 (끝 포함)
+    """
+    result = np.full(len(starts), np.nan)
+    lengths = ends - starts + 1
+    if not len(values) or not (lengths > 0).any():
+        return result
+    table = [np.asarray(values, dtype=float)]
+    while 2 ** len(table) <= len(values):
+        half = 2 ** (len(table) - 1)
+        table.append(np.fmax(table[-1][:-half], table[-1][half:]))
+    
+    levels = np.zeros(len(starts), dtype=np.int64)
+    levels[lengths > 0] = np.floor(np.log2(lengths[lengths > 0])).astype(np.int64)
+    for level in np.unique(levels[lengths > 0]):
+        sel = (lengths > 0) & (levels == level)
+        level_values = table[level]
+        result[sel] = np.fmax(level_values[starts[sel]], level_values[ends[sel] - 2 ** level + 1])
+    return result
+
+
+# 선언된 지표: 이름 → (입력 지표 이름, 계산 함수)
+INDICATORS = {}
+
+# IndicatorGraph 기본 입력 (선언 없이 생성자에서 받는 배열)
+BASE_INPUTS = ('close', 'high', 'low', 'volume', 'valid')
+
+
+def indicator(name, *inputs):
+    """
+    지표 선언 데코레이터 (선언한 지표는 모든 IndicatorGraph에서 get(name)으로 사용)
+    
+    계산 함수는 compute(graph, *입력 배열) 형태이며 (거래일 × 종목) 배열을 반환합니다.
+    입력은 BASE_INPUTS 또는 다른 선언 지표 이름입니다.
+    """
+    def register(func):
+        INDICATORS[name] = (inputs, func)
+        return func
+    return register
+
+
+def required_inputs(name):
+    """지표 계산에 필요한 기본 입력 (BASE_INPUTS 중, 입력 지표를 따라가며 수집)"""
+    if name in BASE_INPUTS:
+        return {name}
+    if name not in INDICATORS:
+        raise KeyError(f"입력 또는 선언된 지표가 아닙니다: {name}")
+    inputs = set()
+    for dependency in INDICATORS[name][0]:
+        inputs |= required_inputs(dependency)
+    return inputs
+
+
+class IndicatorGraph:
+    """
+    지표 계산 그래프 - (거래일 × 종목) OHLCV 배열에서 요청한 지표를 한 번씩만 계산
+    
+    get(name)은 선언된 입력 지표를 먼저 계산하고 모든 결과를 캐시하므로,
+    여러 지표가 같은 중간값(직전 종가, MA20 등)을 써도 한 번만 계산됩니다.
+    가격 배열은 실거래일이 아닌 칸을 NaN으로 바꿔 보관합니다.
+    
+    Args:
+        dates: 거래일 (DatetimeIndex 호환)
+        tickers: 종목 리스트 (열 순서)
+        close: 종가 배열
+        valid: 실거래일 마스크 (기본: 종가가 있는 칸)
+        high / low / volume: 선택 배열 (없으면 이를 쓰는 지표 계산 시 KeyError)
+    """
+    
+    def __init__(self, dates, tickers, close, valid=None, high=None, low=None, volume=None):
+        close = np.asarray(close, dtype=float)
+        self.dates = pd.DatetimeIndex(dates)
+        self.tickers = list(tickers)
+        self.valid = ~np.isnan(close) if valid is None else np.asarray(valid, dtype=bool)
+        self._values = {'valid': self.valid, 'close': np.where(self.valid, close, np.nan)}
+        for name, array in (('high', high), ('low', low), ('volume', volume)):
+            if array is not None:
+                self._values[name] = np.where(self.valid, np.asarray(array, dtype=float), np.nan)
+    
+    @classmethod
+    def from_histories(cls, histories, tickers=None):
+        """
+        {ticker: 일봉 DataFrame} → 그래프 (날짜 합집합 기준, 이력이 없는 종목은 제외)
+        
+        High/Low/Volume은 모든 종목에 있을 때만 입력으로 사용합니다.
+        """
+        tickers = [t for t in dict.fromkeys(histories if tickers is None else tickers) if t in histories]
+        close = pd.DataFrame({t: histories[t]['Close'] for t in tickers}).sort_index()
+        arrays = {}
+        for column in ('High', 'Low', 'Volume'):
+            if tickers and all(column in histories[t] for t in tickers):
+                frame = pd.DataFrame({t: histories[t][column] for t in tickers}).reindex_like(close)
+                arrays[column.lower()] = frame.to_numpy(dtype=float)
+        return cls(close.index, tickers, close.to_numpy(dtype=float).reshape(len(close), len(tickers)),
+                   close.notna().to_numpy().reshape(len(close), len(tickers)), **arrays)
+    
+    @classmethod
+    def from_frame(cls, hist, ticker=''):
+        """종목 하나의 일봉 DataFrame → 1열 그래프"""
+        return cls.from_histories({ticker: hist}, [ticker])
+    
+    @classmethod
+    def from_panel(cls, panel):
+        """PricePanel → 그래프 (패널에 고가/저가가 있으면 함께 입력)"""
+        return cls(panel.dates, panel.tickers, panel.values, panel.valid,
+                   high=getattr(panel, 'high', None), low=getattr(panel, 'low', None))
+    
+    def __contains__(self, name):
+        return name in self._values or name in INDICATORS
+    
+    @property
+    def inputs(self):
+        """생성자에서 받은 기본 입력 이름 (종가만 있는 패널이면 ('valid', 'close'))"""
+        return tuple(name for name in BASE_INPUTS if name in self._values)
+    
+    def get(self, name):
+        """지표 배열 (입력 지표부터 계산, 결과는 캐시)"""
+        if name in self._values:
+            return self._values[name]
+        if name in BASE_INPUTS:
+            raise KeyError(f"입력 배열이 없습니다: {name} (종가만 있는 패널에서는 High/Low 기반 지표 사용 불가)")
+        if name not in INDICATORS:
+            raise KeyError(f"입력 또는 선언된 지표가 아닙니다: {name}")
+        inputs, compute = INDICATORS[name]
+        with np.errstate(invalid='ignore', divide='ignore'):
+            value = compute(self, *[self.get(dependency) for dependency in inputs])
+        self._values[name] = value
+        return value
+    
+    def __getitem__(self, name):
+        return self.get(name)
+    
+    def compute(self, names):
+        """여러 지표 {이름: 배열}"""
+        return {name: self.get(name) for name in names}
+    
+    def cached(self, name, compute):
+        """선언되지 않은 파생 지표 (compute()로 한 번만 계산해 name으로 캐시)"""
+        if name not in self:
+            with np.errstate(invalid='ignore', divide='ignore'):
+                self._values[name] = compute()
+        return self.get(name)
+    
+    def moving_average(self, window):
+        """window일 이동평균 (선언되지 않은 기간도 계산해 ma{window}로 캐시)"""
+        return self.cached(f'ma{window}', lambda: rolling_mean(self.get('close'), self.valid, window))
+    
+    def average_true_range(self, window):
+        """window일 ATR (선언되지 않은 기간도 계산해 atr{window}로 캐시)"""
+        if window == ATR_PERIOD:
+            return self.get('atr')
+        return self.cached(f'atr{window}', lambda: rolling_mean(self.get('true_range'), self.valid, window))
+    
+    def previous(self, array, fill=np.nan):
+        """종목별 직전 실거래일 값 (직전 실거래일이 없으면 fill)"""
+        prev_rows = self.get('prev_rows')
+        cols = np.arange(array.shape[1])
+        shifted = array[np.maximum(prev_rows, 0), cols]
+        return np.where(prev_rows >= 0, shifted, fill)
+    
+    def last_rows(self):
+        """종목별 마지막 실거래일 행 (없으면 -1)"""
+        if not len(self.valid):
+            return np.full(len(self.tickers), -1, dtype=np.int64)
+        return np.where(self.valid, np.arange(len(self.valid))[:, None], -1).max(axis=0)
+    
+    def latest(self, names):
+        """
+        종목별 마지막 실거래일 지표 값
+        
+        Returns:
+            DataFrame: index=ticker, 컬럼=names (실거래일이 없는 종목은 NaN/False)
+        """
+        data = {name: self.last_values(self.get(name)) for name in names}
+        return pd.DataFrame(data, index=pd.Index(self.tickers, name='ticker'))
+    
+    def last_values(self, array):
+        """(거래일 × 종목) 배열의 종목별 마지막 실거래일 값 (실거래일이 없으면 NaN/False)"""
+        rows = self.last_rows()
+        fill = False if array.dtype == bool else np.nan
+        if not len(array):
+            return np.full(len(rows), fill)
+        values = array[np.maximum(rows, 0), np.arange(len(rows))]
+        return np.where(rows >= 0, values, fill)
+    
+    def series(self, names, ticker=None):
+        """
+        종목 하나의 지표 시계열 (실거래일만)
+        
+        Returns:
+            DataFrame: index=거래일, 컬럼=names
+        """
+        col = 0 if ticker is None else self.tickers.index(ticker)
+        rows = self.valid[:, col]
+        return pd.DataFrame({name: self.get(name)[rows, col] for name in names},
+                            index=self.dates[rows])
+
+
+@indicator('prev_rows', 'valid')
+def _prev_rows(graph, valid):
+    return previous_valid_rows(valid)
+
+
+@indicator('history_days', 'valid')
+def _history_days(graph, valid):
+    # 해당 행까지의 종목별 실거래일 수
+    return np.cumsum(valid, axis=0)
+
+
+def _moving_average(window):
+    def compute(graph, close, valid):
+        return rolling_mean(close, valid, window)
+    return compute
+
+
+for _period in MA_PERIODS:
+    indicator(f'ma{_period}', 'close', 'valid')(_moving_average(_period))
+
+
+@indicator('prev_close', 'close')
+def _prev_close(graph, close):
+    return graph.previous(close)
+
+
+@indicator('ma20_prev', 'ma20')
+def _ma20_prev(graph, ma20):
+    return graph.previous(ma20)
+
+
+@indicator('ma60_prev', 'ma60')
+def _ma60_prev(graph, ma60):
+    return graph.previous(ma60)
+
+
+@indicator('above_ma20', 'close', 'ma20')
+def _above_ma20(graph, close, ma20):
+    return close > ma20
+
+
+@indicator('above_ma60', 'close', 'ma60')
+def _above_ma60(graph, close, ma60):
+    return close > ma60
+
+
+@indicator('above_ma120', 'close', 'ma120')
+def _above_ma120(graph, close, ma120):
+    return close > ma120
+
+
+@indicator('ma60_above_ma120', 'ma60', 'ma120')
+def _ma60_above_ma120(graph, ma60, ma120):
+    return ma60 > ma120
+
+
+@indicator('all_conditions_met', 'above_ma60', 'above_ma120', 'ma60_above_ma120')
+def _all_conditions_met(graph, above_ma60, above_ma120, ma60_above_ma120):
+    return above_ma60 & above_ma120 & ma60_above_ma120
+
+
+@indicator('trend_up', 'above_ma60', 'ma60_above_ma120')
+def _trend_up(graph, above_ma60, ma60_above_ma120):
+    return above_ma60 & ma60_above_ma120
+
+
+@indicator('below_ma20', 'close', 'ma20')
+def _below_ma20(graph, close, ma20):
+    return close < ma20
+
+
+@indicator('trailing_stop', 'below_ma20')
+def _trailing_stop(graph, below_ma20):
+    # TRAILING_STOP_DAYS 실거래일 연속 MA20 이탈
+    trailing_stop = below_ma20
+    for _ in range(TRAILING_STOP_DAYS - 1):
+        trailing_stop = below_ma20 & graph.previous(trailing_stop, fill=False)
+    return trailing_stop
+
+
+@indicator('trailing_start', 'valid')
+def _trailing_start(graph, valid):
+    # 트레일링 스탑 연속 구간의 첫 거래일 행 (보유 시작 이후 구간인지 판단용)
+    trailing_start = np.broadcast_to(np.arange(len(valid))[:, None], valid.shape)
+    for _ in range(TRAILING_STOP_DAYS - 1):
+        trailing_start = graph.previous(trailing_start, fill=-1).astype(np.int64)
+    return trailing_start
+
+
+@indicator('ma60_break', 'prev_close', 'ma60_prev', 'close', 'ma60')
+def _ma60_break(graph, prev_close, ma60_prev, close, ma60):
+    return (prev_close >= ma60_prev) & (close < ma60)
+
+
+@indicator('ma20_slope', 'ma20', 'ma20_prev')
+def _ma20_slope(graph, ma20, ma20_prev):
+    # 전날 대비 MA20 변화율 (%, 전날 MA20이 0 이하면 0)
+    slope = (ma20 - ma20_prev) / ma20_prev * 100
+    return np.where(ma20_prev <= 0, 0.0, slope)
+
+
+@indicator('ma20_declining', 'ma20_slope')
+def _ma20_declining(graph, ma20_slope):
+    return ma20_slope <= 0
+
+
+@indicator('true_range', 'high', 'low', 'prev_close')
+def _true_range(graph, high, low, prev_close):
+    # TR = max(High - Low, |High - 전날 종가|, |Low - 전날 종가|) (첫 거래일은 High - Low)
+    return np.fmax(np.fmax(high - low, np.abs(high - prev_close)), np.abs(low - prev_close))
+
+
+@indicator('atr', 'true_range', 'valid')
+def _atr(graph, true_range, valid):
+    return rolling_mean(true_range, valid, ATR_PERIOD)
+
+
+@indicator('atr_pct', 'atr', 'close')
+def _atr_pct(graph, atr, close):
+    return np.where(close > 0, atr / close * 100, np.where(np.isnan(atr), np.nan, 0.0))
+
+
+@indicator('breakout_start', 'valid')
+def _breakout_start(graph, valid):
+    # 각 칸의 BREAKOUT_MONTHS개월 구간 첫 실거래일 행 (실거래일이 아니면 -1)
+    cutoff = (graph.dates - pd.DateOffset(months=BREAKOUT_MONTHS)).to_numpy()
+    dates = graph.dates.to_numpy()
+    start = np.full(valid.shape, -1, dtype=np.int64)
+    for col in range(valid.shape[1]):
+        rows = np.flatnonzero(valid[:, col])
+        start[rows, col] = rows[np.searchsorted(dates[rows], cutoff[rows])]
+    return start
+
+
+@indicator('breakout_days', 'history_days', 'breakout_start', 'valid')
+def _breakout_days(graph, history_days, breakout_start, valid):
+    # BREAKOUT_MONTHS개월 구간(오늘 포함)의 실거래일 수
+    cols = np.arange(valid.shape[1])
+    before = history_days[np.maximum(breakout_start, 0), cols] - valid[np.maximum(breakout_start, 0), cols]
+    return np.where(valid, history_days - before, 0)
+
+
+@indicator('previous_high', 'high', 'breakout_start', 'valid')
+def _previous_high(graph, high, breakout_start, valid):
+    # BREAKOUT_MONTHS개월 구간에서 전 거래일까지의 최고가
+    result = np.full(high.shape, np.nan)
+    for col in range(high.shape[1]):
+        rows = np.flatnonzero(valid[:, col])
+        if not len(rows):
+            continue
+        positions = np.arange(len(rows))
+        starts = np.searchsorted(rows, breakout_start[rows, col])
+        result[rows, col] = window_max(high[rows, col], starts, positions - 1)
+    return result
+
+
+@indicator('breakout', 'close', 'previous_high')
+def _breakout(graph, close, previous_high):
+    return close > previous_high
+
+
+@indicator('breakout_percent', 'close', 'previous_high')
+def _breakout_percent(graph, close, previous_high):
+    return (close - previous_high) / previous_high * 100
+
+
+@indicator('high_52w', 'close', 'valid')
+def _high_52w(graph, close, valid):
+    # 최근 HIGH_LOW_DAYS 실거래일(오늘 포함) 최고 종가 - 종가만 있는 패널에서도 계산
+    return rolling_max(close, valid, HIGH_LOW_DAYS)
+
+
+@indicator('low_52w', 'close', 'valid')
+def _low_52w(graph, close, valid):
+    return -rolling_max(-close, valid, HIGH_LOW_DAYS)
+
+
+@indicator('new_high', 'close', 'high_52w')
+def _new_high(graph, close, high_52w):
+    return close >= high_52w
+
+
+@indicator('new_low', 'close', 'low_52w')
+def _new_low(graph, close, low_52w):
+    return close <= low_52w
+
+
+@indicator('return_3m', 'close', 'valid')
+def _return_3m(graph, close, valid):
+    # RETURN_3M_DAYS 실거래일 전 종가 대비 수익률 (%)
+    result = np.full(close.shape, np.nan)
+    for col in range(close.shape[1]):
+        rows = np.flatnonzero(valid[:, col])
+        if len(rows) <= RETURN_3M_DAYS:
+            continue
+        values = close[rows, col]
+        result[rows[RETURN_3M_DAYS:], col] = (values[RETURN_3M_DAYS:] / values[:-RETURN_3M_DAYS] - 1) * 100
+    return result
+
+
+class IndicatorPanel(IndicatorGraph):
+    """
+    가격 패널의 이동평균과 매매 신호 마스크 (지표 그래프의 백테스트용 고정 속성)
+    
+    Args:
+        panel: PricePanel (INDICATOR_WARMUP_DAYS 이상의 이력 포함 권장, High/Low 조건식이면 ohlc 패널)
+        periods: 계산할 이동평균 기간
+        entry_rule: 매수 조건식 (screening 조건식, 없으면 trend_up = 종가 > MA60 > MA120)
+    """
+    
+    def __init__(self, panel, periods=MA_PERIODS, entry_rule=None):
+        super().__init__(panel.dates, panel.tickers, panel.values, panel.valid,
+                         high=getattr(panel, 'high', None), low=getattr(panel, 'low', None))
+        self.panel = panel
+        self.close = self.get('close')
+        self.ma = {period: self.moving_average(period) for period in periods}
+        self.prev_rows = self.get('prev_rows')
+        self.below_ma20 = self.get('below_ma20')
+        self.trailing_stop = self.get('trailing_stop')
+        self.trailing_start = self.get('trailing_start')
+        self.ma60_break = self.get('ma60_break')
+        self.trend_up = self.get('trend_up')
+        if entry_rule is None:
+            self.entry = self.trend_up
+        else:
+            from screening import compile_rule
+            self.entry = compile_rule(entry_rule).mask(self)
+    
+    def column(self, ticker):
+        """종목 열 위치 (없으면 None)"""
+        return self.panel.index.get(ticker)
+    
+    def row(self, date):
+        """date 당일 거래일 행 (패널에 당일이 없으면 -1)"""
+        i = self.panel.locate(date)
+        if i < 0 or self.panel.dates[i].strftime('%Y-%m-%d') != date.strftime('%Y-%m-%d'):
+            return -1
+        return i
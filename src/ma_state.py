@@ -0,0 +1,279 @@
+"""
+이동평균 증분 상태 (Incremental Moving-Average State)
+종목별 최근 종가 링 버퍼와 기간별 누적합을 저장해 두고, 새 일봉 하나로 MA20/60/120을 O(1) 갱신
+
+- 저장: DATA_DIR/ma_state.json {ticker: {'closes': [오래된 → 최근 종가], 'last_date': 'YYYY-MM-DD'}}
+- 버퍼 크기 = 최장 이동평균(120) + 1 → 전날 기준 이동평균도 같은 상태에서 계산 (MA60 이탈 비교용)
+- 원본 데이터: 로컬 일봉 저장소(bar_store) - 가격 조회는 일봉 저장소만 하고,
+  이 상태는 저장본의 마지막 저장일 이후 일봉만 추가하는 파생 캐시 (파일을 지워도 저장본에서 재구성)
+- 저장일 종가가 일봉 저장본과 다르면(장중 부분 봉, 분할/배당 수정주가) 저장본으로 재구성
+- 누적합은 불러올 때 버퍼에서 다시 계산 → 장기간 덧셈/뺄셈 오차가 쌓이지 않음
+"""
+import json
+from datetime import datetime
+from pathlib import Path
+import numpy as np
+import pandas as pd
+from bar_store import ADJUSTMENT_TOLERANCE, get_bar_store
+from logger import get_logger
+from config import DATA_DIR
+
+logger = get_logger()
+
+MA_STATE_FILE = Path(DATA_DIR) / 'ma_state.json'
+
+MA_WINDOWS = (20, 60, 120)
+BUFFER_SIZE = max(MA_WINDOWS) + 1
+
+
+class MovingAverageState:
+    """
+    한 종목의 이동평균 상태 (링 버퍼 + 기간별 누적합)
+    
+    Args:
+        closes: 초기 종가 (오래된 → 최근, 마지막 BUFFER_SIZE개만 사용)
+        last_date: 마지막 종가 날짜 ('YYYY-MM-DD')
+    """
+    
+    def __init__(self, closes=(), last_date=None):
+        self.buffer = np.zeros(BUFFER_SIZE)
+        self.pos = 0
+        self.count = 0
+        self.sums = {window: 0.0 for window in MA_WINDOWS}
+        self.last_date = None
+        for close in list(closes)[-BUFFER_SIZE:]:
+            self._push(float(close))
+        self.last_date = last_date
+    
+    def _at(self, offset):
+        """offset일 전 종가 (0 = 가장 최근)"""
+        return self.buffer[(self.pos - 1 - offset) % BUFFER_SIZE]
+    
+    def _push(self, close):
+        # 창에서 빠지는 종가를 먼저 빼고 (버퍼가 가득 차면 덮어쓸 칸이 최장 창의 탈락 값)
+        for window in MA_WINDOWS:
+            if self.count >= window:
+                self.sums[window] -= self._at(window - 1)
+            self.sums[window] += close
+        self.buffer[self.pos] = close
+        self.pos = (self.pos + 1) % BUFFER_SIZE
+        self.count = min(self.count + 1, BUFFER_SIZE)
+    
+    def update(self, close, date):
+        """
+        일봉 하나 반영 (O(1))
+        
+        같은 날짜면 마지막 종가를 교체(장중 갱신), 이전 날짜면 무시합니다.
+        
+        Returns:
+            반영 여부
+        """
+        date = pd.Timestamp(date).strftime('%Y-%m-%d')
+        close = float(close)
+        if self.last_date is not None and date < self.last_date:
+            return False
+        if self.last_date == date and self.count:
+            delta = close - self._at(0)
+            for window in MA_WINDOWS:
+                self.sums[window] += delta
+            self.buffer[(self.pos - 1) % BUFFER_SIZE] = close
+        else:
+            self._push(close)
+        self.last_date = date
+        return True
+    
+    @property
+    def last_close(self):
+        return float(self._at(0)) if self.count else None
+    
+    def closes(self):
+        """버퍼 종가 (오래된 → 최근)"""
+        return [float(self._at(offset)) for offset in range(self.count - 1, -1, -1)]
+    
+    def moving_average(self, window, offset=0):
+        """
+        offset일 전 기준 window일 이동평균 (데이터가 부족하면 None)
+        
+        offset=1: 전날 이동평균 = (누적합 - 오늘 종가 + window+1일 전 종가) / window
+        """
+        if self.count < window + offset:
+            return None
+        total = self.sums[window]
+        for k in range(offset):
+            total += self._at(window + k) - self._at(k)
+        return float(total / window)
+    
+    def status(self, offset=0):
+        """
+        calculate_ma_status와 같은 형식의 이동평균 분석 결과
+        
+        Args:
+            offset: 0이면 최근 종가 기준, 1이면 전날 종가 기준
+        """
+        result = {
+            'price': None,
+            'ma20': None,
+            'ma60': None,
+            'ma120': None,
+            'above_ma20': False,
+            'above_ma60': False,
+            'above_ma120': False,
+            'ma60_above_ma120': False,
+            'all_conditions_met': False,
+            'status': 'error'
+        }
+        averages = {window: self.moving_average(window, offset) for window in MA_WINDOWS}
+        if any(value is None for value in averages.values()):
+            return result
+        
+        price = float(self._at(offset))
+        ma20, ma60, ma120 = averages[20], averages[60], averages[120]
+        above_ma60 = bool(price > ma60)
+        above_ma120 = bool(price > ma120)
+        ma60_above_ma120 = bool(ma60 > ma120)
+        result.update({
+            'price': round(price, 2),
+            'ma20': round(ma20, 2),
+            'ma60': round(ma60, 2),
+            'ma120': round(ma120, 2),
+            'above_ma20': bool(price > ma20),
+            'above_ma60': above_ma60,
+            'above_ma120': above_ma120,
+            'ma60_above_ma120': ma60_above_ma120,
+            'all_conditions_met': above_ma60 and above_ma120 and ma60_above_ma120,
+            'status': 'success'
+        })
+        return result
+    
+    def to_dict(self):
+        return {'closes': self.closes(), 'last_date': self.last_date}
+    
+    @classmethod
+    def from_dict(cls, data):
+        return cls(data.get('closes', ()), data.get('last_date'))
+
+
+class MAStateStore:
+    """
+    종목별 이동평균 상태 저장소
+    
+    Args:
+        path: 저장 파일 (기본: DATA_DIR/ma_state.json)
+        bar_store: 원본 DailyBarStore (기본: 공용 일봉 저장소)
+    """
+    
+    def __init__(self, path=MA_STATE_FILE, bar_store=None):
+        self.path = Path(path)
+        self.bar_store = bar_store
+        self.states = {}
+        if self.path.exists():
+            try:
+                with open(self.path, 'r', encoding='utf-8') as f:
+                    data = json.load(f)
+                self.states = {t: MovingAverageState.from_dict(v) for t, v in data.items()}
+            except Exception as e:
+                logger.warning(f"이동평균 상태 읽기 실패 ({self.path}): {e} - 새로 만듭니다.")
+    
+    def __contains__(self, ticker):
+        return ticker in self.states
+    
+    def __len__(self):
+        return len(self.states)
+    
+    def get(self, ticker):
+        return self.states.get(ticker)
+    
+    def save(self):
+        """원자적 저장 (임시 파일 → 교체)"""
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.path.with_name(self.path.name + '.tmp')
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump({t: s.to_dict() for t, s in self.states.items()}, f)
+        tmp_path.replace(self.path)
+    
+    def apply_history(self, ticker, hist, reseed=False):
+        """
+        가격 이력의 마지막 저장일 이후 일봉 반영
+        
+        Args:
+            hist: 'Close' 컬럼이 있는 일봉 DataFrame
+            reseed: True면 기존 상태를 버리고 hist로 새로 구성
+        
+        Returns:
+            반영한 일봉 수 (수정주가 변경으로 재구성이 필요하면 None)
+        """
+        closes = hist['Close'].dropna()
+        state = self.states.get(ticker)
+        if reseed or state is None:
+            dates = closes.index.strftime('%Y-%m-%d')
+            self.states[ticker] = MovingAverageState(closes.to_numpy(),
+                                                     dates[-1] if len(dates) else None)
+            return len(closes)
+        
+        # 저장일 종가가 달라졌으면(분할/배당 수정주가) 증분 갱신 불가
+        dates = closes.index.strftime('%Y-%m-%d')
+        overlap = closes[dates == state.last_date]
+        if len(overlap) and state.last_close:
+            if abs(overlap.iloc[-1] / state.last_close - 1) > ADJUSTMENT_TOLERANCE:
+                return None
+        
+        applied = 0
+        for date, close in zip(dates, closes.to_numpy()):
+            if state.last_date is None or date >= state.last_date:
+                applied += state.update(close, date)
+        return applied
+    
+    def refresh(self, tickers, today=None, update=True):
+        """
+        종목들의 상태를 일봉 저장소의 최신 일봉까지 갱신 (네트워크 조회는 일봉 저장소만 수행)
+        
+        저장 상태가 있는 종목은 마지막 저장일 이후 일봉만 추가하고,
+        처음 보는 종목·저장일 종가가 저장본과 다른 종목은 저장본 마지막 BUFFER_SIZE개로 새로 구성합니다.
+        
+        Args:
+            update: True면 일봉 저장소를 먼저 갱신 (이미 갱신했으면 False)
+        
+        Returns:
+            갱신한 종목 수
+        """
+        bar_store = self.bar_store or get_bar_store()
+        tickers = list(dict.fromkeys(tickers))
+        if update:
+            bar_store.update(tickers, today=today or datetime.now())
+        
+        updated = 0
+        reseed = []
+        for ticker in tickers:
+            bars = bar_store.daily(ticker)
+            if bars is None or bars.empty:
+                continue
+            state = self.states.get(ticker)
+            if state is not None and state.last_date is not None:
+                bars = bars[bars.index >= pd.Timestamp(state.last_date)]
+            applied = self.apply_history(ticker, bars)
+            if applied is None:
+                reseed.append(ticker)
+                self.apply_history(ticker, bar_store.daily(ticker), reseed=True)
+            if applied != 0:
+                updated += 1
+        
+        if reseed:
+            logger.info(f"일봉 저장본과 종가가 달라 이동평균 상태 재구성: {', '.join(reseed)}")
+        logger.debug(f"이동평균 상태 갱신: {updated}/{len(tickers)}개 종목")
+        return updated
+    
+    def statuses(self, tickers, offset=0):
+        """종목별 calculate_ma_status 형식 결과 (offset=1이면 전날 기준, 상태가 없으면 error)"""
+        empty = MovingAverageState()
+        return {ticker: self.states.get(ticker, empty).status(offset) for ticker in tickers}
+
+
+_STORE = None
+
+
+def get_ma_state_store():
+    """공용 이동평균 상태 저장소 (프로세스 내에서 한 번만 로드)"""
+    global _STORE
+    if _STORE is None:
+        _STORE = MAStateStore()
+    return _STORE
@@ -1,17 +1,60 @@
 """
 시장 필터 모듈 (Market Regime Filter)
 SPY와 VIX를 활용하여 시장 약세장/강세장 판단
+
+시장 상태 캐시:
+- 결과는 마지막으로 마감된 미국 정규장 세션에 묶이고 다음 세션 마감까지 유효 (session, valid_until)
+- 지수 일봉은 로컬 일봉 저장소(bar_store)에 쌓고 마지막 저장일 이후 일봉만 추가 조회
+- 잠금 파일 + 원자적 저장으로 여러 프로세스(main, 대시보드, 스케줄러)가 같은 캐시를 공유
+- 백테스트(get_historical_market_regime)도 저장소가 덮는 날짜는 같은 지수 이력으로 계산
+
+임계값 스윕 (regime_sweep):
+- 지수 이력(SPY/VIX)을 한 번만 조회하고, (장기 MA, 단기 MA, VIX 임계값) 조합별
+  hold_cash 마스크를 전 기간에 대해 한 번의 배열 연산(브로드캐스트)으로 계산
+- evaluate_regime_sweep: 조합별 현금 보유 비율·전환 횟수·SPY 필터 전략 성과
+
+시장 폭 (breadth 모듈, 선택):
+- 유니버스 전 종목의 MA200 위 비율이 BREADTH_THRESHOLD 미만이면 지수 조건과 무관하게 현금 보유
+- check_market_regime: 오늘 시장 폭 dict / get_historical_market_regime: 기간 전체 시장 폭 DataFrame
 """
 import yfinance as yf
 import json
+import os
+import time
+from contextlib import contextmanager
+import numpy as np
+import pandas as pd
 from datetime import datetime, timedelta
 from pathlib import Path
 from logger import get_logger
-from config import DATA_DIR, VIX_THRESHOLD
+from config import DATA_DIR, VIX_THRESHOLD, BREADTH_THRESHOLD
 
 logger = get_logger()
 
-def get_market_data(ticker, days=250):
+# 기본 규칙: SPY < MA200 또는 (SPY < MA120 그리고 VIX > 임계값) → 현금 보유
+REGIME_LONG_WINDOW = 200
+REGIME_SHORT_WINDOW = 120
+
+# MA200 계산에 필요한 조회 기간 (달력 일수 - 주말·휴장일 여유 포함)
+REGIME_HISTORY_DAYS = int(REGIME_LONG_WINDOW * 1.5) + 30
+
+REGIME_CACHE_FILE = Path(DATA_DIR) / 'market_regime_cache.json'
+
+# 지수 일봉 (로컬 일봉 저장소 bar_store에 쌓아 두고 새 일봉만 추가 조회)
+INDEX_TICKERS = {'spy': '^GSPC', 'vix': '^VIX'}
+
+# 미국 정규장 마감 시각 (현지) + 종가 확정 대기 - 이 시각이 지나야 당일 세션을 마감된 것으로 봄
+MARKET_TIMEZONE = 'America/New_York'
+SESSION_CLOSE = '16:30:00'
+
+# 캐시 갱신 잠금: 대기 한도 / 이보다 오래된 잠금 파일은 비정상 종료로 보고 제거 (초)
+REGIME_LOCK_TIMEOUT = 120
+REGIME_LOCK_STALE = 600
+
+# 백테스트 조회 중 지수 일봉 저장소를 갱신한 세션 (프로세스당 세션마다 한 번만 갱신)
+_INDEX_REFRESHED = set()
+
+def get_market_data(ticker, days=REGIME_HISTORY_DAYS):
     """
     yfinance를 사용하여 시장 데이터 가져오기
     
@@ -57,185 +100,513 @@ def calculate_moving_average(data, period):
     ma = data['Close'].rolling(window=period).mean()
     return ma.iloc[-1]
 
-def check_market_regime(vix_threshold=20, use_cache=True):
+def apply_breadth_filter(regime, breadth, breadth_threshold=BREADTH_THRESHOLD):
     """
-    시장 상태 체크 (약세장/강세장)
+    시장 폭 조건 반영 (MA200 위 종목 비율 < breadth_threshold → 현금 보유)
     
-    조건:
-    - SPY < MA200 OR (SPY < MA120 AND VIX > 20) → 약세장 (hold_cash = True)
-    - 그 외 → 강세장 (hold_cash = False)
+    Args:
+        regime: check_market_regime / get_historical_market_regime 결과 (제자리 수정)
+        breadth: breadth.breadth_as_of 형식 dict (None이면 조건 없음)
+    
+    Returns:
+        regime ('breadth', 'breadth_threshold' 키 추가)
+    """
+    regime['breadth'] = breadth
+    regime['breadth_threshold'] = breadth_threshold
+    pct_above = breadth.get('pct_above_ma200') if breadth else None
+    if pct_above is not None and not regime['hold_cash'] and pct_above < breadth_threshold:
+        regime['hold_cash'] = True
+        regime['reason'] = f"MA200 위 종목 {pct_above:.1f}% < {breadth_threshold:g}% (시장 폭 약화)"
+    return regime
+
+def last_completed_session(now=None):
+    """
+    now 시점에 마지막으로 마감된 미국 정규장 세션 날짜 (주말 제외)
+    
+    SESSION_CLOSE(현지 시각) 전이면 전 거래일이 마지막 세션입니다.
+    휴장일은 달력 대신 지수 일봉으로 판단합니다 (휴장일 세션에는 새 일봉이 없어 직전 거래일 종가 사용).
     
     Args:
-        vix_threshold: VIX 임계값 (기본: 20)
-        use_cache: 캐시 사용 여부
+        now: 기준 시각 (기본: 현재, 시간대가 없으면 미국 동부 시각으로 간주)
     
     Returns:
-        dict: {
-            'hold_cash': bool,
-            'spy_price': float,
-            'spy_ma200': float,
-            'spy_ma120': float,
-            'vix': float,
-            'date': str,
-            'reason': str
-        }
+        pd.Timestamp: 세션 날짜 (시간대 없음)
     """
-    cache_file = Path(DATA_DIR) / 'market_regime_cache.json'
-    today = datetime.now().strftime('%Y-%m-%d')
+    now = pd.Timestamp.now(tz=MARKET_TIMEZONE) if now is None else pd.Timestamp(now)
+    now = now.tz_localize(MARKET_TIMEZONE) if now.tzinfo is None else now.tz_convert(MARKET_TIMEZONE)
+    local = now.tz_localize(None)
+    session = local.normalize()
+    if local < session + pd.Timedelta(SESSION_CLOSE):
+        session -= pd.Timedelta(days=1)
+    while session.weekday() >= 5:
+        session -= pd.Timedelta(days=1)
+    return session
+
+def session_valid_until(session):
+    """session 기준 시장 상태의 유효 기한 = 다음 세션 마감 시각 (미국 동부 시각)"""
+    day = session + pd.Timedelta(days=1)
+    while day.weekday() >= 5:
+        day += pd.Timedelta(days=1)
+    return (day + pd.Timedelta(SESSION_CLOSE)).tz_localize(MARKET_TIMEZONE)
+
+@contextmanager
+def _cache_lock(path=REGIME_CACHE_FILE, timeout=REGIME_LOCK_TIMEOUT, stale_seconds=REGIME_LOCK_STALE):
+    """
+    프로세스 간 캐시 갱신 잠금 (잠금 파일 배타적 생성 - Windows/Linux 공통)
     
-    # 캐시 확인
-    if use_cache and cache_file.exists():
+    main / 대시보드 / 스케줄러가 동시에 갱신해도 한 프로세스만 조회·저장하고,
+    나머지는 잠금이 풀린 뒤 새 캐시를 읽습니다.
+    비정상 종료로 남은 잠금은 stale_seconds가 지나면 제거하고, timeout까지 못 얻으면 잠금 없이 진행합니다.
+    """
+    lock_path = Path(path).with_name(Path(path).name + '.lock')
+    lock_path.parent.mkdir(parents=True, exist_ok=True)
+    deadline = time.monotonic() + timeout
+    acquired = False
+    while not acquired:
         try:
-            with open(cache_file, 'r', encoding='utf-8') as f:
-                cache = json.load(f)
-                if cache.get('date') == today:
-                    logger.info("캐시된 시장 상태 사용")
-                    return cache
-        except Exception as e:
-            logger.warning(f"캐시 읽기 실패: {e}")
+            fd = os.open(lock_path, os.O_CREAT | os.O_EXCL | os.O_WRONLY)
+            os.write(fd, str(os.getpid()).encode())
+            os.close(fd)
+            acquired = True
+        except FileExistsError:
+            try:
+                if time.time() - lock_path.stat().st_mtime > stale_seconds:
+                    logger.warning(f"오래된 잠금 파일 제거: {lock_path}")
+                    lock_path.unlink()
+                    continue
+            except FileNotFoundError:
+                continue
+            if time.monotonic() > deadline:
+                logger.warning(f"캐시 잠금 대기 시간 초과 ({timeout}초) - 잠금 없이 진행")
+                break
+            time.sleep(0.1)
+    try:
+        yield
+    finally:
+        if acquired:
+            try:
+                lock_path.unlink()
+            except FileNotFoundError:
+                pass
+
+def read_regime_cache(path=REGIME_CACHE_FILE, now=None):
+    """
+    저장된 시장 상태 (없거나 손상되면 None)
     
-    logger.info("시장 상태 분석 중...")
+    Returns:
+        dict: check_market_regime 결과 + 'expired' (유효 기한 경과 또는 기한 정보가 없는 이전 형식)
+    """
+    path = Path(path)
+    if not path.exists():
+        return None
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            cache = json.load(f)
+    except Exception as e:
+        logger.warning(f"캐시 읽기 실패: {e}")
+        return None
+    now = pd.Timestamp.now(tz=MARKET_TIMEZONE) if now is None else pd.Timestamp(now)
+    if now.tzinfo is None:
+        now = now.tz_localize(MARKET_TIMEZONE)
+    valid_until = cache.get('valid_until')
+    cache['expired'] = valid_until is None or now >= pd.Timestamp(valid_until)
+    return cache
+
+def _write_regime_cache(result, path=REGIME_CACHE_FILE):
+    """원자적 저장 (임시 파일 → 교체) - 다른 프로세스는 항상 완성된 파일만 읽음"""
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = path.with_name(f'{path.name}.{os.getpid()}.tmp')
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(result, f, indent=2, ensure_ascii=False)
+    os.replace(tmp_path, path)
+
+def _local_closes(hist):
+    """yfinance 일봉 → 종가 Series (index=현지 날짜)"""
+    index = hist.index.tz_localize(None) if hist.index.tz is not None else hist.index
+    return pd.Series(hist['Close'].to_numpy(), index=index.normalize())
+
+def _align_vix(spy, vix):
+    """SPY 거래일 기준 지수 이력 DataFrame (VIX는 당일 또는 직전 종가)"""
+    history = pd.DataFrame({'spy': spy})
+    if vix is None or vix.empty:
+        history['vix'] = np.nan
+    else:
+        history['vix'] = vix.reindex(vix.index.union(history.index)).ffill().reindex(history.index)
+    return history
+
+def _update_index_bars(store):
+    """
+    지수 일봉 갱신 - 호출하는 쪽에서 _cache_lock을 잡은 상태로 호출
     
-    # SPY (S&P 500) 데이터 가져오기
-    spy_data = get_market_data('^GSPC', days=250)
-    spy_price = None
-    spy_ma200 = None
-    spy_ma120 = None
+    다른 프로세스가 먼저 갱신했을 수 있으므로 메모리 사본을 버리고 저장본을 다시 읽은 뒤 갱신합니다.
+    """
+    tickers = list(INDEX_TICKERS.values())
+    store.invalidate(tickers)
+    store.update(tickers)
+
+def load_index_history(session=None, update=True, store=None):
+    """
+    session 마감까지의 지수 종가 (로컬 일봉 저장소)
     
-    if spy_data is not None:
-        spy_price = spy_data['Close'].iloc[-1]
-        spy_ma200 = calculate_moving_average(spy_data, 200)
-        spy_ma120 = calculate_moving_average(spy_data, 120)
-    else:
-        logger.warning("SPY 데이터를 가져올 수 없습니다. 기본값 사용")
+    update=True면 마지막 저장일 이후 일봉만 추가로 조회합니다 (처음에만 bar_store.SEED_PERIOD 조회).
+    갱신은 _cache_lock 안에서만 호출하세요 (check_market_regime).
+    session 이후의 진행 중인 일봉(장중 부분 봉)은 제외합니다.
     
-    # VIX 데이터 가져오기
-    vix_data = get_market_data('^VIX', days=30)
-    vix = None
+    Returns:
+        DataFrame: index=거래일 (현지 날짜), 컬럼 spy, vix / SPY 일봉이 없으면 None
+    """
+    from bar_store import get_bar_store
     
-    if vix_data is not None:
-        vix = vix_data['Close'].iloc[-1]
-    else:
-        logger.warning("VIX 데이터를 가져올 수 없습니다. 기본값 사용")
+    store = store or get_bar_store()
+    if update:
+        _update_index_bars(store)
+    session = last_completed_session() if session is None else pd.Timestamp(session).normalize()
     
-    # 데이터가 하나도 없으면 None 반환
-    if spy_price is None and vix is None:
-        logger.error("SPY와 VIX 데이터를 모두 가져올 수 없습니다.")
+    closes = {}
+    for name, ticker in INDEX_TICKERS.items():
+        bars = store.daily(ticker)
+        closes[name] = None if bars is None else bars['Close'][bars.index <= session]
+    if closes['spy'] is None or closes['spy'].empty:
         return None
+    return _align_vix(closes['spy'], closes['vix'])
+
+def evaluate_regime(history, vix_threshold=20):
+    """
+    지수 이력의 마지막 거래일 기준 시장 상태 (check_market_regime / get_historical_market_regime 공용)
+    
+    - SPY < MA200 → 약세장
+    - SPY < MA120 AND VIX > vix_threshold → 약세장
+    - MA200을 계산할 이력이 없으면 정상으로 가정
+    
+    Returns:
+        dict: hold_cash, spy_price, spy_ma200, spy_ma120, vix, vix_threshold, date, reason (없는 값은 0.0)
+    """
+    spy = history['spy']
+    vix_value = history['vix'].iloc[-1]
+    spy_price = spy.iloc[-1]
+    spy_ma200 = spy.iloc[-REGIME_LONG_WINDOW:].mean() if len(spy) >= REGIME_LONG_WINDOW else None
+    spy_ma120 = spy.iloc[-REGIME_SHORT_WINDOW:].mean() if len(spy) >= REGIME_SHORT_WINDOW else None
+    vix_value = None if pd.isna(vix_value) else vix_value
     
-    # 약세장 판단
     hold_cash = False
-    reason = ""
-    
-    # SPY와 MA200/MA120 데이터가 모두 있는 경우
-    if spy_price is not None and spy_ma200 is not None:
-        if spy_price < spy_ma200:
-            hold_cash = True
-            reason = "SPY < MA200 (약세장)"
-            logger.warning(f"⚠️ 약세장 감지: {reason}")
-        elif spy_ma120 is not None and spy_price < spy_ma120 and vix is not None and vix > vix_threshold:
-            hold_cash = True
-            reason = f"SPY < MA120 AND VIX > {vix_threshold} (변동성 과열)"
-            logger.warning(f"⚠️ 약세장 감지: {reason}")
-        else:
-            reason = "정상 (강세장)"
-            logger.info(f"✅ 강세장: {reason}")
-    else:
+    if spy_ma200 is None:
         # 데이터가 부족한 경우 보수적으로 정상으로 판단
         reason = "데이터 부족 (정상으로 가정)"
-        logger.warning(f"⚠️ {reason}")
+    elif spy_price < spy_ma200:
+        hold_cash = True
+        reason = "SPY < MA200 (약세장)"
+    elif spy_ma120 is not None and spy_price < spy_ma120 and vix_value is not None and vix_value > vix_threshold:
+        hold_cash = True
+        reason = f"SPY < MA120 AND VIX > {vix_threshold} (변동성 과열)"
+    else:
+        reason = "정상 (강세장)"
     
-    # 결과 생성 (None 값은 0으로 처리)
-    result = {
+    return {
         'hold_cash': hold_cash,
-        'spy_price': float(spy_price) if spy_price is not None else 0.0,
+        'spy_price': float(spy_price),
         'spy_ma200': float(spy_ma200) if spy_ma200 is not None else 0.0,
         'spy_ma120': float(spy_ma120) if spy_ma120 is not None else 0.0,
-        'vix': float(vix) if vix is not None else 0.0,
+        'vix': float(vix_value) if vix_value is not None else 0.0,
         'vix_threshold': vix_threshold,
-        'date': today,
-        'timestamp': datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
+        'date': history.index[-1].strftime('%Y-%m-%d'),
         'reason': reason
     }
+
+def check_market_regime(vix_threshold=20, use_cache=True, breadth=None, breadth_threshold=BREADTH_THRESHOLD,
+                        now=None):
+    """
+    시장 상태 체크 (약세장/강세장) - 마지막으로 마감된 미국 정규장 세션 기준
     
-    # 캐시 저장
-    try:
-        cache_file.parent.mkdir(parents=True, exist_ok=True)
-        with open(cache_file, 'w', encoding='utf-8') as f:
-            json.dump(result, f, indent=2, ensure_ascii=False)
-        logger.info("시장 상태 캐시 저장")
-    except Exception as e:
-        logger.warning(f"캐시 저장 실패: {e}")
+    조건:
+    - SPY < MA200 OR (SPY < MA120 AND VIX > 20) → 약세장 (hold_cash = True)
+    - 시장 폭이 주어지면: MA200 위 종목 비율 < breadth_threshold → 약세장
+    - 그 외 → 강세장 (hold_cash = False)
+    
+    캐시 (DATA_DIR/market_regime_cache.json):
+    - 결과는 세션(session)에 묶이고 다음 세션 마감(valid_until)까지 유효 → 장 시작 전 실행과
+      마감 후 실행은 서로 다른 세션 값을 사용
+    - 갱신 시 지수 일봉은 로컬 일봉 저장소에 마지막 저장일 이후 일봉만 추가 조회
+    - 프로세스 간 잠금 + 원자적 저장으로 main / 대시보드 / 스케줄러가 안전하게 공유
+    
+    Args:
+        vix_threshold: VIX 임계값 (기본: 20)
+        use_cache: 캐시 사용 여부
+        breadth: 오늘 시장 폭 (breadth.current_breadth 결과, None이면 지수 조건만 사용)
+        breadth_threshold: MA200 위 종목 비율 하한 (%)
+        now: 기준 시각 (기본: 현재)
+    
+    Returns:
+        dict: {
+            'hold_cash': bool,
+            'spy_price': float,
+            'spy_ma200': float,
+            'spy_ma120': float,
+            'vix': float,
+            'date': str (지수 마지막 거래일),
+            'session': str (기준 세션),
+            'valid_until': str (유효 기한, ISO 시각),
+            'reason': str
+        }
+    """
+    session = last_completed_session(now)
+    session_str = session.strftime('%Y-%m-%d')
+    
+    with _cache_lock():
+        # 캐시 확인 (같은 세션·같은 임계값·같은 시장 폭이면 재사용)
+        # 시장 폭 없이 호출하면 시장 폭 조건이 반영된 캐시는 쓰지 않음 (반대도 마찬가지)
+        if use_cache:
+            cache = read_regime_cache(now=now)
+            if (cache is not None and cache.get('session') == session_str
+                    and cache.get('vix_threshold') == vix_threshold
+                    and cache.get('breadth') == breadth
+                    and (breadth is None or cache.get('breadth_threshold') == breadth_threshold)):
+                logger.info(f"캐시된 시장 상태 사용 ({session_str} 세션, {cache.get('valid_until')}까지 유효)")
+                cache.pop('expired', None)
+                return cache
+        
+        logger.info(f"시장 상태 분석 중... ({session_str} 세션 마감 기준)")
+        history = load_index_history(session)
+        if history is None:
+            logger.error("SPY 데이터를 가져올 수 없습니다.")
+            return None
+        if history['vix'].isna().iloc[-1]:
+            logger.warning("VIX 데이터를 가져올 수 없습니다. 기본값 사용")
+        
+        result = evaluate_regime(history, vix_threshold)
+        if result['hold_cash']:
+            logger.warning(f"⚠️ 약세장 감지: {result['reason']}")
+        elif result['spy_ma200'] == 0.0:
+            logger.warning(f"⚠️ {result['reason']}")
+        else:
+            logger.info(f"✅ 강세장: {result['reason']}")
+        if breadth is not None:
+            reason = result['reason']
+            apply_breadth_filter(result, breadth, breadth_threshold)
+            if result['reason'] != reason:
+                logger.warning(f"⚠️ 약세장 감지: {result['reason']}")
+        
+        result.update({
+            'session': session_str,
+            'valid_until': session_valid_until(session).isoformat(),
+            'timestamp': datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+        })
+        
+        # 캐시 저장
+        try:
+            _write_regime_cache(result)
+            logger.info("시장 상태 캐시 저장")
+        except Exception as e:
+            logger.warning(f"캐시 저장 실패: {e}")
     
     return result
 
-def get_historical_market_regime(date_str, vix_threshold=20):
+def get_historical_market_regime(date_str, vix_threshold=20, breadth=None, breadth_threshold=BREADTH_THRESHOLD):
     """
     특정 날짜의 시장 상태 체크 (백테스팅용)
     
+    로컬 일봉 저장소의 지수 이력이 해당 날짜를 덮으면 저장소에서 계산하고(네트워크 조회 없음),
+    그렇지 않은 과거 날짜만 yfinance로 직접 조회합니다.
+    
     Args:
         date_str: 날짜 문자열 (YYYY-MM-DD)
         vix_threshold: VIX 임계값
+        breadth: 기간 전체 시장 폭 (breadth.build_breadth 결과 DataFrame, None이면 지수 조건만 사용)
+        breadth_threshold: MA200 위 종목 비율 하한 (%)
     
     Returns:
         dict: 시장 상태 정보 (check_market_regime와 동일)
     """
     try:
         target_date = datetime.strptime(date_str, '%Y-%m-%d')
-        end_date = target_date + timedelta(days=1)
-        start_date = target_date - timedelta(days=250)
-        
-        # SPY 데이터 가져오기
-        spy = yf.Ticker('^GSPC')
-        spy_data = spy.history(start=start_date, end=end_date)
-        
-        if spy_data.empty or len(spy_data) < 200:
-            logger.warning(f"{date_str}: SPY 데이터 부족")
-            return None
-        
-        # VIX 데이터 가져오기
-        vix = yf.Ticker('^VIX')
-        vix_data = vix.history(start=start_date, end=end_date)
+        history = _stored_history(target_date)
         
-        if vix_data.empty:
-            logger.warning(f"{date_str}: VIX 데이터 없음")
-            return None
-        
-        # 해당 날짜의 가격
-        spy_price = spy_data['Close'].iloc[-1]
-        vix_value = vix_data['Close'].iloc[-1]
-        
-        # 이동평균 계산
-        spy_ma200 = spy_data['Close'].rolling(window=200).mean().iloc[-1]
-        spy_ma120 = spy_data['Close'].rolling(window=120).mean().iloc[-1]
+        if history is None:
+            end_date = target_date + timedelta(days=1)
+            start_date = target_date - timedelta(days=REGIME_HISTORY_DAYS)
+            
+            # SPY 데이터 가져오기
+            spy = yf.Ticker('^GSPC')
+            spy_data = spy.history(start=start_date, end=end_date)
+            
+            if spy_data.empty or len(spy_data) < 200:
+                logger.warning(f"{date_str}: SPY 데이터 부족")
+                return None
+            
+            # VIX 데이터 가져오기
+            vix = yf.Ticker('^VIX')
+            vix_data = vix.history(start=start_date, end=end_date)
+            
+            if vix_data.empty:
+                logger.warning(f"{date_str}: VIX 데이터 없음")
+                return None
+            
+            history = _align_vix(_local_closes(spy_data), _local_closes(vix_data))
         
-        # 약세장 판단
-        hold_cash = False
-        reason = ""
-        
-        if spy_price < spy_ma200:
-            hold_cash = True
-            reason = "SPY < MA200 (약세장)"
-        elif spy_price < spy_ma120 and vix_value > vix_threshold:
-            hold_cash = True
-            reason = f"SPY < MA120 AND VIX > {vix_threshold} (변동성 과열)"
-        else:
-            reason = "정상 (강세장)"
-        
-        return {
-            'hold_cash': hold_cash,
-            'spy_price': float(spy_price),
-            'spy_ma200': float(spy_ma200),
-            'spy_ma120': float(spy_ma120),
-            'vix': float(vix_value),
-            'vix_threshold': vix_threshold,
-            'date': date_str,
-            'reason': reason
-        }
+        result = evaluate_regime(history, vix_threshold)
+        result['date'] = date_str
+        if breadth is not None:
+            from breadth import breadth_as_of
+            apply_breadth_filter(result, breadth_as_of(breadth, target_date), breadth_threshold)
+        return result
     except Exception as e:
         logger.error(f"{date_str} 시장 상태 체크 실패: {e}")
         return None
 
+def _stored_history(target_date):
+    """
+    target_date까지의 로컬 지수 이력 (MA200 이력과 target_date 일봉이 모두 있을 때만, 아니면 None)
+    
+    저장소가 target_date보다 오래되었으면 프로세스당 세션마다 한 번만 갱신을 시도합니다
+    (일일 리포트·대시보드와 같은 잠금 안에서 갱신).
+    """
+    from bar_store import get_bar_store
+    
+    store = get_bar_store()
+    target = pd.Timestamp(target_date).normalize()
+    last_date = store.last_date(INDEX_TICKERS['spy'])
+    session = last_completed_session()
+    if (last_date is None or last_date < target) and target <= session and session not in _INDEX_REFRESHED:
+        _INDEX_REFRESHED.add(session)
+        with _cache_lock():
+            _update_index_bars(store)
+        last_date = store.last_date(INDEX_TICKERS['spy'])
+    if last_date is None or last_date < target:
+        return None
+    history = load_index_history(target, update=False, store=store)
+    if history is None or len(history) < REGIME_LONG_WINDOW or history['vix'].isna().iloc[-1]:
+        return None
+    return history
+
+def fetch_regime_history(start_date, end_date=None, max_window=REGIME_LONG_WINDOW):
+    """
+    임계값 스윕용 지수 이력 (SPY·VIX 각각 한 번만 조회)
+    
+    Args:
+        start_date: 평가 시작일 (이동평균 계산을 위해 max_window 거래일만큼 앞서 조회)
+        end_date: 종료일 (기본: 오늘)
+        max_window: 스윕할 가장 긴 이동평균 기간
+    
+    Returns:
+        DataFrame: index=거래일 (SPY 기준, 현지 날짜), 컬럼 spy, vix (VIX는 당일 또는 직전 종가) / 실패 시 None
+    """
+    end_date = end_date or datetime.now()
+    # 거래일 → 달력 일수 여유 (주말·휴장일, REGIME_HISTORY_DAYS와 같은 규칙)
+    fetch_start = start_date - timedelta(days=int(max_window * 1.5) + 30)
+    
+    closes = {}
+    for name, ticker in INDEX_TICKERS.items():
+        try:
+            hist = yf.Ticker(ticker).history(start=fetch_start, end=end_date + timedelta(days=1))
+        except Exception as e:
+            logger.error(f"{ticker} 데이터 가져오기 실패: {e}")
+            return None
+        if hist.empty:
+            logger.error(f"{ticker}: 데이터를 가져올 수 없습니다.")
+            return None
+        closes[name] = _local_closes(hist)
+    
+    history = _align_vix(closes['spy'], closes['vix'])
+    logger.info(f"지수 이력: {history.index[0].strftime('%Y-%m-%d')} ~ {history.index[-1].strftime('%Y-%m-%d')} "
+                f"({len(history)}일)")
+    return history
+
+def regime_sweep(history, long_windows=(REGIME_LONG_WINDOW,), short_windows=(REGIME_SHORT_WINDOW,),
+                 vix_thresholds=(VIX_THRESHOLD,)):
+    """
+    (장기 MA, 단기 MA, VIX 임계값) 조합별 hold_cash 마스크 (전 기간 한 번에 계산)
+    
+    규칙은 check_market_regime / get_historical_market_regime과 같습니다.
+    - SPY < MA(장기) → 현금 보유
+    - 아니면 SPY < MA(단기) 그리고 VIX > 임계값 → 현금 보유
+    - 장기 MA를 계산할 이력이 부족한 날은 정상(현금 보유 안 함)으로 판단
+    
+    Args:
+        history: fetch_regime_history 결과 (spy, vix 컬럼)
+        long_windows / short_windows: 이동평균 기간 목록 (거래일)
+        vix_thresholds: VIX 임계값 목록
+    
+    Returns:
+        DataFrame: index=거래일, 컬럼=MultiIndex (long_window, short_window, vix_threshold), 값=hold_cash (bool)
+    """
+    spy = history['spy'].to_numpy(dtype=float)
+    vix = history['vix'].to_numpy(dtype=float)
+    long_windows, short_windows = list(long_windows), list(short_windows)
+    vix_thresholds = [float(threshold) for threshold in vix_thresholds]
+    
+    # 기간별 이동평균은 한 번씩만 계산 (장기/단기 목록에 같은 기간이 있어도 공유)
+    below = {}
+    for window in dict.fromkeys(long_windows + short_windows):
+        ma = history['spy'].rolling(window=window).mean().to_numpy()
+        below[window] = (spy < ma, ~np.isnan(ma))
+    
+    below_long = np.stack([below[w][0] for w in long_windows], axis=1)            # (거래일, L)
+    has_long = np.stack([below[w][1] for w in long_windows], axis=1)
+    below_short = np.stack([below[w][0] for w in short_windows], axis=1)          # (거래일, S)
+    with np.errstate(invalid='ignore'):
+        vix_above = vix[:, None] > np.asarray(vix_thresholds)[None, :]              # (거래일, T)
+    
+    # (거래일, L, S, T) 브로드캐스트
+    hold_cash = (below_long[:, :, None, None]
+                 | (has_long[:, :, None, None] & below_short[:, None, :, None] & vix_above[:, None, None, :]))
+    
+    columns = pd.MultiIndex.from_product([long_windows, short_windows, vix_thresholds],
+                                         names=['long_window', 'short_window', 'vix_threshold'])
+    return pd.DataFrame(hold_cash.reshape(len(spy), -1), index=history.index, columns=columns)
+
+def evaluate_regime_sweep(history, hold_cash, start_date=None, risk_free_rate=0.0):
+    """
+    조합별 필터 성과 (SPY 보유, hold_cash 다음 거래일은 현금 - 전날 종가 기준 신호)
+    
+    Args:
+        history: fetch_regime_history 결과
+        hold_cash: regime_sweep 결과
+        start_date: 평가 시작일 (기본: 전체 - 이동평균 준비 구간 포함)
+        risk_free_rate: 샤프비율 무위험 수익률 (연, 현금 구간 수익은 0으로 가정)
+    
+    Returns:
+        DataFrame: index=조합, 컬럼 cash_days_pct, switches, total_return, annualized_return, mdd, sharpe_ratio
+                   (수익률/MDD는 %) - 마지막 행 'buy_and_hold'는 필터 없는 SPY
+    """
+    from performance_metrics import TRADING_DAYS_PER_YEAR
+    
+    spy = history['spy'].to_numpy(dtype=float)
+    returns = np.zeros(len(spy))
+    returns[1:] = spy[1:] / spy[:-1] - 1
+    # 전날 신호로 오늘 보유 여부 결정
+    held = np.ones(hold_cash.shape, dtype=bool)
+    held[1:] = ~hold_cash.to_numpy()[:-1]
+    
+    rows = np.ones(len(spy), dtype=bool)
+    if start_date is not None:
+        rows = history.index >= pd.Timestamp(start_date)
+        rows[np.argmax(rows)] = False  # 시작일 당일 수익률은 제외 (기준점)
+    
+    # 마지막 열 = 필터 없는 SPY
+    strategy = np.concatenate([np.where(held, returns[:, None], 0.0),
+                               returns[:, None]], axis=1)[rows]
+    signals = np.concatenate([hold_cash.to_numpy(), np.zeros((len(spy), 1), dtype=bool)], axis=1)[rows]
+    
+    values = np.cumprod(1 + strategy, axis=0)
+    peaks = np.maximum.accumulate(np.maximum(values, 1.0), axis=0)
+    days = (history.index[rows][-1] - history.index[rows][0]).days if rows.sum() > 1 else 0
+    period_rf = (1 + risk_free_rate) ** (1 / TRADING_DAYS_PER_YEAR) - 1
+    excess = strategy - period_rf
+    std = excess.std(axis=0, ddof=1) if len(excess) > 1 else np.zeros(strategy.shape[1])
+    with np.errstate(divide='ignore', invalid='ignore'):
+        sharpe = np.where(std > 0, excess.mean(axis=0) / std * np.sqrt(TRADING_DAYS_PER_YEAR), 0.0)
+        annualized = (values[-1] ** (365 / days) - 1) * 100 if days > 0 else np.zeros(strategy.shape[1])
+    
+    index = pd.Index(list(hold_cash.columns) + ['buy_and_hold'], name='config', tupleize_cols=False)
+    return pd.DataFrame({
+        'cash_days_pct': signals.mean(axis=0) * 100,
+        'switches': (np.diff(signals.astype(np.int8), axis=0) != 0).sum(axis=0),
+        'total_return': (values[-1] - 1) * 100,
+        'annualized_return': annualized,
+        'mdd': ((values - peaks) / peaks).min(axis=0) * 100,
+        'sharpe_ratio': sharpe
+    }, index=index)
+
 if __name__ == "__main__":
     # 테스트
     print("=== 시장 필터 테스트 ===")
@@ -0,0 +1,265 @@
+"""
+모멘텀 순위 엔진 (Cross-Sectional Momentum Ranking)
+(거래일 × 종목) 가격 패널 위에서 모든 선정일의 과거 수익률과 상위 N개 종목을 한 번에 계산
+
+- 평가 구간: 거래일 수(lookback) 또는 달력 일수(window_days) 기준
+- 구간 시작/끝 행은 searchsorted로 한 번에 찾고, 수익률은 (선정일 × 종목) 배열 연산
+- 상위 N개는 행별 argpartition 후 N개만 정렬
+- 평가 구간 내 실거래일 수는 valid 마스크 누적합으로 계산 (min_periods 필터)
+- 디스크 패널(PanelStore)은 ChunkedMomentumRanker가 선정일 평가 구간만 종목 블록별로 읽어 계산
+
+Look-Ahead Bias 방지: include_date=False면 선정일 당일 종가도 사용하지 않습니다.
+"""
+import numpy as np
+import pandas as pd
+
+
+def top_n_indices(scores, n):
+    """
+    행별 상위 n개 열 인덱스 (점수 내림차순)
+    
+    Args:
+        scores: (행 × 종목) 점수 배열 - NaN은 순위에서 제외
+        n: 선정할 종목 수
+    
+    Returns:
+        (indices, valid): (행 × n) 열 인덱스, 유효 여부 마스크
+    """
+    scores = np.where(np.isnan(scores), -np.inf, scores)
+    n = min(n, scores.shape[1])
+    if n <= 0:
+        empty = np.empty((scores.shape[0], 0), dtype=np.int64)
+        return empty, empty.astype(bool)
+    
+    part = np.argpartition(-scores, n - 1, axis=1)[:, :n]
+    order = np.argsort(-np.take_along_axis(scores, part, axis=1), axis=1, kind='stable')
+    indices = np.take_along_axis(part, order, axis=1)
+    valid = np.take_along_axis(scores, indices, axis=1) > -np.inf
+    return indices, valid
+
+
+class MomentumRanker:
+    """
+    가격 패널 기반 모멘텀 순위
+    
+    Args:
+        panel: PricePanel
+        lookback: 평가 기간 (거래일 수) - window_days가 없을 때 사용
+        window_days: 달력 기준 평가 기간 (일) - [선정일 - window_days, 선정일] 구간의
+                     첫 종가 → 마지막 종가 수익률
+        min_periods: 평가 구간 내 최소 실거래일 수
+        include_date: False면 선정일 당일 종가를 제외 (선정일 이전 데이터만 사용)
+    """
+    
+    def __init__(self, panel, lookback=63, window_days=None, min_periods=30, include_date=True):
+        self.panel = panel
+        self.lookback = lookback
+        self.window_days = window_days
+        self.min_periods = min_periods
+        self.include_date = include_date
+        # 실거래일 누적 개수 (앞에 0행 추가 → 구간 [a, b] 개수 = cum[b+1] - cum[a])
+        self._valid_cum = np.vstack([
+            np.zeros((1, panel.values.shape[1]), dtype=np.int64),
+            np.cumsum(panel.valid, axis=0)
+        ])
+        # 각 행 이후(포함) 종목별 첫 실거래일 행 (없으면 거래일 수)
+        n_rows = len(panel.values)
+        first_valid = np.where(panel.valid, np.arange(n_rows)[:, None], n_rows)
+        self._next_valid = np.minimum.accumulate(first_valid[::-1], axis=0)[::-1]
+    
+    def _timestamps(self, dates, offset_days=0):
+        """선정일(- offset_days)을 패널 시간대로 변환 (날짜 연산은 시간대 적용 전에 수행)"""
+        dates = pd.DatetimeIndex(pd.to_datetime(list(dates))) - pd.Timedelta(days=offset_days)
+        tz = self.panel.dates.tz
+        if tz is not None and dates.tz is None:
+            dates = dates.tz_localize(tz)
+        return dates
+
+    def rows(self, dates):
+        """
+        선정일별 평가 구간의 (시작 행, 끝 행) 배열
+        
+        끝 행은 선정일 이전(include_date면 포함) 마지막 거래일, 데이터가 없으면 -1
+        """
+        side = 'right' if self.include_date else 'left'
+        end_rows = self.panel.dates.searchsorted(self._timestamps(dates), side=side) - 1
+        if self.window_days is not None:
+            window_start = self._timestamps(dates, self.window_days)
+            start_rows = self.panel.dates.searchsorted(window_start, side='left')
+        else:
+            start_rows = end_rows - self.lookback
+        return np.asarray(start_rows, dtype=np.int64), np.asarray(end_rows, dtype=np.int64)
+    
+    def returns(self, dates, tickers=None):
+        """
+        선정일별 전 종목 평가 구간 수익률 (%)
+        
+        Args:
+            dates: 선정일 리스트
+            tickers: 순위 후보 종목 (없으면 패널 전 종목) - 나머지 열은 NaN
+        
+        Returns:
+            (len(dates) × 종목) 배열 - 데이터 부족 종목은 NaN
+        """
+        start_rows, end_rows = self.rows(dates)
+        ok = (start_rows >= 0) & (end_rows > start_rows)
+        start = np.where(ok, start_rows, 0)
+        end = np.where(ok, end_rows, 0)
+        
+        # 시작가는 구간 안의 종목별 첫 실거래일 종가
+        values = self.panel.values
+        start_idx = self._start_index(start)
+        start_prices = np.take_along_axis(values, np.minimum(start_idx, len(values) - 1), axis=0)
+        end_prices = values[end]
+        counts = self._valid_cum[end + 1] - self._valid_cum[start]
+        
+        with np.errstate(divide='ignore', invalid='ignore'):
+            perf = (end_prices - start_prices) / start_prices * 100
+        usable = (ok[:, None] & (start_idx <= end[:, None]) & (counts >= self.min_periods)
+                  & (start_prices > 0) & np.isfinite(perf))
+        if tickers is not None:
+            usable &= np.isin(np.asarray(self.panel.tickers, dtype=object), list(tickers))
+        return np.where(usable, perf, np.nan)
+    
+    def _start_index(self, start_rows):
+        """(선정일 × 종목) 평가 구간 시작 행 - 시작 행 이후 첫 실거래일"""
+        if len(self.panel.values) == 0:
+            return np.zeros((len(start_rows), self.panel.values.shape[1]), dtype=np.int64)
+        return self._next_valid[start_rows]
+    
+    def trailing_returns(self):
+        """
+        모든 거래일의 거래일 기준(lookback) 과거 수익률 (%)
+        
+        Returns:
+            (거래일 × 종목) 배열 - 앞쪽 lookback 행과 데이터 부족 칸은 NaN
+        """
+        values = self.panel.values
+        perf = np.full(values.shape, np.nan)
+        if len(values) <= self.lookback:
+            return perf
+        
+        counts = self._valid_cum[self.lookback + 1:] - self._valid_cum[:-self.lookback - 1]
+        start_prices = values[:-self.lookback]
+        with np.errstate(divide='ignore', invalid='ignore'):
+            perf[self.lookback:] = (values[self.lookback:] - start_prices) / start_prices * 100
+        perf[self.lookback:][(counts < self.min_periods) | ~(start_prices > 0)] = np.nan
+        return perf
+    
+    def select(self, dates, top_n=10, tickers=None):
+        """
+        여러 선정일의 상위 N개 종목을 한 번에 선정
+        
+        Returns:
+            선정일별 티커 리스트의 리스트 (유효 종목이 N개 미만이면 있는 만큼)
+        """
+        indices, valid = top_n_indices(self.returns(dates, tickers), top_n)
+        tickers = np.asarray(self.panel.tickers, dtype=object)
+        return [tickers[idx[ok]].tolist() for idx, ok in zip(indices, valid)]
+    
+    def rank(self, date, top_n=10, tickers=None):
+        """
+        한 선정일의 상위 N개 종목 상세 (tickers: 순위 후보 종목, 없으면 전 종목)
+        
+        Returns:
+            [{'ticker', 'performance', 'start_price', 'end_price', 'start_date', 'end_date'}, ...]
+        """
+        start_rows, end_rows = self.rows([date])
+        perf = self.returns([date], tickers)
+        indices, valid = top_n_indices(perf, top_n)
+        
+        records = []
+        start_idx = self._start_index(np.maximum(start_rows, 0))[0]
+        for col in indices[0][valid[0]]:
+            # 구간 첫 실거래일 종가 → 끝 행 종가 (끝 행이 결측이면 직전 종가)
+            start_row, end_row = start_idx[col], end_rows[0]
+            records.append({
+                'ticker': self.panel.tickers[col],
+                'performance': float(perf[0, col]),
+                'start_price': float(self.panel.values[start_row, col]),
+                'end_price': float(self.panel.values[end_row, col]),
+                'start_date': self.panel.dates[start_row].strftime('%Y-%m-%d'),
+                'end_date': self.panel.dates[end_row].strftime('%Y-%m-%d')
+            })
+        return records
+
+
+class ChunkedMomentumRanker(MomentumRanker):
+    """
+    디스크 패널(PanelStore) 기반 모멘텀 순위 - 메모리에 올릴 수 없는 대형 유니버스용
+    
+    선정일마다 평가 구간(date block)만 종목 블록 단위로 읽어 블록별 MomentumRanker로 수익률을 구하고,
+    블록 결과를 한 행으로 모은 뒤 전 종목 기준 상위 N개를 선정합니다.
+    평가 구간 밖 데이터는 수익률에 영향을 주지 않으므로 결과는 메모리 패널의 MomentumRanker와 같습니다.
+    
+    Args:
+        store: PanelStore
+        (나머지는 MomentumRanker와 동일)
+    """
+    
+    def __init__(self, store, lookback=63, window_days=None, min_periods=30, include_date=True):
+        self.panel = store
+        self.lookback = lookback
+        self.window_days = window_days
+        self.min_periods = min_periods
+        self.include_date = include_date
+    
+    def _block_rankers(self, date):
+        """
+        선정일 평가 구간의 종목 블록별 순위 엔진
+        
+        Returns:
+            [(cols, MomentumRanker), ...] (평가 구간이 없으면 [])
+        """
+        start_rows, end_rows = self.rows([date])
+        start, end = int(start_rows[0]), int(end_rows[0])
+        if start < 0 or end <= start:
+            return []
+        rankers = []
+        for k in range(self.panel.block_count):
+            window = self.panel.window(start, end, k)
+            ranker = MomentumRanker(window, lookback=end - start, window_days=self.window_days,
+                                    min_periods=self.min_periods, include_date=self.include_date)
+            rankers.append((self.panel.block(k)[0], ranker))
+        return rankers
+    
+    def _returns_row(self, block_rankers, date, tickers=None):
+        perf = np.full(len(self.panel.tickers), np.nan)
+        for cols, ranker in block_rankers:
+            perf[cols] = ranker.returns([date], tickers)[0]
+        return perf
+    
+    def returns(self, dates, tickers=None):
+        """선정일별 전 종목 평가 구간 수익률 (%) - MomentumRanker.returns와 동일"""
+        rows = [self._returns_row(self._block_rankers(date), date, tickers) for date in dates]
+        return np.vstack(rows) if rows else np.empty((0, len(self.panel.tickers)))
+    
+    def trailing_returns(self):
+        """
+        모든 거래일의 거래일 기준(lookback) 과거 수익률 (%) - MomentumRanker.trailing_returns와 동일
+        
+        종목 블록마다 전 기간을 읽어 블록별로 계산하므로 메모리에는 한 블록과 결과 배열만 올립니다.
+        """
+        perf = np.full(self.panel.shape, np.nan)
+        if len(self.panel) == 0:
+            return perf
+        for k in range(self.panel.block_count):
+            window = self.panel.window(0, len(self.panel) - 1, k)
+            ranker = MomentumRanker(window, lookback=self.lookback, min_periods=self.min_periods)
+            perf[:, self.panel.block(k)[0]] = ranker.trailing_returns()
+        return perf
+    
+    def rank(self, date, top_n=10, tickers=None):
+        """한 선정일의 상위 N개 종목 상세 (MomentumRanker.rank와 같은 형식)"""
+        block_rankers = self._block_rankers(date)
+        perf = self._returns_row(block_rankers, date, tickers)[None, :]
+        indices, valid = top_n_indices(perf, top_n)
+        
+        records = []
+        for col in indices[0][valid[0]]:
+            for cols, ranker in block_rankers:
+                if cols.start <= col < cols.stop:
+                    # 블록 안에서 해당 종목만 후보로 두면 같은 구간·같은 값으로 상세를 구함
+                    records.extend(ranker.rank(date, top_n=1, tickers=[self.panel.tickers[col]]))
+                    break
+        return records
@@ -0,0 +1,327 @@
+"""
+디스크 가격 패널 (On-Disk Panel Store)
+메모리에 다 올릴 수 없는 대형 유니버스(수천 종목 × 수십 년)의 (거래일 × 종목) 패널을
+종목 블록 단위 .npy 파일로 저장하고, 필요한 구간만 메모리 맵으로 읽음
+
+- 저장: {directory}/meta.json (종목·시간대·블록 크기, 조회 기간·요청 종목 풀), dates.npy (UTC ns),
+        values_{k}.npy / valid_{k}.npy (k번째 종목 블록의 거래일 × 종목 배열)
+- 블록 안은 행 우선 배열 → 날짜 구간(date block)을 읽으면 연속된 영역만 디스크에서 읽음
+- 값 규칙은 PricePanel과 동일: 거래일 = 전 종목 날짜 합집합, 결측 구간은 직전 종가, valid 마스크 보존
+- 생성: 종목 블록별로 가격을 조회하고, 날짜 합집합을 구한 뒤 블록마다 정렬하여 저장
+  (한 번에 한 블록만 메모리에 올림)
+
+PricePanel과 같은 조회 인터페이스(dates, tickers, index, locate, prices_as_of)를 제공하므로
+PortfolioEngine 가격 훅과 ChunkedMomentumRanker에 그대로 사용할 수 있고,
+결과는 같은 데이터를 메모리에 올린 PricePanel 경로와 동일합니다.
+"""
+import json
+import shutil
+import time
+from pathlib import Path
+import numpy as np
+import pandas as pd
+from backtest_engine import TickerIndex
+from price_panel import PricePanel, fetch_price_panel
+from progress import ProgressTracker, log_progress
+from logger import get_logger
+from config import DATA_DIR
+
+logger = get_logger()
+
+PANEL_STORE_DIR = Path(DATA_DIR) / 'panels'
+
+# 기본 종목 블록 크기 (열 수) / 날짜 블록 크기 (행 수)
+DEFAULT_BLOCK_SIZE = 500
+DEFAULT_CHUNK_ROWS = 64
+
+
+def _block_file(directory, kind, k):
+    return Path(directory) / f'{kind}_{k:04d}.npy'
+
+
+def _save_array(path, array):
+    """원자적 저장 (임시 파일 → 교체)"""
+    tmp_path = path.with_name(path.name + '.tmp')
+    with open(tmp_path, 'wb') as f:
+        np.save(f, array)
+    tmp_path.replace(path)
+
+
+def _dates_to_utc_ns(dates):
+    """DatetimeIndex → UTC 기준 datetime64[ns] 배열 (시간대가 없으면 그대로)"""
+    dates = pd.DatetimeIndex(dates)
+    if dates.tz is not None:
+        dates = dates.tz_convert('UTC').tz_localize(None)
+    return dates.as_unit('ns').values
+
+
+class PanelStore:
+    """
+    디스크에 저장된 (거래일 × 종목) 가격 패널
+    
+    Args:
+        directory: 저장 디렉토리 (write_panel_store / build_panel_store로 생성)
+        chunk_rows: 과거 방향으로 실거래일을 찾을 때 한 번에 읽는 행 수
+    """
+    
+    def __init__(self, directory, chunk_rows=DEFAULT_CHUNK_ROWS):
+        self.directory = Path(directory)
+        with open(self.directory / 'meta.json', 'r', encoding='utf-8') as f:
+            meta = json.load(f)
+        self.meta = meta
+        self.tickers = list(meta['tickers'])
+        self.index = TickerIndex(self.tickers)
+        self.block_size = int(meta['block_size'])
+        self.chunk_rows = max(1, int(chunk_rows))
+        
+        dates = pd.DatetimeIndex(np.load(self.directory / 'dates.npy'))
+        if meta.get('tz'):
+            dates = dates.tz_localize('UTC').tz_convert(meta['tz'])
+        self.dates = dates
+        self._blocks = {}
+    
+    @staticmethod
+    def exists(directory):
+        return (Path(directory) / 'meta.json').exists()
+    
+    def __len__(self):
+        return len(self.dates)
+    
+    @property
+    def shape(self):
+        return len(self.dates), len(self.tickers)
+    
+    @property
+    def block_count(self):
+        return -(-len(self.tickers) // self.block_size)
+    
+    def block(self, k):
+        """
+        k번째 종목 블록
+        
+        Returns:
+            (cols, values, valid): 패널 열 범위(slice), 메모리 맵 종가/마스크 배열 (거래일 × 블록 종목)
+        """
+        if k not in self._blocks:
+            self._blocks[k] = (
+                np.load(_block_file(self.directory, 'values', k), mmap_mode='r'),
+                np.load(_block_file(self.directory, 'valid', k), mmap_mode='r')
+            )
+        start = k * self.block_size
+        cols = slice(start, min(start + self.block_size, len(self.tickers)))
+        return (cols,) + self._blocks[k]
+    
+    def blocks(self):
+        """종목 블록 순회: (cols, values, valid)"""
+        for k in range(self.block_count):
+            yield self.block(k)
+    
+    def window(self, start_row, end_row, k=None):
+        """
+        [start_row, end_row] 날짜 구간을 메모리 PricePanel로 읽기
+        
+        Args:
+            k: 종목 블록 번호 (None이면 전 종목 - 작은 패널에서만 사용)
+        """
+        rows = slice(start_row, end_row + 1)
+        blocks = self.blocks() if k is None else [self.block(k)]
+        parts = [(cols, np.array(values[rows]), np.array(valid[rows])) for cols, values, valid in blocks]
+        tickers = [t for cols, _, _ in parts for t in self.tickers[cols]]
+        if len(parts) == 1:
+            values, valid = parts[0][1], parts[0][2]
+        else:
+            values = np.hstack([p[1] for p in parts])
+            valid = np.hstack([p[2] for p in parts])
+        return PricePanel(self.dates[rows], tickers, values, valid)
+    
+    def to_panel(self):
+        """전체를 메모리 PricePanel로 읽기 (메모리에 들어가는 크기일 때만)"""
+        return self.window(0, len(self.dates) - 1)
+    
+    def locate(self, date):
+        """date 이전(포함) 마지막 거래일의 위치 (없으면 -1)"""
+        date = pd.Timestamp(date)
+        if self.dates.tz is not None and date.tzinfo is None:
+            date = date.tz_localize(self.dates.tz)
+        return int(self.dates.searchsorted(date, side='right')) - 1
+    
+    def prices_as_of(self, date, max_age_days=None):
+        """
+        date 시점 전 종목 종가 (PricePanel.prices_as_of와 같은 결과)
+        
+        종목 블록마다 date 행부터 과거 방향으로 chunk_rows 행씩 읽으며
+        종목별 마지막 실거래일을 찾고, 모든 종목을 찾았거나 max_age_days 경계에 닿으면 멈춥니다.
+        
+        Returns:
+            종가 배열 (열 순서 = 종목 ID) - 데이터가 없거나 오래된 종목은 NaN
+        """
+        i = self.locate(date)
+        prices = np.full(len(self.tickers), np.nan)
+        if i < 0:
+            return prices
+        
+        lower = 0
+        if max_age_days is not None:
+            # 날짜 연산은 시간대 적용 전에 수행 (DST 전환일 1시간 오차 방지)
+            cutoff = pd.Timestamp(date) - pd.Timedelta(days=max_age_days)
+            if self.dates.tz is not None and cutoff.tzinfo is None:
+                cutoff = cutoff.tz_localize(self.dates.tz)
+            lower = int(self.dates.searchsorted(cutoff, side='left'))
+        
+        for cols, values, valid in self.blocks():
+            block_prices = prices[cols]
+            missing = np.ones(cols.stop - cols.start, dtype=bool)
+            stop = i + 1
+            while stop > lower and missing.any():
+                begin = max(lower, stop - self.chunk_rows)
+                chunk_valid = np.asarray(valid[begin:stop])
+                found = missing & chunk_valid.any(axis=0)
+                if found.any():
+                    # 구간 안 종목별 마지막 실거래일 행
+                    last = len(chunk_valid) - 1 - np.argmax(chunk_valid[::-1], axis=0)
+                    found_cols = np.flatnonzero(found)
+                    block_prices[found_cols] = np.asarray(values[begin:stop])[last[found_cols], found_cols]
+                    missing &= ~found
+                stop = begin
+            prices[cols] = block_prices
+        return prices
+
+
+def write_panel_store(directory, blocks, dates, block_size=DEFAULT_BLOCK_SIZE, meta=None):
+    """
+    종목 블록 패널들을 공통 거래일로 정렬하여 디스크 패널로 저장
+    
+    Args:
+        directory: 저장 디렉토리 (기존 내용은 교체)
+        blocks: 결측 미보정(fill=False) PricePanel 블록을 차례로 돌려주는 iterable
+                - 블록마다 공통 거래일에 맞춘 뒤 직전 종가로 채움 (PricePanel.from_series와 동일)
+        dates: 공통 거래일 (전 블록 날짜 합집합)
+        block_size: 저장 블록 크기 (열 수)
+        meta: meta.json에 함께 기록할 항목 (조회 기간, 요청 종목 풀 등)
+    
+    Returns:
+        PanelStore
+    """
+    directory = Path(directory)
+    if directory.exists():
+        shutil.rmtree(directory)
+    directory.mkdir(parents=True)
+    
+    dates = pd.DatetimeIndex(dates)
+    utc_dates = _dates_to_utc_ns(dates)
+    tickers = []
+    pending_values, pending_valid = [], []
+    count = 0
+    
+    def flush(width):
+        nonlocal pending_values, pending_valid, count
+        values = np.hstack(pending_values)
+        valid = np.hstack(pending_valid)
+        _save_array(_block_file(directory, 'values', count), np.ascontiguousarray(values[:, :width]))
+        _save_array(_block_file(directory, 'valid', count), np.ascontiguousarray(valid[:, :width]))
+        pending_values, pending_valid = [values[:, width:]], [valid[:, width:]]
+        count += 1
+    
+    for panel in blocks:
+        if panel is None or not panel.tickers:
+            continue
+        # 블록 원본(실거래일만) → 공통 거래일 정렬 → 직전 종가 채움
+        raw = np.where(panel.valid, panel.values, np.nan)
+        frame = pd.DataFrame(raw, index=_dates_to_utc_ns(panel.dates)).reindex(utc_dates)
+        pending_valid.append(frame.notna().to_numpy())
+        pending_values.append(frame.ffill().to_numpy(dtype=float))
+        tickers.extend(panel.tickers)
+        while sum(v.shape[1] for v in pending_values) >= block_size:
+            flush(block_size)
+    if sum(v.shape[1] for v in pending_values):
+        flush(block_size)
+    
+    np.save(directory / 'dates.npy', utc_dates)
+    with open(directory / 'meta.json', 'w', encoding='utf-8') as f:
+        json.dump({
+            **(meta or {}),
+            'tickers': tickers,
+            'tz': str(dates.tz) if dates.tz is not None else None,
+            'block_size': block_size,
+            'shape': [len(dates), len(tickers)],
+            'created_at': time.strftime('%Y-%m-%d %H:%M:%S')
+        }, f, ensure_ascii=False)
+    logger.info(f"디스크 패널 저장: {directory} ({len(dates)}일 × {len(tickers)}종목, 블록 {count}개)")
+    return PanelStore(directory)
+
+
+def panel_to_store(panel, directory, block_size=DEFAULT_BLOCK_SIZE):
+    """메모리 PricePanel을 디스크 패널로 저장"""
+    raw = np.where(panel.valid, panel.values, np.nan)
+    blocks = (
+        PricePanel(panel.dates, panel.tickers[start:start + block_size],
+                   raw[:, start:start + block_size], panel.valid[:, start:start + block_size])
+        for start in range(0, len(panel.tickers), block_size)
+    )
+    return write_panel_store(directory, blocks, panel.dates, block_size)
+
+
+def build_panel_store(tickers, start_date, end_date, directory, block_size=DEFAULT_BLOCK_SIZE,
+                      progress=None):
+    """
+    종목 블록 단위로 가격을 조회하여 디스크 패널 생성
+    
+    1단계: 블록별 조회 결과(실거래일만)를 임시 파일로 저장하며 거래일 합집합 계산
+    2단계: 블록마다 합집합 거래일에 맞춰 채운 뒤 저장 (메모리에는 한 블록씩만)
+    
+    결과는 같은 종목을 fetch_price_panel로 한 번에 조회한 패널과 같습니다.
+    meta.json에는 조회 기간(start_date, end_date)과 요청 종목 풀(pool)을 기록합니다
+    (데이터가 없는 종목은 tickers에서 빠지므로 재사용 여부는 pool로 판단).
+    
+    Args:
+        tickers: 종목 리스트
+        start_date, end_date: 조회 기간 (포함)
+        directory: 저장 디렉토리
+        block_size: 조회/저장 블록 크기 (종목 수)
+        progress: 진행률 콜백 (progress.ProgressTracker 이벤트 - 종목 단위)
+    
+    Returns:
+        PanelStore (데이터가 있는 종목이 없으면 None)
+    """
+    directory = Path(directory)
+    staging = directory.with_name(directory.name + '.staging')
+    if staging.exists():
+        shutil.rmtree(staging)
+    staging.mkdir(parents=True)
+    
+    tracker = ProgressTracker(len(tickers), '디스크 패널 조회',
+                              [progress, log_progress(every_fraction=0.05, every_seconds=60)])
+    union = None
+    tz = None
+    staged = []
+    try:
+        for start in range(0, len(tickers), block_size):
+            block_tickers = tickers[start:start + block_size]
+            panel = fetch_price_panel(block_tickers, start_date, end_date, fill=False, progress_every=0)
+            tracker.advance(len(block_tickers), message=f"{start + len(block_tickers)}종목")
+            if panel is None:
+                continue
+            path = staging / f'block_{len(staged):04d}.pkl'
+            pd.to_pickle(panel, path)
+            staged.append(path)
+            block_dates = _dates_to_utc_ns(panel.dates)
+            union = block_dates if union is None else np.union1d(union, block_dates)
+            if tz is None:
+                tz = panel.dates.tz
+            elif panel.dates.tz is not None and str(panel.dates.tz) != str(tz):
+                tz = 'UTC'
+        
+        if not staged:
+            return None
+        dates = pd.DatetimeIndex(union)
+        if tz is not None:
+            dates = dates.tz_localize('UTC').tz_convert(tz)
+        meta = {
+            'start_date': pd.Timestamp(start_date).strftime('%Y-%m-%d'),
+            'end_date': pd.Timestamp(end_date).strftime('%Y-%m-%d'),
+            'pool': list(tickers)
+        }
+        return write_panel_store(directory, (pd.read_pickle(path) for path in staged), dates, block_size,
+                                 meta=meta)
+    finally:
+        shutil.rmtree(staging, ignore_errors=True)
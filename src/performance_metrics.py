@@ -0,0 +1,361 @@
+"""
+성과 지표 모듈 (Performance Metrics)
+모든 백테스팅 엔진이 공유하는 NumPy 기반 성과 지표 계산
+
+- 수익률 단위는 기존 엔진과 동일하게 퍼센트(%) 기준
+- 입력은 숫자 리스트, NumPy 배열 또는 {'return': ...} 딕셔너리 리스트 모두 허용
+- 롤링/누적(expanding) 지표는 루프 없이 배열 연산으로 계산
+"""
+import numpy as np
+
+TRADING_DAYS_PER_YEAR = 252
+
+
+def _as_array(values, key='return'):
+    """숫자 또는 딕셔너리 리스트를 float 배열로 변환"""
+    if values is None:
+        return np.empty(0, dtype=float)
+    if isinstance(values, np.ndarray):
+        return values.astype(float, copy=False)
+    values = list(values)
+    if values and isinstance(values[0], dict):
+        values = [v[key] for v in values]
+    return np.asarray(values, dtype=float)
+
+
+def _period_rf_pct(risk_free_rate, periods_per_year):
+    """기간당 무위험 수익률 (퍼센트)"""
+    return ((1 + risk_free_rate) ** (1 / periods_per_year) - 1) * 100
+
+
+def calculate_total_return(initial_value, final_value):
+    """총 수익률 (%)"""
+    if initial_value == 0:
+        return 0.0
+    return float((final_value - initial_value) / initial_value * 100)
+
+
+def calculate_annualized_return(initial_value, final_value, days):
+    """연환산 수익률 (%) - 달력 일수 기준"""
+    if days <= 0 or initial_value <= 0 or final_value <= 0:
+        return 0.0
+    return float(((final_value / initial_value) ** (365 / days) - 1) * 100)
+
+
+def calculate_drawdown_series(portfolio_values):
+    """시점별 드로다운 (%) 배열"""
+    values = _as_array(portfolio_values, key='value')
+    if len(values) == 0:
+        return values
+    peaks = np.maximum.accumulate(values)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        drawdowns = np.where(peaks > 0, (values - peaks) / peaks * 100, 0.0)
+    return drawdowns
+
+
+def calculate_mdd(portfolio_values):
+    """최대낙폭 (Maximum Drawdown, %) 계산"""
+    values = _as_array(portfolio_values, key='value')
+    if len(values) < 2:
+        return 0.0
+    return float(min(calculate_drawdown_series(values).min(), 0.0))
+
+
+def calculate_drawdown_duration(portfolio_values):
+    """
+    최장 드로다운 기간 (기간 수)
+    
+    고점을 기록한 뒤 그 고점을 회복하기까지 걸린 최장 기간.
+    끝까지 회복하지 못한 드로다운도 포함합니다.
+    """
+    values = _as_array(portfolio_values, key='value')
+    if len(values) < 2:
+        return 0
+    peaks = np.maximum.accumulate(values)
+    at_peak = values >= peaks
+    # 각 시점에서 마지막 고점의 인덱스
+    idx = np.arange(len(values))
+    last_peak_idx = np.maximum.accumulate(np.where(at_peak, idx, 0))
+    return int((idx - last_peak_idx).max())
+
+
+def calculate_volatility(returns, periods_per_year=None, ddof=1):
+    """
+    수익률 변동성 (표준편차, %)
+    
+    Args:
+        returns: 기간 수익률 (%)
+        periods_per_year: 지정 시 연환산 (예: 일간 252, 월간 12)
+        ddof: 자유도 보정 (표본 1, 모집단 0)
+    """
+    r = _as_array(returns)
+    if len(r) <= ddof:
+        return 0.0
+    vol = float(np.std(r, ddof=ddof))
+    if periods_per_year:
+        vol *= periods_per_year ** 0.5
+    return vol
+
+
+def calculate_sharpe_ratio(returns, risk_free_rate=0.05, periods_per_year=TRADING_DAYS_PER_YEAR):
+    """샤프비율 (연환산) 계산"""
+    r = _as_array(returns)
+    if len(r) < 2:
+        return 0.0
+    std_dev = np.std(r, ddof=1)
+    if std_dev == 0:
+        return 0.0
+    excess = r.mean() - _period_rf_pct(risk_free_rate, periods_per_year)
+    return float(excess / std_dev * (periods_per_year ** 0.5))
+
+
+def calculate_sortino_ratio(returns, risk_free_rate=0.05, periods_per_year=TRADING_DAYS_PER_YEAR):
+    """소르티노비율 (연환산) - 하방 편차만 위험으로 간주"""
+    r = _as_array(returns)
+    if len(r) < 2:
+        return 0.0
+    period_rf = _period_rf_pct(risk_free_rate, periods_per_year)
+    downside = np.minimum(r - period_rf, 0.0)
+    downside_dev = np.sqrt(np.mean(downside ** 2))
+    if downside_dev == 0:
+        return 0.0
+    return float((r.mean() - period_rf) / downside_dev * (periods_per_year ** 0.5))
+
+
+def calculate_calmar_ratio(annualized_return, mdd):
+    """칼마비율 = 연환산 수익률 / |MDD|"""
+    if mdd == 0:
+        return 0.0
+    return float(annualized_return / abs(mdd))
+
+
+def calculate_win_rate(returns):
+    """승률 계산 (수익 기간 / 전체 기간, %)"""
+    r = _as_array(returns)
+    if len(r) == 0:
+        return 0.0
+    return float(np.count_nonzero(r > 0) / len(r) * 100)
+
+
+def _sliding(r, window):
+    """길이 window의 슬라이딩 윈도우 뷰 (복사 없음)"""
+    return np.lib.stride_tricks.sliding_window_view(r, window)
+
+
+def rolling_sharpe_ratio(returns, window, risk_free_rate=0.0, periods_per_year=TRADING_DAYS_PER_YEAR):
+    """
+    롤링 샤프비율
+    
+    Returns:
+        길이 len(returns) - window + 1 배열 (i번째 값은 returns[i:i+window] 기준)
+    """
+    r = _as_array(returns)
+    if len(r) < window or window < 2:
+        return np.empty(0, dtype=float)
+    windows = _sliding(r, window)
+    mean = windows.mean(axis=1)
+    std = windows.std(axis=1, ddof=1)
+    excess = mean - _period_rf_pct(risk_free_rate, periods_per_year)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        sharpe = np.where(std > 0, excess / std * (periods_per_year ** 0.5), 0.0)
+    return sharpe
+
+
+def rolling_volatility(returns, window, periods_per_year=None):
+    """롤링 변동성 (%)"""
+    r = _as_array(returns)
+    if len(r) < window or window < 2:
+        return np.empty(0, dtype=float)
+    vol = _sliding(r, window).std(axis=1, ddof=1)
+    if periods_per_year:
+        vol = vol * periods_per_year ** 0.5
+    return vol
+
+
+def rolling_mdd(portfolio_values, window):
+    """롤링 최대낙폭 (%) - 각 윈도우 내부 고점 기준"""
+    values = _as_array(portfolio_values, key='value')
+    if len(values) < window or window < 2:
+        return np.empty(0, dtype=float)
+    windows = _sliding(values, window)
+    peaks = np.maximum.accumulate(windows, axis=1)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        drawdowns = np.where(peaks > 0, (windows - peaks) / peaks * 100, 0.0)
+    return np.minimum(drawdowns.min(axis=1), 0.0)
+
+
+def expanding_sharpe_ratio(returns, risk_free_rate=0.0, periods_per_year=TRADING_DAYS_PER_YEAR, min_periods=2):
+    """누적(expanding) 샤프비율 - min_periods 미만 구간은 NaN"""
+    r = _as_array(returns)
+    n = np.arange(1, len(r) + 1)
+    csum = np.cumsum(r)
+    csum_sq = np.cumsum(r ** 2)
+    mean = csum / n
+    with np.errstate(divide='ignore', invalid='ignore'):
+        var = (csum_sq - n * mean ** 2) / (n - 1)
+        std = np.sqrt(np.maximum(var, 0.0))
+        excess = mean - _period_rf_pct(risk_free_rate, periods_per_year)
+        sharpe = np.where(std > 0, excess / std * (periods_per_year ** 0.5), 0.0)
+    sharpe[n < max(min_periods, 2)] = np.nan
+    return sharpe
+
+
+def expanding_volatility(returns, periods_per_year=None, min_periods=2):
+    """누적(expanding) 변동성 (%)"""
+    r = _as_array(returns)
+    n = np.arange(1, len(r) + 1)
+    mean = np.cumsum(r) / n
+    with np.errstate(divide='ignore', invalid='ignore'):
+        var = (np.cumsum(r ** 2) - n * mean ** 2) / (n - 1)
+    vol = np.sqrt(np.maximum(var, 0.0))
+    if periods_per_year:
+        vol = vol * periods_per_year ** 0.5
+    vol[n < max(min_periods, 2)] = np.nan
+    return vol
+
+
+def expanding_mdd(portfolio_values):
+    """누적(expanding) 최대낙폭 (%) - 각 시점까지의 MDD"""
+    return np.minimum.accumulate(calculate_drawdown_series(portfolio_values))
+
+
+def calculate_performance_summary(portfolio_values, returns, days=None,
+                                  risk_free_rate=0.05, periods_per_year=TRADING_DAYS_PER_YEAR):
+    """
+    주요 성과 지표를 한 번에 계산
+    
+    Args:
+        portfolio_values: 포트폴리오 가치 시계열
+        returns: 기간 수익률 (%)
+        days: 달력 기준 기간 일수 (연환산/칼마비율 계산용)
+        risk_free_rate: 연 무위험 수익률
+        periods_per_year: 연간 기간 수 (일간 252, 월간 12)
+    
+    Returns:
+        dict: total_return, annualized_return, mdd, max_drawdown_duration,
+              sharpe_ratio, sortino_ratio, calmar_ratio, win_rate, volatility
+    """
+    values = _as_array(portfolio_values, key='value')
+    initial_value = values[0] if len(values) else 0.0
+    final_value = values[-1] if len(values) else 0.0
+    
+    total_return = calculate_total_return(initial_value, final_value)
+    annualized_return = calculate_annualized_return(initial_value, final_value, days or 0)
+    mdd = calculate_mdd(values)
+    
+    return {
+        'total_return': total_return,
+        'annualized_return': annualized_return,
+        'mdd': mdd,
+        'max_drawdown_duration': calculate_drawdown_duration(values),
+        'sharpe_ratio': calculate_sharpe_ratio(returns, risk_free_rate, periods_per_year),
+        'sortino_ratio': calculate_sortino_ratio(returns, risk_free_rate, periods_per_year),
+        'calmar_ratio': calculate_calmar_ratio(annualized_return, mdd),
+        'win_rate': calculate_win_rate(returns),
+        'volatility': calculate_volatility(returns, periods_per_year)
+    }
+
+
+class StreamingMetrics:
+    """
+    누적 성과 지표 (스트리밍 레코드용, 메모리 일정)
+    
+    가치/수익률을 한 건씩 받아 최종 가치, MDD(고점 추적), 샤프비율(Welford 평균·분산),
+    승률, 최고/최악 기간을 계산합니다. PortfolioEngine.performance와 같은 항목을 돌려줍니다.
+    
+    Args:
+        initial_capital: 초기 자본 (총 수익률 기준)
+    """
+    
+    def __init__(self, initial_capital):
+        self.initial_capital = initial_capital
+        self.final_value = None
+        self.first_date = None
+        self.last_date = None
+        self.count = 0
+        self.values_count = 0
+        self._mean = 0.0
+        self._m2 = 0.0
+        self._wins = 0
+        self._peak = None
+        self._mdd = 0.0
+        self.best_day = None
+        self.worst_day = None
+    
+    def update(self, value, period_return=None, date=None):
+        """
+        기록 한 건 반영
+        
+        Args:
+            value: 포트폴리오 가치
+            period_return: 기간 수익률 (%, 기준점 기록이면 None)
+            date: 기록 날짜 ('YYYY-MM-DD' - 최고/최악 기간 표시용)
+        """
+        self.final_value = value
+        self.values_count += 1
+        if date is not None:
+            self.first_date = self.first_date or date
+            self.last_date = date
+        if self._peak is None or value > self._peak:
+            self._peak = value
+        if self._peak > 0:
+            self._mdd = min(self._mdd, (value - self._peak) / self._peak * 100)
+        
+        if period_return is None:
+            return
+        self.count += 1
+        delta = period_return - self._mean
+        self._mean += delta / self.count
+        self._m2 += delta * (period_return - self._mean)
+        if period_return > 0:
+            self._wins += 1
+        if self.best_day is None or period_return > self.best_day['return']:
+            self.best_day = {'date': date, 'return': period_return, 'value': value}
+        if self.worst_day is None or period_return < self.worst_day['return']:
+            self.worst_day = {'date': date, 'return': period_return, 'value': value}
+    
+    def update_record(self, record):
+        """스트리밍 레코드(date, value, return) 반영"""
+        self.update(record['value'], record.get('return'), record.get('date'))
+    
+    @property
+    def mean_return(self):
+        """기간 수익률 평균 (%)"""
+        return float(self._mean) if self.count else 0.0
+    
+    def volatility(self, periods_per_year=None, ddof=1):
+        """기간 수익률 표준편차 (%) - calculate_volatility와 같은 규칙"""
+        if self.count <= ddof:
+            return 0.0
+        vol = (self._m2 / (self.count - ddof)) ** 0.5
+        if periods_per_year:
+            vol *= periods_per_year ** 0.5
+        return float(vol)
+    
+    def sharpe_ratio(self, risk_free_rate=0.05, periods_per_year=TRADING_DAYS_PER_YEAR):
+        if self.count < 2:
+            return 0.0
+        std_dev = (self._m2 / (self.count - 1)) ** 0.5
+        if std_dev == 0:
+            return 0.0
+        excess = self._mean - _period_rf_pct(risk_free_rate, periods_per_year)
+        return float(excess / std_dev * (periods_per_year ** 0.5))
+    
+    def result(self, days, risk_free_rate=0.05, periods_per_year=TRADING_DAYS_PER_YEAR):
+        """
+        누적 지표 (PortfolioEngine.performance와 같은 형식)
+        
+        Args:
+            days: 달력 기준 기간 일수 (연환산용)
+        """
+        final_value = self.initial_capital if self.final_value is None else self.final_value
+        return {
+            'final_value': final_value,
+            'total_return': calculate_total_return(self.initial_capital, final_value),
+            'annualized_return': calculate_annualized_return(self.initial_capital, final_value, days),
+            'mdd': float(self._mdd) if self.values_count >= 2 else 0.0,
+            'sharpe_ratio': self.sharpe_ratio(risk_free_rate, periods_per_year),
+            'win_rate': self._wins / self.count * 100 if self.count else 0.0,
+            'best_day': self.best_day or {'date': '-', 'return': 0},
+            'worst_day': self.worst_day or {'date': '-', 'return': 0}
+        }
@@ -0,0 +1,200 @@
+"""
+가격 패널 모듈 (Price Panel)
+여러 종목의 종가를 (거래일 × 종목) float 배열 하나로 정렬하여 관리
+
+- 거래일은 전 종목 날짜의 합집합 → 일부 종목의 결측일이 전체 달력을 줄이지 않음
+- 결측 구간은 직전 종가로 채우고(forward-fill), 실제 데이터 여부는 valid 마스크로 보존
+- 상장 전 구간은 NaN으로 남겨 매수 대상에서 제외
+- 종목 열 순서는 TickerIndex ID와 같아 PortfolioEngine 배열과 바로 내적 가능
+- 고가/저가(high/low)는 선택 배열 (ATR 등 High/Low 기반 조건식을 백테스트할 때만 조회)
+"""
+import numpy as np
+import pandas as pd
+import yfinance as yf
+from backtest_engine import TickerIndex
+from progress import ProgressTracker, log_progress
+from logger import get_logger
+
+logger = get_logger()
+
+
+class PricePanel:
+    """
+    (거래일 × 종목) 종가 배열
+    
+    Args:
+        dates: 거래일 인덱스
+        tickers: 종목 리스트 (열 순서)
+        values: (len(dates), len(tickers)) 종가 배열
+        valid: 실제 거래 데이터가 있는 칸 마스크 (기본: NaN이 아닌 칸)
+        high / low: 선택 고가/저가 배열 (values와 같은 모양, 없으면 None)
+    """
+    
+    def __init__(self, dates, tickers, values, valid=None, high=None, low=None):
+        self.dates = pd.DatetimeIndex(dates)
+        self.tickers = list(tickers)
+        self.index = TickerIndex(self.tickers)
+        self.values = np.asarray(values, dtype=float)
+        self.valid = ~np.isnan(self.values) if valid is None else np.asarray(valid, dtype=bool)
+        self.high = None if high is None else np.asarray(high, dtype=float)
+        self.low = None if low is None else np.asarray(low, dtype=float)
+        self._last_valid = None
+    
+    @classmethod
+    def from_series(cls, series_by_ticker, fill=True, high=None, low=None):
+        """
+        종목별 종가 Series로 패널 생성
+        
+        Args:
+            series_by_ticker: {ticker: pd.Series(종가, index=날짜)}
+            fill: True면 결측 구간을 직전 종가로 채움
+            high / low: {ticker: pd.Series(고가/저가)} (선택, 종가 날짜·종목에 맞춰 정렬)
+        """
+        frame = pd.DataFrame(series_by_ticker).sort_index()
+        valid = frame.notna().to_numpy()
+        extremes = {}
+        for name, series in (('high', high), ('low', low)):
+            if series is not None:
+                extreme = pd.DataFrame(series).reindex(index=frame.index, columns=frame.columns)
+                extremes[name] = (extreme.ffill() if fill else extreme).to_numpy(dtype=float)
+        if fill:
+            frame = frame.ffill()
+        return cls(frame.index, frame.columns, frame.to_numpy(dtype=float), valid, **extremes)
+    
+    @classmethod
+    def concat(cls, panels, fill=True):
+        """
+        여러 패널을 거래일 합집합 × 종목 합집합 패널로 합침 (중복 종목은 앞 패널 우선)
+        
+        실거래일 데이터만 옮기고, fill=True면 합친 뒤 다시 직전 종가로 채웁니다.
+        고가/저가는 모든 패널에 있을 때만 유지합니다.
+        """
+        panels = [panel for panel in panels if panel is not None]
+        ohlc = bool(panels) and all(panel.high is not None and panel.low is not None for panel in panels)
+        series_by_ticker, high, low = {}, {}, {}
+        for panel in panels:
+            raw = np.where(panel.valid, panel.values, np.nan)
+            for col, ticker in enumerate(panel.tickers):
+                if ticker not in series_by_ticker:
+                    series_by_ticker[ticker] = pd.Series(raw[:, col], index=panel.dates)
+                    if ohlc:
+                        high[ticker] = pd.Series(np.where(panel.valid[:, col], panel.high[:, col], np.nan), index=panel.dates)
+                        low[ticker] = pd.Series(np.where(panel.valid[:, col], panel.low[:, col], np.nan), index=panel.dates)
+        if not series_by_ticker:
+            return None
+        return cls.from_series(series_by_ticker, fill=fill, high=high if ohlc else None, low=low if ohlc else None)
+    
+    def __len__(self):
+        return len(self.dates)
+    
+    @property
+    def shape(self):
+        return self.values.shape
+    
+    def filled_count(self):
+        """직전 종가로 채운 칸 수"""
+        return int(np.count_nonzero(~self.valid & ~np.isnan(self.values)))
+    
+    def row(self, i):
+        """i번째 거래일의 전 종목 종가 (열 순서 = 종목 ID)"""
+        return self.values[i]
+    
+    def column(self, ticker):
+        """종목의 전 기간 종가"""
+        return self.values[:, self.index.get(ticker)]
+    
+    def price(self, i, ticker):
+        """i번째 거래일 종가 (데이터가 없으면 None)"""
+        ticker_id = self.index.get(ticker)
+        if ticker_id is None:
+            return None
+        price = self.values[i, ticker_id]
+        return None if np.isnan(price) else float(price)
+    
+    def locate(self, date):
+        """date 이전(포함) 마지막 거래일의 위치 (없으면 -1)"""
+        date = pd.Timestamp(date)
+        if self.dates.tz is not None and date.tzinfo is None:
+            date = date.tz_localize(self.dates.tz)
+        return int(self.dates.searchsorted(date, side='right')) - 1
+    
+    def last_valid_rows(self):
+        """(거래일 × 종목) 각 행 이전(포함) 종목별 마지막 실거래일 행 (없으면 -1)"""
+        if self._last_valid is None:
+            rows = np.where(self.valid, np.arange(len(self.dates))[:, None], -1)
+            self._last_valid = np.maximum.accumulate(rows, axis=0) if len(rows) else rows
+        return self._last_valid
+    
+    def prices_as_of(self, date, max_age_days=None):
+        """
+        date 시점 전 종목 종가 (열 순서 = 종목 ID)
+        
+        Args:
+            date: 평가일 (이전(포함) 마지막 거래일 기준)
+            max_age_days: 마지막 실거래일이 이보다 오래되면 NaN (None이면 제한 없음)
+        
+        Returns:
+            종가 배열 - 데이터가 없거나 오래된 종목은 NaN
+        """
+        i = self.locate(date)
+        prices = np.full(len(self.tickers), np.nan)
+        if i < 0:
+            return prices
+        
+        last_rows = self.last_valid_rows()[i]
+        fresh = last_rows >= 0
+        if max_age_days is not None:
+            # 날짜 연산은 시간대 적용 전에 수행 (DST 전환일 1시간 오차 방지)
+            cutoff = pd.Timestamp(date) - pd.Timedelta(days=max_age_days)
+            if self.dates.tz is not None and cutoff.tzinfo is None:
+                cutoff = cutoff.tz_localize(self.dates.tz)
+            fresh &= self.dates[np.maximum(last_rows, 0)] >= cutoff
+        cols = np.flatnonzero(fresh)
+        prices[cols] = self.values[last_rows[cols], cols]
+        return prices
+    
+    def value(self, i, shares):
+        """i번째 거래일 평가액 (보유 수량 배열과 내적)"""
+        return float(np.dot(np.nan_to_num(self.values[i]), shares[:len(self.tickers)]))
+
+
+def fetch_price_panel(tickers, start_date, end_date, fill=True, progress_every=50, progress=None, ohlc=False):
+    """
+    종목별 종가를 한 번씩 조회하여 가격 패널 생성
+    
+    Args:
+        tickers: 종목 리스트
+        start_date: 시작일 (포함)
+        end_date: 종료일 (포함)
+        fill: True면 결측 구간을 직전 종가로 채움
+        progress_every: 진행률 로그 간격 (종목 수)
+        progress: 진행률 콜백 (progress.ProgressTracker 이벤트 - 종목 단위)
+        ohlc: True면 고가/저가도 패널에 보관 (ATR 등 High/Low 기반 조건식 백테스트용)
+    
+    Returns:
+        PricePanel (데이터가 있는 종목이 없으면 None)
+    """
+    callbacks = [progress]
+    if progress_every:
+        callbacks.append(log_progress(every_steps=progress_every))
+    tracker = ProgressTracker(len(tickers), '가격 조회', callbacks)
+    
+    price_data, high, low = {}, {}, {}
+    for ticker in tracker.iterate(tickers):
+        try:
+            hist = yf.Ticker(ticker).history(start=start_date, end=end_date + pd.Timedelta(days=1))
+            if not hist.empty:
+                price_data[ticker] = hist['Close']
+                if ohlc:
+                    high[ticker] = hist['High']
+                    low[ticker] = hist['Low']
+            else:
+                logger.debug(f"{ticker}: 가격 데이터 없음")
+        except Exception as e:
+            logger.debug(f"{ticker}: 가격 데이터 가져오기 실패 - {e}")
+    
+    if not price_data:
+        return None
+    if ohlc:
+        return PricePanel.from_series(price_data, fill=fill, high=high, low=low)
+    return PricePanel.from_series(price_data, fill=fill)
@@ -0,0 +1,143 @@
+"""
+진행률 / 남은 시간 보고 (Progress Reporting)
+백테스트·종목 선정·가격 조회 루프가 공통으로 쓰는 진행률 콜백 인터페이스
+
+- 콜백 형식: callback(event) - event는 dict
+    label: 작업 이름
+    done / total: 처리한 단계 수 / 전체 단계 수
+    fraction: 진행 비율 (0~1)
+    elapsed: 경과 시간 (초)
+    rate: 처리 속도 (단계/초, 이번 실행에서 처리한 단계 기준)
+    eta: 남은 예상 시간 (초, 아직 알 수 없으면 None)
+    message: 단계별 메모 (날짜 등, 없으면 None)
+- 같은 작업에 여러 소비자를 연결: CLI/로그(log_progress), 대시보드(st.progress) 등
+- 콜백이 없으면 ProgressTracker는 시간 측정만 하고 아무것도 호출하지 않음
+"""
+import time
+from logger import get_logger
+
+logger = get_logger()
+
+
+def format_duration(seconds):
+    """초 → 'H:MM:SS' 또는 'M:SS' (None이면 '-')"""
+    if seconds is None:
+        return '-'
+    seconds = int(round(seconds))
+    hours, rest = divmod(seconds, 3600)
+    minutes, seconds = divmod(rest, 60)
+    if hours:
+        return f"{hours}:{minutes:02d}:{seconds:02d}"
+    return f"{minutes}:{seconds:02d}"
+
+
+def format_progress(event):
+    """진행률 이벤트 → 한 줄 요약 문자열"""
+    text = (f"{event['label']} 진행률: {event['done']}/{event['total']} "
+            f"({event['fraction']*100:.1f}%) · {event['rate']:.1f}단계/초 · "
+            f"남은 시간 {format_duration(event['eta'])}")
+    if event.get('message'):
+        text += f" [{event['message']}]"
+    return text
+
+
+class ProgressTracker:
+    """
+    단계 진행률 추적 및 콜백 호출
+    
+    Args:
+        total: 전체 단계 수
+        label: 작업 이름 (로그/화면 표시용)
+        callbacks: 콜백 하나 또는 리스트 (None은 무시)
+        start: 이미 처리한 단계 수 (체크포인트 재개 시 - 속도/ETA는 이번 실행분으로 계산)
+        min_interval: 콜백 최소 호출 간격 (초, 마지막 단계는 항상 호출)
+    """
+    
+    def __init__(self, total, label='', callbacks=None, start=0, min_interval=0.0):
+        if callbacks is None:
+            callbacks = []
+        elif callable(callbacks):
+            callbacks = [callbacks]
+        self.callbacks = [cb for cb in callbacks if cb is not None]
+        self.total = max(int(total), 0)
+        self.label = label
+        self.done = start
+        self.min_interval = min_interval
+        self._start_done = start
+        self._started = time.monotonic()
+        self._last_emit = None
+    
+    def event(self, message=None):
+        """현재 진행률 이벤트"""
+        elapsed = time.monotonic() - self._started
+        processed = self.done - self._start_done
+        rate = processed / elapsed if elapsed > 0 else 0.0
+        remaining = max(self.total - self.done, 0)
+        eta = remaining / rate if rate > 0 else (0.0 if remaining == 0 else None)
+        return {
+            'label': self.label,
+            'done': self.done,
+            'total': self.total,
+            'fraction': self.done / self.total if self.total else 1.0,
+            'elapsed': elapsed,
+            'rate': rate,
+            'eta': eta,
+            'message': message
+        }
+    
+    def advance(self, steps=1, message=None):
+        """steps만큼 진행하고 콜백 호출 (min_interval 이내면 생략)"""
+        self.done += steps
+        if not self.callbacks:
+            return
+        now = time.monotonic()
+        last = self.done >= self.total
+        if not last and self._last_emit is not None and now - self._last_emit < self.min_interval:
+            return
+        self._last_emit = now
+        event = self.event(message)
+        for callback in self.callbacks:
+            callback(event)
+    
+    def iterate(self, items, message=None):
+        """
+        items를 순회하며 항목 처리가 끝날 때마다 한 단계 진행
+        
+        루프 본문이 continue로 넘어가도 진행되고, 예외로 중단되면 진행하지 않습니다.
+        message: 항목 → 메모 문자열 함수 (선택)
+        """
+        for item in items:
+            yield item
+            self.advance(message=message(item) if message else None)
+
+
+def log_progress(every_steps=None, every_fraction=None, every_seconds=None, level='info'):
+    """
+    진행률을 로그로 남기는 콜백 (CLI 스크립트 기본 출력)
+    
+    조건 중 하나라도 만족하면 기록하고, 마지막 단계는 항상 기록합니다.
+    
+    Args:
+        every_steps: N단계마다
+        every_fraction: 진행 비율 간격마다 (예: 0.1 → 10%마다)
+        every_seconds: N초마다 (정체 구간 확인용)
+        level: 로그 레벨
+    """
+    log = getattr(logger, level)
+    state = {'done': 0, 'fraction': 0.0, 'elapsed': 0.0}
+    
+    def crossed(key, value, every):
+        # 이전 기록 이후 간격 경계를 넘었는지
+        return bool(every) and int(value / every) > int(state[key] / every)
+    
+    def callback(event):
+        due = (event['done'] >= event['total']
+               or crossed('done', event['done'], every_steps)
+               or crossed('fraction', event['fraction'] + 1e-9, every_fraction)
+               or crossed('elapsed', event['elapsed'], every_seconds))
+        if not due:
+            return
+        state.update(done=event['done'], fraction=event['fraction'], elapsed=event['elapsed'])
+        log(format_progress(event))
+    
+    return callback
@@ -16,19 +16,21 @@ from datetime import datetime, timedelta
 from pathlib import Path
 import json
 from logger import get_logger
-from finviz_scraper import scrape_all_tickers_with_pagination
-from config import DATA_DIR, RISK_FREE_RATE
+from universe import get_universe_as_of
+from backtest_engine import (
+    PortfolioEngine, FixedCostModel, run_event_loop, rebalance_equal_weight, rebalance_turnover
+)
+from cost_model import create_cost_model
+from data_manager import load_last_business_day_data
+from price_panel import PricePanel
+from progress import ProgressTracker, log_progress
+from config import DATA_DIR, RISK_FREE_RATE, TRANSACTION_FEE, SLIPPAGE, COST_MODEL
 
 logger = get_logger()
 
-# 거래 비용 설정
-TRANSACTION_FEE = 0.002  # 0.2% 수수료
-SLIPPAGE = 0.001  # 0.1% 슬리피지
-TOTAL_TRANSACTION_COST = TRANSACTION_FEE + SLIPPAGE  # 0.3% 총 거래비용
-
 
 def get_top_performers_no_lookahead(screener_type="large", selection_date=None, 
-                                     lookback_months=3, lag_months=1):
+                                     lookback_months=3, lag_months=1, progress=None):
     """
     Look-Ahead Bias 없이 상위 종목 선정
     
@@ -45,6 +47,7 @@ def get_top_performers_no_lookahead(screener_type="large", selection_date=None,
         selection_date: 종목 선정 날짜 (datetime)
         lookback_months: 수익률 평가 기간 (개월)
         lag_months: 지연 기간 (개월) - 미래 정보 방지
+        progress: 종목 평가 진행률 콜백 (progress.ProgressTracker 이벤트)
     
     Returns:
         상위 10개 종목 정보
@@ -62,34 +65,21 @@ def get_top_performers_no_lookahead(screener_type="large", selection_date=None,
     logger.info(f"평가 기간: {evaluation_start.strftime('%Y-%m-%d')} ~ {evaluation_end.strftime('%Y-%m-%d')}")
     logger.info(f"(선정 시점에서 {lag_months}개월 이전 데이터 사용)")
     
-    # 1. 전체 티커 리스트
-    all_tickers_df = scrape_all_tickers_with_pagination(screener_type)
+    # 1. 선정일 시점의 유니버스 (저장된 스냅샷 as-of 조회)
+    tickers = get_universe_as_of(screener_type, selection_date)
     
-    if all_tickers_df is None or len(all_tickers_df) == 0:
+    if len(tickers) == 0:
         logger.error("티커 리스트를 가져올 수 없습니다.")
         return None
     
-    ticker_column = None
-    for col in all_tickers_df.columns:
-        if 'Ticker' in col or 'ticker' in col.lower():
-            ticker_column = col
-            break
-    
-    if ticker_column is None:
-        logger.error("Ticker 컬럼을 찾을 수 없습니다.")
-        return None
-    
-    tickers = all_tickers_df[ticker_column].tolist()
     logger.info(f"총 {len(tickers)}개 티커 분석")
     
     # 2. 각 종목의 과거 수익률 계산 (Look-Ahead Bias 없음)
     performance_data = []
+    tracker = ProgressTracker(len(tickers), '종목 평가', [progress, log_progress(every_steps=50)])
     
-    for i, ticker in enumerate(tickers):
+    for ticker in tracker.iterate(tickers):
         try:
-            if (i + 1) % 50 == 0:
-                logger.info(f"진행률: {i+1}/{len(tickers)} ({(i+1)/len(tickers)*100:.1f}%)")
-            
             stock = yf.Ticker(ticker)
             hist = stock.history(start=evaluation_start, end=evaluation_end + timedelta(days=1))
             
@@ -145,7 +135,8 @@ def get_top_performers_no_lookahead(screener_type="large", selection_date=None,
 
 
 def simulate_realistic_portfolio(tickers, start_date, end_date, initial_capital=10000,
-                                  rebalance_frequency='monthly'):
+                                  rebalance_frequency='monthly', cost_model=None,
+                                  turnover_only=False, progress=None):
     """
     현실적인 포트폴리오 시뮬레이션
     
@@ -159,15 +150,21 @@ def simulate_realistic_portfolio(tickers, start_date, end_date, initial_capital=
         end_date: 종료일 (datetime)
         initial_capital: 초기 자본
         rebalance_frequency: 'weekly' 또는 'monthly'
+        cost_model: 거래 비용 모델 (기본: 수수료 + 고정 슬리피지)
+        turnover_only: True면 전량 청산 없이 목표 비중과의 차이만 매매
+        progress: 시뮬레이션 진행률 콜백 (progress.ProgressTracker 이벤트 - 거래일 단위)
     
     Returns:
         시뮬레이션 결과
     """
+    if cost_model is None:
+        cost_model = FixedCostModel(fee=TRANSACTION_FEE, slippage=SLIPPAGE)
+    
     logger.info(f"=== 현실적인 백테스팅 시작 ===")
     logger.info(f"기간: {start_date.strftime('%Y-%m-%d')} ~ {end_date.strftime('%Y-%m-%d')}")
     logger.info(f"초기 자본: ${initial_capital:,.2f}")
-    logger.info(f"거래 비용: {TOTAL_TRANSACTION_COST*100:.1f}% (수수료 {TRANSACTION_FEE*100:.1f}% + 슬리피지 {SLIPPAGE*100:.1f}%)")
-    logger.info(f"리밸런싱: {rebalance_frequency}")
+    logger.info(f"거래 비용: {cost_model.summary()}")
+    logger.info(f"리밸런싱: {rebalance_frequency}{' (차이분만 매매)' if turnover_only else ''}")
     
     # 모든 종목의 가격 데이터 가져오기
     price_data = {}
@@ -188,37 +185,28 @@ def simulate_realistic_portfolio(tickers, start_date, end_date, initial_capital=
         logger.error("가격 데이터를 가져올 수 없습니다.")
         return None
     
-    # 공통 거래일 찾기
-    common_dates = None
-    for ticker, prices in price_data.items():
-        if common_dates is None:
-            common_dates = set(prices.index)
-        else:
-            common_dates = common_dates.intersection(set(prices.index))
-    
-    common_dates = sorted(list(common_dates))
-    logger.info(f"공통 거래일: {len(common_dates)}일")
+    # 가격 패널 (거래일 × 종목): 일부 종목의 결측일은 직전 종가로 채워 전체 달력 유지
+    panel = PricePanel.from_series(price_data)
+    logger.info(f"거래일: {len(panel)}일 (결측 보정: {panel.filled_count()}칸)")
     
-    if len(common_dates) < 2:
-        logger.error("충분한 공통 거래일이 없습니다.")
+    if len(panel) < 2:
+        logger.error("충분한 거래일이 없습니다.")
         return None
     
-    # 시뮬레이션 변수
-    portfolio_value = initial_capital
-    cash = initial_capital
-    positions = {}  # {ticker: shares}
-    portfolio_history = []
-    daily_returns = []
-    trade_log = []
-    total_transaction_costs = 0
+    # 시뮬레이션 엔진 (거래 비용 모델) - 티커 ID = 패널 열 순서
+    engine = PortfolioEngine(
+        initial_capital,
+        cost_model=cost_model,
+        tickers=panel.tickers
+    )
+    last_rebalance = {'date': None}
     
-    last_rebalance_date = None
+    def price_hook(engine, current_date, i):
+        return panel.row(i)
     
-    # 매일 시뮬레이션
-    for i, current_date in enumerate(common_dates):
-        day_start_value = portfolio_value
-        
+    def select_hook(engine, current_date, i):
         # 리밸런싱 체크
+        last_rebalance_date = last_rebalance['date']
         should_rebalance = False
         if i == 0:  # 첫날은 무조건 매수
             should_rebalance = True
@@ -231,116 +219,24 @@ def simulate_realistic_portfolio(tickers, start_date, end_date, initial_capital=
             if last_rebalance_date is None or (current_date - last_rebalance_date).days >= 6:
                 should_rebalance = True
         
-        # 리밸런싱 실행
-        if should_rebalance:
-            logger.info(f"\n{current_date.strftime('%Y-%m-%d')}: 리밸런싱")
-            
-            # 기존 포지션 청산 (매도)
-            if positions:
-                for ticker, shares in positions.items():
-                    if ticker in price_data:
-                        sell_price = price_data[ticker].loc[current_date]
-                        # 슬리피지 적용 (매도 시 불리하게)
-                        actual_sell_price = sell_price * (1 - SLIPPAGE)
-                        sell_value = shares * actual_sell_price
-                        # 수수료 차감
-                        sell_value_after_fee = sell_value * (1 - TRANSACTION_FEE)
-                        
-                        cash += sell_value_after_fee
-                        transaction_cost = shares * sell_price - sell_value_after_fee
-                        total_transaction_costs += transaction_cost
-                        
-                        trade_log.append({
-                            'date': current_date.strftime('%Y-%m-%d'),
-                            'action': 'SELL',
-                            'ticker': ticker,
-                            'shares': shares,
-                            'price': sell_price,
-                            'cost': transaction_cost
-                        })
-                        
-                        logger.debug(f"  매도: {ticker} {shares:.4f}주 @ ${sell_price:.2f} (비용: ${transaction_cost:.2f})")
-            
-            positions = {}
-            
-            # 새로운 포지션 매수
-            num_stocks = len([t for t in tickers if t in price_data])
-            if num_stocks > 0:
-                allocation_per_stock = cash / num_stocks
-                
-                for ticker in tickers:
-                    if ticker in price_data and allocation_per_stock > 10:  # 최소 $10 이상
-                        buy_price = price_data[ticker].loc[current_date]
-                        # 슬리피지 적용 (매수 시 불리하게)
-                        actual_buy_price = buy_price * (1 + SLIPPAGE)
-                        # 수수료 포함 매수
-                        shares = allocation_per_stock / (actual_buy_price * (1 + TRANSACTION_FEE))
-                        buy_cost = shares * actual_buy_price * (1 + TRANSACTION_FEE)
-                        
-                        if buy_cost <= cash:
-                            positions[ticker] = shares
-                            cash -= buy_cost
-                            transaction_cost = buy_cost - (shares * buy_price)
-                            total_transaction_costs += transaction_cost
-                            
-                            trade_log.append({
-                                'date': current_date.strftime('%Y-%m-%d'),
-                                'action': 'BUY',
-                                'ticker': ticker,
-                                'shares': shares,
-                                'price': buy_price,
-                                'cost': transaction_cost
-                            })
-                            
-                            logger.debug(f"  매수: {ticker} {shares:.4f}주 @ ${buy_price:.2f} (비용: ${transaction_cost:.2f})")
-            
-            last_rebalance_date = current_date
-        
-        # 포트폴리오 가치 계산
-        position_value = 0
-        for ticker, shares in positions.items():
-            if ticker in price_data:
-                current_price = price_data[ticker].loc[current_date]
-                position_value += shares * current_price
+        if not should_rebalance:
+            return None
         
-        portfolio_value = cash + position_value
-        day_return = ((portfolio_value - day_start_value) / day_start_value) * 100 if day_start_value > 0 else 0
-        
-        portfolio_history.append({
-            'date': current_date.strftime('%Y-%m-%d'),
-            'value': portfolio_value,
-            'cash': cash,
-            'positions': len(positions)
-        })
-        
-        daily_returns.append({
-            'date': current_date.strftime('%Y-%m-%d'),
-            'return': day_return,
-            'value': portfolio_value
-        })
+        logger.info(f"\n{current_date.strftime('%Y-%m-%d')}: 리밸런싱")
+        last_rebalance['date'] = current_date
+        return panel.tickers
+    
+    # 매일 시뮬레이션: 기존 포지션 청산 후 동일 비중 재매수 (turnover_only면 차이분만 매매)
+    run_event_loop(engine, panel.dates, price_hook, select_hook=select_hook,
+                   rebalance_hook=rebalance_turnover if turnover_only else rebalance_equal_weight,
+                   progress=progress)
     
     # 성과 지표 계산
-    final_value = portfolio_value
-    total_return = ((final_value - initial_capital) / initial_capital) * 100
-    
-    days = (common_dates[-1] - common_dates[0]).days
-    if days > 0:
-        annualized_return = ((final_value / initial_capital) ** (365 / days) - 1) * 100
-    else:
-        annualized_return = 0
-    
-    # MDD, 샤프비율, 승률 계산
-    mdd = calculate_mdd([h['value'] for h in portfolio_history])
-    returns = [r['return'] for r in daily_returns]
-    sharpe_ratio = calculate_sharpe_ratio(returns, RISK_FREE_RATE)
-    win_rate = calculate_win_rate(daily_returns)
-    
-    if daily_returns:
-        best_day = max(daily_returns, key=lambda x: x['return'])
-        worst_day = min(daily_returns, key=lambda x: x['return'])
-    else:
-        best_day = {'date': '-', 'return': 0}
-        worst_day = {'date': '-', 'return': 0}
+    trading_dates = panel.dates
+    days = (trading_dates[-1] - trading_dates[0]).days
+    metrics = engine.performance(days, RISK_FREE_RATE)
+    trade_log = engine.trade_log
+    total_transaction_costs = engine.total_transaction_costs
     
     # 거래 통계
     buy_trades = [t for t in trade_log if t['action'] == 'BUY']
@@ -348,20 +244,20 @@ def simulate_realistic_portfolio(tickers, start_date, end_date, initial_capital=
     
     result = {
         'tickers': tickers,
-        'start_date': common_dates[0].strftime('%Y-%m-%d'),
-        'end_date': common_dates[-1].strftime('%Y-%m-%d'),
+        'start_date': trading_dates[0].strftime('%Y-%m-%d'),
+        'end_date': trading_dates[-1].strftime('%Y-%m-%d'),
         'initial_capital': initial_capital,
-        'final_value': final_value,
-        'total_return': total_return,
-        'annualized_return': annualized_return,
-        'mdd': mdd,
-        'sharpe_ratio': sharpe_ratio,
-        'win_rate': win_rate,
-        'trading_days': len(common_dates),
-        'best_day': best_day,
-        'worst_day': worst_day,
-        'portfolio_history': portfolio_history,
-        'daily_returns': daily_returns,
+        'final_value': metrics['final_value'],
+        'total_return': metrics['total_return'],
+        'annualized_return': metrics['annualized_return'],
+        'mdd': metrics['mdd'],
+        'sharpe_ratio': metrics['sharpe_ratio'],
+        'win_rate': metrics['win_rate'],
+        'trading_days': len(trading_dates),
+        'best_day': metrics['best_day'],
+        'worst_day': metrics['worst_day'],
+        'portfolio_history': engine.portfolio_history,
+        'daily_returns': engine.daily_returns,
         'trade_log': trade_log,
         'total_trades': len(trade_log),
         'buy_count': len(buy_trades),
@@ -369,66 +265,20 @@ def simulate_realistic_portfolio(tickers, start_date, end_date, initial_capital=
         'total_transaction_costs': total_transaction_costs,
         'transaction_cost_pct': (total_transaction_costs / initial_capital) * 100,
         'rebalance_frequency': rebalance_frequency,
-        'transaction_fee': TRANSACTION_FEE,
-        'slippage': SLIPPAGE
+        'transaction_fee': cost_model.fee,
+        'slippage': cost_model.slippage,
+        'cost_model': type(cost_model).__name__,
+        'cost_params': cost_model.describe(),
+        'turnover_only': turnover_only
     }
     
     return result
 
 
-def calculate_mdd(portfolio_values):
-    """최대낙폭 (Maximum Drawdown) 계산"""
-    if len(portfolio_values) < 2:
-        return 0.0
-    
-    peak = portfolio_values[0]
-    max_drawdown = 0
-    
-    for value in portfolio_values:
-        if value > peak:
-            peak = value
-        
-        drawdown = ((value - peak) / peak) * 100
-        if drawdown < max_drawdown:
-            max_drawdown = drawdown
-    
-    return max_drawdown
-
-
-def calculate_sharpe_ratio(returns, risk_free_rate=0.05):
-    """샤프비율 계산"""
-    if not returns or len(returns) < 2:
-        return 0.0
-    
-    avg_return = sum(returns) / len(returns)
-    variance = sum((r - avg_return) ** 2 for r in returns) / (len(returns) - 1)
-    std_dev = variance ** 0.5
-    
-    if std_dev == 0:
-        return 0.0
-    
-    daily_rf = (1 + risk_free_rate) ** (1/252) - 1
-    daily_rf_pct = daily_rf * 100
-    
-    sharpe = ((avg_return - daily_rf_pct) / std_dev) * (252 ** 0.5)
-    
-    return sharpe
-
-
-def calculate_win_rate(daily_returns):
-    """승률 계산"""
-    if not daily_returns:
-        return 0.0
-    
-    wins = sum(1 for r in daily_returns if r['return'] > 0)
-    total = len(daily_returns)
-    
-    return (wins / total) * 100 if total > 0 else 0.0
-
-
 def run_realistic_backtest(screener_type="large", initial_capital=10000,
                            test_period_months=3, lookback_months=3, lag_months=1,
-                           rebalance_frequency='monthly'):
+                           rebalance_frequency='monthly', cost_model=COST_MODEL,
+                           turnover_only=False):
     """
     현실적인 백테스팅 메인 함수
     
@@ -439,6 +289,9 @@ def run_realistic_backtest(screener_type="large", initial_capital=10000,
         lookback_months: 종목 선정 시 수익률 평가 기간 (개월)
         lag_months: 종목 선정 시 지연 기간 (개월) - Look-Ahead Bias 방지
         rebalance_frequency: 'weekly' 또는 'monthly'
+        cost_model: 'fixed' (수수료 + 고정 슬리피지) 또는 'liquidity' (최근 스냅샷의
+                    거래량/변동성 기반 스프레드 + 시장 충격)
+        turnover_only: True면 목표 비중과의 차이만 매매
     
     Returns:
         백테스팅 결과
@@ -465,13 +318,19 @@ def run_realistic_backtest(screener_type="large", initial_capital=10000,
     
     tickers = top_stocks['tickers']
     
+    # 거래 비용 모델 (유동성 모델은 최근 영업일 스냅샷의 Avg/Rel Volume, Volatility 사용)
+    snapshot = load_last_business_day_data(f"{screener_type}_") if cost_model == 'liquidity' else None
+    model = create_cost_model(cost_model, snapshot)
+    
     # 포트폴리오 시뮬레이션
     result = simulate_realistic_portfolio(
         tickers=tickers,
         start_date=start_date,
         end_date=end_date,
         initial_capital=initial_capital,
-        rebalance_frequency=rebalance_frequency
+        rebalance_frequency=rebalance_frequency,
+        cost_model=model,
+        turnover_only=turnover_only
     )
     
     if result is None:
@@ -488,8 +347,11 @@ def run_realistic_backtest(screener_type="large", initial_capital=10000,
             'lookback_months': lookback_months,
             'lag_months': lag_months,
             'rebalance_frequency': rebalance_frequency,
-            'transaction_fee': TRANSACTION_FEE,
-            'slippage': SLIPPAGE
+            'transaction_fee': model.fee,
+            'slippage': model.slippage,
+            'cost_model': cost_model,
+            'cost_params': model.describe(),
+            'turnover_only': turnover_only
         },
         'run_date': datetime.now().strftime('%Y-%m-%d %H:%M:%S')
     }
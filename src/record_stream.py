@@ -0,0 +1,159 @@
+"""
+스트리밍 백테스트 레코드 소비자 (Record Stream)
+stream_event_loop가 내보내는 기록을 한 건씩 처리하는 도구
+
+- RecordWriter: JSON Lines 파일로 바로 기록 (결과 전체를 메모리에 두지 않음)
+- read_records: JSON Lines 파일을 한 줄씩 읽는 제너레이터
+- truncate_records: 체크포인트 재개 전 재개 날짜 이후 레코드 제거
+- SeriesDownsampler: 차트용 가치/수익률 시계열을 최대 N개 점으로 유지
+  (가득 차면 인접한 두 점을 합치고 간격을 두 배로 - 수익률은 복리로 합산)
+- consume_records: 레코드 스트림을 여러 소비자에 한 번에 전달
+"""
+import json
+import os
+from pathlib import Path
+from data_manager import json_default
+from logger import get_logger
+
+logger = get_logger()
+
+
+class RecordWriter:
+    """
+    레코드를 JSON Lines로 기록
+    
+    Args:
+        path: 출력 파일 경로
+        include_trades: False면 레코드의 trades 필드는 기록하지 않음
+        append: True면 기존 파일 뒤에 이어서 기록 (체크포인트 재개용)
+    
+    줄 단위로 버퍼를 비우므로 중단되어도 체크포인트 시점까지의 레코드는 파일에 남습니다.
+    """
+    
+    def __init__(self, path, include_trades=True, append=False):
+        self.path = Path(path)
+        self.include_trades = include_trades
+        self.append = append
+        self.count = 0
+        self._file = None
+    
+    def __enter__(self):
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._file = open(self.path, 'a' if self.append else 'w', encoding='utf-8', buffering=1)
+        return self
+    
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+    
+    def write(self, record):
+        if not self.include_trades:
+            record = {k: v for k, v in record.items() if k != 'trades'}
+        self._file.write(json.dumps(record, ensure_ascii=False, default=json_default) + '\n')
+        self.count += 1
+    
+    def update_record(self, record):
+        self.write(record)
+    
+    def close(self):
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+            logger.info(f"레코드 저장: {self.path} ({self.count}건)")
+
+
+def read_records(path):
+    """JSON Lines 레코드 파일을 한 줄씩 읽기"""
+    with open(path, 'r', encoding='utf-8') as f:
+        for line in f:
+            if line.strip():
+                yield json.loads(line)
+
+
+def truncate_records(path, before):
+    """
+    before('YYYY-MM-DD') 이전 날짜의 레코드만 남기기 (임시 파일 → 교체, 한 줄씩 처리)
+    
+    Returns:
+        남은 레코드 수 (파일이 없으면 0)
+    """
+    path = Path(path)
+    if not path.exists():
+        return 0
+    tmp_path = path.with_name(f'{path.name}.{os.getpid()}.tmp')
+    kept = 0
+    with open(path, 'r', encoding='utf-8') as src, open(tmp_path, 'w', encoding='utf-8') as dst:
+        for line in src:
+            # 중단 시점에 쓰다 만 마지막 줄은 버림
+            if not line.endswith('\n'):
+                break
+            if line.strip() and json.loads(line)['date'] < before:
+                dst.write(line)
+                kept += 1
+    os.replace(tmp_path, path)
+    return kept
+
+
+class SeriesDownsampler:
+    """
+    차트용 시계열 (최대 max_points개 점, 메모리 일정)
+    
+    각 점은 구간 마지막 레코드의 date/value와 구간 복리 수익률(return, %)을 가집니다.
+    결과는 차트 함수가 쓰는 daily_returns 형식과 같습니다.
+    
+    Args:
+        max_points: 유지할 최대 점 개수
+    """
+    
+    def __init__(self, max_points=2000):
+        self.max_points = max(2, int(max_points))
+        self.points = []
+        self.stride = 1
+        self._pending = None
+    
+    @staticmethod
+    def _merge(first, second):
+        compounded = ((1 + first['return'] / 100) * (1 + second['return'] / 100) - 1) * 100
+        return {'date': second['date'], 'value': second['value'], 'return': compounded}
+    
+    def update_record(self, record):
+        if record.get('return') is None:
+            return
+        point = {'date': record['date'], 'value': record['value'], 'return': record['return']}
+        # 현재 간격(stride)만큼 모아 한 점으로
+        if self._pending is None:
+            self._pending = (point, 1)
+        else:
+            self._pending = (self._merge(self._pending[0], point), self._pending[1] + 1)
+        if self._pending[1] < self.stride:
+            return
+        self.points.append(self._pending[0])
+        self._pending = None
+        
+        if len(self.points) >= self.max_points:
+            merged = [self._merge(self.points[k], self.points[k + 1])
+                      for k in range(0, len(self.points) - 1, 2)]
+            if len(self.points) % 2:
+                merged.append(self.points[-1])
+            self.points = merged
+            self.stride *= 2
+    
+    def series(self):
+        """daily_returns 형식 리스트 (아직 간격을 못 채운 마지막 구간 포함)"""
+        if self._pending is None:
+            return list(self.points)
+        return self.points + [self._pending[0]]
+
+
+def consume_records(records, consumers):
+    """
+    레코드 스트림을 소비자들(update_record 메서드)에 차례로 전달
+    
+    Returns:
+        처리한 레코드 수
+    """
+    count = 0
+    for record in records:
+        for consumer in consumers:
+            consumer.update_record(record)
+        count += 1
+    return count
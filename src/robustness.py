@@ -0,0 +1,241 @@
+"""
+강건성 분석 모듈 (Bootstrap / Monte Carlo)
+백테스팅 결과의 기간 수익률을 재표본화하여 수익률, MDD, 샤프비율의 신뢰구간 계산
+
+- 블록 부트스트랩: 자기상관을 보존하도록 연속 구간(블록) 단위로 복원 추출
+- 리밸런싱 순서 셔플: 같은 수익률을 다른 순서로 경험했을 때의 경로 위험
+- 거래 비용 교란: 경로마다 비용 수준을 무작위로 뽑아 기간 수익률에서 차감
+
+모든 경로는 (경로 수 × 기간 수) 배열 하나로 생성/평가하며, Python 루프를 돌지 않습니다.
+"""
+import numpy as np
+from performance_metrics import TRADING_DAYS_PER_YEAR, _as_array, _period_rf_pct
+from logger import get_logger
+
+logger = get_logger()
+
+ROBUSTNESS_METHODS = ('bootstrap', 'shuffle', 'cost')
+
+# 한 번에 생성할 최대 원소 수 (경로 수 × 기간 수) - 약 400MB(float64) 상한
+MAX_BATCH_ELEMENTS = 50_000_000
+
+
+def extract_period_returns(result):
+    """
+    백테스팅 결과에서 기간 수익률(%)과 연간 기간 수 추출
+    
+    backtester / historical / realistic / smart / flexible / longterm 결과 모두 지원
+    
+    Returns:
+        (np.ndarray, int): 기간 수익률 배열, 연간 기간 수 (일간 252, 월간 12)
+    """
+    if result is None:
+        return np.empty(0, dtype=float), TRADING_DAYS_PER_YEAR
+    
+    # 스크립트별 래핑 구조 ('simulation', 'result') 해제
+    for key in ('simulation', 'result'):
+        if isinstance(result.get(key), dict):
+            result = result[key]
+            break
+    
+    if result.get('daily_returns'):
+        return _as_array(result['daily_returns']), TRADING_DAYS_PER_YEAR
+    if result.get('monthly_returns'):
+        return _as_array(result['monthly_returns']), 12
+    return np.empty(0, dtype=float), TRADING_DAYS_PER_YEAR
+
+
+def estimate_turnover(result, n_positions=10):
+    """
+    거래 내역으로 기간당 평균 회전율 추정
+    
+    거래 1건 = 포트폴리오의 1/n_positions 비중 편도 거래로 보고,
+    매수+매도 2건을 왕복 1회로 계산합니다. 거래 내역이 없으면 1.0 (매 기간 전량 교체)
+    """
+    if result is None:
+        return 1.0
+    for key in ('simulation', 'result'):
+        if isinstance(result.get(key), dict):
+            result = result[key]
+            break
+    
+    trade_log = result.get('trade_log')
+    n_periods = len(result.get('daily_returns') or result.get('monthly_returns') or [])
+    if not trade_log or n_periods == 0:
+        return 1.0
+    tickers = result.get('tickers') or []
+    n_positions = len(tickers) or n_positions
+    return len(trade_log) / 2 / n_positions / n_periods
+
+
+def block_bootstrap_paths(returns, n_paths, block_size=20, rng=None):
+    """
+    원형(circular) 블록 부트스트랩 경로 생성
+    
+    Args:
+        returns: 기간 수익률 (%)
+        n_paths: 생성할 경로 수
+        block_size: 블록 길이 (기간 수)
+        rng: numpy Generator
+    
+    Returns:
+        np.ndarray: (n_paths, len(returns)) 수익률 배열
+    """
+    rng = rng or np.random.default_rng()
+    r = _as_array(returns)
+    n = len(r)
+    block_size = max(1, min(block_size, n))
+    n_blocks = -(-n // block_size)
+    
+    starts = rng.integers(0, n, size=(n_paths, n_blocks))
+    idx = (starts[:, :, None] + np.arange(block_size)) % n
+    idx = idx.reshape(n_paths, n_blocks * block_size)[:, :n]
+    return r[idx]
+
+
+def shuffled_order_paths(returns, n_paths, rng=None):
+    """리밸런싱 순서를 무작위로 섞은 경로 생성 (총 수익률은 동일, 경로 위험만 변화)"""
+    rng = rng or np.random.default_rng()
+    r = _as_array(returns)
+    return rng.permuted(np.broadcast_to(r, (n_paths, len(r))), axis=1)
+
+
+def cost_perturbed_paths(returns, n_paths, cost_range=(0.0, 0.3), turnover=1.0, rng=None):
+    """
+    거래 비용 교란 경로 생성
+    
+    Args:
+        returns: 기간 수익률 (%)
+        n_paths: 생성할 경로 수
+        cost_range: 경로별 왕복 거래 비용 범위 (%, 균등분포)
+        turnover: 기간당 평균 회전율 (1.0 = 매 기간 전량 교체)
+        rng: numpy Generator
+    
+    Returns:
+        np.ndarray: (n_paths, len(returns)) 비용 차감 후 수익률 배열
+    """
+    rng = rng or np.random.default_rng()
+    r = _as_array(returns)
+    path_cost = rng.uniform(cost_range[0], cost_range[1], size=(n_paths, 1))
+    # 같은 경로 안에서도 기간별로 비용이 ±50% 흔들리도록 교란
+    jitter = rng.uniform(0.5, 1.5, size=(n_paths, len(r)))
+    return r - path_cost * jitter * turnover
+
+
+def evaluate_paths(paths, risk_free_rate=0.05, periods_per_year=TRADING_DAYS_PER_YEAR):
+    """
+    경로 배열의 성과 지표를 한 번에 계산
+    
+    Args:
+        paths: (n_paths, n_periods) 수익률 배열 (%)
+    
+    Returns:
+        dict: {'total_return', 'mdd', 'sharpe_ratio'} 각 (n_paths,) 배열
+    """
+    growth = np.cumprod(1 + paths / 100, axis=1)
+    total_return = (growth[:, -1] - 1) * 100
+    
+    # 시작 가치 1.0을 포함하여 낙폭 계산
+    peaks = np.maximum(np.maximum.accumulate(growth, axis=1), 1.0)
+    mdd = np.minimum(((growth - peaks) / peaks * 100).min(axis=1), 0.0)
+    
+    std = paths.std(axis=1, ddof=1)
+    excess = paths.mean(axis=1) - _period_rf_pct(risk_free_rate, periods_per_year)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        sharpe = np.where(std > 0, excess / std * (periods_per_year ** 0.5), 0.0)
+    
+    return {
+        'total_return': total_return,
+        'mdd': mdd,
+        'sharpe_ratio': sharpe
+    }
+
+
+def summarize_distribution(samples, confidence=0.90):
+    """분포 요약 (평균, 중앙값, 신뢰구간 하한/상한)"""
+    alpha = (1 - confidence) / 2 * 100
+    lower, median, upper = np.percentile(samples, [alpha, 50, 100 - alpha])
+    return {
+        'mean': float(np.mean(samples)),
+        'median': float(median),
+        'lower': float(lower),
+        'upper': float(upper),
+        'prob_loss': float(np.mean(samples < 0) * 100)
+    }
+
+
+def _generate_paths(method, returns, n_paths, rng, block_size, cost_range, turnover):
+    """방법별 경로 생성"""
+    if method == 'bootstrap':
+        return block_bootstrap_paths(returns, n_paths, block_size, rng)
+    if method == 'shuffle':
+        return shuffled_order_paths(returns, n_paths, rng)
+    if method == 'cost':
+        return cost_perturbed_paths(returns, n_paths, cost_range, turnover, rng)
+    raise ValueError(f"알 수 없는 강건성 분석 방법: {method}")
+
+
+def run_robustness_analysis(returns, n_paths=10000, methods=ROBUSTNESS_METHODS,
+                            block_size=20, cost_range=(0.0, 0.3), turnover=1.0,
+                            confidence=0.90, risk_free_rate=0.05,
+                            periods_per_year=TRADING_DAYS_PER_YEAR, seed=None,
+                            include_samples=False):
+    """
+    부트스트랩/몬테카를로 강건성 분석
+    
+    Args:
+        returns: 기간 수익률 (%) - 숫자 리스트, 배열 또는 daily_returns 딕셔너리 리스트
+        n_paths: 방법별 경로 수
+        methods: 'bootstrap', 'shuffle', 'cost' 중 선택
+        block_size: 블록 부트스트랩 블록 길이
+        cost_range: 비용 교란 범위 (%)
+        turnover: 기간당 평균 회전율
+        confidence: 신뢰수준 (0.90 → 5% ~ 95% 구간)
+        risk_free_rate: 연 무위험 수익률
+        periods_per_year: 연간 기간 수
+        seed: 난수 시드 (재현용)
+        include_samples: True면 경로별 지표 배열도 반환 (차트용)
+    
+    Returns:
+        dict: {method: {metric: 분포 요약}} + 'original', 'params'
+    """
+    r = _as_array(returns)
+    if len(r) < 2:
+        logger.warning("강건성 분석을 위한 수익률 데이터가 부족합니다.")
+        return None
+    
+    rng = np.random.default_rng(seed)
+    batch_size = max(1, min(n_paths, MAX_BATCH_ELEMENTS // len(r)))
+    
+    original = evaluate_paths(r[None, :], risk_free_rate, periods_per_year)
+    analysis = {
+        'original': {k: float(v[0]) for k, v in original.items()},
+        'params': {
+            'n_paths': n_paths,
+            'n_periods': len(r),
+            'block_size': block_size,
+            'cost_range': list(cost_range),
+            'turnover': turnover,
+            'confidence': confidence,
+            'periods_per_year': periods_per_year,
+            'seed': seed
+        }
+    }
+    
+    for method in methods:
+        batches = []
+        for start in range(0, n_paths, batch_size):
+            size = min(batch_size, n_paths - start)
+            paths = _generate_paths(method, r, size, rng, block_size, cost_range, turnover)
+            batches.append(evaluate_paths(paths, risk_free_rate, periods_per_year))
+        
+        metrics = {k: np.concatenate([b[k] for b in batches]) for k in batches[0]}
+        analysis[method] = {k: summarize_distribution(v, confidence) for k, v in metrics.items()}
+        if include_samples:
+            analysis[method]['samples'] = metrics
+        
+        logger.info(f"강건성 분석 [{method}] {n_paths:,}개 경로: "
+                    f"수익률 {analysis[method]['total_return']['lower']:+.2f}% ~ "
+                    f"{analysis[method]['total_return']['upper']:+.2f}%")
+    
+    return analysis
@@ -0,0 +1,230 @@
+"""
+스크리닝 조건식 (Screening Expressions)
+문자열 조건식을 (거래일 × 종목) 지표 그래프 위의 벡터 연산으로 컴파일
+
+예:
+    close > sma(60) > sma(120)
+    close > ma60 and atr_pct(14) < 5 and not prev(below_ma20)
+
+- 이름: 지표 그래프 입력/선언 지표 (close, high, ma20, atr_pct, breakout, trend_up ...), price = close
+- 함수: sma(n), atr(n), atr_pct(n), prev(식), abs(식)
+- 연산: 비교(연쇄 비교 포함), and / or / not, + - * /, 괄호, 숫자/True/False
+- 전 기간을 한 번에 계산 → 백테스트는 마스크를 인덱싱, 일일 리포트는 종목별 마지막 실거래일 값 사용
+- NaN과의 비교는 False (이동평균 데이터 부족 구간은 조건 불충족)
+- 식이 쓰는 가격 입력(high/low 등)이 그래프에 없으면 ValueError (고가/저가 없이 조회한 가격 패널 등)
+
+파이썬 ast로 파싱하되 위 구문만 허용합니다 (eval 사용 안 함).
+"""
+import ast
+import operator
+from functools import lru_cache
+import numpy as np
+from indicators import INDICATORS, BASE_INPUTS, required_inputs
+
+# 이름 별칭
+ALIASES = {'price': 'close'}
+
+_COMPARE = {
+    ast.Gt: np.greater,
+    ast.GtE: np.greater_equal,
+    ast.Lt: np.less,
+    ast.LtE: np.less_equal,
+    ast.Eq: np.equal,
+    ast.NotEq: np.not_equal
+}
+
+_ARITHMETIC = {
+    ast.Add: operator.add,
+    ast.Sub: operator.sub,
+    ast.Mult: operator.mul,
+    ast.Div: operator.truediv
+}
+
+
+def _window_arg(name, args):
+    """sma(n) 등의 기간 인자 (양의 정수 상수)"""
+    if len(args) != 1 or not isinstance(args[0], ast.Constant) or isinstance(args[0].value, bool) \
+            or not isinstance(args[0].value, int) or args[0].value <= 0:
+        raise ValueError(f"{name}()의 인자는 양의 정수 하나여야 합니다.")
+    return args[0].value
+
+
+def _sma(args):
+    window = _window_arg('sma', args)
+    return lambda graph: graph.moving_average(window)
+
+
+def _atr(args):
+    window = _window_arg('atr', args)
+    return lambda graph: graph.average_true_range(window)
+
+
+def _atr_pct(args):
+    window = _window_arg('atr_pct', args)
+    
+    def evaluate(graph):
+        close = graph.get('close')
+        atr = graph.average_true_range(window)
+        return np.where(close > 0, atr / close * 100, np.where(np.isnan(atr), np.nan, 0.0))
+    return evaluate
+
+
+def _prev(args):
+    if len(args) != 1:
+        raise ValueError("prev()의 인자는 식 하나여야 합니다.")
+    inner = _compile(args[0])
+    
+    def evaluate(graph):
+        value = np.broadcast_to(inner(graph), graph.valid.shape)
+        return graph.previous(value, fill=False if value.dtype == bool else np.nan)
+    return evaluate
+
+
+def _abs(args):
+    if len(args) != 1:
+        raise ValueError("abs()의 인자는 식 하나여야 합니다.")
+    inner = _compile(args[0])
+    return lambda graph: np.abs(inner(graph))
+
+
+# 함수 이름 → 인자 ast 리스트를 받아 evaluate(graph) 함수를 만드는 컴파일러
+FUNCTIONS = {
+    'sma': _sma,
+    'atr': _atr,
+    'atr_pct': _atr_pct,
+    'prev': _prev,
+    'abs': _abs
+}
+
+
+# 함수 이름 → 계산에 쓰는 지표 (필요한 가격 입력 확인용)
+FUNCTION_INPUTS = {
+    'sma': ('close',),
+    'atr': ('true_range',),
+    'atr_pct': ('true_range', 'close')
+}
+
+
+def _required_inputs(tree):
+    """조건식이 사용하는 기본 입력 (close, high, low ...)"""
+    calls = [node for node in ast.walk(tree) if isinstance(node, ast.Call)]
+    function_names = {id(call.func) for call in calls}
+    inputs = {'valid'}
+    for call in calls:
+        for name in FUNCTION_INPUTS.get(call.func.id, ()):
+            inputs |= required_inputs(name)
+    for node in ast.walk(tree):
+        if isinstance(node, ast.Name) and id(node) not in function_names:
+            inputs |= required_inputs(ALIASES.get(node.id, node.id))
+    return inputs
+
+
+def _compile(node):
+    """ast 노드 → evaluate(graph) 함수"""
+    if isinstance(node, ast.Constant) and isinstance(node.value, (bool, int, float)):
+        value = node.value
+        return lambda graph: value
+    
+    if isinstance(node, ast.Name):
+        name = ALIASES.get(node.id, node.id)
+        if name not in INDICATORS and name not in BASE_INPUTS:
+            raise ValueError(f"알 수 없는 지표: {node.id}")
+        return lambda graph: graph.get(name)
+    
+    if isinstance(node, ast.Call):
+        if not isinstance(node.func, ast.Name) or node.func.id not in FUNCTIONS or node.keywords:
+            raise ValueError(f"지원하지 않는 함수: {ast.unparse(node.func)} (사용 가능: {', '.join(FUNCTIONS)})")
+        return FUNCTIONS[node.func.id](node.args)
+    
+    if isinstance(node, ast.BoolOp):
+        parts = [_compile(value) for value in node.values]
+        combine = np.logical_and if isinstance(node.op, ast.And) else np.logical_or
+        
+        def evaluate(graph):
+            result = parts[0](graph)
+            for part in parts[1:]:
+                result = combine(result, part(graph))
+            return result
+        return evaluate
+    
+    if isinstance(node, ast.UnaryOp) and isinstance(node.op, (ast.Not, ast.USub)):
+        operand = _compile(node.operand)
+        if isinstance(node.op, ast.Not):
+            return lambda graph: np.logical_not(operand(graph))
+        return lambda graph: -operand(graph)
+    
+    if isinstance(node, ast.BinOp) and type(node.op) in _ARITHMETIC:
+        left, right = _compile(node.left), _compile(node.right)
+        op = _ARITHMETIC[type(node.op)]
+        return lambda graph: op(left(graph), right(graph))
+    
+    if isinstance(node, ast.Compare) and all(type(op) in _COMPARE for op in node.ops):
+        # 연쇄 비교 a > b > c → (a > b) and (b > c), 가운데 항은 한 번만 계산
+        terms = [_compile(node.left)] + [_compile(comparator) for comparator in node.comparators]
+        ops = [_COMPARE[type(op)] for op in node.ops]
+        
+        def evaluate(graph):
+            values = [term(graph) for term in terms]
+            result = ops[0](values[0], values[1])
+            for k in range(1, len(ops)):
+                result = np.logical_and(result, ops[k](values[k], values[k + 1]))
+            return result
+        return evaluate
+    
+    raise ValueError(f"지원하지 않는 구문: {ast.unparse(node)}")
+
+
+class ScreenRule:
+    """
+    컴파일된 조건식
+    
+    Args:
+        expression: 조건식 문자열
+    """
+    
+    def __init__(self, expression):
+        self.expression = expression.strip()
+        try:
+            tree = ast.parse(self.expression, mode='eval')
+        except SyntaxError as e:
+            raise ValueError(f"조건식 구문 오류: {self.expression} ({e.msg})") from None
+        self._evaluate = _compile(tree.body)
+        self.inputs = frozenset(_required_inputs(tree.body))
+    
+    def __repr__(self):
+        return f"ScreenRule({self.expression!r})"
+    
+    def check_inputs(self, available):
+        """
+        사용 가능한 기본 입력으로 계산할 수 있는지 확인 (백테스트 시작 전 검사용)
+        
+        Raises:
+            ValueError: 필요한 입력(high/low 등)이 없을 때
+        """
+        missing = sorted(self.inputs - set(available))
+        if missing:
+            raise ValueError(f"조건식에 필요한 가격 입력이 없습니다: {', '.join(missing)} ({self.expression}) - "
+                             f"High/Low 기반 지표(atr, atr_pct, breakout 등)는 고가/저가가 있는 패널(ohlc=True)이 필요합니다.")
+    
+    def evaluate(self, graph):
+        """식 값 ((거래일 × 종목) 배열 또는 상수)"""
+        self.check_inputs(graph.inputs)
+        with np.errstate(invalid='ignore', divide='ignore'):
+            return self._evaluate(graph)
+    
+    def mask(self, graph):
+        """(거래일 × 종목) bool 마스크 (실거래일이 아닌 칸은 False)"""
+        value = np.asarray(self.evaluate(graph))
+        if value.dtype != bool:
+            raise ValueError(f"조건식이 참/거짓 값이 아닙니다: {self.expression}")
+        return np.broadcast_to(value, graph.valid.shape) & graph.valid
+    
+    def latest(self, graph):
+        """종목별 마지막 실거래일 조건 충족 여부 (bool 배열, graph.tickers 순서)"""
+        return graph.last_values(self.mask(graph))
+
+
+@lru_cache(maxsize=64)
+def compile_rule(expression):
+    """조건식 문자열 → ScreenRule (같은 식은 한 번만 컴파일)"""
+    return ScreenRule(expression)
@@ -0,0 +1,264 @@
+"""
+손절/재진입 상태 머신 커널 (Stop-Based Strategy Kernel)
+보유 상태에 따라 달라지는 일별 규칙을 NumPy 배열 위에서 한 번에 실행
+
+- MA20 연속 이탈 일수(보유 중에만 카운트, 매수/매도 시 초기화)
+- 트레일링 스탑 / MA60 손절 후 현금 보유 → 다음 리밸런싱에서 재진입
+- 리밸런싱일 하루 최대 N개 매수, 최대 보유 종목 수, 최소 매수 금액
+
+Numba가 설치되어 있으면 JIT 컴파일하고, 없으면 같은 코드를 순수 Python으로 실행합니다.
+run_backtest_flexible의 이벤트 루프(훅) 경로와 같은 결과를 내며,
+가치 곡선만 필요한 파라미터 스윕에서는 커널 결과 배열을 바로 사용할 수 있습니다.
+"""
+import numpy as np
+from indicators import TRAILING_STOP_DAYS
+
+try:
+    from numba import njit
+    NUMBA_AVAILABLE = True
+except ImportError:
+    NUMBA_AVAILABLE = False
+    
+    def njit(*args, **kwargs):
+        """Numba가 없을 때: 데코레이터를 그대로 통과"""
+        if len(args) == 1 and callable(args[0]) and not kwargs:
+            return args[0]
+        return lambda func: func
+
+# 거래 구분 / 사유 코드
+ACTION_BUY = 0
+ACTION_SELL = 1
+
+REASON_ENTRY = 0
+REASON_TRAILING_STOP = 1
+REASON_MA60_STOP = 2
+
+REASON_TEXT = {
+    REASON_ENTRY: '기술적 조건 만족',
+    REASON_TRAILING_STOP: '트레일링 스탑',
+    REASON_MA60_STOP: 'MA60 손절'
+}
+
+
+@njit(cache=True)
+def _stop_kernel(close, below_ma20, ma60_break, entry, day_rows, targets, target_counts,
+                 initial_capital, fee, slippage, max_positions, max_buys, min_buy_cash, stop_days):
+    n_days = len(day_rows)
+    n_cols = close.shape[1]
+    
+    shares = np.zeros(n_cols)
+    last_price = np.zeros(n_cols)
+    days_below = np.zeros(n_cols, dtype=np.int64)
+    # 티커 인턴 순서 (첫 매수 순서) - 엔진의 held_tickers() 순서와 동일하게 순회
+    order = np.empty(n_cols, dtype=np.int64)
+    seen = np.zeros(n_cols, dtype=np.bool_)
+    n_order = 0
+    cash = initial_capital
+    n_held = 0
+    
+    values = np.zeros(n_days)
+    cash_history = np.zeros(n_days)
+    positions = np.zeros(n_days, dtype=np.int64)
+    
+    capacity = n_days * (max_positions + 2 * max_buys) + 16
+    t_day = np.empty(capacity, dtype=np.int64)
+    t_col = np.empty(capacity, dtype=np.int64)
+    t_action = np.empty(capacity, dtype=np.int64)
+    t_reason = np.empty(capacity, dtype=np.int64)
+    t_shares = np.empty(capacity)
+    t_price = np.empty(capacity)
+    t_value = np.empty(capacity)
+    t_cost = np.empty(capacity)
+    n_trades = 0
+    candidates = np.empty(targets.shape[1], dtype=np.int64)
+    
+    for d in range(n_days):
+        row = day_rows[d]
+        
+        # 1. 보유 종목 평가 가격 갱신 (당일 데이터가 없으면 직전 가격)
+        if row >= 0:
+            for k in range(n_order):
+                col = order[k]
+                if shares[col] > 0 and not np.isnan(close[row, col]):
+                    last_price[col] = close[row, col]
+        
+        # 2. 매도 신호: 트레일링 스탑(MA20 연속 이탈) → MA60 손절
+        if row >= 0:
+            for k in range(n_order):
+                col = order[k]
+                if shares[col] <= 0 or np.isnan(close[row, col]):
+                    continue
+                if below_ma20[row, col]:
+                    days_below[col] += 1
+                else:
+                    days_below[col] = 0
+                
+                reason = -1
+                if days_below[col] >= stop_days:
+                    reason = REASON_TRAILING_STOP
+                elif ma60_break[row, col]:
+                    reason = REASON_MA60_STOP
+                if reason < 0:
+                    continue
+                
+                price = close[row, col]
+                gross = shares[col] * price
+                proceeds = gross * (1 - slippage) * (1 - fee)
+                t_day[n_trades] = d
+                t_col[n_trades] = col
+                t_action[n_trades] = ACTION_SELL
+                t_reason[n_trades] = reason
+                t_shares[n_trades] = shares[col]
+                t_price[n_trades] = price
+                t_value[n_trades] = proceeds
+                t_cost[n_trades] = gross - proceeds
+                n_trades += 1
+                
+                cash += proceeds
+                shares[col] = 0.0
+                last_price[col] = price
+                days_below[col] = 0
+                n_held -= 1
+        
+        # 3. 리밸런싱일 매수: 미보유 상위 종목 중 앞에서부터 최대 max_buys개
+        n_targets = target_counts[d]
+        if n_targets >= 0 and cash > 0 and n_held < max_positions:
+            # 패널에 없는 종목(-1)도 후보 자리는 차지 (매수 시점에 데이터 없음으로 건너뜀)
+            n_candidates = 0
+            for k in range(n_targets):
+                col = targets[d, k]
+                if col < 0 or shares[col] <= 0:
+                    candidates[n_candidates] = col
+                    n_candidates += 1
+            target_positions = min(max_positions, n_targets)
+            
+            for k in range(min(n_candidates, max_buys)):
+                if cash < min_buy_cash:
+                    break
+                col = candidates[k]
+                if col < 0 or row < 0 or np.isnan(close[row, col]) or not entry[row, col]:
+                    continue
+                if target_positions - n_held <= 0:
+                    continue
+                
+                price = close[row, col]
+                amount = min(cash / (target_positions - n_held), cash)
+                fill_price = price * (1 + slippage) * (1 + fee)
+                bought = amount / fill_price
+                spent = bought * fill_price
+                t_day[n_trades] = d
+                t_col[n_trades] = col
+                t_action[n_trades] = ACTION_BUY
+                t_reason[n_trades] = REASON_ENTRY
+                t_shares[n_trades] = bought
+                t_price[n_trades] = price
+                t_value[n_trades] = spent
+                t_cost[n_trades] = spent - bought * price
+                n_trades += 1
+                
+                if shares[col] <= 0:
+                    n_held += 1
+                if not seen[col]:
+                    seen[col] = True
+                    order[n_order] = col
+                    n_order += 1
+                shares[col] += bought
+                last_price[col] = price
+                days_below[col] = 0
+                cash = max(cash - spent, 0.0)
+        
+        # 4. 일별 가치 기록
+        position_value = 0.0
+        for k in range(n_order):
+            col = order[k]
+            position_value += shares[col] * last_price[col]
+        values[d] = cash + position_value
+        cash_history[d] = cash
+        positions[d] = n_held
+    
+    return (values, cash_history, positions, t_day[:n_trades], t_col[:n_trades],
+            t_action[:n_trades], t_reason[:n_trades], t_shares[:n_trades],
+            t_price[:n_trades], t_value[:n_trades], t_cost[:n_trades])
+
+
+def run_stop_kernel(indicators, day_rows, targets, initial_capital=10000, fee=0.0, slippage=0.0,
+                    max_positions=10, max_buys=3, min_buy_cash=100, stop_days=TRAILING_STOP_DAYS):
+    """
+    손절/재진입 전략 실행
+    
+    Args:
+        indicators: IndicatorPanel (close, below_ma20, ma60_break, entry 마스크)
+        day_rows: 거래 날짜별 패널 행 (당일 데이터가 없으면 -1)
+        targets: 거래 날짜별 목표 종목 열 리스트 (리밸런싱하지 않는 날은 None, 패널에 없는 종목은 -1)
+        initial_capital: 초기 자본
+        fee, slippage: 거래 비용 (FixedCostModel과 같은 방식)
+        max_positions: 최대 보유 종목 수
+        max_buys: 리밸런싱일 하루 최대 매수 종목 수
+        min_buy_cash: 이 금액 미만의 현금으로는 매수하지 않음
+        stop_days: 트레일링 스탑 MA20 연속 이탈 일수
+    
+    Returns:
+        dict: values, cash, positions (일별 배열), trades (거래 배열 dict)
+    """
+    width = max([len(t) for t in targets if t is not None] or [1])
+    target_matrix = np.full((len(day_rows), width), -1, dtype=np.int64)
+    target_counts = np.full(len(day_rows), -1, dtype=np.int64)
+    for d, cols in enumerate(targets):
+        if cols is None:
+            continue
+        target_counts[d] = len(cols)
+        target_matrix[d, :len(cols)] = cols
+    
+    out = _stop_kernel(
+        indicators.close, indicators.below_ma20, indicators.ma60_break, indicators.entry,
+        np.asarray(day_rows, dtype=np.int64), target_matrix, target_counts,
+        float(initial_capital), float(fee), float(slippage),
+        int(max_positions), int(max_buys), float(min_buy_cash), int(stop_days)
+    )
+    values, cash, positions = out[:3]
+    keys = ('day', 'col', 'action', 'reason', 'shares', 'price', 'value', 'cost')
+    return {
+        'values': values,
+        'cash': cash,
+        'positions': positions,
+        'trades': dict(zip(keys, out[3:]))
+    }
+
+
+def kernel_records(result, dates, tickers, initial_capital):
+    """
+    커널 결과를 PortfolioEngine과 같은 기록 형식으로 변환
+    
+    Returns:
+        (portfolio_history, daily_returns, trade_log)
+    """
+    portfolio_history = []
+    daily_returns = []
+    prev_value = initial_capital
+    for d, date in enumerate(dates):
+        date_str = date.strftime('%Y-%m-%d')
+        value = float(result['values'][d])
+        portfolio_history.append({
+            'date': date_str,
+            'value': value,
+            'cash': float(result['cash'][d]),
+            'positions': int(result['positions'][d])
+        })
+        period_return = ((value - prev_value) / prev_value) * 100 if prev_value > 0 else 0
+        daily_returns.append({'date': date_str, 'return': period_return, 'value': value})
+        prev_value = value
+    
+    trades = result['trades']
+    trade_log = []
+    for k in range(len(trades['day'])):
+        trade_log.append({
+            'date': dates[trades['day'][k]].strftime('%Y-%m-%d'),
+            'action': 'BUY' if trades['action'][k] == ACTION_BUY else 'SELL',
+            'ticker': tickers[trades['col'][k]],
+            'shares': float(trades['shares'][k]),
+            'price': float(trades['price'][k]),
+            'value': float(trades['value'][k]),
+            'cost': float(trades['cost'][k]),
+            'reason': REASON_TEXT[int(trades['reason'][k])]
+        })
+    return portfolio_history, daily_returns, trade_log
@@ -1,11 +1,48 @@
 # 기술적 분석 모듈 - 이동평균선 분석
+import numpy as np
 import yfinance as yf
 import pandas as pd
 from datetime import datetime, timedelta
 from logger import get_logger
+from ma_state import MovingAverageState, get_ma_state_store
+from indicators import IndicatorGraph, rolling_mean, MA_PERIODS, ATR_PERIOD
+from screening import compile_rule
 
 logger = get_logger()
 
+# 이동평균 기간 / 최소 데이터 일수
+MA_WINDOWS = MA_PERIODS
+MIN_HISTORY_DAYS = 120
+
+# analyze_technical_batch 결과 컬럼 타입 (calculate_ma_status 결과 키와 동일)
+TECHNICAL_COLUMNS = {
+    'price': 'float64',
+    'ma20': 'float64',
+    'ma60': 'float64',
+    'ma120': 'float64',
+    'above_ma20': 'bool',
+    'above_ma60': 'bool',
+    'above_ma120': 'bool',
+    'ma60_above_ma120': 'bool',
+    'all_conditions_met': 'bool',
+    'status': 'object'
+}
+
+# scan_technical 추가 컬럼 (ATR, MA20 기울기, 3개월 신고가 돌파)
+SCAN_COLUMNS = {
+    'atr': 'float64',
+    'atr_pct': 'float64',
+    'ma20_yesterday': 'float64',
+    'ma20_slope': 'float64',
+    'ma20_declining': 'bool',
+    'previous_high': 'float64',
+    'today_high': 'float64',
+    'breakout': 'bool',
+    'breakout_percent': 'float64'
+}
+
+MIN_BREAKOUT_DAYS = 10
+
 def get_moving_averages(ticker, period="6mo"):
     """
     yfinance로 역사적 가격 데이터를 가져와서 이동평균 계산
@@ -37,6 +74,28 @@ def get_moving_averages(ticker, period="6mo"):
         logger.error(f"{ticker}: 데이터 가져오기 실패 - {e}")
         return None
 
+def get_timeframe_history(ticker, timeframe="W", store=None):
+    """
+    주봉/월봉 가격 데이터 (로컬 일봉 저장소 리샘플 - 다른 interval로 다시 조회하지 않음)
+    
+    Args:
+        ticker: 종목 티커
+        timeframe: 'D' (일봉), 'W' (주봉), 'M' (월봉)
+        store: DailyBarStore (기본: 공용 저장소 - 마지막 저장일 이후 일봉만 갱신)
+    
+    Returns:
+        DataFrame (Open/High/Low/Close/Volume) or None
+    """
+    from bar_store import get_bar_store
+    
+    store = get_bar_store() if store is None else store
+    store.update([ticker])
+    bars = store.bars(ticker, timeframe)
+    if bars is None or bars.empty:
+        logger.warning(f"{ticker}: 역사적 데이터가 없습니다.")
+        return None
+    return bars
+
 def calculate_atr(ticker, period=14):
     """
     ATR (Average True Range) 계산
@@ -60,16 +119,12 @@ def calculate_atr(ticker, period=14):
             logger.warning(f"{ticker}: ATR 계산을 위한 충분한 데이터가 없습니다.")
             return None
         
-        # True Range 계산
-        # TR = max(High - Low, |High - Previous Close|, |Low - Previous Close|)
-        high_low = hist['High'] - hist['Low']
-        high_prev_close = abs(hist['High'] - hist['Close'].shift(1))
-        low_prev_close = abs(hist['Low'] - hist['Close'].shift(1))
-        
-        true_range = pd.concat([high_low, high_prev_close, low_prev_close], axis=1).max(axis=1)
-        
-        # ATR = True Range의 이동평균
-        atr = true_range.rolling(window=period).mean().iloc[-1]
+        # ATR = 지표 그래프의 True Range 이동평균 (기간이 ATR_PERIOD면 선언된 atr 그대로)
+        graph = IndicatorGraph.from_frame(hist, ticker)
+        if period == ATR_PERIOD:
+            atr = graph.get('atr')[-1, 0]
+        else:
+            atr = rolling_mean(graph.get('true_range'), graph.valid, period)[-1, 0]
         
         current_price = hist['Close'].iloc[-1]
         atr_pct = (atr / current_price) * 100 if current_price > 0 else 0
@@ -109,17 +164,14 @@ def calculate_ma20_slope(ticker):
             logger.warning(f"{ticker}: MA20 기울기 계산을 위한 충분한 데이터가 없습니다.")
             return None
         
-        # MA20 계산
-        ma20 = hist['Close'].rolling(window=20).mean()
-        
-        if len(ma20) < 2:
+        # MA20 / 기울기 (지표 그래프의 ma20, ma20_prev, ma20_slope)
+        latest = IndicatorGraph.from_frame(hist, ticker).latest(['ma20', 'ma20_prev', 'ma20_slope']).iloc[0]
+        if pd.isna(latest['ma20_prev']):
             return None
         
-        ma20_today = ma20.iloc[-1]
-        ma20_yesterday = ma20.iloc[-2]
-        
-        # 기울기 계산 (퍼센트 변화)
-        slope = ((ma20_today - ma20_yesterday) / ma20_yesterday) * 100 if ma20_yesterday > 0 else 0
+        ma20_today = float(latest['ma20'])
+        ma20_yesterday = float(latest['ma20_prev'])
+        slope = float(latest['ma20_slope'])
         is_declining = slope <= 0
         
         logger.debug(f"{ticker}: MA20 오늘={ma20_today:.2f}, 어제={ma20_yesterday:.2f}, 기울기={slope:.3f}%")
@@ -135,12 +187,16 @@ def calculate_ma20_slope(ticker):
         logger.error(f"{ticker}: MA20 기울기 계산 실패 - {e}")
         return None
 
-def calculate_ma_status(ticker):
+def calculate_ma_status(ticker, store=None):
     """
     종목의 이동평균선 분석 수행
     
+    저장된 이동평균 상태(ma_state)를 일봉 저장소(bar_store)의 마지막 저장일 이후 일봉으로만 갱신하여 계산합니다.
+    (처음 보는 종목만 일봉 저장소가 이력을 조회)
+    
     Args:
         ticker: 종목 티커
+        store: MAStateStore (기본: 공용 저장소 - 갱신 후 저장)
     
     Returns:
         dict: {
@@ -156,99 +212,284 @@ def calculate_ma_status(ticker):
             'status': 'success' or 'error'
         }
     """
-    result = {
-        'price': None,
-        'ma20': None,
-        'ma60': None,
-        'ma120': None,
-        'above_ma20': False,
-        'above_ma60': False,
-        'above_ma120': False,
-        'ma60_above_ma120': False,
-        'all_conditions_met': False,
-        'status': 'error'
-    }
-    
     try:
-        # 역사적 데이터 가져오기 (6개월 = 약 130영업일)
-        hist = get_moving_averages(ticker, period="6mo")
-        
-        if hist is None or len(hist) < 120:
-            logger.warning(f"{ticker}: 충분한 데이터가 없습니다 (필요: 120일, 보유: {len(hist) if hist is not None else 0}일)")
+        shared = store is None
+        if shared:
+            store = get_ma_state_store()
+        store.refresh([ticker])
+        if shared:
+            store.save()
+        
+        state = store.get(ticker)
+        result = state.status() if state is not None else MovingAverageState().status()
+        if result['status'] != 'success':
+            count = state.count if state is not None else 0
+            logger.warning(f"{ticker}: 충분한 데이터가 없습니다 (필요: 120일, 보유: {count}일)")
             return result
         
-        # 현재가 (가장 최근 종가)
-        current_price = hist['Close'].iloc[-1]
-        
-        # 20일 이동평균
-        ma20 = hist['Close'].tail(20).mean()
-        
-        # 60일 이동평균
-        ma60 = hist['Close'].tail(60).mean()
-        
-        # 120일 이동평균
-        ma120 = hist['Close'].tail(120).mean()
-        
-        # 조건 체크
-        above_ma20 = current_price > ma20
-        above_ma60 = current_price > ma60
-        above_ma120 = current_price > ma120
-        ma60_above_ma120 = ma60 > ma120
-        
-        # 모든 조건 만족 여부
-        all_conditions = above_ma60 and above_ma120 and ma60_above_ma120
-        
-        result = {
-            'price': round(current_price, 2),
-            'ma20': round(ma20, 2),
-            'ma60': round(ma60, 2),
-            'ma120': round(ma120, 2),
-            'above_ma20': above_ma20,
-            'above_ma60': above_ma60,
-            'above_ma120': above_ma120,
-            'ma60_above_ma120': ma60_above_ma120,
-            'all_conditions_met': all_conditions,
-            'status': 'success'
-        }
-        
-        logger.info(f"{ticker}: 현재가=${current_price:.2f}, MA20=${ma20:.2f}, MA60=${ma60:.2f}, MA120=${ma120:.2f}, 조건충족={all_conditions}")
+        logger.info(f"{ticker}: 현재가=${result['price']:.2f}, MA20=${result['ma20']:.2f}, MA60=${result['ma60']:.2f}, "
+                    f"MA120=${result['ma120']:.2f}, 조건충족={result['all_conditions_met']}")
         
         return result
     
     except Exception as e:
         logger.error(f"{ticker}: 이동평균 계산 실패 - {e}")
-        return result
+        return MovingAverageState().status()
+
+def fetch_histories(tickers, period="6mo"):
+    """
+    여러 종목의 역사적 가격 데이터를 한 번의 일괄 요청으로 가져오기
+    
+    Args:
+        tickers: 종목 티커 리스트
+        period: 가져올 기간 (get_moving_averages와 동일)
+    
+    Returns:
+        dict: {ticker: 가격 DataFrame} (데이터가 없는 종목은 제외)
+    """
+    tickers = list(dict.fromkeys(tickers))
+    if not tickers:
+        return {}
+    
+    try:
+        data = yf.download(tickers, period=period, group_by='ticker', auto_adjust=True,
+                           progress=False, threads=True)
+    except Exception as e:
+        logger.error(f"일괄 데이터 가져오기 실패 ({len(tickers)}개 종목) - {e}")
+        return {}
+    
+    histories = {}
+    for ticker in tickers:
+        if isinstance(data.columns, pd.MultiIndex):
+            if ticker not in data.columns.get_level_values(0):
+                logger.warning(f"{ticker}: 역사적 데이터가 없습니다.")
+                continue
+            hist = data[ticker]
+        else:
+            hist = data
+        hist = hist.dropna(how='all')
+        if hist.empty:
+            logger.warning(f"{ticker}: 역사적 데이터가 없습니다.")
+            continue
+        histories[ticker] = hist
+    
+    logger.debug(f"일괄 데이터: {len(histories)}/{len(tickers)}개 종목")
+    return histories
+
+def analyze_technical_batch(tickers, period="6mo", histories=None, graph=None, rule=None):
+    """
+    여러 종목의 이동평균선 분석을 한 번에 수행 (calculate_ma_status의 일괄 버전)
+    
+    가격은 한 번의 일괄 요청으로 가져오고, 이동평균과 조건은 지표 그래프(indicators.IndicatorGraph)에서
+    종목별 마지막 실거래일 값으로 한꺼번에 계산합니다.
+    
+    Args:
+        tickers: 종목 티커 리스트
+        period: 가져올 기간 (기본 6개월 - 120일선 계산에 충분)
+        histories: 미리 가져온 {ticker: 가격 DataFrame} (없으면 fetch_histories로 조회)
+        graph: 미리 만든 IndicatorGraph (scan_technical과 중간값 공유)
+        rule: 매수 조건식 (screening 조건식) - 있으면 all_conditions_met을 이 식으로 판정
+    
+    Returns:
+        DataFrame: index=ticker, 컬럼/타입은 TECHNICAL_COLUMNS
+                   (데이터 부족 종목은 status='error', 가격/이동평균 NaN, 조건 False)
+    """
+    tickers = list(dict.fromkeys(tickers))
+    frame = pd.DataFrame(index=pd.Index(tickers, name='ticker'), columns=list(TECHNICAL_COLUMNS))
+    frame[['price', 'ma20', 'ma60', 'ma120']] = np.nan
+    frame[['above_ma20', 'above_ma60', 'above_ma120', 'ma60_above_ma120', 'all_conditions_met']] = False
+    frame['status'] = 'error'
+    frame = frame.astype(TECHNICAL_COLUMNS)
+    if not tickers:
+        return frame
+    
+    if graph is None:
+        if histories is None:
+            histories = fetch_histories(tickers, period=period)
+        graph = IndicatorGraph.from_histories(histories, tickers)
+    if not graph.tickers:
+        return frame
+    
+    conditions = ['above_ma20', 'above_ma60', 'above_ma120', 'ma60_above_ma120', 'all_conditions_met']
+    latest = graph.latest(['close', 'history_days'] + [f'ma{window}' for window in MA_WINDOWS] + conditions)
+    
+    counts = latest['history_days']
+    ok = counts >= MIN_HISTORY_DAYS
+    for ticker in counts.index[~ok]:
+        logger.warning(f"{ticker}: 충분한 데이터가 없습니다 (필요: {MIN_HISTORY_DAYS}일, 보유: {counts[ticker]}일)")
+    ok = ok[ok].index
+    
+    frame.loc[ok, 'price'] = latest.loc[ok, 'close'].round(2)
+    for window in MA_WINDOWS:
+        frame.loc[ok, f'ma{window}'] = latest.loc[ok, f'ma{window}'].round(2)
+    if rule is not None:
+        latest['all_conditions_met'] = compile_rule(rule).latest(graph)
+    for column in conditions:
+        frame.loc[ok, column] = latest.loc[ok, column]
+    frame.loc[ok, 'status'] = 'success'
+    return frame.astype(TECHNICAL_COLUMNS)
 
-def analyze_top10_technical(df):
+def scan_technical(tickers, period="6mo", histories=None, rule=None):
     """
-    상위 5개 종목의 기술적 분석을 일괄 처리
+    스크리너 종목 전체 기술적 스캔 (이동평균 배열, ATR, MA20 기울기, 3개월 신고가 돌파)
+    
+    6개월 이력을 한 번에 일괄 조회해 지표 그래프 하나를 만들고, 모든 지표를 그 그래프에서 읽습니다.
+    (직전 종가, MA20 등 공유 중간값은 한 번만 계산)
+    종목별 값은 calculate_atr / calculate_ma20_slope / detect_breakout_highs의 종목별 계산과 같은 규칙입니다.
+    
+    Args:
+        tickers: 종목 티커 리스트 (스크리너 순위 순)
+        period: 가져올 기간 (기본 6개월)
+        histories: 미리 가져온 {ticker: 가격 DataFrame}
+        rule: 매수 조건식 (analyze_technical_batch와 동일)
+    
+    Returns:
+        DataFrame: analyze_technical_batch 컬럼 + SCAN_COLUMNS (계산할 수 없는 값은 NaN/False)
+    """
+    tickers = list(dict.fromkeys(tickers))
+    if histories is None:
+        histories = fetch_histories(tickers, period=period)
+    graph = IndicatorGraph.from_histories(histories, tickers)
+    frame = analyze_technical_batch(tickers, graph=graph, rule=rule)
+    for column, dtype in SCAN_COLUMNS.items():
+        frame[column] = False if dtype == 'bool' else np.nan
+    if not graph.tickers:
+        return frame.astype(SCAN_COLUMNS)
+    
+    latest = graph.latest(['history_days', 'atr', 'atr_pct', 'ma20_prev', 'ma20_slope', 'ma20_declining',
+                           'high', 'previous_high', 'breakout_days', 'breakout', 'breakout_percent'])
+    counts = latest['history_days']
+    
+    # ATR: True Range(전 거래일 종가 기준)의 최근 14개 평균
+    has_atr = latest.index[counts >= ATR_PERIOD + 1]
+    frame.loc[has_atr, ['atr', 'atr_pct']] = latest.loc[has_atr, ['atr', 'atr_pct']].to_numpy()
+    
+    # MA20 기울기: 오늘/어제 MA20 변화율
+    has_slope = latest.index[counts >= 21]
+    frame.loc[has_slope, 'ma20_yesterday'] = latest.loc[has_slope, 'ma20_prev']
+    frame.loc[has_slope, 'ma20_slope'] = latest.loc[has_slope, 'ma20_slope']
+    frame.loc[has_slope, 'ma20_declining'] = latest.loc[has_slope, 'ma20_declining']
+    
+    # 3개월 신고가: 최근 3개월 중 전 거래일까지의 최고가를 현재가가 넘었는지
+    has_breakout = latest.index[latest['breakout_days'] >= MIN_BREAKOUT_DAYS]
+    frame.loc[has_breakout, 'previous_high'] = latest.loc[has_breakout, 'previous_high'].round(2)
+    frame.loc[has_breakout, 'today_high'] = latest.loc[has_breakout, 'high'].round(2)
+    frame.loc[has_breakout, 'breakout'] = latest.loc[has_breakout, 'breakout']
+    frame.loc[has_breakout, 'breakout_percent'] = latest.loc[has_breakout, 'breakout_percent'].round(2)
+    
+    return frame.astype(SCAN_COLUMNS)
+
+def analyze_timeframe(tickers, timeframe="W", rule=None, store=None, update=True):
+    """
+    주봉/월봉 기준 이동평균선 분석 (analyze_technical_batch와 같은 컬럼)
+    
+    로컬 일봉 저장소를 리샘플하므로 추가 조회는 새 일봉 갱신분뿐입니다.
+    예: timeframe='W'면 ma20/ma60/ma120은 20/60/120주 이동평균, rule='close > ma20'은 주봉 추세 필터
+    
+    Args:
+        tickers: 종목 티커 리스트
+        timeframe: 'D' / 'W' / 'M'
+        rule: 조건식 (all_conditions_met 판정, 없으면 종가 > MA60 > MA120 기본 조건)
+        store: DailyBarStore (기본: 공용 저장소)
+        update: False면 저장소를 갱신하지 않고 저장된 일봉만 사용
+    
+    Returns:
+        DataFrame: index=ticker, 컬럼/타입은 TECHNICAL_COLUMNS
+    """
+    from bar_store import get_bar_store
+    
+    tickers = list(dict.fromkeys(tickers))
+    store = get_bar_store() if store is None else store
+    if update:
+        store.update(tickers)
+    return analyze_technical_batch(tickers, graph=store.graph(tickers, timeframe), rule=rule)
+
+def apply_entry_rule(technical_analysis, scan):
+    """
+    이동평균 상태 기반 분석 결과의 조건 충족 여부를 스캔 결과(매수 조건식 판정)로 교체
+    
+    두 결과 모두 성공한 종목만 교체하고, 스캔에 없는 종목은 기존 판정(종가 > MA60 > MA120)을 유지합니다.
+    
+    Returns:
+        교체한 종목 수
+    """
+    if not technical_analysis or scan is None:
+        return 0
+    applied = 0
+    for ticker, record in technical_analysis.items():
+        if record['status'] != 'success' or ticker not in scan.index or scan.at[ticker, 'status'] != 'success':
+            continue
+        record['all_conditions_met'] = bool(scan.at[ticker, 'all_conditions_met'])
+        applied += 1
+    return applied
+
+def technical_records(frame):
+    """
+    analyze_technical_batch 결과 → {ticker: calculate_ma_status 형식 dict}
+    
+    기존 dict 소비자(telegram_notifier, 대시보드, detect_* 함수)용 호환 변환입니다.
+    실패 종목의 가격/이동평균은 None입니다.
+    """
+    records = {}
+    for ticker, row in frame.iterrows():
+        record = {}
+        for column, dtype in TECHNICAL_COLUMNS.items():
+            value = row[column]
+            if dtype == 'float64':
+                value = None if pd.isna(value) else float(value)
+            elif dtype == 'bool':
+                value = bool(value)
+            record[column] = value
+        records[ticker] = record
+    return records
+
+def as_technical_dict(technical_analysis):
+    """기술적 분석 결과를 dict 형식으로 (DataFrame이면 technical_records 변환, dict/None은 그대로)"""
+    if isinstance(technical_analysis, pd.DataFrame):
+        return technical_records(technical_analysis)
+    return technical_analysis
+
+def analyze_top10_technical(df, top_n=5, store=None, offset=0, update=True):
+    """
+    상위 종목의 기술적 분석을 일괄 처리
     
     Args:
         df: Finviz에서 가져온 DataFrame
+        top_n: 분석할 상위 종목 수 (기본 5개)
+        store: MAStateStore - 지정하면 일봉 저장소에서 이동평균 상태를 증분 갱신하여 사용
+               (없으면 6개월 이력을 일괄 조회하여 계산)
+        offset: store 사용 시 기준일 (0: 최근 종가, 1: 전날 종가 - MA60 이탈 비교용)
+        update: store 사용 시 일봉 저장소를 먼저 갱신 (이미 갱신했으면 False)
     
     Returns:
         dict: {ticker: ma_status_result}
     """
-    top10 = df.head(5)
-    technical_analysis = {}
+    tickers = df.head(top_n)['Ticker'].tolist()
     
-    logger.info("=== 상위 5개 종목 기술적 분석 시작 ===")
+    logger.info(f"=== 상위 {len(tickers)}개 종목 기술적 분석 시작 ===")
     
-    for i, row in top10.iterrows():
-        ticker = row['Ticker']
-        logger.info(f"분석 중: {ticker} ({i+1}/5)")
-        
-        # 각 종목의 이동평균선 분석
-        ma_status = calculate_ma_status(ticker)
-        technical_analysis[ticker] = ma_status
+    if store is not None:
+        store.refresh(tickers, update=update)
+        technical_analysis = store.statuses(tickers, offset=offset)
+        success_count = sum(1 for v in technical_analysis.values() if v['status'] == 'success')
+        all_conditions_count = sum(1 for v in technical_analysis.values() if v['all_conditions_met'])
+        logger.info(f"분석 성공: {success_count}/{len(tickers)}, 모든 조건 만족: {all_conditions_count}/{len(tickers)} "
+                    f"(이동평균 상태{', 전날 기준' if offset else ''})")
+        return technical_analysis
+    
+    frame = analyze_technical_batch(tickers)
+    for ticker, row in frame[frame['status'] == 'success'].iterrows():
+        logger.info(f"{ticker}: 현재가=${row['price']:.2f}, MA20=${row['ma20']:.2f}, MA60=${row['ma60']:.2f}, "
+                    f"MA120=${row['ma120']:.2f}, 조건충족={row['all_conditions_met']}")
+    technical_analysis = technical_records(frame)
     
     logger.info("=== 기술적 분석 완료 ===")
     
     # 요약 통계
-    success_count = sum(1 for v in technical_analysis.values() if v['status'] == 'success')
-    all_conditions_count = sum(1 for v in technical_analysis.values() if v.get('all_conditions_met', False))
+    success_count = int((frame['status'] == 'success').sum())
+    all_conditions_count = int(frame['all_conditions_met'].sum())
     
-    logger.info(f"분석 성공: {success_count}/10, 모든 조건 만족: {all_conditions_count}/10")
+    logger.info(f"분석 성공: {success_count}/{len(tickers)}, 모든 조건 만족: {all_conditions_count}/{len(tickers)}")
     
     return technical_analysis
 
@@ -306,6 +547,9 @@ def detect_ma60_breaks(current_technical, previous_technical):
     """
     MA60 이탈 종목 감지 (손절 신호)
     
+    전날 결과는 이동평균 상태의 전날 기준 값(analyze_top10_technical(..., store, offset=1))을 쓰면
+    이력을 다시 조회하지 않습니다.
+    
     Args:
         current_technical: 현재 기술적 분석 결과
         previous_technical: 전날 기술적 분석 결과
@@ -346,7 +590,26 @@ def detect_ma60_breaks(current_technical, previous_technical):
     
     return ma60_breaks
 
-def detect_trailing_stops(current_technical, previous_technical):
+def _scan_atr(scan, ticker):
+    """scan_technical 결과 → calculate_atr 형식 (값이 없으면 None)"""
+    if ticker not in scan.index or pd.isna(scan.at[ticker, 'atr']):
+        return None
+    row = scan.loc[ticker]
+    return {'atr': float(row['atr']), 'atr_pct': float(row['atr_pct']), 'current_price': float(row['price'])}
+
+def _scan_slope(scan, ticker):
+    """scan_technical 결과 → calculate_ma20_slope 형식 (값이 없으면 None)"""
+    if ticker not in scan.index or pd.isna(scan.at[ticker, 'ma20_slope']):
+        return None
+    row = scan.loc[ticker]
+    return {
+        'ma20_today': float(row['ma20']),
+        'ma20_yesterday': float(row['ma20_yesterday']),
+        'slope': float(row['ma20_slope']),
+        'is_declining': bool(row['ma20_declining'])
+    }
+
+def detect_trailing_stops(current_technical, previous_technical, scan=None):
     """
     트레일링 스탑 신호 감지 (개선된 조건)
     
@@ -355,6 +618,7 @@ def detect_trailing_stops(current_technical, previous_technical):
     Args:
         current_technical: 현재 기술적 분석 결과
         previous_technical: 전날 기술적 분석 결과
+        scan: scan_technical 결과 - 있으면 ATR/MA20 기울기를 종목별로 다시 조회하지 않음
     
     Returns:
         list: 트레일링 스탑 조건을 만족하는 종목 리스트
@@ -386,7 +650,7 @@ def detect_trailing_stops(current_technical, previous_technical):
         ma20 = current['ma20']
         
         # 1. ATR 기반 버퍼 계산
-        atr_info = calculate_atr(ticker)
+        atr_info = _scan_atr(scan, ticker) if scan is not None else calculate_atr(ticker)
         if atr_info:
             # 버퍼 = max(1%, 0.5 × ATR%)
             atr_buffer = 0.5 * atr_info['atr_pct']
@@ -408,7 +672,7 @@ def detect_trailing_stops(current_technical, previous_technical):
             continue
         
         # 3. MA20 기울기 체크
-        ma20_slope_info = calculate_ma20_slope(ticker)
+        ma20_slope_info = _scan_slope(scan, ticker) if scan is not None else calculate_ma20_slope(ticker)
         if not ma20_slope_info:
             logger.debug(f"{ticker}: MA20 기울기 계산 실패")
             continue
@@ -440,24 +704,41 @@ def detect_trailing_stops(current_technical, previous_technical):
     
     return trailing_stops
 
-def detect_breakout_highs(df):
+def detect_breakout_highs(df, top_n=5, scan=None):
     """
     3개월 신고가 돌파 종목 감지 (매수 신호)
     
     Args:
-        df: 현재 DataFrame (상위 10개 종목)
+        df: 현재 DataFrame (스크리너 순위 순)
+        top_n: 감지할 상위 종목 수 (기본 5개)
+        scan: scan_technical 결과 - 있으면 종목별로 다시 조회하지 않고 돌파 컬럼 사용
     
     Returns:
         list: 신고가를 돌파한 종목 리스트
     """
     breakout_highs = []
-    top10 = df.head(5)
+    top10 = df.head(top_n)
     
     logger.info("=== 3개월 신고가 돌파 감지 ===")
     
     for i, row in top10.iterrows():
         ticker = row['Ticker']
         
+        if scan is not None:
+            # 일괄 스캔 결과의 돌파 컬럼 사용
+            if ticker in scan.index and scan.at[ticker, 'breakout']:
+                hit = scan.loc[ticker]
+                breakout_highs.append({
+                    'ticker': ticker,
+                    'current_price': float(hit['price']),
+                    'previous_high': float(hit['previous_high']),
+                    'today_high': float(hit['today_high']),
+                    'breakout_percent': float(hit['breakout_percent'])
+                })
+                logger.info(f"🚀 {ticker} 신고가 돌파! 현재가=${hit['price']:.2f}, 전 최고가=${hit['previous_high']:.2f}, "
+                            f"돌파율={hit['breakout_percent']:.1f}%")
+            continue
+        
         try:
             # 3개월 가격 데이터 가져오기
             hist = get_moving_averages(ticker, period="3mo")
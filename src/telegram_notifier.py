@@ -3,6 +3,7 @@ import requests
 from datetime import datetime
 from config import TELEGRAM_BOT_TOKEN, TELEGRAM_CHAT_ID
 from analyzer import calculate_summary_stats
+from technical_analyzer import as_technical_dict
 
 def create_telegram_message(current_df, yesterday_analysis, week_analysis, technical_analysis=None, screener_name="대형주", ma60_breaks=None, trailing_stops=None, breakout_highs=None, market_regime=None):
     """Telegram 메시지 생성 - 투자 전략 중심의 간결한 형식
@@ -11,7 +12,7 @@ def create_telegram_message(current_df, yesterday_analysis, week_analysis, techn
         current_df: 현재 데이터 DataFrame
         yesterday_analysis: 전날 분석 결과
         week_analysis: 일주일 전 분석 결과
-        technical_analysis: 기술적 분석 결과 (선택사항)
+        technical_analysis: 기술적 분석 결과 (선택사항 - {ticker: dict} 또는 analyze_technical_batch DataFrame)
         screener_name: 스크리너 이름 (대형주/초대형주)
         ma60_breaks: MA60 이탈 종목 리스트 (선택사항)
         trailing_stops: 트레일링 스탑 종목 리스트 (선택사항)
@@ -19,6 +20,7 @@ def create_telegram_message(current_df, yesterday_analysis, week_analysis, techn
         market_regime: 시장 상태 정보 (선택사항)
     """
     current_top10 = current_df.head(10)
+    technical_analysis = as_technical_dict(technical_analysis)
     
     # 요약 통계 계산
     stats = calculate_summary_stats(current_df)
@@ -40,6 +42,9 @@ def create_telegram_message(current_df, yesterday_analysis, week_analysis, techn
         message += f"• MA200: ${market_regime.get('spy_ma200', 0):.2f}\n"
         message += f"• MA120: ${market_regime.get('spy_ma120', 0):.2f}\n"
         message += f"• VIX: {market_regime.get('vix', 0):.2f}\n"
+        breadth = market_regime.get('breadth')
+        if breadth and breadth.get('pct_above_ma200') is not None:
+            message += f"• 시장 폭: MA200 위 {breadth['pct_above_ma200']:.1f}% / 신고가-신저가 {breadth['net_new_highs']:+d}\n"
         message += f"• 판단: {market_regime.get('reason', 'N/A')}\n"
         message += "\n━━━━━━━━━━━━━━━━━━━━\n\n"
     
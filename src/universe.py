@@ -0,0 +1,174 @@
+"""
+종목 유니버스 스냅샷 (Point-in-Time Universe)
+스크리너 구성 종목을 날짜별로 저장하고, 백테스트에서는 해당 시점(as-of) 구성 종목을 조회
+
+- 저장: DATA_DIR/universe_{screener_type}.csv (date, ticker) - 스냅샷 하나 = 같은 날짜의 행들
+- as-of 조회: 조회일 이전(포함) 마지막 스냅샷의 구성 종목
+- 첫 스냅샷 이전 날짜는 가장 오래된 스냅샷으로 대체 (생존편향 경고)
+- 스냅샷이 하나도 없을 때만 Finviz를 실시간 조회하여 오늘 날짜로 저장
+
+백테스트는 저장된 스냅샷만 읽으므로 네트워크 없이 재현 가능합니다.
+"""
+from datetime import datetime
+from pathlib import Path
+import pandas as pd
+from logger import get_logger
+from config import DATA_DIR
+
+logger = get_logger()
+
+
+def _ticker_column(df):
+    """Ticker 컬럼 찾기 (없으면 None)"""
+    for col in df.columns:
+        if 'Ticker' in col or 'ticker' in col.lower():
+            return col
+    return None
+
+
+class UniverseStore:
+    """
+    스크리너별 날짜 → 구성 종목 스냅샷 저장소
+    
+    Args:
+        screener_type: 'large' 또는 'mega'
+        data_dir: 저장 디렉토리 (기본: DATA_DIR)
+    """
+    
+    def __init__(self, screener_type, data_dir=DATA_DIR):
+        self.screener_type = screener_type
+        self.path = Path(data_dir) / f'universe_{screener_type}.csv'
+        self._snapshots = None
+        self._warned_earliest = False
+    
+    def _load(self):
+        """스냅샷 로드 (한 번만 읽고 메모리에 유지)"""
+        if self._snapshots is not None:
+            return self._snapshots
+        self._snapshots = {}
+        if self.path.exists():
+            try:
+                df = pd.read_csv(self.path, dtype={'date': str, 'ticker': str})
+                for date_str, group in df.groupby('date', sort=True):
+                    self._snapshots[date_str] = group['ticker'].tolist()
+            except Exception as e:
+                logger.warning(f"유니버스 스냅샷 읽기 실패 ({self.path}): {e}")
+        return self._snapshots
+    
+    @property
+    def dates(self):
+        """스냅샷 날짜 리스트 (오름차순, 'YYYY-MM-DD')"""
+        return sorted(self._load())
+    
+    def __len__(self):
+        return len(self._load())
+    
+    def record(self, tickers, date=None):
+        """
+        스냅샷 저장 (같은 날짜가 있으면 덮어씀)
+        
+        Args:
+            tickers: 구성 종목 리스트
+            date: 스냅샷 날짜 (datetime 또는 'YYYY-MM-DD', 기본: 오늘)
+        """
+        date_str = pd.Timestamp(date or datetime.now()).strftime('%Y-%m-%d')
+        snapshots = self._load()
+        snapshots[date_str] = list(dict.fromkeys(str(t) for t in tickers if pd.notna(t)))
+        
+        rows = [(d, t) for d in sorted(snapshots) for t in snapshots[d]]
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        pd.DataFrame(rows, columns=['date', 'ticker']).to_csv(self.path, index=False)
+        logger.info(f"유니버스 스냅샷 저장: {self.screener_type} {date_str} ({len(snapshots[date_str])}개 종목)")
+    
+    def record_frame(self, df, date=None):
+        """스크리너 DataFrame(Ticker 컬럼)으로 스냅샷 저장"""
+        ticker_column = _ticker_column(df)
+        if ticker_column is None:
+            logger.error("Ticker 컬럼을 찾을 수 없습니다.")
+            return
+        self.record(df[ticker_column].tolist(), date)
+    
+    def as_of(self, date, allow_earliest=True):
+        """
+        date 시점의 구성 종목 (date 이전(포함) 마지막 스냅샷)
+        
+        Args:
+            date: 조회일
+            allow_earliest: 첫 스냅샷 이전 날짜면 가장 오래된 스냅샷으로 대체
+        
+        Returns:
+            (snapshot_date, tickers): 스냅샷이 없으면 (None, [])
+        """
+        dates = self.dates
+        if not dates:
+            return None, []
+        
+        date_str = pd.Timestamp(date).strftime('%Y-%m-%d')
+        idx = pd.Index(dates).searchsorted(date_str, side='right') - 1
+        if idx < 0:
+            if not allow_earliest:
+                return None, []
+            if not self._warned_earliest:
+                logger.warning(f"{date_str}: {self.screener_type} 유니버스 스냅샷 이전 날짜 - "
+                               f"가장 오래된 스냅샷({dates[0]}) 사용 (생존편향 주의)")
+                self._warned_earliest = True
+            idx = 0
+        return dates[idx], list(self._load()[dates[idx]])
+    
+    def tickers_between(self, start_date, end_date):
+        """기간 중 한 번이라도 유효했던 구성 종목 합집합 (가격 패널 조회용)"""
+        dates = self.dates
+        if not dates:
+            return []
+        start_str = pd.Timestamp(start_date).strftime('%Y-%m-%d')
+        end_str = pd.Timestamp(end_date).strftime('%Y-%m-%d')
+        # 시작일 시점의 스냅샷 + 기간 중 새로 찍힌 스냅샷
+        first, _ = self.as_of(start_str)
+        effective = [d for d in dates if first <= d <= end_str] or [first]
+        snapshots = self._load()
+        return list(dict.fromkeys(t for d in effective for t in snapshots[d]))
+
+
+def snapshot_universe(screener_type, date=None, store=None):
+    """
+    Finviz 전체 페이지를 조회하여 유니버스 스냅샷 저장
+    
+    Returns:
+        구성 종목 리스트 (조회 실패 시 [])
+    """
+    from finviz_scraper import scrape_all_tickers_with_pagination
+    
+    if store is None:
+        store = UniverseStore(screener_type)
+    df = scrape_all_tickers_with_pagination(screener_type)
+    if df is None or len(df) == 0:
+        logger.error("티커 리스트를 가져올 수 없습니다.")
+        return []
+    store.record_frame(df, date)
+    _, tickers = store.as_of(date or datetime.now())
+    return tickers
+
+
+_STORES = {}
+
+
+def get_universe_store(screener_type):
+    """스크리너별 공용 저장소 (프로세스 내에서 한 번만 로드)"""
+    if screener_type not in _STORES:
+        _STORES[screener_type] = UniverseStore(screener_type)
+    return _STORES[screener_type]
+
+
+def get_universe_as_of(screener_type, date):
+    """
+    date 시점의 스크리너 구성 종목
+    
+    저장된 스냅샷이 없을 때만 Finviz를 실시간 조회하여 오늘 날짜 스냅샷으로 저장합니다.
+    """
+    store = get_universe_store(screener_type)
+    if len(store) == 0:
+        logger.info(f"{screener_type} 유니버스 스냅샷이 없어 Finviz에서 수집합니다.")
+        if not snapshot_universe(screener_type, store=store):
+            return []
+    _, tickers = store.as_of(date)
+    return tickers
@@ -0,0 +1,129 @@
+#!/usr/bin/env python3
+"""
+매수 조건식 테스트 스크립트
+일일 스캔(scan_technical)과 백테스트(IndicatorPanel)가 같은 조건식으로 같은 마스크를 만드는지 확인
+(네트워크 없이 고정 시드로 만든 OHLC 일봉 사용)
+"""
+import sys
+import os
+
+# src 모듈 경로 추가
+sys.path.append(os.path.join(os.path.dirname(__file__), 'src'))
+
+import numpy as np
+import pandas as pd
+from screening import compile_rule
+from indicators import IndicatorGraph, IndicatorPanel
+from price_panel import PricePanel
+from technical_analyzer import scan_technical
+
+RULE = "close > sma(60) > sma(120) and atr_pct(14) < 5"
+
+
+def make_histories(days=300, seed=7):
+    """종목별 OHLCV 일봉 (상승/하락/고변동성/결측일·늦은 상장 종목 포함)"""
+    rng = np.random.default_rng(seed)
+    dates = pd.bdate_range('2024-01-02', periods=days, tz='America/New_York')
+    profiles = {
+        'UPSLOW': (0.002, 0.006),
+        'DOWN': (-0.002, 0.006),
+        'VOLATILE': (0.002, 0.04),
+        'GAPPY': (0.0015, 0.01),
+        'LATE': (0.003, 0.008)
+    }
+    histories = {}
+    for ticker, (drift, noise) in profiles.items():
+        close = 100 * np.exp(np.cumsum(drift + noise * rng.standard_normal(days)))
+        spread = close * noise * (1 + rng.random(days))
+        frame = pd.DataFrame({
+            'Open': close,
+            'High': close + spread,
+            'Low': close - spread,
+            'Close': close,
+            'Volume': rng.integers(1_000_000, 5_000_000, days)
+        }, index=dates)
+        if ticker == 'GAPPY':
+            frame = frame.drop(frame.index[rng.choice(days, 20, replace=False)])
+        if ticker == 'LATE':
+            frame = frame.iloc[100:]
+        histories[ticker] = frame
+    return histories
+
+
+def make_backtest_panel(histories):
+    """백테스트처럼 스크리너별 OHLC 패널 두 개를 만들어 합침"""
+    tickers = list(histories)
+    panels = [
+        PricePanel.from_series({t: histories[t]['Close'] for t in group},
+                               high={t: histories[t]['High'] for t in group},
+                               low={t: histories[t]['Low'] for t in group})
+        for group in (tickers[:2], tickers[2:])
+    ]
+    return PricePanel.concat(panels)
+
+
+def test_entry_rule():
+    """조건식 전 기간 마스크 / 마지막 거래일 값 비교"""
+    print("=" * 60)
+    print(f"매수 조건식 테스트: {RULE}")
+    print("=" * 60)
+    
+    histories = make_histories()
+    tickers = list(histories)
+    rule = compile_rule(RULE)
+    print(f"필요한 가격 입력: {', '.join(sorted(rule.inputs))}")
+    
+    # 일일 리포트 경로: 종목별 일봉 → 지표 그래프
+    graph = IndicatorGraph.from_histories(histories, tickers)
+    daily_mask = rule.mask(graph)
+    scan = scan_technical(tickers, histories=histories, rule=RULE)
+    
+    # 백테스트 경로: OHLC 가격 패널 → IndicatorPanel
+    panel = make_backtest_panel(histories)
+    backtest = IndicatorPanel(panel, entry_rule=RULE)
+    
+    ok = True
+    if list(panel.dates) != list(graph.dates) or panel.tickers != graph.tickers:
+        print("❌ 거래일/종목 순서가 다릅니다.")
+        return False
+    
+    if not np.array_equal(daily_mask, backtest.entry):
+        diff = np.argwhere(daily_mask != backtest.entry)
+        print(f"❌ 전 기간 마스크 불일치: {len(diff)}칸 (첫 위치: {panel.dates[diff[0][0]].date()} {tickers[diff[0][1]]})")
+        ok = False
+    else:
+        print(f"✅ 전 기간 마스크 일치: {daily_mask.size}칸 중 충족 {int(daily_mask.sum())}칸")
+    
+    # 일일 스캔 결과 = 백테스트 마스크의 종목별 마지막 실거래일 값
+    last_rows = panel.last_valid_rows()[-1]
+    for col, ticker in enumerate(tickers):
+        expected = bool(backtest.entry[last_rows[col], col])
+        actual = bool(scan.loc[ticker, 'all_conditions_met'])
+        mark = '✅' if expected == actual else '❌'
+        print(f"{mark} {ticker}: 일일 스캔 {actual} / 백테스트 {expected}")
+        ok &= expected == actual
+    
+    if not daily_mask.any() or daily_mask.all():
+        print("❌ 조건식이 한쪽으로만 판정되어 비교 의미가 없습니다.")
+        ok = False
+    
+    # 고가/저가 없이 만든 패널은 조건식 평가 전에 ValueError
+    close_only = PricePanel(panel.dates, panel.tickers, panel.values, panel.valid)
+    try:
+        IndicatorPanel(close_only, entry_rule=RULE)
+        print("❌ 종가만 있는 패널에서 오류가 나지 않았습니다.")
+        ok = False
+    except ValueError as e:
+        print(f"✅ 종가만 있는 패널: {e}")
+    
+    return ok
+
+
+if __name__ == "__main__":
+    print("\n🚀 매수 조건식 테스트 시작\n")
+    
+    if test_entry_rule():
+        print("\n✅ 모든 테스트 완료!")
+    else:
+        print("\n❌ 매수 조건식 테스트 실패")
+        sys.exit(1)
@@ -0,0 +1,116 @@
+#!/usr/bin/env python3
+"""
+손절/재진입 커널 테스트 스크립트
+유연한 전략을 이벤트 루프(use_kernel=False)와 상태 머신 커널(use_kernel=True)로 실행해
+거래 기록(trade_log)과 포트폴리오 기록(portfolio_history)이 같은지 확인
+(네트워크 없이 고정 시드로 만든 작은 가격 패널 사용)
+"""
+import sys
+import os
+import math
+import logging
+from datetime import datetime
+
+# src 모듈 경로 추가
+sys.path.append(os.path.join(os.path.dirname(__file__), 'src'))
+
+import numpy as np
+import pandas as pd
+import run_backtest_flexible
+from price_panel import PricePanel
+from stop_kernel import NUMBA_AVAILABLE
+from logger import get_logger
+
+START_DATE = datetime(2023, 1, 3)
+END_DATE = datetime(2023, 12, 29)
+
+
+def make_panels(seed=11):
+    """스크리너별 고정 가격 패널 (상승/하락 구간이 섞인 종목 6개씩, 결측일 포함)"""
+    rng = np.random.default_rng(seed)
+    dates = pd.bdate_range('2022-03-01', '2023-12-29', tz='America/New_York')
+    panels = {}
+    for screener_type, prefix in (('large', 'L'), ('mega', 'M')):
+        series = {}
+        for k in range(6):
+            # 구간마다 추세가 바뀌어 MA20 이탈 / MA60 손절 / 재진입이 모두 발생하도록
+            drift = np.repeat(rng.normal(0.001, 0.004, len(dates) // 40 + 1), 40)[:len(dates)]
+            close = 100 * np.exp(np.cumsum(drift + 0.015 * rng.standard_normal(len(dates))))
+            close[rng.random(len(dates)) < 0.02] = np.nan
+            series[f'{prefix}{k}'] = pd.Series(close, index=dates)
+        panels[screener_type] = PricePanel.from_series(series)
+    return panels
+
+
+def top_by_return(screener_type, date, top_n=5, panel=None):
+    """최근 60거래일 수익률 상위 종목 (유니버스 스냅샷 대신 고정 패널로 선정)"""
+    i = panel.locate(date)
+    if i < 60:
+        return []
+    returns = panel.values[i] / panel.values[i - 60] - 1
+    order = np.argsort(-np.nan_to_num(returns, nan=-np.inf), kind='stable')
+    return [panel.tickers[col] for col in order[:top_n]]
+
+
+def same_records(left, right):
+    """기록 리스트 비교 (실수 값은 상대 오차 1e-9 허용)"""
+    if len(left) != len(right):
+        return False
+    for a, b in zip(left, right):
+        if a.keys() != b.keys():
+            return False
+        for key in a:
+            if isinstance(a[key], float) or isinstance(b[key], float):
+                if not math.isclose(a[key], b[key], rel_tol=1e-9, abs_tol=1e-9):
+                    return False
+            elif a[key] != b[key]:
+                return False
+    return True
+
+
+def test_stop_kernel(rebalance_frequency):
+    """이벤트 루프 / 커널 결과 비교"""
+    print("=" * 60)
+    print(f"커널 비교 테스트: {rebalance_frequency} ({'Numba' if NUMBA_AVAILABLE else '순수 Python'})")
+    print("=" * 60)
+    
+    panels = make_panels()
+    results = {}
+    for use_kernel in (False, True):
+        results[use_kernel] = run_backtest_flexible.simulate_flexible_strategy(
+            START_DATE, END_DATE, rebalance_frequency=rebalance_frequency,
+            panels=panels, use_kernel=use_kernel)
+    loop, kernel = results[False], results[True]
+    if loop is None or kernel is None:
+        print("❌ 시뮬레이션 실패")
+        return False
+    
+    ok = True
+    for field in ('trade_log', 'portfolio_history', 'daily_returns'):
+        same = same_records(loop[field], kernel[field])
+        print(f"{'✅' if same else '❌'} {field}: 이벤트 루프 {len(loop[field])}건 / 커널 {len(kernel[field])}건")
+        ok &= same
+    
+    reasons = {trade['reason'] for trade in loop['trade_log']}
+    print(f"거래 사유: {', '.join(sorted(reasons))} / 최종 가치 ${loop['final_value']:,.2f} / ${kernel['final_value']:,.2f}")
+    if loop['sell_count'] == 0:
+        print("❌ 매도가 없어 손절 경로를 비교하지 못했습니다.")
+        ok = False
+    
+    return ok
+
+
+if __name__ == "__main__":
+    print("\n🚀 손절/재진입 커널 테스트 시작\n")
+    
+    # 유니버스 스냅샷 대신 고정 패널에서 상위 종목 선정, 매매 로그는 생략
+    run_backtest_flexible.get_top_performers_at_date = top_by_return
+    get_logger().setLevel(logging.WARNING)
+    
+    success = all([test_stop_kernel('weekly'), test_stop_kernel('monthly')])
+    
+    if success:
+        print("\n✅ 모든 테스트 완료!")
+    else:
+        print("\n❌ 커널 비교 테스트 실패")
+        sys.exit(1)